@@ -0,0 +1 @@
+# Shared request-path infrastructure
\ No newline at end of file
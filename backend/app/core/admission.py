@@ -0,0 +1,187 @@
+import os
+import json
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+
+from app.core import deadline
+from app.core.errors import ServiceUnavailableError
+from app.core.limiter import ConcurrencyLimiter, QueueTimeoutError
+from app.core.metrics import REGISTRY
+
+ADMISSION_SHED = REGISTRY.counter(
+    "admission_shed_total", "Requests rejected by admission control before reaching a route", ("group", "reason")
+)
+ADMISSION_SERVICE_TIME = REGISTRY.gauge(
+    "admission_service_time_seconds", "Smoothed time a request holds an admission slot", ("group",)
+)
+
+class AdmissionGroup:
+    """경로 묶음 하나의 동시 실행 수 제한 + 대기열 + 요청 deadline
+
+    - 동시에 limit개까지 처리하고 나머지는 최대 max_queue개까지 대기합니다.
+    - 요청마다 도착 시점부터 deadline초의 deadline을 두고, 대기 시간도 여기에 포함됩니다.
+    - 슬롯 점유 시간의 지수 이동 평균으로 예상 대기 시간을 계산해, 기다려도 deadline 안에
+      끝낼 수 없는 요청은 대기열에 넣지 않고 바로 거절합니다. deadline까지 간 요청은 실제로
+      더 걸렸을 수 있으므로 deadline 전체를 점유 시간으로 기록합니다 (빈 슬롯이 있으면 항상 받으므로
+      upstream이 회복되면 평균도 다시 내려갑니다).
+    - 대기열 깊이·점유 수는 limiter_waiting / limiter_active{limiter="admission_{name}"} 지표입니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        prefixes: Sequence[str],
+        limit: int,
+        max_queue: int,
+        deadline: float,
+        smoothing: float = 0.2
+    ) -> None:
+        self.name = name
+        self.prefixes = tuple(prefixes)
+        self.deadline = deadline
+        self.smoothing = smoothing
+        self.limiter = ConcurrencyLimiter(f"admission_{name}", limit, queue_timeout=deadline, max_queue=max_queue)
+        self.service_time = 0.0
+        self.admitted = 0
+        self.shed: Dict[str, int] = {"queue_full": 0, "timeout": 0, "predicted_wait": 0}
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        prefixes: Sequence[str],
+        limit: int,
+        max_queue: int,
+        deadline: float
+    ) -> Optional["AdmissionGroup"]:
+        """ADMISSION_{NAME}_LIMIT / _MAX_QUEUE / _DEADLINE (LIMIT=0이면 None)"""
+        prefix = f"ADMISSION_{name.upper()}"
+        limit = int(os.getenv(f"{prefix}_LIMIT", limit))
+        if limit <= 0:
+            return None
+        return cls(
+            name,
+            prefixes,
+            limit=limit,
+            max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", max_queue)),
+            deadline=float(os.getenv(f"{prefix}_DEADLINE", deadline))
+        )
+
+    def matches(self, path: str) -> bool:
+        return path.startswith(self.prefixes)
+
+    def estimated_wait(self) -> float:
+        """지금 대기열에 들어가면 슬롯을 얻기까지 예상 시간(초)"""
+        if not self.limiter.saturated:
+            return 0.0
+        return (self.limiter.waiting + 1) / self.limiter.limit * self.service_time
+
+    def _reject(self, reason: str, retry_after: float = 1.0) -> ServiceUnavailableError:
+        self.shed[reason] += 1
+        ADMISSION_SHED.inc(self.name, reason)
+        return ServiceUnavailableError(f"요청이 많아 처리할 수 없습니다 ({self.name})", retry_after=retry_after)
+
+    async def admit(self, arrived: float) -> None:
+        """슬롯 획득 (arrived부터 deadline 안에 끝낼 수 없으면 ServiceUnavailableError)"""
+        # 슬롯을 얻은 뒤 처리에 필요한 시간을 남겨 두고 기다림
+        wait_budget = arrived + self.deadline - time.monotonic() - self.service_time
+        if self.limiter.saturated:
+            expected = self.estimated_wait()
+            if expected > wait_budget:
+                raise self._reject("predicted_wait", retry_after=expected)
+        try:
+            await self.limiter.acquire(timeout=max(0.0, wait_budget))
+        except QueueTimeoutError as e:
+            raise self._reject(e.reason)
+        self.admitted += 1
+
+    def release(self, held: float, expired: bool = False) -> None:
+        """슬롯 반환 + 점유 시간 평균 갱신 (expired: 요청 deadline이 지난 뒤 끝남)"""
+        self.limiter.release()
+        if expired:
+            held = max(held, self.deadline)
+        if self.service_time:
+            self.service_time += self.smoothing * (held - self.service_time)
+        else:
+            self.service_time = held
+        ADMISSION_SERVICE_TIME.set(self.service_time, self.name)
+
+    @asynccontextmanager
+    async def slot(self, arrived: Optional[float] = None) -> AsyncIterator[None]:
+        """admit → deadline 설정 → release (미들웨어를 거치지 않는 WebSocket용, 거절 시 ServiceUnavailableError)"""
+        arrived = time.monotonic() if arrived is None else arrived
+        await self.admit(arrived)
+        admitted = time.monotonic()
+        try:
+            with deadline.deadline_at(arrived + self.deadline):
+                yield
+        finally:
+            finished = time.monotonic()
+            self.release(finished - admitted, expired=finished >= arrived + self.deadline)
+
+    def stats(self) -> Dict[str, Any]:
+        limiter = self.limiter.stats()
+        return {
+            "limit": limiter["limit"],
+            "max_queue": self.limiter.max_queue,
+            "deadline_s": self.deadline,
+            "active": limiter["active"],
+            "waiting": limiter["waiting"],
+            "admitted": self.admitted,
+            "shed": dict(self.shed),
+            "service_time_ms": round(self.service_time * 1000, 3),
+            "avg_queue_wait_ms": limiter["avg_queue_wait_ms"]
+        }
+
+class AdmissionMiddleware:
+    """경로 묶음별 admission control (ASGI)
+
+    요청 경로에 맞는 첫 AdmissionGroup의 슬롯을 얻은 뒤 deadline을 설정하고 앱을 실행합니다.
+    슬롯은 응답 본문을 다 보낼 때까지 유지하며, 거절된 요청은 라우터에 닿기 전에 503 + Retry-After로 응답합니다.
+    묶음에 해당하지 않는 경로(프로브·지표 등)와 WebSocket은 그대로 통과합니다.
+    (WebSocket 라우트는 AdmissionGroup.slot()으로 직접 슬롯을 얻습니다.)
+    """
+
+    def __init__(self, app: Any, groups: Sequence[Optional[AdmissionGroup]]) -> None:
+        self.app = app
+        self.groups: List[AdmissionGroup] = [group for group in groups if group is not None]
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.groups:
+            await self.app(scope, receive, send)
+            return
+        path = scope["path"]
+        group = next((group for group in self.groups if group.matches(path)), None)
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+
+        arrived = time.monotonic()
+        try:
+            await group.admit(arrived)
+        except ServiceUnavailableError as e:
+            await _service_unavailable(send, e)
+            return
+
+        admitted = time.monotonic()
+        try:
+            with deadline.deadline_at(arrived + group.deadline):
+                await self.app(scope, receive, send)
+        finally:
+            finished = time.monotonic()
+            group.release(finished - admitted, expired=finished >= arrived + group.deadline)
+
+async def _service_unavailable(send: Any, exc: ServiceUnavailableError) -> None:
+    body = json.dumps({"detail": str(exc)}, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(exc.retry_after))).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,131 @@
+import os
+import time
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request
+
+from app.core.metrics import REGISTRY
+from app.core.singleflight import SingleFlight
+
+AUTH_TOKEN_CHECKS = REGISTRY.counter(
+    "auth_token_checks_total", "Bearer token checks by outcome", ("result",)
+)
+
+# Supabase Auth 검증 함수: 토큰 → JWT claims (무효면 AuthenticationError, upstream 장애면 ServiceUnavailableError)
+VerifyFn = Callable[[str], Awaitable[Dict[str, Any]]]
+
+class AuthenticationError(Exception):
+    """토큰이 없거나 유효하지 않음 (401)"""
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """검증된 Supabase 사용자 (token은 RLS가 적용되도록 PostgREST 호출에 그대로 사용)"""
+    id: str
+    token: str
+
+def bearer_token(authorization: Optional[str]) -> Optional[str]:
+    """Authorization: Bearer <token> → token (없거나 형식이 다르면 None)"""
+    if not authorization:
+        return None
+    scheme, _, token = authorization.partition(" ")
+    token = token.strip()
+    return token if scheme.lower() == "bearer" and token else None
+
+class TokenVerifier:
+    """Supabase 액세스 토큰(JWT) 검증 + 결과 캐시
+
+    - verify(Supabase Auth get_claims)로 확인한 결과를 토큰 해시 → (사용자 id, 만료 시각)으로
+      최대 ttl초 보관합니다 (토큰 exp를 넘기지 않음). 같은 토큰의 동시 검증은 한 번만 보냅니다.
+    - 로그아웃한 토큰도 캐시에 남은 동안은 통과하지만, messages 조회·저장은 PostgREST가 같은 토큰으로
+      RLS를 다시 적용합니다.
+    """
+
+    def __init__(self, verify: VerifyFn, ttl: float = 60.0, max_size: int = 10_000) -> None:
+        self.verify_claims = verify
+        self.ttl = ttl
+        self.max_size = max_size
+        self._cache: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+        self._flight = SingleFlight("auth_token", max_tracked_keys=0)
+        self.hits = 0
+        self.verified = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls, verify: VerifyFn) -> "TokenVerifier":
+        """AUTH_TOKEN_CACHE_TTL / AUTH_TOKEN_CACHE_MAX_SIZE"""
+        return cls(
+            verify,
+            ttl=float(os.getenv("AUTH_TOKEN_CACHE_TTL", 60)),
+            max_size=int(os.getenv("AUTH_TOKEN_CACHE_MAX_SIZE", 10_000))
+        )
+
+    def cached(self, token: str) -> Optional[AuthenticatedUser]:
+        """이미 검증해 캐시에 있는 토큰이면 AuthenticatedUser, 아니면 None (Auth 호출 없음)"""
+        cached = self._cache.get(hashlib.sha256(token.encode()).digest())
+        if cached is None or cached[1] <= time.time():
+            return None
+        return AuthenticatedUser(cached[0], token)
+
+    async def verify(self, token: str) -> AuthenticatedUser:
+        """토큰 → AuthenticatedUser (유효하지 않으면 AuthenticationError)"""
+        key = hashlib.sha256(token.encode()).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[1] > time.time():
+                self._cache.move_to_end(key)
+                self.hits += 1
+                AUTH_TOKEN_CHECKS.inc("cached")
+                return AuthenticatedUser(cached[0], token)
+            del self._cache[key]
+
+        try:
+            claims = await self._flight.do(key, lambda: self.verify_claims(token))
+        except AuthenticationError:
+            self.rejected += 1
+            AUTH_TOKEN_CHECKS.inc("rejected")
+            raise
+        user_id = claims.get("sub")
+        if not user_id or claims.get("role") not in (None, "authenticated"):
+            # anon / service_role 키 자체는 사용자 토큰이 아님
+            self.rejected += 1
+            AUTH_TOKEN_CHECKS.inc("rejected")
+            raise AuthenticationError("사용자 토큰이 아닙니다.")
+
+        self.verified += 1
+        AUTH_TOKEN_CHECKS.inc("verified")
+        expires_at = time.time() + self.ttl
+        if isinstance(claims.get("exp"), (int, float)):
+            expires_at = min(expires_at, float(claims["exp"]))
+        if self.ttl > 0:
+            self._cache[key] = (str(user_id), expires_at)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+        return AuthenticatedUser(str(user_id), token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "cached_tokens": len(self._cache),
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "verified": self.verified,
+            "rejected": self.rejected
+        }
+
+async def get_current_user(request: Request) -> AuthenticatedUser:
+    """FastAPI 의존성: Authorization: Bearer <Supabase 액세스 토큰> 검증 (없거나 무효면 401)"""
+    from app.database.supabase import get_supabase_manager
+
+    token = bearer_token(request.headers.get("authorization"))
+    if token is None:
+        raise HTTPException(status_code=401, detail="로그인이 필요합니다.", headers={"WWW-Authenticate": "Bearer"})
+    try:
+        return await get_supabase_manager().verify_token(token)
+    except AuthenticationError as e:
+        raise HTTPException(
+            status_code=401,
+            detail=f"유효하지 않은 토큰입니다: {str(e)}",
+            headers={"WWW-Authenticate": 'Bearer error="invalid_token"'}
+        )
@@ -0,0 +1,301 @@
+import os
+import gzip
+import time
+import zlib
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.metrics import REGISTRY
+
+try:
+    import brotli
+except ImportError:  # br은 선택 의존성 (brotli 또는 brotlicffi)
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd는 선택 의존성
+    zstandard = None
+
+COMPRESSION_BYTES = REGISTRY.counter(
+    "http_compression_bytes_total", "Response bytes before (in) and after (out) compression", ("encoding", "stage")
+)
+COMPRESSION_SECONDS = REGISTRY.histogram(
+    "http_compression_cpu_seconds", "CPU time spent compressing a response body", ("encoding",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+COMPRESSION_OFFLOADED = REGISTRY.counter(
+    "http_compression_offloaded_total", "Response bodies compressed in a worker thread", ("encoding",)
+)
+
+# 이미 압축된 형식이거나 스트리밍 이벤트라 압축하지 않는 content-type
+DEFAULT_EXCLUDE_CONTENT_TYPES = (
+    "text/event-stream", "image/*", "audio/*", "video/*",
+    "application/zip", "application/gzip", "application/octet-stream"
+)
+
+class StreamCompressor:
+    """스트리밍 응답용 압축기 (청크마다 flush해 바로 전송 가능하게)"""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes], finish: Callable[[], bytes]) -> None:
+        self._compress = compress
+        self._flush = flush
+        self._finish = finish
+
+    def chunk(self, data: bytes, final: bool) -> bytes:
+        return self._compress(data) + (self._finish() if final else self._flush())
+
+@dataclass
+class Codec:
+    """Content-Encoding 하나 (one-shot 압축 + 스트리밍 압축기 생성)"""
+    name: str
+    level: int
+    compress: Callable[[bytes, int], bytes]
+    stream: Callable[[int], StreamCompressor]
+
+def _gzip_stream(level: int) -> StreamCompressor:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return StreamCompressor(
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush
+    )
+
+def _brotli_stream(level: int) -> StreamCompressor:
+    compressor = brotli.Compressor(quality=level)
+    process = getattr(compressor, "process", None) or compressor.compress
+    return StreamCompressor(process, compressor.flush, compressor.finish)
+
+def _zstd_stream(level: int) -> StreamCompressor:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return StreamCompressor(
+        compressor.compress,
+        lambda: compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK),
+        compressor.flush
+    )
+
+def available_codecs(levels: Optional[Dict[str, int]] = None) -> Dict[str, Codec]:
+    """설치된 라이브러리 기준으로 사용 가능한 코덱 (gzip은 항상 가능)"""
+    levels = levels or {}
+    codecs = {
+        "gzip": Codec(
+            "gzip", levels.get("gzip", 6),
+            lambda data, level: gzip.compress(data, compresslevel=level, mtime=0),
+            _gzip_stream
+        )
+    }
+    if brotli is not None:
+        codecs["br"] = Codec(
+            "br", levels.get("br", 4),
+            lambda data, level: brotli.compress(data, quality=level),
+            _brotli_stream
+        )
+    if zstandard is not None:
+        codecs["zstd"] = Codec(
+            "zstd", levels.get("zstd", 3),
+            # ZstdCompressor는 스레드 간 공유 불가 → 호출마다 생성
+            lambda data, level: zstandard.ZstdCompressor(level=level).compress(data),
+            _zstd_stream
+        )
+    return codecs
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {인코딩: q} (q=0은 명시적 거부)"""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+@dataclass
+class CompressionConfig:
+    """압축 미들웨어 설정"""
+    enabled: bool = True
+    # 서버 선호 순서 (클라이언트 q값이 같으면 앞쪽 우선)
+    encodings: Tuple[str, ...] = ("zstd", "br", "gzip")
+    levels: Dict[str, int] = field(default_factory=lambda: {"gzip": 6, "br": 4, "zstd": 3})
+    minimum_size: int = 1000
+    # 이 크기 이상의 본문은 워커 스레드에서 압축 (0이면 항상 이벤트 루프에서)
+    offload_size: int = 64 * 1024
+    exclude_paths: Tuple[str, ...] = ()
+    exclude_content_types: Tuple[str, ...] = DEFAULT_EXCLUDE_CONTENT_TYPES
+
+    @classmethod
+    def from_env(cls, exclude_paths: Sequence[str] = ()) -> "CompressionConfig":
+        """COMPRESSION_* 환경변수 기반 설정 (exclude_paths는 코드에서 지정한 기본 제외 경로)"""
+        extra = [path.strip() for path in os.getenv("COMPRESSION_EXCLUDE_PATHS", "").split(",") if path.strip()]
+        return cls(
+            enabled=os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes"),
+            encodings=tuple(
+                name.strip() for name in os.getenv("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if name.strip()
+            ),
+            levels={
+                "gzip": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+                "br": int(os.getenv("COMPRESSION_BR_LEVEL", 4)),
+                "zstd": int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+            },
+            minimum_size=int(os.getenv("COMPRESSION_MINIMUM_SIZE", 1000)),
+            offload_size=int(os.getenv("COMPRESSION_OFFLOAD_SIZE", 64 * 1024)),
+            exclude_paths=tuple(exclude_paths) + tuple(extra)
+        )
+
+def _compress_timed(codec: Codec, data: bytes) -> Tuple[bytes, float]:
+    # thread_time: 이벤트 루프/워커 스레드 어디서 실행되든 이 스레드가 쓴 CPU 시간
+    started = time.thread_time()
+    body = codec.compress(data, codec.level)
+    return body, time.thread_time() - started
+
+class CompressionMiddleware:
+    """Accept-Encoding 협상 기반 응답 압축 (zstd / br / gzip, ASGI)
+
+    - minimum_size 미만, 제외 경로·content-type, 이미 Content-Encoding이 있는 응답은 그대로 전송
+    - offload_size 이상 본문은 asyncio.to_thread로 압축해 이벤트 루프를 막지 않음
+    - 압축한 응답의 strong ETag는 weak(W/)로 바꿈 (바이트가 달라지므로, If-None-Match는 weak 비교)
+    """
+
+    def __init__(self, app: Any, config: Optional[CompressionConfig] = None) -> None:
+        self.app = app
+        self.config = config or CompressionConfig.from_env()
+        codecs = available_codecs(self.config.levels)
+        self.codecs = [codecs[name] for name in self.config.encodings if name in codecs]
+
+    def select(self, accept_encoding: str) -> Optional[Codec]:
+        """클라이언트 q값이 가장 높은 코덱 (같으면 서버 선호 순서)"""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        best: Optional[Codec] = None
+        best_quality = 0.0
+        for codec in self.codecs:
+            quality = accepted.get(codec.name, wildcard)
+            if quality > best_quality:
+                best, best_quality = codec, quality
+        return best
+
+    def _excluded_path(self, path: str) -> bool:
+        return any(path.startswith(prefix) for prefix in self.config.exclude_paths)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.config.enabled or self._excluded_path(scope.get("path", "")):
+            await self.app(scope, receive, send)
+            return
+
+        codec = self.select(Headers(scope=scope).get("accept-encoding", ""))
+        responder = _CompressionResponder(self.config, codec, send)
+        await self.app(scope, receive, responder.send)
+
+class _CompressionResponder:
+    """응답 메시지를 가로채 압축 여부 결정 후 전송"""
+
+    def __init__(self, config: CompressionConfig, codec: Optional[Codec], send: Any) -> None:
+        self.config = config
+        self.codec = codec
+        self._send = send
+        self.start_message: Optional[Dict[str, Any]] = None
+        self.passthrough = False
+        self.started = False
+        self.stream: Optional[StreamCompressor] = None
+
+    def _is_excluded_type(self, content_type: str) -> bool:
+        media_type = content_type.partition(";")[0].strip().lower()
+        candidates = {media_type, media_type.partition("/")[0] + "/*"}
+        return not candidates.isdisjoint(self.config.exclude_content_types)
+
+    def _prepare_headers(self, compressed: bool) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        vary = [value.strip().lower() for value in headers.get("vary", "").split(",")]
+        if "accept-encoding" not in vary:
+            headers.add_vary_header("Accept-Encoding")
+        if compressed:
+            headers["Content-Encoding"] = self.codec.name
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+        return headers
+
+    async def _compress(self, data: bytes) -> bytes:
+        codec = self.codec
+        if self.config.offload_size and len(data) >= self.config.offload_size:
+            COMPRESSION_OFFLOADED.inc(codec.name)
+            body, cpu = await asyncio.to_thread(_compress_timed, codec, data)
+        else:
+            body, cpu = _compress_timed(codec, data)
+        COMPRESSION_SECONDS.observe(cpu, codec.name)
+        COMPRESSION_BYTES.inc(codec.name, "in", amount=len(data))
+        COMPRESSION_BYTES.inc(codec.name, "out", amount=len(body))
+        return body
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or message["status"] < 200
+                or self._is_excluded_type(headers.get("content-type", ""))
+            )
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if self.passthrough or message_type != "http.response.body":
+            if not self.passthrough and not self.started and message_type == "http.response.pathsend":
+                self.started = True
+                await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if not more_body and len(body) < self.config.minimum_size:
+                # 작은 응답은 압축 없이 그대로
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            if self.codec is None:
+                # 압축은 안 하지만 다른 클라이언트에는 압축본이 갈 수 있으므로 Vary 표시
+                self._prepare_headers(compressed=False)
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            headers = self._prepare_headers(compressed=True)
+            if more_body:
+                self.stream = self.codec.stream(self.codec.level)
+                del headers["Content-Length"]
+                message["body"] = self.stream.chunk(body, final=False)
+            else:
+                message["body"] = await self._compress(body)
+                headers["Content-Length"] = str(len(message["body"]))
+            await self._send(self.start_message)
+            await self._send(message)
+            return
+
+        if self.stream is not None:
+            message["body"] = self.stream.chunk(body, final=not more_body)
+        await self._send(message)
@@ -0,0 +1,69 @@
+import os
+import hashlib
+from typing import Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+from app.core.metrics import REGISTRY
+from app.core.serialization import model_response
+
+# 조건부 GET (ETag / If-None-Match → 304) 및 캐시 헤더
+# 응답 본문을 한 번만 직렬화해 그 바이트로 strong ETag를 만들고, 클라이언트가 가진 것과 같으면
+# 본문 없이 304를 보냅니다 (압축·전송 비용 절감).
+
+CONDITIONAL_REQUESTS = REGISTRY.counter(
+    "http_conditional_requests_total",
+    "Conditional GET outcomes on ETag-enabled routes (not_modified, changed, unconditional)",
+    ("result",)
+)
+
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 0))
+HTTP_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv("HTTP_CACHE_STALE_WHILE_REVALIDATE", 0))
+
+def cache_control(max_age: int = HTTP_CACHE_MAX_AGE, stale_while_revalidate: int = HTTP_CACHE_STALE_WHILE_REVALIDATE) -> str:
+    """Cache-Control 값 (max_age가 0이면 저장은 하되 매번 ETag로 재검증)"""
+    if max_age <= 0:
+        return "public, no-cache"
+    value = f"public, max-age={max_age}"
+    if stale_while_revalidate > 0:
+        value += f", stale-while-revalidate={stale_while_revalidate}"
+    return value
+
+def make_etag(body: bytes) -> str:
+    """응답 본문 바이트 기반 strong ETag"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 비교 (목록·*·W/ 접두사 허용, RFC 9110 weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def conditional_json(request: Request, content: BaseModel, cache_control_value: Optional[str] = None) -> Response:
+    """응답 모델 → ETag/Cache-Control/Vary가 붙은 JSON 응답, 변경 없으면 304"""
+    response = model_response(content)
+    etag = make_etag(response.body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": cache_control_value or cache_control(),
+        "Vary": "Accept-Encoding"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag):
+        CONDITIONAL_REQUESTS.inc("not_modified")
+        return Response(status_code=304, headers=headers)
+
+    CONDITIONAL_REQUESTS.inc("changed" if if_none_match else "unconditional")
+    response.headers.update(headers)
+    return response
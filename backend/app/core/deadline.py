@@ -0,0 +1,58 @@
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from typing import Any, Dict, Iterator, Optional
+
+from app.core.errors import ServiceUnavailableError
+
+# 요청의 deadline (time.monotonic() 기준 절대 시각). 요청 처리 중 생성한 태스크에도 전달됨
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+class DeadlineExceededError(ServiceUnavailableError):
+    """요청 deadline 안에 upstream 호출을 끝낼 수 없음"""
+
+    def __init__(self, operation: str) -> None:
+        super().__init__(f"{operation} 요청 시간 초과 (deadline)", retry_after=1.0)
+        self.operation = operation
+
+@contextmanager
+def deadline_at(deadline: float) -> Iterator[None]:
+    """이 블록(과 안에서 만든 태스크)의 deadline 설정. 바깥 deadline이 더 이르면 그대로 유지"""
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def detached() -> Context:
+    """deadline이 없는 현재 컨텍스트 사본 (요청 중에 시작하지만 요청보다 오래 사는 백그라운드 태스크용)
+
+        loop.create_task(self._run(), context=deadline.detached())
+    """
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+def remaining() -> Optional[float]:
+    """deadline까지 남은 시간(초). deadline이 없으면 None"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def bounded(timeout: float) -> float:
+    """timeout을 남은 deadline으로 줄임 (음수면 0)"""
+    left = remaining()
+    return timeout if left is None else max(0.0, min(timeout, left))
+
+def allows(seconds: float) -> bool:
+    """seconds초를 더 써도 deadline을 넘지 않는지"""
+    left = remaining()
+    return left is None or left > seconds
+
+def clamp_timeouts(timeouts: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """httpx timeout extension(connect/read/write/pool)의 각 값을 남은 deadline 이하로"""
+    left = remaining()
+    if left is None or timeouts is None:
+        return timeouts
+    left = max(0.0, left)
+    return {key: left if value is None else min(value, left) for key, value in timeouts.items()}
@@ -0,0 +1,9 @@
+class ServiceUnavailableError(Exception):
+    """일시적으로 처리할 수 없는 요청 (대기열 포화, 서킷 브레이커 open 등)
+
+    앱 전역 예외 핸들러가 503 + Retry-After(retry_after초)로 응답합니다.
+    """
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
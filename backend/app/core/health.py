@@ -0,0 +1,119 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+ProbeFn = Callable[[], Awaitable[Any]]
+
+class DependencyProber:
+    """외부 의존성(Supabase, ElevenLabs) 백그라운드 상태 점검
+
+    interval초마다 모든 probe를 timeout 안에서 동시에 실행하고 결과를 캐시합니다.
+    /readyz는 캐시된 결과만 읽으므로 probe 요청이 의존성에 부하를 주지 않습니다.
+    probe 함수는 실패 시 예외를 던지거나 False를 반환합니다.
+    """
+
+    def __init__(
+        self,
+        probes: Dict[str, ProbeFn],
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        required: Optional[Iterable[str]] = None
+    ) -> None:
+        self.probes = probes
+        self.interval = interval
+        self.timeout = timeout
+        self.required = list(required) if required is not None else list(probes)
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    @classmethod
+    def from_env(cls, probes: Dict[str, ProbeFn]) -> "DependencyProber":
+        """환경변수 기반 prober 생성"""
+        required = os.getenv("READINESS_REQUIRED", "supabase")
+        return cls(
+            probes=probes,
+            interval=float(os.getenv("HEALTH_PROBE_INTERVAL", 10)),
+            timeout=float(os.getenv("HEALTH_PROBE_TIMEOUT", 2)),
+            required=[name.strip() for name in required.split(",") if name.strip()]
+        )
+
+    async def _probe(self, name: str, fn: ProbeFn) -> None:
+        started = time.perf_counter()
+        error: Optional[str] = None
+        try:
+            ok = await asyncio.wait_for(fn(), timeout=self.timeout)
+            if ok is False:
+                error = "probe returned False"
+        except asyncio.TimeoutError:
+            error = f"timeout after {self.timeout}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        self._results[name] = {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 2),
+            "checked_monotonic": time.monotonic(),
+            "error": error
+        }
+
+    async def probe_once(self) -> None:
+        """모든 의존성을 한 번 점검"""
+        await asyncio.gather(*(self._probe(name, fn) for name, fn in self.probes.items()))
+
+    async def _run(self, initial_delay: float = 0.0) -> None:
+        if initial_delay > 0:
+            await asyncio.sleep(initial_delay)
+        while True:
+            try:
+                await self.probe_once()
+            except Exception as e:
+                logger.error(f"의존성 점검 루프 오류: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self, initial_delay: float = 0.0) -> None:
+        """백그라운드 점검 시작 (initial_delay초 후 첫 점검)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(initial_delay))
+
+    async def stop(self) -> None:
+        """백그라운드 점검 중지"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """의존성별 최근 점검 결과 (지연 시간, 경과 시간 포함)"""
+        now = time.monotonic()
+        stale_after = self.interval * 3 + self.timeout
+        snapshot: Dict[str, Dict[str, Any]] = {}
+
+        for name in self.probes:
+            result = self._results.get(name)
+            if result is None:
+                snapshot[name] = {"ok": False, "required": name in self.required, "error": "not checked yet"}
+                continue
+
+            age = now - result["checked_monotonic"]
+            snapshot[name] = {
+                "ok": result["ok"] and age <= stale_after,
+                "required": name in self.required,
+                "latency_ms": result["latency_ms"],
+                "age_s": round(age, 2),
+                "stale": age > stale_after,
+                "error": result["error"]
+            }
+
+        return snapshot
+
+    def is_ready(self, snapshot: Optional[Dict[str, Dict[str, Any]]] = None) -> bool:
+        """필수 의존성이 모두 정상인지 여부"""
+        snapshot = snapshot if snapshot is not None else self.snapshot()
+        return all(snapshot.get(name, {}).get("ok", False) for name in self.required)
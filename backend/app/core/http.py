@@ -0,0 +1,66 @@
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core import deadline
+
+class TimeoutTransport(httpx.AsyncBaseTransport):
+    """요청마다 지정된 timeout(connect/read/write/pool)을 강제하는 트랜스포트
+
+    일부 SDK는 요청마다 timeout을 숫자 하나로 넘겨 클라이언트의 connect/read 구분을
+    덮어쓰므로, 트랜스포트 단계에서 설정값으로 다시 맞춥니다.
+    요청 deadline이 있으면 각 timeout을 남은 시간 이하로 줄입니다.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, timeout: httpx.Timeout) -> None:
+        self.transport = transport
+        self.timeout = timeout
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        request.extensions["timeout"] = deadline.clamp_timeouts(self.timeout.as_dict())
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+def pooled_transport(
+    prefix: str,
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 30.0,
+    connect_timeout: float = 5.0,
+    read_timeout: float = 30.0,
+    pool_timeout: float = 5.0
+) -> TimeoutTransport:
+    """{prefix}_MAX_CONNECTIONS 등 환경변수 기반 커넥션 풀 트랜스포트 생성"""
+    read = float(os.getenv(f"{prefix}_READ_TIMEOUT", os.getenv(f"{prefix}_TIMEOUT", read_timeout)))
+    timeout = httpx.Timeout(
+        connect=float(os.getenv(f"{prefix}_CONNECT_TIMEOUT", connect_timeout)),
+        read=read,
+        write=read,
+        pool=float(os.getenv(f"{prefix}_POOL_TIMEOUT", pool_timeout))
+    )
+    limits = httpx.Limits(
+        max_connections=int(os.getenv(f"{prefix}_MAX_CONNECTIONS", max_connections)),
+        max_keepalive_connections=int(os.getenv(f"{prefix}_MAX_KEEPALIVE", max_keepalive)),
+        keepalive_expiry=float(os.getenv(f"{prefix}_KEEPALIVE_EXPIRY", keepalive_expiry))
+    )
+    return TimeoutTransport(httpx.AsyncHTTPTransport(limits=limits, retries=0), timeout)
+
+def pool_stats(transport: Optional[httpx.AsyncBaseTransport]) -> Dict[str, Any]:
+    """httpx 커넥션 풀 상태 (전체/유휴/사용 중 연결 수, 연결 대기 요청 수)"""
+    # TimeoutTransport / ResilientTransport 등 래퍼를 벗겨 실제 커넥션 풀까지 내려감
+    while transport is not None and not hasattr(transport, "_pool") and hasattr(transport, "transport"):
+        transport = transport.transport
+    pool: Any = getattr(transport, "_pool", None)
+    connections = list(getattr(pool, "connections", None) or [])
+    requests = list(getattr(pool, "_requests", None) or [])
+    idle = sum(1 for connection in connections if connection.is_idle())
+    return {
+        "connections": len(connections),
+        "idle": idle,
+        "in_use": len(connections) - idle,
+        "queued_requests": sum(1 for request in requests if request.is_queued()),
+        "max_connections": getattr(pool, "_max_connections", None)
+    }
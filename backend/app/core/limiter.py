@@ -0,0 +1,126 @@
+import time
+import asyncio
+from typing import Any, Dict, Optional
+
+from app.core import deadline
+from app.core.errors import ServiceUnavailableError
+from app.core.metrics import REGISTRY
+
+LIMITER_ACTIVE = REGISTRY.gauge(
+    "limiter_active", "Operations currently holding a limiter slot", ("limiter",)
+)
+LIMITER_WAITING = REGISTRY.gauge(
+    "limiter_waiting", "Operations queued for a limiter slot", ("limiter",)
+)
+LIMITER_REJECTED = REGISTRY.counter(
+    "limiter_rejected_total", "Operations rejected by a limiter", ("limiter", "reason")
+)
+LIMITER_WAIT = REGISTRY.histogram(
+    "limiter_queue_wait_seconds", "Time spent queued for a limiter slot", ("limiter",)
+)
+
+class QueueTimeoutError(ServiceUnavailableError):
+    """대기열에서 deadline 안에 차례를 얻지 못했거나 대기열이 가득 참"""
+
+    def __init__(self, limiter: str, reason: str) -> None:
+        super().__init__(f"{limiter} 대기열 {'시간 초과' if reason == 'timeout' else '초과'}", retry_after=1.0)
+        self.limiter = limiter
+        self.reason = reason
+
+class ConcurrencyLimiter:
+    """동시 실행 수 제한 + 대기 deadline
+
+    limit개까지 바로 실행하고, 나머지는 최대 queue_timeout초 동안 대기합니다.
+    요청 deadline(app.core.deadline)이 더 이르면 그때까지만 기다립니다.
+    대기 중인 요청이 max_queue개를 넘거나 deadline이 지나면 QueueTimeoutError를 던집니다.
+
+        async with limiter:
+            await call_upstream()
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_timeout: float = 2.0,
+        max_queue: Optional[int] = None
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.acquired = 0
+        self.queued = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+
+    @property
+    def saturated(self) -> bool:
+        """빈 슬롯이 없어 새 요청이 대기열로 가는 상태인지"""
+        return self._semaphore.locked()
+
+    async def acquire(self, timeout: Optional[float] = None) -> None:
+        """슬롯 획득 (timeout을 주면 이번 호출만 대기 deadline 변경)"""
+        if self._semaphore.locked():
+            if self.max_queue is not None and self.waiting >= self.max_queue:
+                self.rejected += 1
+                LIMITER_REJECTED.inc(self.name, "queue_full")
+                raise QueueTimeoutError(self.name, "queue_full")
+
+            self.waiting += 1
+            self.queued += 1
+            LIMITER_WAITING.inc(self.name)
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(
+                    self._semaphore.acquire(),
+                    timeout=deadline.bounded(self.queue_timeout if timeout is None else timeout)
+                )
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                LIMITER_REJECTED.inc(self.name, "timeout")
+                raise QueueTimeoutError(self.name, "timeout")
+            finally:
+                waited = time.perf_counter() - started
+                self._wait_total += waited
+                self.waiting -= 1
+                LIMITER_WAITING.dec(self.name)
+                LIMITER_WAIT.observe(waited, self.name)
+        else:
+            await self._semaphore.acquire()
+
+        self.active += 1
+        self.acquired += 1
+        LIMITER_ACTIVE.inc(self.name)
+
+    def release(self) -> None:
+        """슬롯 반환"""
+        self.active -= 1
+        LIMITER_ACTIVE.dec(self.name)
+        self._semaphore.release()
+
+    async def __aenter__(self) -> "ConcurrencyLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.release()
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """동시 실행/대기/거절 통계"""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "active": self.active,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "queued": self.queued,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "avg_queue_wait_ms": round(self._wait_total / self.queued * 1000, 3) if self.queued else 0.0
+        }
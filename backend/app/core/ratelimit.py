@@ -0,0 +1,405 @@
+import os
+import json
+import math
+import time
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs
+
+from starlette.datastructures import Headers
+
+from app.core.auth import bearer_token
+from app.core.metrics import REGISTRY
+from app.core.redis import RedisClient, RedisError, Script
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_REQUESTS = REGISTRY.counter(
+    "rate_limit_requests_total", "Requests checked by a rate limit rule", ("rule", "result")
+)
+RATE_LIMIT_BACKEND_ERRORS = REGISTRY.counter(
+    "rate_limit_backend_errors_total", "Rate limit backend failures (request allowed)", ("backend",)
+)
+
+# (허용 여부, 다시 시도까지 초)
+Decision = Tuple[bool, float]
+
+# 버킷 하나: (키, 초당 보충 수, 버킷 크기)
+Bucket = Tuple[str, float, int]
+
+# 백엔드 결과: (한도를 넘은 첫 버킷 번호, 허용이면 -1; 다시 시도까지 초)
+TakeResult = Tuple[int, float]
+
+# Bearer 토큰 → 사용자 id (이미 검증된 토큰이 아니면 None). 요청마다 부르므로 네트워크 호출 없이 즉시 반환
+AuthenticateFn = Callable[[str], Optional[str]]
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """경로별 토큰 버킷 규칙
+
+    rate: 초당 토큰 보충 수, burst: 버킷 크기(연속 허용 수).
+    key: 버킷을 나누는 기준. "+"로 여러 개를 묶으면 값 조합마다 버킷 하나 (예: "ip+public_id").
+      - "ip": 클라이언트 IP
+      - "user": Bearer 토큰으로 인증한 사용자 id (이미 검증된 토큰이 아니면 IP)
+      - 그 외 ("public_id", "agent_id" 등): 쿼리 파라미터 → JSON 본문 순으로 찾고, 없으면 이 규칙은 적용하지 않습니다.
+        호출자가 정하는 값이라 단독으로 쓰면 남의 버킷을 소진시킬 수 있으므로 "ip" 등과 묶어 쓰세요.
+    """
+    name: str
+    paths: Tuple[str, ...]
+    rate: float
+    burst: int
+    key: str = "ip"
+    methods: Tuple[str, ...] = ("GET", "POST")
+
+    @property
+    def key_parts(self) -> Tuple[str, ...]:
+        return tuple(self.key.split("+"))
+
+    @classmethod
+    def from_env(
+        cls,
+        name: str,
+        paths: Sequence[str],
+        limit: str,
+        key: str = "ip",
+        methods: Sequence[str] = ("GET", "POST")
+    ) -> Optional["RateLimitRule"]:
+        """RATE_LIMIT_{NAME}="횟수/초[:burst]" (기본값 limit, "off"면 None)"""
+        spec = os.getenv(f"RATE_LIMIT_{name.upper()}", limit).strip().lower()
+        if spec in ("", "0", "off", "false"):
+            return None
+        amount, _, rest = spec.partition("/")
+        period, _, burst = rest.partition(":")
+        count = float(amount)
+        return cls(
+            name=name,
+            paths=tuple(paths),
+            rate=count / float(period or 1),
+            burst=int(burst) if burst else max(1, int(count)),
+            key=key,
+            methods=tuple(methods)
+        )
+
+class MemoryBackend:
+    """프로세스 내 토큰 버킷 (워커별 독립, 오래 안 쓴 키부터 max_keys개로 제한)"""
+
+    name = "memory"
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, buckets: Sequence[Bucket], cost: float = 1.0) -> TakeResult:
+        """모든 버킷에 cost 이상 있을 때만 전부에서 차감 (하나라도 모자라면 아무것도 차감하지 않음)"""
+        now = time.monotonic()
+        available: List[float] = []
+        for index, (key, rate, burst) in enumerate(buckets):
+            bucket = self._buckets.get(key)
+            tokens = float(burst) if bucket is None else min(float(burst), bucket[0] + (now - bucket[1]) * rate)
+            if tokens < cost:
+                return index, (cost - tokens) / rate
+            available.append(tokens)
+
+        for (key, _, _), tokens in zip(buckets, available):
+            if key in self._buckets:
+                self._buckets.move_to_end(key)
+            elif len(self._buckets) >= self.max_keys:
+                self._buckets.popitem(last=False)
+            self._buckets[key] = (tokens - cost, now)
+        return -1, 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "keys": len(self._buckets), "max_keys": self.max_keys}
+
+    async def aclose(self) -> None:
+        pass
+
+# 서버 시간(TIME) 기준으로 계산해 워커 간 시계 차이 영향 없음
+# KEYS: 버킷들, ARGV: cost, rate1, burst1, rate2, burst2, ...
+# 모든 버킷을 먼저 확인하고, 전부 허용일 때만 차감 → {0, "0"}. 아니면 아무것도 쓰지 않고 {넘은 버킷 번호(1부터), retry}
+# 소수점 값은 Lua → Redis 변환 시 잘리므로 문자열로 반환
+TOKEN_BUCKET_SCRIPT = Script("""
+local cost = tonumber(ARGV[1])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local available = {}
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[i * 2])
+  local burst = tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 't', 'u')
+  local tokens = tonumber(state[1])
+  if tokens == nil then
+    tokens = burst
+  else
+    tokens = math.min(burst, tokens + math.max(0, now - tonumber(state[2])) * rate)
+  end
+  if tokens < cost then
+    return {i, tostring((cost - tokens) / rate)}
+  end
+  available[i] = tokens
+end
+for i, key in ipairs(KEYS) do
+  local rate = tonumber(ARGV[i * 2])
+  local burst = tonumber(ARGV[i * 2 + 1])
+  redis.call('HSET', key, 't', tostring(available[i] - cost), 'u', tostring(now))
+  redis.call('PEXPIRE', key, math.ceil(burst / rate * 1000) + 1000)
+end
+return {0, '0'}
+""")
+
+class RedisBackend:
+    """Redis 프로토콜 서버에 둔 토큰 버킷 (여러 워커/인스턴스가 같은 한도 공유)"""
+
+    name = "redis"
+
+    def __init__(self, client: RedisClient, prefix: str = "rl:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, buckets: Sequence[Bucket], cost: float = 1.0) -> TakeResult:
+        """모든 버킷을 한 스크립트에서 확인·차감 (워커 간에도 원자적)"""
+        args: List[Any] = [cost]
+        for _, rate, burst in buckets:
+            args.extend((rate, burst))
+        rejected, retry_after = await TOKEN_BUCKET_SCRIPT(
+            self.client, [self.prefix + key for key, _, _ in buckets], args
+        )
+        return int(rejected) - 1, float(retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.client.stats()}
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+class RateLimiter:
+    """요청 → 적용할 규칙·키 결정 → 백엔드 토큰 버킷 확인"""
+
+    def __init__(
+        self,
+        rules: Sequence[RateLimitRule],
+        backend: Any,
+        authenticate: Optional[AuthenticateFn] = None
+    ) -> None:
+        self.rules = list(rules)
+        self.backend = backend
+        self.authenticate = authenticate
+        self._by_path: Dict[str, List[RateLimitRule]] = {}
+        for rule in self.rules:
+            for path in rule.paths:
+                self._by_path.setdefault(path, []).append(rule)
+
+    @classmethod
+    def from_env(
+        cls, rules: Sequence[Optional[RateLimitRule]], authenticate: Optional[AuthenticateFn] = None
+    ) -> "RateLimiter":
+        """RATE_LIMIT_BACKEND=memory|redis (redis는 REDIS_URL 필요), RATE_LIMIT_ENABLED=false면 규칙 없음"""
+        if os.getenv("RATE_LIMIT_ENABLED", "true").lower() not in ("1", "true", "yes"):
+            rules = []
+        backend_name = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+        backend: Any = None
+        if backend_name == "redis":
+            client = RedisClient.from_env()
+            if client is None:
+                logger.warning("RATE_LIMIT_BACKEND=redis지만 REDIS_URL이 없어 메모리 백엔드를 사용합니다.")
+            else:
+                backend = RedisBackend(client, prefix=os.getenv("RATE_LIMIT_KEY_PREFIX", "rl:"))
+        if backend is None:
+            backend = MemoryBackend(max_keys=int(os.getenv("RATE_LIMIT_MAX_KEYS", 100_000)))
+        return cls([rule for rule in rules if rule is not None], backend, authenticate)
+
+    def rules_for(self, method: str, path: str) -> List[RateLimitRule]:
+        return [rule for rule in self._by_path.get(path, ()) if method in rule.methods]
+
+    async def check_rules(
+        self, names: Sequence[str], identities: Dict[str, Optional[str]]
+    ) -> Optional[Tuple[RateLimitRule, float]]:
+        """이름으로 고른 규칙을 key별 값으로 직접 확인 (미들웨어를 거치지 않는 WebSocket용)
+
+        처음 한도를 넘은 (규칙, 다시 시도까지 초), 모두 허용이면 None. 값이 없는 key의 규칙은 건너뜁니다.
+        """
+        checks = []
+        for rule in self.rules:
+            if rule.name not in names:
+                continue
+            values = [identities.get(part) for part in rule.key_parts]
+            if all(values):
+                checks.append((rule, "|".join(values)))
+        return await self.check_all(checks)
+
+    async def check_all(self, checks: Sequence[Tuple[RateLimitRule, str]]) -> Optional[Tuple[RateLimitRule, float]]:
+        """(규칙, 키 값) 여러 개를 한 번에 확인 → 처음 한도를 넘은 (규칙, 다시 시도까지 초), 모두 허용이면 None
+
+        하나라도 넘으면 어느 버킷에서도 토큰을 차감하지 않습니다 (백엔드 장애 시 허용).
+        """
+        if not checks:
+            return None
+        try:
+            rejected, retry_after = await self.backend.take(
+                [(f"{rule.name}:{identity}", rule.rate, rule.burst) for rule, identity in checks]
+            )
+        except RedisError as e:
+            RATE_LIMIT_BACKEND_ERRORS.inc(self.backend.name)
+            logger.warning(f"레이트 리밋 백엔드 오류, 요청 허용: {e}")
+            return None
+        if rejected < 0:
+            for rule, _ in checks:
+                RATE_LIMIT_REQUESTS.inc(rule.name, "allowed")
+            return None
+        RATE_LIMIT_REQUESTS.inc(checks[rejected][0].name, "limited")
+        return checks[rejected][0], retry_after
+
+    async def check(self, rule: RateLimitRule, identity: str) -> Decision:
+        """규칙 하나 확인 (백엔드 장애 시 허용)"""
+        limited = await self.check_all([(rule, identity)])
+        return (True, 0.0) if limited is None else (False, limited[1])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.backend.stats(),
+            "rules": {rule.name: {"rate_per_s": round(rule.rate, 4), "burst": rule.burst, "key": rule.key} for rule in self.rules}
+        }
+
+    async def aclose(self) -> None:
+        await self.backend.aclose()
+
+MAX_BODY_FOR_KEY = 64 * 1024
+
+class RateLimitMiddleware:
+    """경로별 토큰 버킷 레이트 리밋 (ASGI). 초과 시 429 + Retry-After
+
+    규칙이 없는 경로는 dict 조회 한 번으로 통과합니다.
+    본문(JSON)에서 키를 찾아야 하는 경우에만 본문을 읽고 앱에는 그대로 다시 전달합니다.
+    경로에 걸린 규칙은 모두 한 번에 확인하므로, 한 규칙에 걸려 거절된 요청은 다른 규칙의 토큰을 쓰지 않습니다.
+    """
+
+    def __init__(self, app: Any, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.limiter._by_path:
+            await self.app(scope, receive, send)
+            return
+        rules = self.limiter.rules_for(scope["method"], scope["path"])
+        if not rules:
+            await self.app(scope, receive, send)
+            return
+
+        query: Optional[Dict[str, List[str]]] = None
+        body_json: Optional[Dict[str, Any]] = None
+        body_read = False
+        messages: List[Dict[str, Any]] = []
+        resolved: Dict[str, Optional[str]] = {}
+
+        async def value_of(part: str) -> Optional[str]:
+            nonlocal query, body_json, body_read, messages
+            if part in resolved:
+                return resolved[part]
+            if part == "ip":
+                client = scope.get("client")
+                value: Optional[str] = client[0] if client else "unknown"
+            elif part == "user":
+                value = self._user_identity(scope)
+            else:
+                if query is None:
+                    query = parse_qs(scope.get("query_string", b"").decode("latin-1"))
+                value = (query.get(part) or [None])[0]
+                if value is None and scope["method"] == "POST":
+                    if not body_read:
+                        body_read = True
+                        body, messages = await _read_body(receive)
+                        body_json = _parse_json(body, scope)
+                    found = body_json.get(part) if body_json else None
+                    value = found if isinstance(found, str) else None
+            resolved[part] = value
+            return value
+
+        checks = []
+        for rule in rules:
+            values = [await value_of(part) for part in rule.key_parts]
+            if all(values):
+                checks.append((rule, "|".join(values)))
+
+        limited = await self.limiter.check_all(checks)
+        if limited is not None:
+            await _too_many_requests(send, *limited)
+            return
+
+        if body_read:
+            receive = _replay(messages, receive)
+        await self.app(scope, receive, send)
+
+    def _user_identity(self, scope: Dict[str, Any]) -> str:
+        """인증한 사용자 id ("user:<id>"), 이미 검증된 토큰이 아니면 클라이언트 IP ("ip:<주소>")
+
+        쿼리의 user_id처럼 호출자가 고르는 값이 아니므로, 값을 빼거나 남의 id를 넣어 한도를 피하거나
+        남의 버킷을 소진시킬 수 없습니다. 토큰 검증 캐시만 보므로 한도 확인 전에 Auth 호출이 생기지 않습니다.
+        """
+        token = bearer_token(Headers(scope=scope).get("authorization"))
+        if token is not None and self.limiter.authenticate is not None:
+            user_id = self.limiter.authenticate(token)
+            if user_id:
+                return f"user:{user_id}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+async def _read_body(receive: Any) -> Tuple[bytes, List[Dict[str, Any]]]:
+    messages: List[Dict[str, Any]] = []
+    chunks: List[bytes] = []
+    size = 0
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        if not message.get("more_body", False) or size > MAX_BODY_FOR_KEY:
+            break
+    return b"".join(chunks), messages
+
+def _parse_json(body: bytes, scope: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    content_type = Headers(scope=scope).get("content-type", "")
+    if "json" not in content_type or len(body) > MAX_BODY_FOR_KEY:
+        return None
+    try:
+        value = json.loads(body)
+    except ValueError:
+        return None
+    return value if isinstance(value, dict) else None
+
+def _replay(messages: List[Dict[str, Any]], receive: Any) -> Any:
+    pending = list(messages)
+
+    async def replay() -> Dict[str, Any]:
+        if pending:
+            return pending.pop(0)
+        return await receive()
+
+    return replay
+
+def too_many_requests_detail(retry_after: float) -> str:
+    return f"요청이 너무 많습니다. {math.ceil(retry_after)}초 후 다시 시도하세요."
+
+def too_many_requests_headers(rule: RateLimitRule, retry_after: float) -> Dict[str, str]:
+    return {
+        "retry-after": str(max(1, math.ceil(retry_after))),
+        "x-ratelimit-limit": str(rule.burst),
+        "x-ratelimit-remaining": "0"
+    }
+
+async def _too_many_requests(send: Any, rule: RateLimitRule, retry_after: float) -> None:
+    body = json.dumps({"detail": too_many_requests_detail(retry_after)}, ensure_ascii=False).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *((name.encode(), value.encode()) for name, value in too_many_requests_headers(rule, retry_after).items())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
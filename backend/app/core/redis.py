@@ -0,0 +1,214 @@
+import os
+import ssl
+import asyncio
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Redis 프로토콜(RESP2) 최소 비동기 클라이언트
+# 레이트 리밋 / 캐시에 필요한 명령만 쓰므로 외부 의존성 없이 asyncio 스트림으로 구현합니다.
+# Redis, Valkey, KeyDB, 로컬 fake 서버 등 RESP를 말하는 서버면 모두 동작합니다.
+
+Reply = Union[None, int, bytes, List[Any]]
+
+class RedisError(Exception):
+    """Redis 에러 응답 또는 연결 실패"""
+
+def _encode(args: Sequence[Any]) -> bytes:
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        elif isinstance(arg, str):
+            data = arg.encode()
+        elif isinstance(arg, float):
+            data = repr(arg).encode()
+        else:
+            data = str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+async def read_reply(reader: asyncio.StreamReader) -> Reply:
+    """RESP2 응답 하나 읽기 (에러 응답은 RedisError 인스턴스로 반환)"""
+    line = await reader.readline()
+    if not line:
+        raise RedisError("연결이 끊어졌습니다.")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload
+    if kind == b"-":
+        return RedisError(payload.decode(errors="replace"))
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await read_reply(reader) for _ in range(length)]
+    raise RedisError(f"알 수 없는 응답: {line!r}")
+
+def _tls_context(options: Dict[str, List[str]]) -> ssl.SSLContext:
+    """rediss:// 연결용 SSLContext (기본: 시스템 CA로 인증서·호스트명 검증)"""
+    ca_certs = options.get("ssl_ca_certs", [None])[0]
+    context = ssl.create_default_context(cafile=ca_certs)
+    cert_reqs = options.get("ssl_cert_reqs", ["required"])[0].lower()
+    if cert_reqs not in ("required", "none"):
+        raise ValueError(f"지원하지 않는 ssl_cert_reqs 값입니다: {cert_reqs!r} (required 또는 none)")
+    if cert_reqs == "none":
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+class RedisClient:
+    """커넥션 풀을 가진 RESP 클라이언트
+
+        client = RedisClient.from_url("redis://localhost:6379/0")
+        await client.execute("SET", "key", "value", "PX", 1000)
+
+    rediss:// URL이면 TLS로 연결합니다 (ssl_context).
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 6379,
+        db: int = 0,
+        password: Optional[str] = None,
+        username: Optional[str] = None,
+        pool_size: int = 10,
+        timeout: float = 1.0,
+        ssl_context: Optional[ssl.SSLContext] = None
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.username = username
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._pool_size = pool_size
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(pool_size)
+        self.commands = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs: Any) -> "RedisClient":
+        """redis://[user:password@]host:port/db 또는 rediss://...(TLS)
+
+        rediss:// 쿼리 옵션: ssl_ca_certs=CA 파일 경로, ssl_cert_reqs=none(인증서 검증 안 함, 개발용)
+        """
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", "rediss"):
+            raise ValueError(f"지원하지 않는 Redis URL 스킴입니다: {parsed.scheme!r} (redis:// 또는 rediss://)")
+        if parsed.scheme == "rediss" and "ssl_context" not in kwargs:
+            kwargs["ssl_context"] = _tls_context(parse_qs(parsed.query))
+        return cls(
+            host=parsed.hostname or "localhost",
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip("/") or 0),
+            password=unquote(parsed.password) if parsed.password else None,
+            username=unquote(parsed.username) if parsed.username else None,
+            **kwargs
+        )
+
+    @classmethod
+    def from_env(cls) -> Optional["RedisClient"]:
+        """REDIS_URL 환경변수 기반 (없으면 None)"""
+        url = os.getenv("REDIS_URL")
+        if not url:
+            return None
+        return cls.from_url(
+            url,
+            pool_size=int(os.getenv("REDIS_POOL_SIZE", 10)),
+            timeout=float(os.getenv("REDIS_TIMEOUT", 1.0))
+        )
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl_context)
+        setup: List[List[Any]] = []
+        if self.password:
+            setup.append(["AUTH", self.username, self.password] if self.username else ["AUTH", self.password])
+        if self.db:
+            setup.append(["SELECT", self.db])
+        for command in setup:
+            writer.write(_encode(command))
+            await writer.drain()
+            reply = await read_reply(reader)
+            if isinstance(reply, RedisError):
+                writer.close()
+                raise reply
+        return reader, writer
+
+    async def _call(self, commands: Sequence[Sequence[Any]]) -> List[Reply]:
+        await self._slots.acquire()
+        connection = None
+        try:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            reader, writer = connection
+            writer.write(b"".join(_encode(command) for command in commands))
+            await writer.drain()
+            replies = [await read_reply(reader) for _ in commands]
+            self._idle.append(connection)
+            connection = None
+            return replies
+        finally:
+            if connection is not None:
+                # 응답을 다 읽지 못한 연결은 재사용하지 않음
+                connection[1].close()
+            self._slots.release()
+
+    async def pipeline(self, commands: Sequence[Sequence[Any]]) -> List[Reply]:
+        """여러 명령을 한 번의 왕복으로 실행 (에러 응답은 RedisError 인스턴스로 포함)"""
+        self.commands += len(commands)
+        try:
+            return await asyncio.wait_for(self._call(commands), timeout=self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            self.errors += 1
+            raise RedisError(f"Redis 호출 실패: {type(e).__name__}: {e}") from e
+
+    async def execute(self, *args: Any) -> Reply:
+        """명령 하나 실행 (에러 응답은 RedisError로 던짐)"""
+        reply = (await self.pipeline([args]))[0]
+        if isinstance(reply, RedisError):
+            self.errors += 1
+            raise reply
+        return reply
+
+    async def aclose(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    def stats(self) -> dict:
+        return {
+            "address": f"{self.host}:{self.port}/{self.db}",
+            "tls": self.ssl_context is not None,
+            "commands": self.commands,
+            "errors": self.errors,
+            "idle_connections": len(self._idle)
+        }
+
+class Script:
+    """Lua 스크립트 (EVALSHA 우선, 서버에 없으면 EVAL로 등록)"""
+
+    def __init__(self, source: str) -> None:
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+
+    async def __call__(self, client: RedisClient, keys: Sequence[Any], args: Sequence[Any]) -> Reply:
+        try:
+            return await client.execute("EVALSHA", self.sha, len(keys), *keys, *args)
+        except RedisError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+        return await client.execute("EVAL", self.source, len(keys), *keys, *args)
@@ -0,0 +1,303 @@
+import os
+import time
+import random
+import asyncio
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core import deadline
+from app.core.deadline import DeadlineExceededError
+from app.core.errors import ServiceUnavailableError
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BREAKER_STATE = REGISTRY.gauge(
+    "circuit_breaker_state", "Circuit breaker state (0=closed, 1=half_open, 2=open)", ("upstream",)
+)
+BREAKER_OPENED = REGISTRY.counter(
+    "circuit_breaker_opened_total", "Times a circuit breaker opened", ("upstream",)
+)
+BREAKER_REJECTED = REGISTRY.counter(
+    "circuit_breaker_rejected_total", "Calls rejected by an open circuit breaker", ("upstream",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "upstream_retries_total", "Retried upstream requests", ("upstream", "reason")
+)
+UPSTREAM_DEADLINE_EXCEEDED = REGISTRY.counter(
+    "upstream_deadline_exceeded_total", "Upstream calls cut short by the request deadline", ("upstream",)
+)
+
+# 재시도 대상: 멱등 메서드 + 일시적 오류 상태 코드
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+RETRYABLE_STATUS = frozenset((429, 500, 502, 503, 504, 520))
+
+class CircuitOpenError(ServiceUnavailableError):
+    """서킷 브레이커가 열려 upstream 호출을 바로 거절함"""
+
+    def __init__(self, upstream: str, retry_after: float) -> None:
+        super().__init__(f"{upstream} 일시적으로 사용할 수 없습니다 (circuit open)", retry_after=retry_after)
+        self.upstream = upstream
+
+class CircuitBreaker:
+    """upstream별 서킷 브레이커 (closed → open → half_open → closed)
+
+    - closed: 연속 실패가 failure_threshold번이면 open
+    - open: reset_timeout초 동안 호출 없이 바로 CircuitOpenError
+    - half_open: 시험 호출 half_open_max_calls개만 허용, 성공하면 closed / 실패하면 다시 open
+    failure_threshold가 0이면 브레이커를 사용하지 않습니다.
+    """
+
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    _STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._half_open_calls = 0
+        self.opened = 0
+        self.rejected = 0
+        self.failures = 0
+        self.successes = 0
+        BREAKER_STATE.set(0, name)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"서킷 브레이커 {self.name}: {self.state} → {state}")
+        self.state = state
+        BREAKER_STATE.set(self._STATE_VALUES[state], self.name)
+        if state == self.OPEN:
+            self.opened += 1
+            self.opened_at = time.monotonic()
+            BREAKER_OPENED.inc(self.name)
+        if state == self.HALF_OPEN:
+            self._half_open_calls = 0
+
+    def retry_after(self) -> float:
+        """open 상태가 끝날 때까지 남은 시간(초)"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self) -> None:
+        """호출 허용 여부 확인 (거절 시 CircuitOpenError)"""
+        if self.failure_threshold <= 0:
+            return
+
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                self.rejected += 1
+                BREAKER_REJECTED.inc(self.name)
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                BREAKER_REJECTED.inc(self.name)
+                raise CircuitOpenError(self.name, 1.0)
+            self._half_open_calls += 1
+
+    def _release(self) -> None:
+        if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record_success(self) -> None:
+        self.successes += 1
+        self._release()
+        self.consecutive_failures = 0
+        if self.state == self.HALF_OPEN:
+            self._transition(self.CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._release()
+        self.consecutive_failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self._transition(self.OPEN)
+
+    def record_ignored(self) -> None:
+        """결과를 판단할 수 없는 호출 (취소 등) — 시험 호출 슬롯만 반환"""
+        self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "retry_after_s": round(self.retry_after(), 2),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "failures": self.failures,
+            "successes": self.successes
+        }
+
+class RetryPolicy:
+    """지수 백오프 + full jitter 재시도 정책 (attempts는 첫 시도 포함 총 횟수)"""
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        base_delay: float = 0.1,
+        max_delay: float = 2.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._random = random.Random(seed)
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """attempt번째(0부터) 실패 후 대기 시간. 서버가 준 Retry-After가 max_delay 이하면 우선"""
+        if retry_after:
+            seconds = _parse_retry_after(retry_after)
+            if seconds is not None and seconds <= self.max_delay:
+                return seconds
+        return self._random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class Upstream:
+    """upstream 하나의 재시도 정책 + 서킷 브레이커"""
+
+    def __init__(self, name: str, retry: RetryPolicy, breaker: CircuitBreaker) -> None:
+        self.name = name
+        self.retry = retry
+        self.breaker = breaker
+        self.retries = 0
+        self.deadline_exceeded = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "Upstream":
+        """{NAME}_RETRY_* / {NAME}_BREAKER_* 환경변수 기반 생성"""
+        prefix = name.upper()
+        return cls(
+            name,
+            RetryPolicy(
+                attempts=int(os.getenv(f"{prefix}_RETRY_ATTEMPTS", 3)),
+                base_delay=float(os.getenv(f"{prefix}_RETRY_BASE_DELAY", 0.1)),
+                max_delay=float(os.getenv(f"{prefix}_RETRY_MAX_DELAY", 2))
+            ),
+            CircuitBreaker(
+                name,
+                failure_threshold=int(os.getenv(f"{prefix}_BREAKER_FAILURE_THRESHOLD", 5)),
+                reset_timeout=float(os.getenv(f"{prefix}_BREAKER_RESET_TIMEOUT", 30))
+            )
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"retries": self.retries, "deadline_exceeded": self.deadline_exceeded, **self.breaker.stats()}
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """httpx 트랜스포트에 재시도·서킷 브레이커·요청 deadline 적용
+
+    - 네트워크 오류와 5xx는 브레이커 실패로 집계합니다 (4xx는 upstream 정상으로 간주).
+    - GET/HEAD 등 멱등 요청만 RETRYABLE_STATUS / 네트워크 오류에 대해 재시도합니다.
+    - 브레이커가 열려 있으면 요청을 보내지 않고 CircuitOpenError를 던집니다.
+    - 요청 deadline(app.core.deadline)이 있으면 시도마다 남은 시간만큼만 기다리고,
+      백오프 후 재시도할 시간이 없으면 마지막 결과를 그대로 돌려줍니다.
+      deadline으로 끊긴 호출은 DeadlineExceededError이며 브레이커 실패로 세지 않습니다.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, upstream: Upstream) -> None:
+        self.transport = transport
+        self.upstream = upstream
+
+    def _deadline_exceeded(self) -> DeadlineExceededError:
+        self.upstream.deadline_exceeded += 1
+        UPSTREAM_DEADLINE_EXCEEDED.inc(self.upstream.name)
+        return DeadlineExceededError(self.upstream.name)
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        budget = deadline.remaining()
+        if budget is None:
+            return await self.transport.handle_async_request(request)
+        if budget <= 0:
+            raise self._deadline_exceeded()
+        request.extensions["timeout"] = deadline.clamp_timeouts(request.extensions.get("timeout"))
+        try:
+            return await asyncio.wait_for(self.transport.handle_async_request(request), budget)
+        except asyncio.TimeoutError:
+            raise self._deadline_exceeded()
+        except httpx.TimeoutException as e:
+            # 줄어든 timeout으로 끊긴 경우 upstream 장애가 아니라 deadline 초과
+            if not deadline.allows(0):
+                raise self._deadline_exceeded() from e
+            raise
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        upstream = self.upstream
+        breaker = upstream.breaker
+        attempts = upstream.retry.attempts if request.method in IDEMPOTENT_METHODS else 1
+
+        for attempt in range(attempts):
+            breaker.before_call()
+            last_attempt = attempt + 1 >= attempts
+            error: Optional[httpx.TransportError] = None
+            response: Optional[httpx.Response] = None
+            try:
+                response = await self._send(request)
+            except httpx.TransportError as e:
+                breaker.record_failure()
+                if last_attempt:
+                    raise
+                error = e
+                reason = type(e).__name__
+                retry_after = None
+            except BaseException:
+                breaker.record_ignored()
+                raise
+            else:
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if last_attempt or response.status_code not in RETRYABLE_STATUS:
+                    return response
+                reason = str(response.status_code)
+                retry_after = response.headers.get("retry-after")
+
+            delay = upstream.retry.delay(attempt, retry_after)
+            if not deadline.allows(delay):
+                # 기다렸다 다시 보낼 시간이 남지 않음 → 이번 결과로 끝냄
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                await response.aclose()
+
+            upstream.retries += 1
+            UPSTREAM_RETRIES.inc(upstream.name, reason)
+            await asyncio.sleep(delay)
+
+        raise RuntimeError("unreachable")
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,94 @@
+import os
+import json
+import math
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson은 선택 의존성 (없으면 표준 json)
+    orjson = None
+
+# 빠른 JSON 응답 경로 (opt-in)
+# - 모델 응답: 데이터 계층에서 이미 검증된 모델을 pydantic-core로 바로 직렬화해 Response로 반환
+#   → FastAPI의 response_model 재검증을 건너뜀 (바이트는 기본 경로와 동일)
+# - dict 응답(/health 등): orjson 기반 default_response_class
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in ("1", "true", "yes")
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # starlette JSONResponse.render와 동일한 옵션
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+# 표준 json(float.__repr__)과 orjson 표기가 다른 float 범위: 1e-05 → 0.00001, 1e+16 → 1e16
+_REPR_EXPONENT_BELOW = 1e-4
+_REPR_EXPONENT_FROM = 1e16
+
+def _orjson_compatible(content: Any) -> bool:
+    """orjson 출력이 표준 json과 같은 바이트인지 (NaN/Infinity, 지수 표기 float가 있으면 False)"""
+    stack = [content]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return False
+            magnitude = abs(value)
+            if magnitude and (magnitude < _REPR_EXPONENT_BELOW or magnitude >= _REPR_EXPONENT_FROM):
+                return False
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return True
+
+def dumps(content: Any) -> bytes:
+    """JSON 바이트 (JSONResponse와 같은 바이트·같은 에러)
+
+    orjson을 우선 쓰고, orjson이 못 다루거나 표기가 다른 값은 표준 json으로 직렬화합니다.
+    - 64비트 초과 정수, 문자열이 아닌 dict 키 (orjson TypeError)
+    - NaN/Infinity: orjson은 null로 바꾸지만 표준 json(allow_nan=False)은 ValueError
+    - 지수 표기 float (|x| < 1e-4 또는 >= 1e16): 1e-05 ↔ 0.00001, 1e+16 ↔ 1e16
+    """
+    if orjson is not None and _orjson_compatible(content):
+        try:
+            return orjson.dumps(content)
+        except TypeError:
+            pass
+    return _stdlib_dumps(content)
+
+class FastJSONResponse(JSONResponse):
+    """orjson으로 렌더링하는 JSONResponse"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def model_json(model: BaseModel) -> bytes:
+    """pydantic-core 직렬화 (FastAPI 기본 response_model 경로와 같은 바이트)"""
+    return model.__pydantic_serializer__.to_json(model)
+
+def model_response(
+    model: BaseModel,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """이미 검증된 응답 모델을 재검증 없이 JSON Response로"""
+    return Response(
+        content=model_json(model),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json"
+    )
+
+def respond(model: BaseModel, status_code: int = 200) -> Any:
+    """FAST_JSON이면 직렬화된 Response, 아니면 모델 그대로 (FastAPI가 검증 후 직렬화)
+
+    status_code는 FAST_JSON일 때만 쓰이므로 라우트 데코레이터의 status_code와 같게 넘깁니다.
+    """
+    return model_response(model, status_code=status_code) if FAST_JSON else model
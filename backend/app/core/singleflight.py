@@ -0,0 +1,97 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.core import deadline
+from app.core.deadline import DeadlineExceededError
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """동일 키 동시 요청 병합 (single-flight)
+
+    같은 키로 진행 중인 upstream 호출이 있으면 새 호출을 만들지 않고
+    그 결과를 함께 기다립니다. upstream 호출은 별도 Task로 실행되므로
+    기다리던 요청 하나가 취소되어도 다른 요청에는 영향이 없습니다.
+
+    공유 호출은 처음 시작한 요청의 deadline을 물려받지 않고, 요청마다 자기 deadline까지만
+    기다립니다 (deadline이 짧은 경로가 먼저 시작해도 긴 경로의 합류 요청은 끝까지 기다림).
+    """
+
+    def __init__(self, name: str, max_tracked_keys: int = 1024) -> None:
+        self.name = name
+        self.max_tracked_keys = max_tracked_keys
+        self._in_flight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        # 키별 통계: upstream 호출 수 / 처리한 요청 수 / 한 호출이 처리한 최대 요청 수
+        self._key_stats: "OrderedDict[Hashable, Dict[str, int]]" = OrderedDict()
+        self.upstream_calls = 0
+        self.callers = 0
+        # 공유 호출이 끝나기 전에 자기 deadline이 지나 먼저 포기한 요청 수
+        self.deadline_exceeded = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """key로 진행 중인 호출이 있으면 합류, 없으면 fn() 실행"""
+        self.callers += 1
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.upstream_calls += 1
+            task = asyncio.get_running_loop().create_task(fn(), context=deadline.detached())
+            self._in_flight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda _t, k=key: self._finish(k))
+        else:
+            self._waiters[key] += 1
+
+        left = deadline.remaining()
+        if left is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), max(0.0, left))
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            self.deadline_exceeded += 1
+            raise DeadlineExceededError(self.name)
+
+    def _finish(self, key: Hashable) -> None:
+        """upstream 호출 완료 시 통계 기록 및 정리"""
+        self._in_flight.pop(key, None)
+        served = self._waiters.pop(key, 1)
+
+        stats = self._key_stats.pop(key, None) or {"upstream_calls": 0, "callers": 0, "max_shared": 0}
+        stats["upstream_calls"] += 1
+        stats["callers"] += served
+        stats["max_shared"] = max(stats["max_shared"], served)
+        self._key_stats[key] = stats
+
+        while len(self._key_stats) > self.max_tracked_keys:
+            self._key_stats.popitem(last=False)
+
+    def in_flight(self) -> int:
+        """현재 진행 중인 upstream 호출 수"""
+        return len(self._in_flight)
+
+    def stats(self, top: Optional[int] = 20) -> Dict[str, Any]:
+        """전체 및 키별(요청 수 상위) 병합 통계"""
+        keys = sorted(self._key_stats.items(), key=lambda item: item[1]["callers"], reverse=True)
+        if top is not None:
+            keys = keys[:top]
+
+        return {
+            "name": self.name,
+            "upstream_calls": self.upstream_calls,
+            "callers": self.callers,
+            "coalesced": self.callers - self.upstream_calls,
+            "in_flight": self.in_flight(),
+            "deadline_exceeded": self.deadline_exceeded,
+            "keys": [
+                {
+                    "key": ":".join(str(part) for part in key) if isinstance(key, tuple) else str(key),
+                    **stats,
+                    "callers_per_call": round(stats["callers"] / stats["upstream_calls"], 2)
+                }
+                for key, stats in keys
+            ]
+        }
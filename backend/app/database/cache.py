@@ -0,0 +1,158 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple, Dict, Any, Union
+
+from app.database.models import VoiceRecord
+
+# 캐시 키 종류 (voices 테이블의 조회 컬럼)
+LOOKUP_COLUMNS = ('agent_id', 'public_id')
+
+CacheKey = Tuple[str, str]
+
+class VoiceCache:
+    """VoiceRecord LRU + TTL 캐시 (agent_id / public_id 양쪽 키로 조회)
+
+    - 레코드는 agent_id, public_id 두 키에 함께 저장됩니다.
+    - 존재하지 않는 ID(negative lookup)는 짧은 TTL로 캐시합니다.
+    - Supabase Realtime 변경 이벤트로 무효화됩니다 (invalidate_row).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 60.0,
+        negative_ttl: float = 5.0,
+        enabled: bool = True
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Optional[VoiceRecord]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.invalidations = 0
+        self.evictions = 0
+        # 무효화 세대 번호: 조회 도중 무효화가 일어나면 오래된 결과를 저장하지 않음
+        self.generation = 0
+
+    @classmethod
+    def from_env(cls) -> "VoiceCache":
+        """환경변수 기반 캐시 생성"""
+        return cls(
+            max_size=int(os.getenv("VOICE_CACHE_MAX_SIZE", 1024)),
+            ttl=float(os.getenv("VOICE_CACHE_TTL", 60)),
+            negative_ttl=float(os.getenv("VOICE_CACHE_NEGATIVE_TTL", 5)),
+            enabled=os.getenv("VOICE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        )
+
+    def get(self, column: str, value: str) -> Tuple[bool, Optional[VoiceRecord]]:
+        """캐시 조회 → (hit 여부, 레코드). negative hit이면 (True, None)"""
+        if not self.enabled:
+            return False, None
+
+        key = (column, value)
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return False, None
+
+        expires_at, record = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return False, None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        if record is None:
+            self.negative_hits += 1
+        return True, record
+
+    def set(
+        self,
+        column: str,
+        value: str,
+        record: Optional[VoiceRecord],
+        generation: Optional[int] = None,
+        ttl: Optional[float] = None
+    ) -> None:
+        """조회 결과 저장 (None이면 negative 캐시)
+
+        generation을 주면 조회 시작 이후 무효화가 있었던 경우 저장하지 않습니다.
+        ttl을 주면 (L2 값의 남은 수명) 설정된 TTL보다 짧을 때 그만큼만 보관합니다.
+        """
+        if not self.enabled:
+            return
+
+        if generation is not None and generation != self.generation:
+            return
+
+        lifetime = self.negative_ttl if record is None else self.ttl
+        if ttl is not None:
+            lifetime = min(lifetime, ttl)
+
+        if record is None:
+            self._put((column, value), time.monotonic() + lifetime, None)
+            return
+
+        expires_at = time.monotonic() + lifetime
+        for lookup_column in LOOKUP_COLUMNS:
+            lookup_value = getattr(record, lookup_column)
+            if lookup_value:
+                self._put((lookup_column, lookup_value), expires_at, record)
+
+    def _put(self, key: CacheKey, expires_at: float, record: Optional[VoiceRecord]) -> None:
+        self._entries[key] = (expires_at, record)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_row(self, row: Optional[Union[Dict[str, Any], VoiceRecord]]) -> None:
+        """voices 행(dict 또는 VoiceRecord)에 해당하는 캐시 항목 제거"""
+        if not row:
+            return
+
+        if isinstance(row, VoiceRecord):
+            row = row.model_dump()
+
+        self.generation += 1
+
+        for lookup_column in LOOKUP_COLUMNS:
+            lookup_value = row.get(lookup_column)
+            if lookup_value and self._entries.pop((lookup_column, lookup_value), None) is not None:
+                self.invalidations += 1
+
+    def handle_change(self, payload: Dict[str, Any]) -> None:
+        """Supabase Realtime postgres_changes 페이로드 처리
+
+        UPDATE로 public_id가 바뀐 경우를 위해 old_record/record 모두 무효화합니다.
+        (DELETE/UPDATE의 old_record는 REPLICA IDENTITY FULL 설정이 필요)
+        """
+        data = payload.get('data', payload)
+        self.invalidate_row(data.get('old_record'))
+        self.invalidate_row(data.get('record'))
+
+    def clear(self) -> None:
+        """전체 캐시 비우기"""
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """hit/miss 카운터 반환"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions
+        }
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal, Dict, Any
 from datetime import datetime
+from uuid import UUID
 
 # === Voice Models ===
 
@@ -19,6 +20,14 @@ class VoiceListResponse(BaseModel):
     """음성 목록 응답"""
     voices: List[VoiceRecord]
     total: int
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (없으면 마지막 페이지)")
+    message: str
+
+class VoiceProjectionListResponse(BaseModel):
+    """음성 목록 응답 (fields= 프로젝션, 요청한 컬럼만 포함)"""
+    voices: List[Dict[str, Any]]
+    total: int
+    next_cursor: Optional[str] = Field(None, description="다음 페이지 커서 (없으면 마지막 페이지)")
     message: str
 
 class VoiceDetailResponse(BaseModel):
@@ -26,6 +35,30 @@ class VoiceDetailResponse(BaseModel):
     voice: VoiceRecord
     message: str
 
+class VoiceLookupKey(BaseModel):
+    """일괄 조회 대상 ID (agent_id 또는 public_id)"""
+    kind: Literal['agent_id', 'public_id'] = Field(..., description="ID 종류")
+    id: str = Field(..., min_length=1, description="조회할 ID")
+
+class VoiceResolveRequest(BaseModel):
+    """여러 ID 일괄 조회 요청"""
+    ids: List[VoiceLookupKey] = Field(..., min_length=1, max_length=100, description="조회할 ID 목록 (최대 100개)")
+
+class VoiceResolveResult(BaseModel):
+    """일괄 조회 개별 결과"""
+    kind: Literal['agent_id', 'public_id']
+    id: str
+    found: bool
+    voice: Optional[VoiceRecord] = None
+    message: str
+
+class VoiceResolveResponse(BaseModel):
+    """일괄 조회 응답 (중복 제거, 요청 순서 유지)"""
+    results: List[VoiceResolveResult]
+    found: int
+    not_found: int
+    message: str
+
 # === Conversation Models ===
 
 class SignedUrlRequest(BaseModel):
@@ -63,6 +96,45 @@ class PublicIdToAgentResponse(BaseModel):
     created_at: Optional[datetime] = None
     message: str
 
+# === Transcript Models ===
+
+MessageType = Literal['user_text', 'ai_text', 'ai_voice', 'system']
+
+class TranscriptEvent(BaseModel):
+    """대화 기록 이벤트 (messages 테이블 한 행)"""
+    content: str = Field(..., min_length=1, description="메시지 내용")
+    sender_id: Optional[UUID] = Field(None, description="보낸 사용자 ID (생략하면 토큰의 사용자, 다르면 403)")
+    chatroom_id: str = Field('ai-streamer', description="채팅방 식별자")
+    message_type: MessageType = Field('ai_text', description="user_text, ai_text, ai_voice, system")
+    created_at: Optional[datetime] = Field(None, description="발생 시각 (없으면 서버 수신 시각)")
+
+class TranscriptIngestRequest(BaseModel):
+    """대화 기록 일괄 수신 요청"""
+    events: List[TranscriptEvent] = Field(..., min_length=1, max_length=500)
+
+class TranscriptIngestResponse(BaseModel):
+    """대화 기록 수신 응답 (DB 저장은 백그라운드에서 일괄 처리)"""
+    accepted: int
+    dropped: int = Field(0, description="대기열이 가득 차 버려진 이전 이벤트 수 (drop_oldest 정책)")
+    queued: int = Field(..., description="저장 대기 중인 이벤트 수")
+    message: str
+
+class MessageRecord(BaseModel):
+    """messages 테이블 레코드"""
+    id: str
+    content: str
+    sender_id: str
+    chatroom_id: str
+    message_type: MessageType
+    created_at: datetime
+
+class MessageListResponse(BaseModel):
+    """채팅방 메시지 목록 응답 (최신순)"""
+    messages: List[MessageRecord]
+    total: int
+    next_cursor: Optional[str] = Field(None, description="다음(더 오래된) 페이지 커서 (없으면 마지막 페이지)")
+    message: str
+
 # === Common Models ===
 
 class SuccessResponse(BaseModel):
@@ -88,4 +160,6 @@ class StatsResponse(BaseModel):
     """통계 응답"""
     total_voices: int
     voices_with_agent: int
+    user_id: Optional[str] = None
+    exact: bool = Field(False, description="COUNT(*)로 직접 계산했는지 여부 (기본은 카운터 테이블)")
     message: str 
\ No newline at end of file
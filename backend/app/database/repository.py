@@ -0,0 +1,483 @@
+import json
+import asyncio
+import base64
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional, TYPE_CHECKING, Tuple, TypeVar
+
+from app.database.models import VoiceRecord, MessageRecord
+from app.database.cache import VoiceCache
+from app.database.shared_cache import SharedVoiceCache
+from app.database.voice_index import VoiceRoutingIndex
+from app.core.singleflight import SingleFlight
+from app.core.metrics import span
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient
+
+T = TypeVar("T")
+
+LookupKey = Tuple[str, str]
+
+# VoiceRecord 컬럼 (fields= 프로젝션 허용 목록)
+VOICE_COLUMNS = tuple(VoiceRecord.model_fields)
+
+# MessageRecord 컬럼 (updated_at은 조회하지 않음)
+MESSAGE_COLUMNS = tuple(MessageRecord.model_fields)
+
+# 커서 페이지네이션 정렬 키 (created_at DESC, id DESC)
+CURSOR_COLUMNS = ('created_at', 'id')
+
+def _quote(value: str) -> str:
+    """PostgREST 필터 값 인용 (쉼표/괄호/콜론이 있어도 안전)"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+def _in_list(values: List[str]) -> str:
+    """PostgREST in.() 필터용 값 목록"""
+    return "(" + ",".join(_quote(value) for value in values) + ")"
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """마지막 행의 (created_at, id)를 불투명 커서 문자열로 인코딩"""
+    raw = json.dumps([str(row['created_at']), str(row['id'])], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """커서 문자열 → (created_at, id). 형식이 잘못되면 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("잘못된 cursor 값입니다.")
+    if not isinstance(created_at, str) or not isinstance(row_id, str):
+        raise ValueError("잘못된 cursor 값입니다.")
+    return created_at, row_id
+
+def _after(query: Any, after: Optional[Tuple[str, str]], descending: bool = True) -> Any:
+    """키셋 조건: created_at < c OR (created_at = c AND id < i) (오름차순이면 >)"""
+    if not after:
+        return query
+    created_at, row_id = after
+    op = "lt" if descending else "gt"
+    return query.or_(
+        f"created_at.{op}.{_quote(created_at)},"
+        f"and(created_at.eq.{_quote(created_at)},id.{op}.{_quote(row_id)})"
+    )
+
+class VoiceRepository:
+    """voices 테이블 비동기 조회 (공유 커넥션 풀 사용)
+
+    재시도·서킷 브레이커는 SupabaseManager의 트랜스포트에서 처리하므로
+    postgrest 자체 재시도(503에 1·2·4초 대기)는 끕니다 (.retry(False)).
+    """
+
+    TABLE = 'voices'
+    STATS_TABLE = 'voice_stats'
+    USER_STATS_TABLE = 'voice_user_stats'
+
+    def __init__(
+        self,
+        client: "AsyncClient",
+        cache: Optional[VoiceCache] = None,
+        flight: Optional[SingleFlight] = None,
+        shared: Optional[SharedVoiceCache] = None,
+        index: Optional[VoiceRoutingIndex] = None
+    ) -> None:
+        self.client = client
+        self.cache = cache
+        self.flight = flight
+        self.shared = shared
+        self.index = index
+
+    async def _coalesce(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """동일 조회가 진행 중이면 그 결과를 공유 (single-flight)"""
+        if self.flight is None:
+            return await fn()
+        return await self.flight.do(key, fn)
+
+    async def _get_one(self, column: str, value: str) -> Optional[VoiceRecord]:
+        """단일 컬럼 일치 조회 (public_id 인덱스 → 캐시 → 진행 중 조회 합류 → DB, 없으면 None)"""
+        if column == 'public_id' and self.index is not None:
+            record = self.index.get(value)
+            if record is not None:
+                return record
+
+        if self.cache is not None:
+            hit, record = self.cache.get(column, value)
+            if hit:
+                return record
+
+        return await self._coalesce((column, value), lambda: self._load_one(column, value))
+
+    async def _load_one(self, column: str, value: str) -> Optional[VoiceRecord]:
+        """공유 캐시(L2) → DB 조회 후 캐시에 저장"""
+        if self.cache is None and self.shared is None:
+            return await self._fetch_one(column, value)
+
+        generation = self.cache.generation if self.cache is not None else None
+        # L2에서 읽은 값은 L2에 남은 수명까지만 L1에 보관 (DB에서 새로 읽으면 L1 TTL 그대로)
+        ttl: Optional[float] = None
+        if self.shared is None:
+            record = await self._fetch_one(column, value)
+        else:
+            hit, record, ttl = await self.shared.get(column, value)
+            if not hit:
+                ttl = None
+                record = await self.shared.load(
+                    column, value,
+                    lambda: self._fetch_one(column, value),
+                    still_valid=lambda: self.cache is None or self.cache.generation == generation
+                )
+        if self.cache is not None:
+            self.cache.set(column, value, record, generation=generation, ttl=ttl)
+        return record
+
+    async def _fetch_one(self, column: str, value: str) -> Optional[VoiceRecord]:
+        """DB에서 단일 레코드 조회"""
+        with span("supabase.fetch_one", upstream="supabase"):
+            result = await self.client.table(self.TABLE)\
+                .select('*')\
+                .eq(column, value)\
+                .limit(1)\
+                .retry(False).execute()
+
+        if not result.data:
+            return None
+
+        return VoiceRecord(**result.data[0])
+
+    async def get_by_agent_id(self, agent_id: str) -> Optional[VoiceRecord]:
+        """Agent ID로 레코드 조회"""
+        return await self._get_one('agent_id', agent_id)
+
+    async def get_by_public_id(self, public_id: str) -> Optional[VoiceRecord]:
+        """Public ID로 레코드 조회"""
+        return await self._get_one('public_id', public_id)
+
+    async def get_many(self, keys: List[LookupKey]) -> Dict[LookupKey, Optional[VoiceRecord]]:
+        """(column, value) 여러 개를 한 번의 쿼리로 조회 (캐시 hit은 제외)"""
+        found: Dict[LookupKey, Optional[VoiceRecord]] = {}
+        pending: List[LookupKey] = []
+
+        for key in dict.fromkeys(keys):
+            if key[0] == 'public_id' and self.index is not None:
+                record = self.index.get(key[1])
+                if record is not None:
+                    found[key] = record
+                    continue
+            if self.cache is not None:
+                hit, record = self.cache.get(*key)
+                if hit:
+                    found[key] = record
+                    continue
+            pending.append(key)
+
+        if not pending:
+            return found
+
+        generation = self.cache.generation if self.cache is not None else None
+
+        if self.shared is not None:
+            shared_found = await self.shared.get_many(pending)
+            for key, (record, ttl) in shared_found.items():
+                found[key] = record
+                if self.cache is not None:
+                    self.cache.set(*key, record, generation=generation, ttl=ttl)
+            pending = [key for key in pending if key not in shared_found]
+            if not pending:
+                return found
+
+        records = await self._fetch_many(pending)
+
+        by_column: Dict[LookupKey, VoiceRecord] = {}
+        for record in records:
+            by_column[('agent_id', record.agent_id)] = record
+            by_column[('public_id', record.public_id)] = record
+
+        for key in pending:
+            record = by_column.get(key)
+            found[key] = record
+            if self.cache is not None:
+                self.cache.set(*key, record, generation=generation)
+
+        if self.shared is not None and (self.cache is None or self.cache.generation == generation):
+            await self.shared.set_many([(key, found[key]) for key in pending])
+
+        return found
+
+    async def _fetch_many(self, keys: List[LookupKey]) -> List[VoiceRecord]:
+        """agent_id / public_id 목록을 단일 in 쿼리로 조회"""
+        values: Dict[str, List[str]] = {}
+        for column, value in keys:
+            values.setdefault(column, []).append(value)
+
+        query = self.client.table(self.TABLE).select('*')
+
+        if len(values) == 1:
+            (column, column_values), = values.items()
+            query = query.in_(column, column_values)
+        else:
+            query = query.or_(",".join(
+                f"{column}.in.{_in_list(column_values)}"
+                for column, column_values in values.items()
+            ))
+
+        with span("supabase.fetch_many", upstream="supabase"):
+            result = await query.retry(False).execute()
+        return [VoiceRecord(**voice) for voice in result.data]
+
+    async def list_voices(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[VoiceRecord], Optional[str]]:
+        """agent_id가 있는 레코드를 최신순으로 조회 → (레코드, next_cursor)"""
+        rows, next_cursor = await self.list_voice_rows(user_id=user_id, limit=limit, cursor=cursor)
+        return [VoiceRecord(**row) for row in rows], next_cursor
+
+    async def list_voice_rows(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        columns: Optional[List[str]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """(created_at, id) 키셋 페이지네이션 조회 → (행 dict, next_cursor)
+
+        columns를 주면 해당 컬럼만 조회합니다 (커서 계산용 created_at, id는 항상 포함).
+        """
+        after = decode_cursor(cursor) if cursor else None
+        key = ('list', user_id, limit, after, tuple(columns) if columns else None)
+        return await self._coalesce(key, lambda: self._fetch_page(user_id, limit, after, columns))
+
+    async def _fetch_page(
+        self,
+        user_id: Optional[str],
+        limit: int,
+        after: Optional[Tuple[str, str]],
+        columns: Optional[List[str]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        if columns:
+            select_columns = list(dict.fromkeys([*columns, *CURSOR_COLUMNS]))
+            query = self.client.table(self.TABLE).select(*select_columns)
+        else:
+            query = self.client.table(self.TABLE).select('*')
+
+        if user_id:
+            query = query.eq('user_id', user_id)
+
+        query = _after(query.not_.is_('agent_id', 'null'), after)
+
+        # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        with span("supabase.fetch_page", upstream="supabase"):
+            result = await query\
+                .order('created_at', desc=True)\
+                .order('id', desc=True)\
+                .limit(limit + 1)\
+                .retry(False).execute()
+
+        rows = result.data[:limit]
+        next_cursor = encode_cursor(rows[-1]) if len(result.data) > limit else None
+
+        if columns:
+            rows = [{column: row.get(column) for column in columns} for row in rows]
+
+        return rows, next_cursor
+
+    async def iter_index_pages(
+        self,
+        page_size: int = 10_000,
+        since: Optional[str] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """public_id 인덱스 적재용: agent_id가 있는 행을 (created_at, id) 오름차순으로 페이지 조회
+
+        since를 주면 created_at >= since인 행만 (증분 갱신). 다음 페이지는 현재 페이지를 적용하는 동안 미리 요청합니다.
+        PostgREST max-rows가 page_size보다 작아 잘려 와도 빈 페이지가 나올 때까지 이어서 읽습니다.
+        """
+        pending = asyncio.ensure_future(self._fetch_index_page(page_size, None, since))
+        try:
+            while True:
+                rows = await pending
+                if not rows:
+                    return
+                last = rows[-1]
+                pending = asyncio.ensure_future(
+                    self._fetch_index_page(page_size, (str(last['created_at']), str(last['id'])), since)
+                )
+                yield rows
+        finally:
+            if not pending.done():
+                pending.cancel()
+
+    async def _fetch_index_page(
+        self,
+        limit: int,
+        after: Optional[Tuple[str, str]],
+        since: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        query = self.client.table(self.TABLE)\
+            .select(*VOICE_COLUMNS)\
+            .not_.is_('agent_id', 'null')
+        if since:
+            query = query.gte('created_at', since)
+        query = _after(query, after, descending=False)
+
+        with span("supabase.fetch_index_page", upstream="supabase"):
+            result = await query\
+                .order('created_at')\
+                .order('id')\
+                .limit(limit)\
+                .retry(False).execute()
+
+        return result.data
+
+    async def ping(self) -> bool:
+        """연결 확인용 최소 조회 (인덱스로 행 1개만 읽음)"""
+        with span("supabase.ping", upstream="supabase"):
+            await self.client.table(self.TABLE).select('id').limit(1).retry(False).execute()
+        return True
+
+    async def count(self, with_agent_only: bool = False, user_id: Optional[str] = None) -> int:
+        """레코드 수 정확히 조회 (COUNT(*), head 요청으로 본문 없이 count만 받음)"""
+        return await self._coalesce(
+            ('count', with_agent_only, user_id),
+            lambda: self._fetch_count(with_agent_only, user_id)
+        )
+
+    async def _fetch_count(self, with_agent_only: bool, user_id: Optional[str]) -> int:
+        query = self.client.table(self.TABLE).select('id', count="exact", head=True)
+
+        if user_id:
+            query = query.eq('user_id', user_id)
+
+        if with_agent_only:
+            query = query.not_.is_('agent_id', 'null')
+
+        with span("supabase.count", upstream="supabase"):
+            result = await query.retry(False).execute()
+        return result.count or 0
+
+    async def get_stats(self, user_id: Optional[str] = None, exact: bool = False) -> Tuple[int, int]:
+        """(전체 수, agent_id가 있는 수) 조회
+
+        기본은 트리거로 유지되는 voice_stats / voice_user_stats 카운터 행을 읽고,
+        exact=True이거나 카운터 행이 없으면 COUNT(*)로 계산합니다.
+        """
+        if not exact:
+            counters = await self._coalesce(('stats', user_id), lambda: self._fetch_counters(user_id))
+            if counters is not None:
+                return counters
+
+        total, with_agent = await asyncio.gather(
+            self.count(user_id=user_id),
+            self.count(with_agent_only=True, user_id=user_id)
+        )
+        return total, with_agent
+
+    async def _fetch_counters(self, user_id: Optional[str]) -> Optional[Tuple[int, int]]:
+        with span("supabase.counters", upstream="supabase"):
+            return await self._query_counters(user_id)
+
+    async def _query_counters(self, user_id: Optional[str]) -> Optional[Tuple[int, int]]:
+        if user_id:
+            result = await self.client.table(self.USER_STATS_TABLE)\
+                .select('total_voices,voices_with_agent')\
+                .eq('user_id', user_id)\
+                .limit(1)\
+                .retry(False).execute()
+            # 카운터 행이 없는 사용자는 음성이 없는 것
+            if not result.data:
+                return 0, 0
+        else:
+            result = await self.client.table(self.STATS_TABLE)\
+                .select('total_voices,voices_with_agent')\
+                .limit(1)\
+                .retry(False).execute()
+            if not result.data:
+                return None
+
+        row = result.data[0]
+        return int(row['total_voices']), int(row['voices_with_agent'])
+
+class MessageRepository:
+    """messages 테이블 조회 / 쓰기 (채팅 기록, 대화 기록 일괄 저장)
+
+    조회는 chatroom_id 일치 + (created_at, id) 키셋이라 idx_messages_chatroom_created 범위 스캔으로
+    처리되고, 깊은 페이지도 OFFSET처럼 앞 행을 건너뛰는 비용이 없습니다.
+
+    id를 앱에서 미리 정해 ON CONFLICT DO NOTHING(ignore-duplicates)으로 넣으므로
+    응답을 못 받은 배치를 다시 보내도 중복 행이 생기지 않습니다.
+    """
+
+    TABLE = 'messages'
+
+    def __init__(self, client: "AsyncClient") -> None:
+        self.client = client
+
+    async def list_message_rows(
+        self,
+        chatroom_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """채팅방 메시지를 최신순으로 한 페이지 조회 → (행 dict, next_cursor)"""
+        after = decode_cursor(cursor) if cursor else None
+        rows, more = await self._fetch_page(chatroom_id, limit, after)
+        return rows, encode_cursor(rows[-1]) if more else None
+
+    async def iter_message_pages(
+        self,
+        chatroom_id: str,
+        page_size: int = 500,
+        cursor: Optional[str] = None
+    ) -> AsyncGenerator[List[Dict[str, Any]], None]:
+        """채팅방 메시지를 마지막 페이지까지 최신순으로 페이지 단위 조회
+
+        호출자가 현재 페이지를 처리(전송)하는 동안 다음 페이지를 미리 요청하므로
+        메모리에는 많아야 두 페이지만 있습니다. 잘못된 cursor는 첫 페이지 전에 ValueError.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        pending = asyncio.ensure_future(self._fetch_page(chatroom_id, page_size, after))
+        try:
+            while True:
+                rows, more = await pending
+                if not more:
+                    yield rows
+                    return
+                last = rows[-1]
+                pending = asyncio.ensure_future(
+                    self._fetch_page(chatroom_id, page_size, (str(last['created_at']), str(last['id'])))
+                )
+                yield rows
+        finally:
+            # 클라이언트 연결 종료 등으로 중단되면 미리 보낸 요청 취소
+            if not pending.done():
+                pending.cancel()
+
+    async def _fetch_page(
+        self,
+        chatroom_id: str,
+        limit: int,
+        after: Optional[Tuple[str, str]]
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        query = self.client.table(self.TABLE)\
+            .select(*MESSAGE_COLUMNS)\
+            .eq('chatroom_id', chatroom_id)
+        query = _after(query, after)
+
+        # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        with span("supabase.fetch_messages", upstream="supabase"):
+            result = await query\
+                .order('created_at', desc=True)\
+                .order('id', desc=True)\
+                .limit(limit + 1)\
+                .retry(False).execute()
+
+        return result.data[:limit], len(result.data) > limit
+
+    async def insert_many(self, rows: List[Dict[str, Any]]) -> int:
+        """여러 행을 INSERT 한 번으로 저장 (응답 본문 없이)"""
+        from postgrest.types import ReturnMethod
+        with span("supabase.insert_messages", upstream="supabase"):
+            await self.client.table(self.TABLE)\
+                .upsert(rows, ignore_duplicates=True, returning=ReturnMethod.minimal, default_to_null=False)\
+                .retry(False).execute()
+        return len(rows)
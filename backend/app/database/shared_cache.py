@@ -0,0 +1,475 @@
+import os
+import time
+import uuid
+import struct
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from app.database.models import VoiceRecord
+from app.database.cache import LOOKUP_COLUMNS
+from app.core.metrics import REGISTRY
+from app.core.redis import RedisClient, RedisError, Script
+
+logger = logging.getLogger(__name__)
+
+VOICE_L2_REQUESTS = REGISTRY.counter(
+    "voice_cache_l2_requests_total", "Shared (L2) voice cache lookups by result", ("result",)
+)
+VOICE_L2_FILLS = REGISTRY.counter(
+    "voice_cache_l2_fills_total", "L2 misses by how the value was filled", ("result",)
+)
+
+LookupKey = Tuple[str, str]
+# L2 조회 결과: (hit 여부, 레코드, 남은 TTL 초). miss면 (False, None, 0.0)
+Entry = Tuple[bool, Optional[VoiceRecord], float]
+
+# === 바이너리 형식 ===
+# [종류 1바이트][None 필드 비트마스크 (필드 8개당 1바이트)][필드들]
+# 문자열: varint 길이 + UTF-8, datetime: UTC 기준 마이크로초 (int64 big-endian)
+# JSON 대비 키 이름·따옴표·날짜 문자열이 없어 약 절반 크기이고, 검증 없이 model_construct로 복원합니다.
+# 순수 Python이라 인코딩/디코딩은 pydantic(JSON)보다 느리므로, 목적은 Redis 메모리·전송량 절감입니다.
+
+CODEC_VERSION = 1
+_NEGATIVE = 0
+_RECORD = 1
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_INT64 = struct.Struct(">q")
+
+def _field_kinds() -> List[Tuple[str, str]]:
+    """VoiceRecord 필드 → 인코딩 종류 (지원하지 않는 타입이 추가되면 import 시점에 실패)"""
+    kinds = []
+    for name, info in VoiceRecord.model_fields.items():
+        if info.annotation is str:
+            kinds.append((name, "str"))
+        elif info.annotation == Optional[str]:
+            kinds.append((name, "optional_str"))
+        elif info.annotation is datetime:
+            kinds.append((name, "datetime"))
+        else:
+            raise TypeError(f"VoiceRecord.{name}: L2 캐시 형식이 지원하지 않는 타입 {info.annotation}")
+    return kinds
+
+FIELD_KINDS = _field_kinds()
+_MASK_BYTES = (len(FIELD_KINDS) + 7) // 8
+
+def schema_fingerprint(model: Type[BaseModel]) -> str:
+    """형식 버전 + 모델 필드 이름·타입의 해시 (키에 넣음)"""
+    fields = [(name, repr(info.annotation)) for name, info in model.model_fields.items()]
+    return hashlib.sha1(repr((CODEC_VERSION, fields)).encode()).hexdigest()[:8]
+
+# 필드 이름·타입이 바뀌면 키가 달라져 이전 형식 값은 읽지 않음 (배포 중 구/신 버전이 섞여도 안전)
+SCHEMA_FINGERPRINT = schema_fingerprint(VoiceRecord)
+
+def _write_str(out: bytearray, value: str) -> None:
+    data = value.encode()
+    length = len(data)
+    while length >= 0x80:
+        out.append((length & 0x7F) | 0x80)
+        length >>= 7
+    out.append(length)
+    out += data
+
+def _read_str(data: bytes, offset: int) -> Tuple[str, int]:
+    length = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        length |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+    end = offset + length
+    return data[offset:end].decode(), end
+
+def encode_record(record: Optional[VoiceRecord]) -> bytes:
+    """VoiceRecord(None이면 '없음') → 바이트"""
+    if record is None:
+        return bytes((_NEGATIVE,))
+    out = bytearray(1 + _MASK_BYTES)
+    out[0] = _RECORD
+    mask = 0
+    for index, (name, kind) in enumerate(FIELD_KINDS):
+        value = getattr(record, name)
+        if kind == "datetime":
+            if value.tzinfo is None:
+                value = value.replace(tzinfo=timezone.utc)
+            delta = value - _EPOCH
+            out += _INT64.pack((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+        elif value is None:
+            mask |= 1 << index
+        else:
+            _write_str(out, value)
+    out[1:1 + _MASK_BYTES] = mask.to_bytes(_MASK_BYTES, "big")
+    return bytes(out)
+
+def decode_record(data: bytes) -> Optional[VoiceRecord]:
+    """encode_record의 역. 형식이 맞지 않으면 ValueError"""
+    try:
+        if data[0] == _NEGATIVE:
+            return None
+        if data[0] != _RECORD:
+            raise ValueError(f"알 수 없는 L2 캐시 값 종류: {data[0]}")
+        mask = int.from_bytes(data[1:1 + _MASK_BYTES], "big")
+        offset = 1 + _MASK_BYTES
+        values: Dict[str, Any] = {}
+        for index, (name, kind) in enumerate(FIELD_KINDS):
+            if kind == "datetime":
+                (micros,) = _INT64.unpack_from(data, offset)
+                offset += 8
+                values[name] = _EPOCH + timedelta(microseconds=micros)
+            elif mask & (1 << index):
+                values[name] = None
+            else:
+                values[name], offset = _read_str(data, offset)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"손상된 L2 캐시 값: {e}") from e
+    # 저장 전에 이미 검증된 값이므로 재검증 없이 생성
+    return VoiceRecord.model_construct(**values)
+
+# 인기 점수 +1 후 멤버가 max_size를 넘으면 방금 올린 멤버는 남기고 점수가 가장 낮은 멤버부터 제거
+# (그냥 ZREMRANGEBYRANK로 자르면 점수 1로 들어온 새 public_id가 바로 잘려 순위에 오를 수 없음)
+_TRACK_HOT_LUA = """
+local function track_hot(hot, member, max_size)
+  local score = redis.call('ZINCRBY', hot, 1, member)
+  if redis.call('ZCARD', hot) > max_size then
+    redis.call('ZREM', hot, member)
+    redis.call('ZREMRANGEBYRANK', hot, 0, -max_size)
+    redis.call('ZADD', hot, score, member)
+  end
+end
+"""
+
+# KEYS: 인기 점수 ZSET / ARGV: public_id, max_size
+TRACK_HOT_SCRIPT = Script(_TRACK_HOT_LUA + """
+track_hot(KEYS[1], ARGV[1], tonumber(ARGV[2]))
+return 1
+""")
+
+# KEYS: 값 키, 인기 점수 ZSET / ARGV: public_id, max_size → {값, 남은 TTL(ms)}
+# 한 번의 왕복으로 조회하고, 레코드가 있을 때(negative·miss 제외)만 인기 점수를 올림
+GET_TRACK_HOT_SCRIPT = Script(_TRACK_HOT_LUA + """
+local value = redis.call('GET', KEYS[1])
+if value and string.byte(value, 1) == %d then
+  track_hot(KEYS[2], ARGV[1], tonumber(ARGV[2]))
+end
+return {value, redis.call('PTTL', KEYS[1])}
+""" % _RECORD)
+
+class SharedVoiceCache:
+    """워커·파드가 함께 쓰는 VoiceRecord 캐시 (Redis 프로토콜, VoiceCache(L1) 아래 L2)
+
+    - 키: {prefix}{스키마 지문}:{컬럼}:{값}, 값: encode_record 바이너리
+    - L2 miss 시 SET NX 잠금을 잡은 프로세스 하나만 DB를 조회하고, 나머지는 값이 채워지길
+      lock_wait초까지 기다린 뒤 직접 조회합니다 (프로세스 안의 중복은 SingleFlight가 병합)
+    - public_id 조회(L1 miss)로 레코드를 찾으면 인기 점수(ZINCRBY)를 올려 warm-up에 사용합니다.
+      L2 hit은 조회와 같은 왕복(Lua), DB에서 채운 경우는 채운 뒤 한 번. 없는 public_id는 세지 않고,
+      점수 집합은 hot_max_size개로 제한합니다.
+    - Redis 장애 시 에러를 세고 DB 조회로 진행하며, error_backoff초 동안은 L2를 건너뜀
+      (장애 중 요청마다 연결 실패를 기다리거나 경고를 남기지 않도록)
+    - 조회는 남은 TTL을 함께 돌려주고, L1은 그보다 오래 보관하지 않습니다 (L2 값의 수명을 연장하지 않음)
+    - Realtime 구독이 없으면(realtime=False) 변경을 DEL로 반영할 수 없으므로, 저장 TTL을
+      max_age_without_realtime초(VOICE_CACHE_TTL)로 줄이고 남은 TTL이 그보다 긴 값(Realtime이 있는
+      파드가 저장한 값)은 miss로 취급합니다 → 이 파드가 돌려주는 값은 DB 조회 후 그 시간 이내
+    """
+
+    def __init__(
+        self,
+        client: RedisClient,
+        prefix: str = "vc:",
+        ttl: float = 300.0,
+        negative_ttl: float = 5.0,
+        lock_ttl: float = 2.0,
+        lock_wait: float = 0.5,
+        track_hot: bool = True,
+        hot_max_size: int = 10_000,
+        error_backoff: float = 1.0,
+        max_age_without_realtime: float = 60.0
+    ) -> None:
+        self.client = client
+        self.prefix = f"{prefix}{SCHEMA_FINGERPRINT}:"
+        self.hot_key = f"{prefix}hot:public_id"
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        self.track_hot = track_hot
+        self.hot_max_size = max(1, hot_max_size)
+        self.error_backoff = error_backoff
+        self.max_age_without_realtime = max_age_without_realtime
+        # SupabaseManager가 voices Realtime 구독에 성공하면 True
+        self.realtime = False
+        self._down_until = 0.0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.skipped = 0
+        self.fills = {"loaded": 0, "waited": 0, "wait_timeout": 0}
+
+    @classmethod
+    def from_env(cls) -> Optional["SharedVoiceCache"]:
+        """VOICE_L2_ENABLED=true이고 REDIS_URL이 있으면 생성 (아니면 None → L1만 사용)"""
+        if os.getenv("VOICE_L2_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        client = RedisClient.from_env()
+        if client is None:
+            logger.warning("VOICE_L2_ENABLED=true지만 REDIS_URL이 없어 L2 캐시를 사용하지 않습니다.")
+            return None
+        return cls(
+            client,
+            prefix=os.getenv("VOICE_L2_KEY_PREFIX", "vc:"),
+            ttl=float(os.getenv("VOICE_L2_TTL", 300)),
+            negative_ttl=float(os.getenv("VOICE_L2_NEGATIVE_TTL", 5)),
+            lock_ttl=float(os.getenv("VOICE_L2_LOCK_TTL", 2)),
+            lock_wait=float(os.getenv("VOICE_L2_LOCK_WAIT", 0.5)),
+            track_hot=os.getenv("VOICE_L2_TRACK_HOT", "true").lower() in ("1", "true", "yes"),
+            hot_max_size=int(os.getenv("VOICE_L2_HOT_MAX_SIZE", 10_000)),
+            error_backoff=float(os.getenv("VOICE_L2_ERROR_BACKOFF", 1)),
+            max_age_without_realtime=float(os.getenv("VOICE_CACHE_TTL", 60))
+        )
+
+    def key(self, column: str, value: str) -> str:
+        return f"{self.prefix}{column}:{value}"
+
+    def _available(self) -> bool:
+        if self._down_until and time.monotonic() < self._down_until:
+            self.skipped += 1
+            VOICE_L2_REQUESTS.inc("skipped")
+            return False
+        return True
+
+    def _error(self, action: str, e: Exception) -> None:
+        self.errors += 1
+        VOICE_L2_REQUESTS.inc("error")
+        if not self._down_until:
+            logger.warning(f"L2 캐시 {action} 실패, {self.error_backoff}초간 DB로 직접 조회: {e}")
+        self._down_until = time.monotonic() + self.error_backoff
+
+    def _decode(self, value: Any) -> Tuple[bool, Optional[VoiceRecord]]:
+        if not isinstance(value, bytes):
+            return False, None
+        try:
+            return True, decode_record(value)
+        except ValueError as e:
+            logger.warning(f"L2 캐시 값 무시: {e}")
+            return False, None
+
+    @property
+    def write_ttl(self) -> float:
+        """레코드 저장 TTL (Realtime이 없으면 max_age_without_realtime 이하)"""
+        return self.ttl if self.realtime else min(self.ttl, self.max_age_without_realtime)
+
+    def _entry(self, value: Any, pttl: Any) -> Entry:
+        """GET 값 + PTTL 응답 → Entry (Realtime이 없으면 write_ttl보다 오래 남은 값은 miss)"""
+        hit, record = self._decode(value)
+        if not hit:
+            return False, None, 0.0
+        # PTTL -1(만료 없음)·에러 응답이면 새로 저장한 값으로 간주
+        remaining = pttl / 1000 if isinstance(pttl, int) and pttl >= 0 else self.write_ttl
+        if not self.realtime and remaining > self.write_ttl:
+            return False, None, 0.0
+        return True, record, min(remaining, self.write_ttl)
+
+    def _count(self, hit: bool, record: Optional[VoiceRecord]) -> None:
+        if not hit:
+            self.misses += 1
+            VOICE_L2_REQUESTS.inc("miss")
+        elif record is None:
+            self.negative_hits += 1
+            VOICE_L2_REQUESTS.inc("negative_hit")
+        else:
+            self.hits += 1
+            VOICE_L2_REQUESTS.inc("hit")
+
+    async def get(self, column: str, value: str) -> Entry:
+        """L2 조회 → (hit 여부, 레코드, 남은 TTL). negative hit이면 (True, None, 남은 TTL)"""
+        if not self._available():
+            return False, None, 0.0
+        key = self.key(column, value)
+        try:
+            if self._tracks(column):
+                reply, pttl = await GET_TRACK_HOT_SCRIPT(self.client, [key, self.hot_key], [value, self.hot_max_size])
+            else:
+                reply, pttl = await self.client.pipeline([["GET", key], ["PTTL", key]])
+                if isinstance(reply, RedisError):
+                    raise reply
+        except RedisError as e:
+            self._error("조회", e)
+            return False, None, 0.0
+        hit, record, remaining = self._entry(reply, pttl)
+        self._count(hit, record)
+        return hit, record, remaining
+
+    def _tracks(self, column: str) -> bool:
+        return self.track_hot and column == "public_id"
+
+    async def _track_hot(self, public_id: str) -> None:
+        if not self._available():
+            return
+        try:
+            await TRACK_HOT_SCRIPT(self.client, [self.hot_key], [public_id, self.hot_max_size])
+        except RedisError as e:
+            self._error("인기 점수 집계", e)
+
+    async def get_many(self, keys: Sequence[LookupKey]) -> Dict[LookupKey, Tuple[Optional[VoiceRecord], float]]:
+        """여러 키를 MGET(+ 키별 PTTL) 한 번의 왕복으로 조회 → hit한 키만 (레코드, 남은 TTL)"""
+        if not keys or not self._available():
+            return {}
+        redis_keys = [self.key(*key) for key in keys]
+        try:
+            values, *pttls = await self.client.pipeline([["MGET", *redis_keys], *(["PTTL", key] for key in redis_keys)])
+            if isinstance(values, RedisError):
+                raise values
+        except RedisError as e:
+            self._error("일괄 조회", e)
+            return {}
+        found: Dict[LookupKey, Tuple[Optional[VoiceRecord], float]] = {}
+        for key, value, pttl in zip(keys, values or [], pttls):
+            hit, record, remaining = self._entry(value, pttl)
+            self._count(hit, record)
+            if hit:
+                found[key] = (record, remaining)
+        return found
+
+    def _set_commands(self, column: str, value: str, record: Optional[VoiceRecord]) -> List[List[Any]]:
+        data = encode_record(record)
+        if record is None:
+            return [["SET", self.key(column, value), data, "PX", int(self.negative_ttl * 1000)]]
+        # 레코드는 agent_id / public_id 두 키에 함께 저장 (L1과 같은 방식)
+        return [
+            ["SET", self.key(lookup_column, getattr(record, lookup_column)), data, "PX", int(self.write_ttl * 1000)]
+            for lookup_column in LOOKUP_COLUMNS
+            if getattr(record, lookup_column)
+        ]
+
+    async def set_many(self, items: Sequence[Tuple[LookupKey, Optional[VoiceRecord]]]) -> None:
+        """조회 결과 저장 (None이면 negative, 짧은 TTL)"""
+        commands = [command for (column, value), record in items for command in self._set_commands(column, value, record)]
+        if not commands or not self._available():
+            return
+        try:
+            await self.client.pipeline(commands)
+        except RedisError as e:
+            self._error("저장", e)
+
+    async def load(
+        self,
+        column: str,
+        value: str,
+        fetch: Callable[[], Awaitable[Optional[VoiceRecord]]],
+        still_valid: Callable[[], bool] = lambda: True
+    ) -> Optional[VoiceRecord]:
+        """L2 miss 후 채우기 (stampede 방지)
+
+        잠금을 잡으면 fetch() 후 L2에 저장, 못 잡으면 다른 프로세스가 채우길 기다립니다.
+        still_valid()가 False면 (조회 중 무효화) L2에 저장하지 않습니다.
+        """
+        record = await self._fill(column, value, fetch, still_valid)
+        if record is not None and self._tracks(column):
+            await self._track_hot(value)
+        return record
+
+    async def _fill(
+        self,
+        column: str,
+        value: str,
+        fetch: Callable[[], Awaitable[Optional[VoiceRecord]]],
+        still_valid: Callable[[], bool]
+    ) -> Optional[VoiceRecord]:
+        if not self._available():
+            return await fetch()
+        lock_key = f"{self.key(column, value)}:lock"
+        token = uuid.uuid4().hex
+        try:
+            acquired = await self.client.execute("SET", lock_key, token, "NX", "PX", int(self.lock_ttl * 1000)) is not None
+        except RedisError as e:
+            self._error("잠금", e)
+            return await fetch()
+
+        if acquired:
+            self.fills["loaded"] += 1
+            VOICE_L2_FILLS.inc("loaded")
+            try:
+                record = await fetch()
+                if still_valid():
+                    await self.set_many([((column, value), record)])
+                return record
+            finally:
+                # 잠금 TTL 안에 끝나지 않았다면 다른 프로세스의 잠금일 수 있지만, 결과는 조회가 한 번 더 느는 것뿐
+                try:
+                    await self.client.execute("DEL", lock_key)
+                except RedisError:
+                    pass
+
+        deadline = time.monotonic() + self.lock_wait
+        delay = 0.01
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+            delay = min(delay * 2, 0.1)
+            try:
+                hit, record = self._decode(await self.client.execute("GET", self.key(column, value)))
+            except RedisError as e:
+                self._error("대기 중 조회", e)
+                break
+            if hit:
+                self.fills["waited"] += 1
+                VOICE_L2_FILLS.inc("waited")
+                return record
+
+        self.fills["wait_timeout"] += 1
+        VOICE_L2_FILLS.inc("wait_timeout")
+        return await fetch()
+
+    async def invalidate_row(self, row: Optional[Union[Dict[str, Any], VoiceRecord]]) -> None:
+        """voices 행에 해당하는 L2 키 삭제 (Realtime 변경 이벤트, 파드마다 받아도 멱등)"""
+        if not row:
+            return
+        if isinstance(row, VoiceRecord):
+            row = row.model_dump()
+        keys = [self.key(column, row[column]) for column in LOOKUP_COLUMNS if row.get(column)]
+        if not keys or not self._available():
+            return
+        try:
+            await self.client.execute("DEL", *keys)
+        except RedisError as e:
+            self._error("무효화", e)
+
+    async def handle_change(self, payload: Dict[str, Any]) -> None:
+        """Supabase Realtime postgres_changes 페이로드 처리 (VoiceCache.handle_change와 같은 규칙)"""
+        data = payload.get('data', payload)
+        await self.invalidate_row(data.get('old_record'))
+        await self.invalidate_row(data.get('record'))
+
+    async def hot_public_ids(self, top: int) -> List[str]:
+        """조회가 많은 public_id 상위 top개 (warm-up용)"""
+        if top <= 0 or not self._available():
+            return []
+        try:
+            values = await self.client.execute("ZREVRANGE", self.hot_key, 0, top - 1)
+        except RedisError as e:
+            self._error("인기 목록 조회", e)
+            return []
+        return [value.decode() for value in values or []]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "backend": "redis",
+            "schema": SCHEMA_FINGERPRINT,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "fills": dict(self.fills),
+            **{f"redis_{key}": value for key, value in self.client.stats().items()}
+        }
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
@@ -1,31 +1,247 @@
 import os
-from supabase import create_client, Client
-from typing import Optional
+import asyncio
+import logging
+import httpx
+from typing import TYPE_CHECKING, Any, Dict, Optional, Set
 from functools import lru_cache
 
+from fastapi import Depends
+
+from app.database.repository import MessageRepository, VoiceRepository
+from app.database.cache import VoiceCache
+from app.database.shared_cache import SharedVoiceCache
+from app.database.voice_index import VoiceRoutingIndex
+from app.core.singleflight import SingleFlight
+from app.core.resilience import ResilientTransport, Upstream
+from app.core.auth import AuthenticatedUser, AuthenticationError, TokenVerifier, get_current_user
+from app.core.errors import ServiceUnavailableError
+
+# supabase SDK(auth·storage·realtime 포함)는 import만 수백 ms라 클라이언트를 만들 때 불러옴
+if TYPE_CHECKING:
+    from supabase import Client, AsyncClient
+
+logger = logging.getLogger(__name__)
+
 class SupabaseManager:
     """Supabase 클라이언트 관리 (싱글톤 패턴)"""
-    
-    def __init__(self) -> None:
+
+    def __init__(
+        self,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        realtime: bool = True
+    ) -> None:
+        # transport를 주입하면 (벤치마크용 인프로세스 가짜 PostgREST 등) 그대로 사용
+        self.transport = transport
+        self.realtime = realtime
         self.url: Optional[str] = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
         self.key: Optional[str] = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
-        self._client: Optional[Client] = None
-        
+        self._client: Optional["Client"] = None
+        self._async_client: Optional["AsyncClient"] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._voices: Optional[VoiceRepository] = None
+        self._voices_channel = None
+        self.voice_cache: VoiceCache = VoiceCache.from_env()
+        # 워커·파드 공유 L2 캐시 (VOICE_L2_ENABLED=true + REDIS_URL, 없으면 None)
+        self.shared_voice_cache: Optional[SharedVoiceCache] = SharedVoiceCache.from_env()
+        # public_id → voices 행 메모리 인덱스 (VOICE_INDEX_ENABLED=true, 없으면 None)
+        self.voice_index: Optional[VoiceRoutingIndex] = VoiceRoutingIndex.from_env()
+        self._invalidations: Set["asyncio.Task[None]"] = set()
+        self.voice_flight: Optional[SingleFlight] = (
+            SingleFlight('voices')
+            if os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+            else None
+        )
+        # 멱등 조회 재시도 + 서킷 브레이커 (SUPABASE_RETRY_* / SUPABASE_BREAKER_*)
+        self.upstream: Upstream = Upstream.from_env("supabase")
+        # 사용자 액세스 토큰 검증 결과 캐시 (AUTH_TOKEN_CACHE_*)
+        self.token_verifier: TokenVerifier = TokenVerifier.from_env(self._verify_claims)
+        self._init_lock = asyncio.Lock()
+
         if not self.url or not self.key:
             raise ValueError(
                 "Supabase URL과 KEY가 환경변수에 설정되지 않았습니다. "
                 "NEXT_PUBLIC_SUPABASE_URL과 NEXT_PUBLIC_SUPABASE_ANON_KEY를 확인하세요."
             )
-    
+
     @property
-    def client(self) -> Client:
+    def client(self) -> "Client":
         """Supabase 클라이언트 반환 (지연 초기화)"""
         if self._client is None:
             if not self.url or not self.key:
                 raise ValueError("Supabase 환경변수가 설정되지 않았습니다.")
+            from supabase import create_client
             self._client = create_client(self.url, self.key)
         return self._client
-    
+
+    async def get_async_client(self) -> "AsyncClient":
+        """비동기 Supabase 클라이언트 반환 (공유 httpx 커넥션 풀 사용)"""
+        if self._async_client is None:
+            async with self._init_lock:
+                if self._async_client is None:
+                    if not self.url or not self.key:
+                        raise ValueError("Supabase 환경변수가 설정되지 않았습니다.")
+                    from supabase import create_async_client, AsyncClientOptions
+                    transport = self.transport or httpx.AsyncHTTPTransport(
+                        limits=httpx.Limits(
+                            max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", 100)),
+                            max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE", 20))
+                        )
+                    )
+                    self._http_client = httpx.AsyncClient(
+                        timeout=float(os.getenv("SUPABASE_TIMEOUT", 10)),
+                        transport=ResilientTransport(transport, self.upstream)
+                    )
+                    self._async_client = await create_async_client(
+                        self.url,
+                        self.key,
+                        options=AsyncClientOptions(httpx_client=self._http_client)
+                    )
+        return self._async_client
+
+    async def get_voice_repository(self) -> VoiceRepository:
+        """voices 테이블 리포지토리 반환"""
+        if self._voices is None:
+            self._voices = VoiceRepository(
+                await self.get_async_client(),
+                cache=self.voice_cache,
+                flight=self.voice_flight,
+                shared=self.shared_voice_cache,
+                index=self.voice_index
+            )
+        return self._voices
+
+    async def get_message_repository(self, token: str) -> MessageRepository:
+        """사용자 토큰으로 호출하는 messages 리포지토리 (RLS 적용, 같은 커넥션 풀 사용)
+
+        anon 키 + 사용자 JWT로 PostgREST를 호출하므로 auth.uid() 조건(조회: 로그인 사용자,
+        INSERT: sender_id 본인)을 DB가 그대로 검사합니다.
+        """
+        await self.get_async_client()
+        from postgrest import AsyncPostgrestClient
+        client = AsyncPostgrestClient(
+            f"{self.url}/rest/v1",
+            headers={"apikey": self.key, "Authorization": f"Bearer {token}"},
+            http_client=self._http_client
+        )
+        return MessageRepository(client)
+
+    async def _verify_claims(self, token: str) -> Dict[str, Any]:
+        """Supabase Auth로 액세스 토큰 확인 → claims (비대칭 키는 JWKS 서명 확인, HS256은 /auth/v1/user 조회)"""
+        from supabase_auth.errors import AuthApiError, AuthError, AuthRetryableError
+
+        client = await self.get_async_client()
+        try:
+            response = await client.auth.get_claims(jwt=token)
+        except AuthRetryableError as e:
+            raise ServiceUnavailableError(f"Supabase Auth 일시 오류: {e}")
+        except AuthApiError as e:
+            if e.status >= 500:
+                raise ServiceUnavailableError(f"Supabase Auth 일시 오류: {e}")
+            raise AuthenticationError(str(e))
+        except AuthError as e:
+            raise AuthenticationError(str(e))
+        except httpx.HTTPError as e:
+            raise ServiceUnavailableError(f"Supabase Auth 연결 실패: {type(e).__name__}")
+        if response is None:
+            raise AuthenticationError("토큰이 없습니다.")
+        return dict(response["claims"])
+
+    async def verify_token(self, token: str) -> AuthenticatedUser:
+        """사용자 액세스 토큰 검증 (무효면 AuthenticationError, Auth 장애면 ServiceUnavailableError)"""
+        return await self.token_verifier.verify(token)
+
+    def cached_user(self, token: str) -> Optional[AuthenticatedUser]:
+        """이미 검증된 토큰이면 사용자, 아니면 None (Supabase Auth를 호출하지 않음)"""
+        return self.token_verifier.cached(token)
+
+    async def start_voice_cache_invalidation(self) -> None:
+        """voices 테이블 Realtime 변경 이벤트로 캐시 무효화(+ public_id 인덱스 갱신) 구독"""
+        if not self.realtime or self._voices_channel is not None:
+            return
+        if not self.voice_cache.enabled and self.voice_index is None:
+            return
+
+        client = await self.get_async_client()
+        try:
+            channel = client.channel('voices-cache-invalidation')
+            channel.on_postgres_changes(
+                '*',
+                schema='public',
+                table='voices',
+                callback=self._handle_voice_change
+            )
+            await asyncio.wait_for(channel.subscribe(), timeout=float(os.getenv("SUPABASE_REALTIME_TIMEOUT", 5)))
+            self._voices_channel = channel
+            if self.shared_voice_cache is not None:
+                self.shared_voice_cache.realtime = True
+        except Exception as e:
+            # Realtime을 쓸 수 없으면 TTL 만료(인덱스는 TTL마다 전체 적재)에만 의존
+            logger.warning(f"voices 캐시 Realtime 구독 실패 (TTL 만료로 대체): {e}")
+
+    def _handle_voice_change(self, payload: Dict[str, Any]) -> None:
+        """voices 변경 이벤트 → 인덱스 반영 + L1 무효화 + L2 키 삭제 (L2는 비동기로)"""
+        if self.voice_index is not None:
+            self.voice_index.handle_change(payload)
+        self.voice_cache.handle_change(payload)
+        if self.shared_voice_cache is not None:
+            task = asyncio.ensure_future(self.shared_voice_cache.handle_change(payload))
+            self._invalidations.add(task)
+            task.add_done_callback(self._invalidations.discard)
+
+    async def warm_voice_cache(self, top: int) -> int:
+        """L2에 기록된 인기 public_id 상위 top개를 L1(+ 없으면 DB에서 L2)로 미리 적재 → 적재한 레코드 수"""
+        if self.shared_voice_cache is None or top <= 0:
+            return 0
+        public_ids = await self.shared_voice_cache.hot_public_ids(top)
+        if not public_ids:
+            return 0
+        voices_repo = await self.get_voice_repository()
+        found = await voices_repo.get_many([('public_id', public_id) for public_id in public_ids])
+        return sum(1 for record in found.values() if record is not None)
+
+    async def start_voice_index(self) -> int:
+        """public_id 인덱스 전체 적재 후 주기 갱신 시작 → 적재한 행 수 (비활성화 시 0)
+
+        적재에 실패해도 시작은 계속하고(인덱스 없이 DB 경로로 조회), 다음 주기에 다시 전체 적재합니다.
+        """
+        if self.voice_index is None:
+            return 0
+        self.voice_index.realtime = self._voices_channel is not None
+        if not self.voice_index.realtime:
+            logger.warning(
+                "voices Realtime 구독 없음: 인덱스 수정·삭제는 전체 적재로만 반영되므로 "
+                f"{self.voice_index.max_age_without_realtime:g}초(VOICE_CACHE_TTL)마다 전체를 다시 적재합니다."
+            )
+        voices_repo = await self.get_voice_repository()
+        try:
+            loaded = await self.voice_index.load(voices_repo)
+        except Exception as e:
+            self.voice_index.failures += 1
+            logger.warning(f"voices 인덱스 적재 실패 (DB 조회로 대체, 다음 주기에 재시도): {e}")
+            loaded = 0
+        self.voice_index.start(voices_repo)
+        return loaded
+
+    async def aclose(self) -> None:
+        """비동기 클라이언트 및 커넥션 풀 정리"""
+        if self.voice_index is not None:
+            await self.voice_index.stop()
+        if self._voices_channel is not None and self._async_client is not None:
+            try:
+                await self._async_client.remove_channel(self._voices_channel)
+            except Exception as e:
+                logger.warning(f"voices 캐시 Realtime 구독 해제 실패: {e}")
+        self._voices_channel = None
+        if self.shared_voice_cache is not None:
+            self.shared_voice_cache.realtime = False
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._async_client = None
+        self._voices = None
+        if self.shared_voice_cache is not None:
+            await self.shared_voice_cache.aclose()
+
     def test_connection(self) -> bool:
         """DB 연결 테스트"""
         try:
@@ -44,11 +260,29 @@ def get_supabase_manager() -> SupabaseManager:
         _supabase_manager = SupabaseManager()
     return _supabase_manager
 
-async def get_supabase() -> Client:
+def set_supabase_manager(manager: Optional[SupabaseManager]) -> None:
+    """전역 Supabase 매니저 교체 (벤치마크/로컬 스텁 주입용)"""
+    global _supabase_manager
+    _supabase_manager = manager
+
+async def close_supabase_manager() -> None:
+    """앱 종료 시 Supabase 연결 정리"""
+    if _supabase_manager is not None:
+        await _supabase_manager.aclose()
+
+async def get_supabase() -> "Client":
     """FastAPI 의존성 주입용 Supabase 클라이언트"""
     return get_supabase_manager().client
 
+async def get_voice_repository() -> VoiceRepository:
+    """FastAPI 의존성 주입용 voices 리포지토리 (비동기)"""
+    return await get_supabase_manager().get_voice_repository()
+
+async def get_message_repository(user: AuthenticatedUser = Depends(get_current_user)) -> MessageRepository:
+    """FastAPI 의존성 주입용 messages 리포지토리 (요청한 사용자의 토큰으로 조회해 RLS 적용, 토큰 없으면 401)"""
+    return await get_supabase_manager().get_message_repository(user.token)
+
 @lru_cache(maxsize=1)
-def get_supabase_sync() -> Client:
+def get_supabase_sync() -> "Client":
     """동기 Supabase 클라이언트 (캐시됨)"""
-    return get_supabase_manager().client 
\ No newline at end of file
+    return get_supabase_manager().client
@@ -0,0 +1,283 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from app.database.models import VoiceRecord
+from app.core.metrics import REGISTRY
+
+if TYPE_CHECKING:
+    from app.database.repository import VoiceRepository
+
+logger = logging.getLogger(__name__)
+
+VOICE_INDEX_LOOKUPS = REGISTRY.counter(
+    "voice_index_lookups_total", "public_id lookups served by the in-memory routing index", ("result",)
+)
+VOICE_INDEX_ROWS = REGISTRY.gauge("voice_index_rows", "Rows in the in-memory public_id routing index")
+
+# 인덱스 행: public_id(키)를 뺀 VoiceRecord 필드. created_at은 문자열보다 작은 datetime으로 보관
+INDEX_FIELDS = ('agent_id', 'id', 'user_id', 'voice_id', 'file_name', 'nickname', 'created_at')
+
+IndexRow = Tuple[str, str, str, str, str, Optional[str], datetime]
+
+def _parse_created_at(value: Any) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+
+def _index_row(row: Dict[str, Any]) -> IndexRow:
+    """DB 행 → 인덱스 튜플 (user_id·nickname은 여러 행이 같은 값을 가지므로 intern)"""
+    nickname = row.get('nickname')
+    return (
+        row['agent_id'],
+        row['id'],
+        sys.intern(row['user_id']),
+        row['voice_id'],
+        row['file_name'],
+        sys.intern(nickname) if nickname else nickname,
+        _parse_created_at(row['created_at'])
+    )
+
+class VoiceRoutingIndex:
+    """public_id → voices 행 메모리 라우팅 인덱스 (/api/voices/public, /signed-url-by-public)
+
+    - 시작 시 voices 전체를 (created_at, id) 오름차순 키셋 페이지로 한 번에 적재합니다.
+      VOICE_INDEX_PAGE_SIZE를 PostgREST max-rows 이상으로 두면 쿼리 한 번입니다.
+    - 이후 refresh_interval마다 created_at 고수위(high-water mark) 이후 행만 가져옵니다.
+      늦게 커밋된 행을 놓치지 않도록 고수위에서 overlap초 앞부터 다시 읽습니다 (같은 행은 덮어씀).
+    - 수정·삭제는 Realtime 변경 이벤트로 반영하고, full_reload_interval마다 전체를 다시 읽어 맞춥니다.
+      Realtime 구독이 없으면(realtime=False) 수정·삭제는 전체 적재로만 반영되므로, 마지막 전체 적재가
+      max_age_without_realtime초(VOICE_CACHE_TTL)보다 오래되면 인덱스를 쓰지 않고 그 전에 다시 전체 적재합니다.
+      → 지워지거나 agent_id가 바뀐 음성이 L1 캐시 TTL보다 오래 라우팅되지 않음
+    - 인덱스에 없는 public_id는 기존 경로(L1 → L2 → DB)로 조회합니다. 방금 만든 음성이 404가 되지 않도록
+      인덱스 miss를 "없음"으로 보지 않습니다.
+    - 마지막 동기화가 max_staleness초보다 오래되면(Supabase 장애 등) 인덱스를 쓰지 않습니다.
+    """
+
+    def __init__(
+        self,
+        page_size: int = 10_000,
+        refresh_interval: float = 30.0,
+        full_reload_interval: float = 900.0,
+        overlap: float = 5.0,
+        max_staleness: float = 300.0,
+        max_age_without_realtime: float = 60.0
+    ) -> None:
+        self.page_size = page_size
+        self.refresh_interval = refresh_interval
+        self.full_reload_interval = full_reload_interval
+        self.overlap = overlap
+        self.max_staleness = max_staleness
+        self.max_age_without_realtime = max_age_without_realtime
+        # Realtime 변경 이벤트를 받고 있는지 (SupabaseManager가 구독 성공 시 True로 설정)
+        self.realtime = False
+        self._rows: Dict[str, IndexRow] = {}
+        # 적재·증분 조회로 마지막으로 읽은 행의 (created_at, id). Realtime 이벤트로는 올리지 않음
+        self.high_water_mark: Optional[Tuple[datetime, str]] = None
+        self._synced_at: Optional[float] = None
+        # 마지막 전체 적재를 시작한 시각 (그 뒤의 수정·삭제는 Realtime이 없으면 반영되지 않음)
+        self._full_loaded_at: Optional[float] = None
+        # 전체 적재 중 받은 Realtime 이벤트 (교체 후 다시 적용)
+        self._pending_changes: Optional[List[Dict[str, Any]]] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.hits = 0
+        self.misses = 0
+        self.stale_bypasses = 0
+        self.full_loads = 0
+        self.refreshes = 0
+        self.refreshed_rows = 0
+        self.changes = 0
+        self.failures = 0
+        self.last_load_ms = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["VoiceRoutingIndex"]:
+        """VOICE_INDEX_ENABLED=true일 때 VOICE_INDEX_* 설정으로 생성 (아니면 None)"""
+        if os.getenv("VOICE_INDEX_ENABLED", "false").lower() not in ("1", "true", "yes"):
+            return None
+        return cls(
+            page_size=int(os.getenv("VOICE_INDEX_PAGE_SIZE", 10_000)),
+            refresh_interval=float(os.getenv("VOICE_INDEX_REFRESH_INTERVAL", 30)),
+            full_reload_interval=float(os.getenv("VOICE_INDEX_FULL_RELOAD_INTERVAL", 900)),
+            overlap=float(os.getenv("VOICE_INDEX_REFRESH_OVERLAP", 5)),
+            max_staleness=float(os.getenv("VOICE_INDEX_MAX_STALENESS", 300)),
+            max_age_without_realtime=float(os.getenv("VOICE_CACHE_TTL", 60))
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @property
+    def fresh(self) -> bool:
+        """적재가 끝났고 마지막 동기화가 max_staleness 이내인지 (Realtime이 없으면 전체 적재도 max_age_without_realtime 이내)"""
+        if self._synced_at is None or self._full_loaded_at is None:
+            return False
+        now = time.monotonic()
+        if now - self._synced_at > self.max_staleness:
+            return False
+        return self.realtime or now - self._full_loaded_at <= self.max_age_without_realtime
+
+    def lookup(self, public_id: str) -> Optional[str]:
+        """public_id → agent_id (DB 조회 없음, 모르면 None)"""
+        row = self._rows.get(public_id) if self.fresh else None
+        return row[0] if row is not None else None
+
+    def get(self, public_id: str) -> Optional[VoiceRecord]:
+        """public_id → VoiceRecord (인덱스 miss·오래된 인덱스면 None → 호출자가 DB 경로로 조회)"""
+        if not self.fresh:
+            self.stale_bypasses += 1
+            VOICE_INDEX_LOOKUPS.inc("stale")
+            return None
+        row = self._rows.get(public_id)
+        if row is None:
+            self.misses += 1
+            VOICE_INDEX_LOOKUPS.inc("miss")
+            return None
+        self.hits += 1
+        VOICE_INDEX_LOOKUPS.inc("hit")
+        # 적재 시 검증한 값이므로 검증 없이 생성
+        return VoiceRecord.model_construct(public_id=public_id, **dict(zip(INDEX_FIELDS, row)))
+
+    def _apply(self, rows: Dict[str, IndexRow], data: Iterable[Dict[str, Any]], advance: bool = True) -> int:
+        applied = 0
+        for row in data:
+            public_id = row.get('public_id')
+            if not public_id or not row.get('agent_id'):
+                continue
+            try:
+                index_row = rows[public_id] = _index_row(row)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"voices 인덱스에 넣을 수 없는 행 건너뜀 ({public_id}): {e}")
+                continue
+            applied += 1
+            if advance:
+                mark = (index_row[6], index_row[1])
+                if self.high_water_mark is None or mark > self.high_water_mark:
+                    self.high_water_mark = mark
+        return applied
+
+    async def load(self, voices_repo: "VoiceRepository") -> int:
+        """전체 적재 후 한 번에 교체 → 적재한 행 수 (실패하면 기존 인덱스 유지)"""
+        started = time.perf_counter()
+        loaded_at = time.monotonic()
+        rows: Dict[str, IndexRow] = {}
+        previous_mark = self.high_water_mark
+        self.high_water_mark = None
+        self._pending_changes = []
+        try:
+            async for page in voices_repo.iter_index_pages(page_size=self.page_size):
+                self._apply(rows, page)
+        except BaseException:
+            self.high_water_mark = previous_mark
+            raise
+        finally:
+            pending, self._pending_changes = self._pending_changes, None
+
+        self._rows = rows
+        for payload in pending:
+            self.handle_change(payload)
+        self._synced_at = time.monotonic()
+        self._full_loaded_at = loaded_at
+        self.full_loads += 1
+        self.last_load_ms = (time.perf_counter() - started) * 1000
+        VOICE_INDEX_ROWS.set(len(rows))
+        return len(rows)
+
+    async def refresh(self, voices_repo: "VoiceRepository") -> int:
+        """고수위(created_at) 이후에 생긴 행만 추가 → 반영한 행 수"""
+        since: Optional[str] = None
+        if self.high_water_mark is not None:
+            since = (self.high_water_mark[0] - timedelta(seconds=self.overlap)).isoformat()
+        applied = 0
+        async for page in voices_repo.iter_index_pages(page_size=self.page_size, since=since):
+            applied += self._apply(self._rows, page)
+        self._synced_at = time.monotonic()
+        self.refreshes += 1
+        self.refreshed_rows += applied
+        VOICE_INDEX_ROWS.set(len(self._rows))
+        return applied
+
+    def handle_change(self, payload: Dict[str, Any]) -> None:
+        """Supabase Realtime postgres_changes 페이로드 반영 (INSERT/UPDATE는 덮어쓰기, DELETE는 제거)
+
+        UPDATE로 public_id가 바뀐 경우와 DELETE는 old_record가 필요합니다 (REPLICA IDENTITY FULL).
+        """
+        if self._pending_changes is not None:
+            self._pending_changes.append(payload)
+        data = payload.get('data', payload)
+        old_record = data.get('old_record') or {}
+        record = data.get('record') or {}
+        old_public_id = old_record.get('public_id')
+        if old_public_id and old_public_id != record.get('public_id'):
+            self._rows.pop(old_public_id, None)
+        if record:
+            if record.get('agent_id'):
+                self._apply(self._rows, [record], advance=False)
+            elif record.get('public_id'):
+                # agent_id가 지워진 행은 라우팅 대상이 아님
+                self._rows.pop(record['public_id'], None)
+        self.changes += 1
+        VOICE_INDEX_ROWS.set(len(self._rows))
+
+    def _full_reload_due(self) -> bool:
+        if self._full_loaded_at is None:
+            return True
+        age = time.monotonic() - self._full_loaded_at
+        if age >= self.full_reload_interval:
+            return True
+        # Realtime이 없으면 다음 주기까지 기다리다 max_age_without_realtime을 넘기지 않도록 미리 전체 적재
+        return not self.realtime and age + self.refresh_interval >= self.max_age_without_realtime
+
+    async def sync_once(self, voices_repo: "VoiceRepository") -> None:
+        """주기 동기화 한 번 (전체 적재 주기가 됐으면 전체 적재, 아니면 증분)"""
+        try:
+            if self._full_reload_due():
+                await self.load(voices_repo)
+            else:
+                await self.refresh(voices_repo)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"voices 인덱스 동기화 실패 (기존 인덱스 유지): {e}")
+
+    async def _run(self, voices_repo: "VoiceRepository") -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.sync_once(voices_repo)
+
+    def start(self, voices_repo: "VoiceRepository") -> None:
+        """백그라운드 동기화 시작"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(voices_repo))
+
+    async def stop(self) -> None:
+        """백그라운드 동기화 중지"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._rows),
+            "fresh": self.fresh,
+            "realtime": self.realtime,
+            "full_load_age_s": None if self._full_loaded_at is None else round(time.monotonic() - self._full_loaded_at, 1),
+            "synced_age_s": None if self._synced_at is None else round(time.monotonic() - self._synced_at, 1),
+            "high_water_mark": self.high_water_mark[0].isoformat() if self.high_water_mark else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stale_bypasses": self.stale_bypasses,
+            "full_loads": self.full_loads,
+            "last_load_ms": round(self.last_load_ms, 1),
+            "refreshes": self.refreshes,
+            "refreshed_rows": self.refreshed_rows,
+            "changes": self.changes,
+            "failures": self.failures
+        }
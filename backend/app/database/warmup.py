@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+공유(L2) voice 캐시 warm-up 명령
+
+    cd backend
+    python -m app.database.warmup --top 1000           # 조회가 많은 public_id 상위 1000개
+    python -m app.database.warmup --latest 500         # 인기 기록이 없을 때 (Redis 초기화 직후 등) 최신 음성 500개
+    python -m app.database.warmup --public-ids a,b,c   # 지정한 public_id
+
+L2에 없는 레코드만 DB에서 읽어 채웁니다. 배포 전에 실행하면 새 파드들이 L2에서 바로 읽고,
+각 워커는 시작할 때 VOICE_CACHE_WARMUP_TOP개를 L2에서 자기 L1으로 가져옵니다.
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from app.database.supabase import SupabaseManager
+
+async def warm(args: argparse.Namespace) -> Dict[str, Any]:
+    manager = SupabaseManager(realtime=False)
+    shared = manager.shared_voice_cache
+    if shared is None:
+        raise SystemExit("L2 캐시가 꺼져 있습니다. VOICE_L2_ENABLED=true와 REDIS_URL을 설정하세요.")
+
+    try:
+        voices_repo = await manager.get_voice_repository()
+        public_ids: List[str] = []
+        if args.public_ids:
+            public_ids += [value.strip() for value in args.public_ids.split(",") if value.strip()]
+        public_ids += await shared.hot_public_ids(args.top)
+        public_ids = list(dict.fromkeys(public_ids))
+
+        found = 0
+        for start in range(0, len(public_ids), args.batch_size):
+            batch = public_ids[start:start + args.batch_size]
+            records = await voices_repo.get_many([('public_id', public_id) for public_id in batch])
+            found += sum(1 for record in records.values() if record is not None)
+
+        latest = 0
+        cursor: Optional[str] = None
+        while latest < args.latest:
+            voices, cursor = await voices_repo.list_voices(limit=min(100, args.latest - latest), cursor=cursor)
+            await shared.set_many([(('public_id', voice.public_id), voice) for voice in voices])
+            latest += len(voices)
+            if not cursor:
+                break
+
+        return {
+            "public_ids": len(public_ids),
+            "found": found,
+            "latest": latest,
+            "l2": shared.stats()
+        }
+    finally:
+        await manager.aclose()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="공유(L2) voice 캐시 warm-up")
+    parser.add_argument("--top", type=int, default=1000, help="조회가 많은 public_id 상위 N개")
+    parser.add_argument("--latest", type=int, default=0, help="최신 음성 N개")
+    parser.add_argument("--public-ids", help="쉼표로 구분한 public_id 목록")
+    parser.add_argument("--batch-size", type=int, default=100, help="DB 일괄 조회 크기")
+    args = parser.parse_args(argv)
+
+    print(json.dumps(asyncio.run(warm(args)), ensure_ascii=False, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,202 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
+from contextlib import asynccontextmanager
 import os
+import math
+import logging
+from typing import Optional
 from dotenv import load_dotenv
 load_dotenv()
 
 from app.routers import voices, conversations
-from app.database.supabase import get_supabase
+from app.database.supabase import get_voice_repository, get_supabase_manager, close_supabase_manager
+from app.services.elevenlabs import get_elevenlabs_service, close_elevenlabs_service
+from app.services.conversation_proxy import get_conversation_proxy, close_conversation_proxy
+from app.services.transcript_writer import get_transcript_writer, close_transcript_writer
+from app.core.health import DependencyProber
+from app.core.metrics import REGISTRY, CONTENT_TYPE, MetricsMiddleware
+from app.core.errors import ServiceUnavailableError
+from app.core.compression import CompressionConfig, CompressionMiddleware
+from app.core.ratelimit import RateLimiter, RateLimitMiddleware, RateLimitRule
+from app.core.admission import AdmissionGroup, AdmissionMiddleware
+from app.core import serialization
+
+logger = logging.getLogger(__name__)
+
+# CORS 허용 출처 (대화 WebSocket의 Origin 확인에도 사용)
+CORS_ALLOW_ORIGINS = [
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+    "http://localhost:3001",
+    "http://127.0.0.1:3001"
+]
+
+async def _probe_supabase() -> bool:
+    """Supabase 연결 점검"""
+    voices_repo = await get_voice_repository()
+    return await voices_repo.ping()
+
+async def _probe_elevenlabs() -> bool:
+    """ElevenLabs 연결 점검"""
+    return await get_elevenlabs_service().test_connection()
+
+async def _prewarm_clients() -> None:
+    """첫 요청이 지연 초기화 비용을 내지 않도록 Supabase·ElevenLabs 클라이언트 미리 생성"""
+    try:
+        await get_voice_repository()
+    except Exception as e:
+        logger.warning(f"Supabase 클라이언트 예열 실패: {e}")
+
+    try:
+        get_elevenlabs_service().client
+    except Exception as e:
+        logger.warning(f"ElevenLabs 클라이언트 예열 실패: {e}")
+
+async def _warm_voice_cache() -> None:
+    """공유(L2) 캐시에 기록된 인기 public_id를 이 워커의 L1에 미리 적재 (VOICE_CACHE_WARMUP_TOP)"""
+    try:
+        warmed = await get_supabase_manager().warm_voice_cache(int(os.getenv("VOICE_CACHE_WARMUP_TOP", 200)))
+        if warmed:
+            logger.info(f"voices 캐시 warm-up: {warmed}개 적재")
+    except Exception as e:
+        logger.warning(f"voices 캐시 warm-up 실패: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 시작/종료 훅 (시작 시 클라이언트 예열·캐시 무효화 구독·의존성 점검, 종료 시 공유 커넥션 풀 정리)"""
+    prewarm = os.getenv("PREWARM_CLIENTS", "true").lower() in ("1", "true", "yes")
+    if prewarm:
+        await _prewarm_clients()
+        await _warm_voice_cache()
+
+    try:
+        await get_supabase_manager().start_voice_cache_invalidation()
+    except Exception as e:
+        logger.warning(f"voices 캐시 무효화 구독을 시작하지 못했습니다: {e}")
+
+    # 구독을 먼저 시작해 적재 중 생긴 변경도 인덱스에 반영
+    try:
+        indexed = await get_supabase_manager().start_voice_index()
+        if indexed:
+            logger.info(f"voices public_id 인덱스: {indexed}개 적재")
+    except Exception as e:
+        logger.warning(f"voices 인덱스를 시작하지 못했습니다: {e}")
+
+    app.state.prober = DependencyProber.from_env({
+        "supabase": _probe_supabase,
+        "elevenlabs": _probe_elevenlabs
+    })
+    if prewarm:
+        # 첫 점검을 기다려 커넥션(TLS 포함)을 미리 열고 /readyz도 바로 정확하게 응답
+        await app.state.prober.probe_once()
+        app.state.prober.start(initial_delay=app.state.prober.interval)
+    else:
+        app.state.prober.start()
+
+    yield
+
+    await app.state.prober.stop()
+    await close_conversation_proxy()
+    await app.state.rate_limiter.aclose()
+    # 남은 대화 기록은 Supabase 연결을 닫기 전에 저장
+    await close_transcript_writer()
+    await close_supabase_manager()
+    await close_elevenlabs_service()
+
+def _collect_runtime_stats():
+    """/metrics 수집 시점의 캐시·요청 병합·Signed URL 풀 통계"""
+    manager = get_supabase_manager()
+    cache = manager.voice_cache.stats()
+    yield ("voice_cache_hits_total", "counter", "Voice cache hits", [({}, cache["hits"])])
+    yield ("voice_cache_misses_total", "counter", "Voice cache misses", [({}, cache["misses"])])
+    yield ("voice_cache_entries", "gauge", "Voice cache entries", [({}, cache["size"])])
+
+    flights = [manager.voice_flight, get_elevenlabs_service().signed_url_flight]
+    flights = [flight for flight in flights if flight is not None]
+    yield ("singleflight_upstream_calls_total", "counter", "Upstream calls made by single-flight groups",
+           [({"group": flight.name}, flight.upstream_calls) for flight in flights])
+    yield ("singleflight_callers_total", "counter", "Callers served by single-flight groups",
+           [({"group": flight.name}, flight.callers) for flight in flights])
+
+    http_pool = get_elevenlabs_service().stats()["http_pool"]
+    yield ("elevenlabs_http_connections", "gauge", "ElevenLabs HTTP pool connections by state", [
+        ({"state": "idle"}, http_pool["idle"]),
+        ({"state": "in_use"}, http_pool["in_use"])
+    ])
+    yield ("elevenlabs_http_queued_requests", "gauge", "Requests waiting for an ElevenLabs HTTP connection",
+           [({}, http_pool["queued_requests"])])
+
+    pool = get_elevenlabs_service().signed_url_pool
+    if pool is not None:
+        pool_stats = pool.stats()
+        yield ("signed_url_pool_hits_total", "counter", "Signed URL pool hits", [({}, pool_stats["hits"])])
+        yield ("signed_url_pool_misses_total", "counter", "Signed URL pool misses", [({}, pool_stats["misses"])])
+
+def _singleflight_stats(voices_repo) -> dict:
+    """요청 병합(single-flight) 통계"""
+    signed_url_flight = get_elevenlabs_service().signed_url_flight
+    return {
+        "voices": voices_repo.flight.stats() if voices_repo.flight else None,
+        "signed_url": signed_url_flight.stats() if signed_url_flight else None
+    }
+
+def _signed_url_pool_stats() -> Optional[dict]:
+    """Signed URL 예열 풀 통계 (비활성화 시 None)"""
+    pool = get_elevenlabs_service().signed_url_pool
+    return pool.stats() if pool else None
+
+def _rate_limit_rules() -> list:
+    """레이트 리밋 규칙 (RATE_LIMIT_{NAME}="횟수/초[:burst]"로 변경, "off"면 해제)
+
+    버킷은 클라이언트(IP·인증 사용자)별로만 나눕니다. public_id·user_id처럼 요청에 담긴 값만으로 나누면
+    한 클라이언트가 남의 버킷을 소진시켜 같은 링크의 다른 시청자나 다른 사용자를 막을 수 있습니다.
+    """
+    signed_url_paths = ("/api/conversations/signed-url", "/api/conversations/signed-url-by-public")
+    return [
+        # Signed URL 발급은 ElevenLabs 쿼터를 쓰므로 IP별로 제한
+        RateLimitRule.from_env("signed_url_ip", signed_url_paths, "30/60:10", key="ip"),
+        # 선택: 같은 클라이언트가 한 공개 음성에 반복 발급하는 것만 따로 제한 (기본 꺼짐)
+        RateLimitRule.from_env(
+            "signed_url_public_id", ("/api/conversations/signed-url-by-public",), "off", key="ip+public_id"
+        ),
+        # 인증한 사용자별 (토큰이 없으면 IP별)
+        RateLimitRule.from_env("voices_list_user", ("/api/voices/list",), "600/60:60", key="user", methods=("GET",))
+    ]
+
+def _rate_limit_user(token: str) -> Optional[str]:
+    """레이트 리밋용 사용자 확인 (get_current_user가 이미 검증해 캐시한 토큰만, 아니면 None → IP로 제한)
+
+    Auth를 호출하지 않으므로 위조 토큰을 보내도 한도 확인 전에 upstream 요청이 생기지 않습니다.
+    """
+    user = get_supabase_manager().cached_user(token)
+    return user.id if user is not None else None
+
+def _admission_groups() -> list:
+    """경로 묶음별 admission control (ADMISSION_{NAME}_LIMIT / _MAX_QUEUE / _DEADLINE, ADMISSION_ENABLED=false면 해제)"""
+    if os.getenv("ADMISSION_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return []
+    groups = [
+        # ElevenLabs가 느려져도 발급 요청이 워커에 쌓여 voices 조회까지 밀리지 않도록 따로 제한
+        AdmissionGroup.from_env("signed_url", ("/api/conversations/signed-url",), limit=32, max_queue=64, deadline=10),
+        AdmissionGroup.from_env("voices", ("/api/voices/",), limit=128, max_queue=512, deadline=5)
+    ]
+    return [group for group in groups if group is not None]
+
+def _upstream_stats() -> dict:
+    """upstream별 재시도 수 및 서킷 브레이커 상태"""
+    return {
+        "supabase": get_supabase_manager().upstream.stats(),
+        "elevenlabs": get_elevenlabs_service().upstream.stats()
+    }
+
+async def _service_unavailable_handler(request: Request, exc: ServiceUnavailableError) -> JSONResponse:
+    """일시적 과부하/서킷 open → 503 + Retry-After (워커를 붙잡지 않고 바로 실패)"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))}
+    )
 
 def create_app() -> FastAPI:
     """FastAPI 앱 생성 및 설정"""
@@ -15,67 +205,126 @@ def create_app() -> FastAPI:
         description="ElevenLabs 음성 대화 API",
         version="1.0.0",
         docs_url="/docs",
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        lifespan=lifespan,
+        # FAST_JSON: 모델 응답은 라우터에서 직접 직렬화하므로 dict 응답에만 orjson 적용
+        **({"default_response_class": serialization.FastJSONResponse} if serialization.FAST_JSON else {})
     )
 
+    # admission control (레이트 리밋 안쪽: 429로 걸러진 요청은 슬롯·대기열을 쓰지 않음)
+    admission_groups = _admission_groups()
+    app.state.admission_groups = admission_groups
+    app.add_middleware(AdmissionMiddleware, groups=admission_groups)
+
+    # 레이트 리밋 (CORS 안쪽에 둬서 429 응답에도 CORS 헤더가 붙도록)
+    rate_limiter = RateLimiter.from_env(_rate_limit_rules(), authenticate=_rate_limit_user)
+    app.state.rate_limiter = rate_limiter
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
     # CORS 설정
     app.add_middleware(
         CORSMiddleware,
-        allow_origins=[
-            "http://localhost:3000", 
-            "http://127.0.0.1:3000",
-            "http://localhost:3001",
-            "http://127.0.0.1:3001"
-        ],
+        allow_origins=CORS_ALLOW_ORIGINS,
         allow_credentials=True,
         allow_methods=["GET", "POST", "PUT", "DELETE"],
         allow_headers=["*"],
     )
+    app.state.allowed_origins = CORS_ALLOW_ORIGINS
+
+    # 응답 압축 (zstd / br / gzip 협상). 작은 페이로드만 주는 지연 민감 경로와 프로브는 제외
+    app.add_middleware(CompressionMiddleware, config=CompressionConfig.from_env(exclude_paths=(
+        "/api/conversations/signed-url",
+        "/api/conversations/validate-agent",
+        "/livez",
+        "/readyz"
+    )))
+
+    # 요청 지표 (가장 바깥에서 전체 처리 시간 측정)
+    app.add_middleware(MetricsMiddleware)
+    REGISTRY.register_collector(_collect_runtime_stats)
 
-    # Gzip 압축
-    app.add_middleware(GZipMiddleware, minimum_size=1000)
+    app.add_exception_handler(ServiceUnavailableError, _service_unavailable_handler)
 
     # 라우터 등록
     app.include_router(voices.router, prefix="/api/voices", tags=["voices"])
     app.include_router(conversations.router, prefix="/api/conversations", tags=["conversations"])
 
-    return app
+    # 기본 엔드포인트 (루트, 지표, 프로브, 헬스체크)
+    @app.get("/")
+    async def root():
+        """API 루트"""
+        return {
+            "name": "AI Voice Chat API",
+            "version": "1.0.0",
+            "status": "running"
+        }
 
-app = create_app()
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus 텍스트 포맷 지표"""
+        return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
 
-@app.get("/")
-async def root():
-    """API 루트"""
-    return {
-        "name": "AI Voice Chat API",
-        "version": "1.0.0",
-        "status": "running"
-    }
+    @app.get("/livez")
+    async def livez():
+        """Liveness 프로브 (의존성 점검 없이 프로세스 응답 여부만 확인)"""
+        return {"status": "alive"}
 
-@app.get("/health")
-async def health_check():
-    """헬스체크"""
-    try:
-        supabase = await get_supabase()
-        result = supabase.table('voices').select("count", count="exact").execute()
-        
-        return {
-            "status": "healthy",
-            "database": "connected",
-            "voices_count": result.count or 0
-        }
-    except Exception as e:
-        return {
-            "status": "unhealthy",
-            "error": str(e)
-        }
+    @app.get("/readyz")
+    async def readyz(request: Request):
+        """Readiness 프로브 (백그라운드 점검 결과 캐시 조회)"""
+        prober: Optional[DependencyProber] = getattr(request.app.state, "prober", None)
+        if prober is None:
+            return JSONResponse(status_code=503, content={"status": "starting", "dependencies": {}})
+
+        dependencies = prober.snapshot()
+        ready = prober.is_ready(dependencies)
+
+        return JSONResponse(
+            status_code=200 if ready else 503,
+            content={
+                "status": "ready" if ready else "not_ready",
+                "dependencies": dependencies
+            }
+        )
+
+    @app.get("/health")
+    async def health_check(exact: bool = False):
+        """헬스체크 (voices_count는 카운터 테이블, exact=true면 COUNT(*))"""
+        try:
+            voices_repo = await get_voice_repository()
+            if exact:
+                voices_count = await voices_repo.count()
+            else:
+                voices_count, _ = await voices_repo.get_stats()
+
+            return {
+                "status": "healthy",
+                "database": "connected",
+                "voices_count": voices_count,
+                "voice_cache": voices_repo.cache.stats() if voices_repo.cache else None,
+                "voice_cache_l2": voices_repo.shared.stats() if voices_repo.shared else None,
+                "voice_index": voices_repo.index.stats() if voices_repo.index else None,
+                "singleflight": _singleflight_stats(voices_repo),
+                "signed_url_pool": _signed_url_pool_stats(),
+                "elevenlabs": get_elevenlabs_service().stats(),
+                "upstreams": _upstream_stats(),
+                "rate_limit": rate_limiter.stats(),
+                "admission": {group.name: group.stats() for group in admission_groups},
+                "conversation_proxy": get_conversation_proxy().stats(),
+                "transcripts": get_transcript_writer().stats()
+            }
+        except Exception as e:
+            return {
+                "status": "unhealthy",
+                "error": str(e),
+                "upstreams": _upstream_stats()
+            }
+
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        log_level="info"
-    ) 
\ No newline at end of file
+    # python -m app.main → run.py와 동일한 실행 모드 사용 (SERVER_MODE)
+    from run import main
+    main() 
\ No newline at end of file
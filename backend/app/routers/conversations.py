@@ -1,49 +1,81 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
-from supabase import Client
-from typing import Optional
+import time
+import logging
+from contextlib import nullcontext
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, WebSocket
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Literal, Optional
 
-from app.database.supabase import get_supabase
+from app.database.supabase import get_voice_repository, get_message_repository
+from app.database.repository import VoiceRepository, MessageRepository, encode_cursor
 from app.database.models import (
     SignedUrlRequest, 
     SignedUrlResponse, 
     AgentValidationResponse,
     VoiceRecord,
-    PublicSignedUrlRequest
+    PublicSignedUrlRequest,
+    TranscriptIngestRequest,
+    TranscriptIngestResponse,
+    MessageRecord,
+    MessageListResponse
 )
 from app.services.elevenlabs import get_elevenlabs_service
+from app.services.conversation_proxy import ProxyClosed, get_conversation_proxy
+from app.services.transcript_writer import event_rows, get_transcript_writer
+from app.core.admission import AdmissionGroup
+from app.core.auth import AuthenticatedUser, get_current_user
+from app.core.errors import ServiceUnavailableError
+from app.core.ratelimit import RateLimiter, too_many_requests_detail, too_many_requests_headers
+from app.core.metrics import span
+from app.core.serialization import dumps, respond
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-async def _validate_agent_exists(agent_id: str, supabase: Client) -> VoiceRecord:
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+async def _validate_agent_exists(agent_id: str, voices_repo: VoiceRepository) -> VoiceRecord:
     """Agent ID가 DB에 존재하는지 확인하고 레코드 반환"""
     try:
-        result = supabase.table('voices')\
-            .select('*')\
-            .eq('agent_id', agent_id)\
-            .single()\
-            .execute()
+        with span("validate_agent_exists"):
+            voice_record = await voices_repo.get_by_agent_id(agent_id)
         
-        if not result.data:
+        if voice_record is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Agent ID '{agent_id}'를 찾을 수 없습니다."
             )
         
-        return VoiceRecord(**result.data)
+        return voice_record
     
     except HTTPException:
         raise
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Agent 검증 중 오류 발생: {str(e)}"
         )
 
-async def _create_signed_url_response(agent_id: str, voice_record: VoiceRecord) -> SignedUrlResponse:
+CLIENT_SESSION_HEADER = "X-Client-Session"
+
+def _client_identity(request: Request) -> Optional[str]:
+    """Signed URL 재사용 캐시용 클라이언트 식별자 (X-Client-Session 헤더 + 클라이언트 IP, 없으면 None)"""
+    return get_elevenlabs_service().client_identity(
+        request.headers.get(CLIENT_SESSION_HEADER),
+        request.client.host if request.client else None
+    )
+
+async def _create_signed_url_response(
+    agent_id: str,
+    voice_record: VoiceRecord,
+    client: Optional[str] = None
+) -> SignedUrlResponse:
     """Signed URL 생성 및 응답 객체 반환"""
     try:
         elevenlabs_service = get_elevenlabs_service()
-        signed_url_response = elevenlabs_service.get_signed_url(agent_id)
+        signed_url_response = await elevenlabs_service.get_signed_url(agent_id, client=client)
         
         return SignedUrlResponse(
             signed_url=signed_url_response.signed_url,
@@ -51,6 +83,8 @@ async def _create_signed_url_response(agent_id: str, voice_record: VoiceRecord)
             message=f"대화 준비 완료! 음성: {voice_record.file_name} ({voice_record.nickname or 'No nickname'})"
         )
     
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -60,48 +94,52 @@ async def _create_signed_url_response(agent_id: str, voice_record: VoiceRecord)
 @router.get("/signed-url", response_model=SignedUrlResponse)
 async def get_signed_url(
     agent_id: str = Query(..., description="ElevenLabs agent ID"),
-    supabase: Client = Depends(get_supabase)
+    voices_repo: VoiceRepository = Depends(get_voice_repository),
+    client: Optional[str] = Depends(_client_identity)
 ):
     """GET 방식으로 Signed URL 생성"""
     if not agent_id.strip():
         raise HTTPException(status_code=400, detail="Agent ID가 필요합니다.")
     
-    voice_record = await _validate_agent_exists(agent_id, supabase)
-    return await _create_signed_url_response(agent_id, voice_record)
+    voice_record = await _validate_agent_exists(agent_id, voices_repo)
+    return respond(await _create_signed_url_response(agent_id, voice_record, client))
 
 @router.post("/signed-url", response_model=SignedUrlResponse)
 async def create_signed_url(
     request: SignedUrlRequest,
-    supabase: Client = Depends(get_supabase)
+    voices_repo: VoiceRepository = Depends(get_voice_repository),
+    client: Optional[str] = Depends(_client_identity)
 ):
     """POST 방식으로 Signed URL 생성"""
-    voice_record = await _validate_agent_exists(request.agent_id, supabase)
-    return await _create_signed_url_response(request.agent_id, voice_record)
+    voice_record = await _validate_agent_exists(request.agent_id, voices_repo)
+    return respond(await _create_signed_url_response(request.agent_id, voice_record, client))
 
 @router.get("/validate-agent/{agent_id}", response_model=AgentValidationResponse)
 async def validate_agent(
     agent_id: str,
-    supabase: Client = Depends(get_supabase)
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
 ):
     """Agent ID 유효성 검증"""
     try:
-        voice_record = await _validate_agent_exists(agent_id, supabase)
+        voice_record = await _validate_agent_exists(agent_id, voices_repo)
         
-        return AgentValidationResponse(
+        return respond(AgentValidationResponse(
             valid=True,
             agent_id=agent_id,
             file_name=voice_record.file_name,
             nickname=voice_record.nickname,
             created_at=voice_record.created_at,
             message="유효한 Agent ID입니다."
-        )
+        ))
         
     except HTTPException as e:
         if e.status_code == 404:
-            return AgentValidationResponse(
+            return respond(AgentValidationResponse(
                 valid=False,
                 message=e.detail
-            )
+            ))
+        raise
+    except ServiceUnavailableError:
         raise
     except Exception as e:
         raise HTTPException(
@@ -109,25 +147,24 @@ async def validate_agent(
             detail=f"검증 실패: {str(e)}"
         )
 
-async def _validate_public_id_exists(public_id: str, supabase: Client) -> VoiceRecord:
+async def _validate_public_id_exists(public_id: str, voices_repo: VoiceRepository) -> VoiceRecord:
     """Public ID가 DB에 존재하는지 확인하고 레코드 반환"""
     try:
-        result = supabase.table('voices')\
-            .select('*')\
-            .eq('public_id', public_id)\
-            .single()\
-            .execute()
+        with span("validate_public_id_exists"):
+            voice_record = await voices_repo.get_by_public_id(public_id)
         
-        if not result.data:
+        if voice_record is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Public ID '{public_id}'를 찾을 수 없습니다."
             )
         
-        return VoiceRecord(**result.data)
+        return voice_record
     
     except HTTPException:
         raise
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -137,20 +174,23 @@ async def _validate_public_id_exists(public_id: str, supabase: Client) -> VoiceR
 @router.get("/signed-url-by-public", response_model=SignedUrlResponse)
 async def get_signed_url_by_public_id(
     public_id: str,
-    supabase: Client = Depends(get_supabase)
+    voices_repo: VoiceRepository = Depends(get_voice_repository),
+    client: Optional[str] = Depends(_client_identity)
 ):
     """Public ID로 Signed URL 생성 (보안 라우팅용)"""
     try:
         # Public ID로 voice 레코드 조회
-        voice_record = await _validate_public_id_exists(public_id, supabase)
+        voice_record = await _validate_public_id_exists(public_id, voices_repo)
         
         # Agent ID로 signed URL 생성
-        response = await _create_signed_url_response(voice_record.agent_id, voice_record)
+        response = await _create_signed_url_response(voice_record.agent_id, voice_record, client)
         
-        return response
+        return respond(response)
         
     except HTTPException:
         raise
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -160,7 +200,190 @@ async def get_signed_url_by_public_id(
 @router.post("/signed-url-by-public", response_model=SignedUrlResponse)
 async def post_signed_url_by_public_id(
     request: PublicSignedUrlRequest,
-    supabase: Client = Depends(get_supabase)
+    voices_repo: VoiceRepository = Depends(get_voice_repository),
+    client: Optional[str] = Depends(_client_identity)
 ):
     """Public ID로 Signed URL 생성 (POST 방식)"""
-    return await get_signed_url_by_public_id(request.public_id, supabase) 
\ No newline at end of file
+    return await get_signed_url_by_public_id(request.public_id, voices_repo, client) 
+
+@router.post("/transcripts", response_model=TranscriptIngestResponse, status_code=202)
+async def ingest_transcripts(
+    request: TranscriptIngestRequest,
+    user: AuthenticatedUser = Depends(get_current_user)
+):
+    """대화 기록 수신 (Bearer 토큰 필요, 대기열에 넣고 바로 응답, messages 저장은 백그라운드 일괄 INSERT)
+
+    sender_id는 토큰의 사용자로 저장하며, 저장도 그 토큰으로 해서 messages RLS를 그대로 적용합니다.
+    """
+    if any(event.sender_id is not None and str(event.sender_id) != user.id for event in request.events):
+        raise HTTPException(status_code=403, detail="다른 사용자의 대화 기록은 저장할 수 없습니다.")
+    writer = get_transcript_writer()
+    # 대기열이 가득 차면 TranscriptQueueFullError → 503 + Retry-After
+    dropped = writer.submit(event_rows(request.events, user.id), user.token)
+    return respond(TranscriptIngestResponse(
+        accepted=len(request.events),
+        dropped=dropped,
+        queued=writer.stats()["queued"],
+        message=f"대화 기록 {len(request.events)}건을 저장 대기열에 추가했습니다."
+    ), status_code=202)
+
+# WebSocket은 레이트 리밋·admission·CORS 미들웨어를 거치지 않으므로 라우트에서 직접 확인
+# (연결마다 Signed URL을 발급하므로 /signed-url*과 같은 규칙·묶음 사용)
+WS_RATE_LIMIT_RULES = ("signed_url_ip", "signed_url_public_id")
+WS_ADMISSION_PATH = "/api/conversations/signed-url"
+
+async def _deny_websocket(websocket: WebSocket, status_code: int, detail: str, headers: Optional[Dict[str, str]] = None) -> None:
+    """수락 전 거절 (서버가 denial response 확장을 지원하면 HTTP 상태·본문, 아니면 핸드셰이크 403)"""
+    if "websocket.http.response" in websocket.scope.get("extensions", {}):
+        await websocket.send_denial_response(JSONResponse({"detail": detail}, status_code=status_code, headers=headers))
+    else:
+        await websocket.close(code=1008, reason=detail)
+
+async def _websocket_rejection(websocket: WebSocket, public_id: str) -> bool:
+    """Origin 허용 목록·레이트 리밋 확인 → 거절했으면 True"""
+    state = websocket.app.state
+    origin = websocket.headers.get("origin")
+    # Origin이 없는 클라이언트(브라우저가 아님)는 CORS와 마찬가지로 통과
+    if origin is not None and origin not in getattr(state, "allowed_origins", ()):
+        await _deny_websocket(websocket, 403, "허용되지 않은 출처입니다.")
+        return True
+
+    limiter: Optional[RateLimiter] = getattr(state, "rate_limiter", None)
+    if limiter is not None:
+        limited = await limiter.check_rules(WS_RATE_LIMIT_RULES, {
+            "ip": websocket.client.host if websocket.client else "unknown",
+            "public_id": public_id
+        })
+        if limited is not None:
+            rule, retry_after = limited
+            await _deny_websocket(
+                websocket, 429, too_many_requests_detail(retry_after), too_many_requests_headers(rule, retry_after)
+            )
+            return True
+    return False
+
+def _websocket_admission_group(websocket: WebSocket) -> Optional[AdmissionGroup]:
+    groups = getattr(websocket.app.state, "admission_groups", ())
+    return next((group for group in groups if group.matches(WS_ADMISSION_PATH)), None)
+
+@router.websocket("/ws/{public_id}")
+async def conversation_proxy(
+    websocket: WebSocket,
+    public_id: str,
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
+):
+    """Public ID로 음성 조회 → Signed URL 발급 → ElevenLabs 대화 WebSocket 중계 (CONVERSATION_PROXY_ENABLED=true)"""
+    proxy = get_conversation_proxy()
+    if not proxy.config.enabled:
+        # 수락 전 종료 → 핸드셰이크 403
+        await websocket.close(code=1008)
+        return
+    if await _websocket_rejection(websocket, public_id):
+        return
+    arrived = time.monotonic()
+    admission = _websocket_admission_group(websocket)
+
+    async def resolve_signed_url() -> str:
+        try:
+            # 발급하는 동안만 signed_url 묶음 슬롯 점유 (deadline은 연결 도착 시점부터)
+            async with (admission.slot(arrived) if admission is not None else nullcontext()):
+                voice_record = await _validate_public_id_exists(public_id, voices_repo)
+                response = await get_elevenlabs_service().get_signed_url(voice_record.agent_id)
+        except HTTPException as e:
+            # 4000 + HTTP 상태 (예: 4404 음성 없음)
+            raise ProxyClosed(4000 + e.status_code, str(e.detail))
+        except ServiceUnavailableError as e:
+            raise ProxyClosed(1013, str(e))
+        except Exception as e:
+            raise ProxyClosed(1011, f"Signed URL 생성 실패: {str(e)}")
+        return response.signed_url
+
+    await proxy.serve(websocket, public_id, resolve_signed_url)
+
+class _ClosingStreamingResponse(StreamingResponse):
+    """응답이 끝나면(클라이언트 연결 종료 포함) 본문 제너레이터를 바로 닫는 StreamingResponse
+
+    Starlette는 전송 중 연결이 끊겨도 body_iterator를 닫지 않아, 가비지 컬렉션 전까지
+    제너레이터의 finally(미리 요청한 조회 취소)가 실행되지 않습니다.
+    """
+
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.body_iterator.aclose()
+
+async def _ndjson_pages(
+    first: List[Dict[str, Any]],
+    pages: AsyncGenerator[List[Dict[str, Any]], None]
+) -> AsyncIterator[bytes]:
+    """페이지마다 NDJSON 청크 하나 (메시지 한 줄씩). 중간에 실패하면 이어받을 커서가 담긴 error 줄로 끝냄
+
+    클라이언트가 중간에 끊으면 pages를 바로 닫아 미리 요청한 다음 페이지 조회를 취소합니다.
+    """
+    rows = first
+    try:
+        while True:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+            last = rows[-1] if rows else None
+            try:
+                rows = await pages.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception as e:
+                logger.error(f"메시지 스트리밍 중 조회 실패: {e}")
+                yield dumps({
+                    "error": f"메시지 조회 실패: {str(e)}",
+                    "next_cursor": encode_cursor(last) if last else None
+                }) + b"\n"
+                return
+    finally:
+        await pages.aclose()
+
+@router.get("/{chatroom_id}/messages", response_model=MessageListResponse)
+async def get_messages(
+    chatroom_id: str,
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="페이지 크기 (기본 json 50, ndjson 500)"),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (더 오래된 메시지 조회)"),
+    format: Optional[Literal['json', 'ndjson']] = Query(None, description="ndjson이면 끝까지 스트리밍 (Accept: application/x-ndjson도 가능)"),
+    messages_repo: MessageRepository = Depends(get_message_repository)
+):
+    """채팅방 메시지 최신순 조회 ((created_at, id) 키셋 페이지네이션, Bearer 토큰 필요)
+
+    조회는 요청한 사용자의 토큰으로 보내므로 messages RLS가 그대로 적용됩니다.
+    ndjson 모드는 방 전체 기록을 메모리에 모으지 않고 페이지를 가져오는 대로 한 줄에 메시지 하나씩 전송합니다.
+    """
+    stream = format == 'ndjson' or (
+        format is None and NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+    try:
+        if stream:
+            pages = messages_repo.iter_message_pages(chatroom_id, page_size=limit or 500, cursor=cursor)
+            # 첫 페이지는 응답 시작 전에 조회 → 잘못된 커서·upstream 장애는 일반 에러 응답으로
+            try:
+                with span("messages.stream_first_page"):
+                    first = await pages.__anext__()
+            except BaseException:
+                await pages.aclose()
+                raise
+            return _ClosingStreamingResponse(_ndjson_pages(first, pages), media_type=NDJSON_MEDIA_TYPE)
+
+        with span("messages.list"):
+            rows, next_cursor = await messages_repo.list_message_rows(chatroom_id, limit=limit or 50, cursor=cursor)
+        return respond(MessageListResponse(
+            messages=[MessageRecord(**row) for row in rows],
+            total=len(rows),
+            next_cursor=next_cursor,
+            message=f"총 {len(rows)}개의 메시지를 찾았습니다."
+        ))
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"메시지 조회 실패: {str(e)}"
+        )
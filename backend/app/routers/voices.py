@@ -1,46 +1,80 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from supabase import Client
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import Optional, List, Union
 
-from app.database.supabase import get_supabase
+from app.database.supabase import get_voice_repository
+from app.database.repository import VoiceRepository, VOICE_COLUMNS
+from app.core.errors import ServiceUnavailableError
+from app.core.metrics import span
+from app.core.conditional import conditional_json
+from app.core.serialization import respond
 from app.database.models import (
-    VoiceRecord, 
     VoiceListResponse, 
+    VoiceProjectionListResponse,
     VoiceDetailResponse,
     StatsResponse,
-    PublicIdToAgentResponse
+    PublicIdToAgentResponse,
+    VoiceResolveRequest,
+    VoiceResolveResult,
+    VoiceResolveResponse
 )
 
 router = APIRouter()
 
-@router.get("/list", response_model=VoiceListResponse)
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """fields= 쿼리 파싱 및 검증 (쉼표 구분 컬럼 목록)"""
+    if not fields:
+        return None
+    
+    columns = list(dict.fromkeys(column.strip() for column in fields.split(",") if column.strip()))
+    unknown = [column for column in columns if column not in VOICE_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"알 수 없는 필드: {', '.join(unknown)} (허용: {', '.join(VOICE_COLUMNS)})"
+        )
+    
+    return columns or None
+
+@router.get("/list", response_model=Union[VoiceListResponse, VoiceProjectionListResponse])
 async def get_voice_list(
+    request: Request,
     user_id: Optional[str] = Query(None, description="사용자 ID (없으면 전체 조회)"),
     limit: int = Query(50, ge=1, le=100, description="조회할 최대 개수 (1-100)"),
-    supabase: Client = Depends(get_supabase)
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (다음 페이지 조회)"),
+    fields: Optional[str] = Query(None, description="조회할 컬럼 (쉼표 구분, 예: public_id,nickname)"),
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
 ):
-    """음성 에이전트 목록 조회"""
+    """음성 에이전트 목록 조회 (created_at, id 기준 커서 페이지네이션, ETag 지원)"""
+    columns = _parse_fields(fields)
+    
     try:
-        query = supabase.table('voices').select('*')
-        
-        # user_id 필터링
-        if user_id:
-            query = query.eq('user_id', user_id)
-        
-        # agent_id가 있는 레코드만 조회
-        query = query.not_.is_('agent_id', 'null')
-        
-        # 최신순 정렬 및 제한
-        result = query.order('created_at', desc=True).limit(limit).execute()
-        
-        voices = [VoiceRecord(**voice) for voice in result.data]
-        
-        return VoiceListResponse(
+        # agent_id가 있는 레코드를 최신순으로 조회 (user_id 필터링)
+        if columns:
+            with span("voices.list"):
+                rows, next_cursor = await voices_repo.list_voice_rows(
+                    user_id=user_id, limit=limit, cursor=cursor, columns=columns
+                )
+            return conditional_json(request, VoiceProjectionListResponse(
+                voices=rows,
+                total=len(rows),
+                next_cursor=next_cursor,
+                message=f"총 {len(rows)}개의 음성 에이전트를 찾았습니다."
+            ))
+        
+        with span("voices.list"):
+            voices, next_cursor = await voices_repo.list_voices(user_id=user_id, limit=limit, cursor=cursor)
+        
+        return conditional_json(request, VoiceListResponse(
             voices=voices,
             total=len(voices),
+            next_cursor=next_cursor,
             message=f"총 {len(voices)}개의 음성 에이전트를 찾았습니다."
-        )
+        ))
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -50,31 +84,29 @@ async def get_voice_list(
 @router.get("/agent/{agent_id}", response_model=VoiceDetailResponse)
 async def get_voice_by_agent(
     agent_id: str,
-    supabase: Client = Depends(get_supabase)
+    request: Request,
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
 ):
-    """특정 Agent ID로 음성 정보 조회"""
+    """특정 Agent ID로 음성 정보 조회 (ETag 지원)"""
     try:
-        result = supabase.table('voices')\
-            .select('*')\
-            .eq('agent_id', agent_id)\
-            .single()\
-            .execute()
+        with span("voices.get_by_agent_id"):
+            voice = await voices_repo.get_by_agent_id(agent_id)
         
-        if not result.data:
+        if voice is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Agent ID '{agent_id}'를 찾을 수 없습니다."
             )
         
-        voice = VoiceRecord(**result.data)
-        
-        return VoiceDetailResponse(
+        return conditional_json(request, VoiceDetailResponse(
             voice=voice,
             message=f"Agent ID {agent_id[:15]}... 정보를 찾았습니다."
-        )
+        ))
         
     except HTTPException:
         raise
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -83,27 +115,26 @@ async def get_voice_by_agent(
 
 @router.get("/stats", response_model=StatsResponse)
 async def get_voice_stats(
-    supabase: Client = Depends(get_supabase)
+    user_id: Optional[str] = Query(None, description="사용자 ID (없으면 전체 통계)"),
+    exact: bool = Query(False, description="true면 카운터 대신 COUNT(*)로 정확히 계산"),
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
 ):
-    """음성 에이전트 통계 정보"""
+    """음성 에이전트 통계 정보 (트리거로 유지되는 카운터 테이블 조회)"""
     try:
-        # 전체 레코드 수
-        total_result = supabase.table('voices')\
-            .select("count", count="exact")\
-            .execute()
-        
-        # agent_id가 있는 레코드 수
-        agent_result = supabase.table('voices')\
-            .select("count", count="exact")\
-            .not_.is_('agent_id', 'null')\
-            .execute()
-        
-        return StatsResponse(
-            total_voices=total_result.count or 0,
-            voices_with_agent=agent_result.count or 0,
+        # 전체 레코드 수 / agent_id가 있는 레코드 수
+        with span("voices.stats"):
+            total_voices, voices_with_agent = await voices_repo.get_stats(user_id=user_id, exact=exact)
+        
+        return respond(StatsResponse(
+            total_voices=total_voices,
+            voices_with_agent=voices_with_agent,
+            user_id=user_id,
+            exact=exact,
             message="voices 테이블 통계 정보"
-        )
+        ))
         
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -113,39 +144,77 @@ async def get_voice_stats(
 @router.get("/public/{public_id}", response_model=PublicIdToAgentResponse)
 async def get_agent_by_public_id(
     public_id: str,
-    supabase: Client = Depends(get_supabase)
+    request: Request,
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
 ):
-    """Public ID로 Agent ID 조회 (보안 라우팅용)"""
+    """Public ID로 Agent ID 조회 (보안 라우팅용, ETag 지원)"""
     try:
-        result = supabase.table('voices')\
-            .select('*')\
-            .eq('public_id', public_id)\
-            .single()\
-            .execute()
+        with span("voices.get_by_public_id"):
+            voice = await voices_repo.get_by_public_id(public_id)
         
-        if not result.data:
+        if voice is None:
             raise HTTPException(
                 status_code=404, 
                 detail=f"Public ID '{public_id}'를 찾을 수 없습니다."
             )
         
-        voice_data = result.data
-        
-        return PublicIdToAgentResponse(
-            agent_id=voice_data['agent_id'],
-            public_id=voice_data['public_id'],
-            nickname=voice_data.get('nickname'),
-            file_name=voice_data.get('file_name'),
-            voice_id=voice_data.get('voice_id'),
-            user_id=voice_data.get('user_id'),
-            created_at=voice_data.get('created_at'),
-            message=f"Agent ID 조회 성공: {voice_data.get('nickname') or voice_data.get('file_name', 'Unknown')}"
-        )
+        return conditional_json(request, PublicIdToAgentResponse(
+            agent_id=voice.agent_id,
+            public_id=voice.public_id,
+            nickname=voice.nickname,
+            file_name=voice.file_name,
+            voice_id=voice.voice_id,
+            user_id=voice.user_id,
+            created_at=voice.created_at,
+            message=f"Agent ID 조회 성공: {voice.nickname or voice.file_name or 'Unknown'}"
+        ))
         
     except HTTPException:
         raise
+    except ServiceUnavailableError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
             detail=f"Public ID 조회 실패: {str(e)}"
-        ) 
\ No newline at end of file
+        ) 
+
+@router.post("/resolve", response_model=VoiceResolveResponse)
+async def resolve_voices(
+    request: VoiceResolveRequest,
+    voices_repo: VoiceRepository = Depends(get_voice_repository)
+):
+    """여러 agent_id / public_id 일괄 조회 (단일 쿼리, 중복 제거, 요청 순서 유지)"""
+    try:
+        keys = list(dict.fromkeys((item.kind, item.id) for item in request.ids))
+        with span("voices.resolve"):
+            records = await voices_repo.get_many(keys)
+        
+        results = []
+        for kind, lookup_id in keys:
+            voice = records.get((kind, lookup_id))
+            label = "Agent ID" if kind == 'agent_id' else "Public ID"
+            results.append(VoiceResolveResult(
+                kind=kind,
+                id=lookup_id,
+                found=voice is not None,
+                voice=voice,
+                message="조회 성공" if voice else f"{label} '{lookup_id}'를 찾을 수 없습니다."
+            ))
+        
+        found = sum(1 for result in results if result.found)
+        
+        return respond(VoiceResolveResponse(
+            results=results,
+            found=found,
+            not_found=len(results) - found,
+            message=f"{len(results)}개 중 {found}개의 음성 에이전트를 찾았습니다."
+        ))
+        
+    except ServiceUnavailableError:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"일괄 조회 실패: {str(e)}"
+        )
@@ -0,0 +1,424 @@
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from starlette.websockets import WebSocket, WebSocketState
+
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+Message = Union[str, bytes]
+Connect = Callable[[str, "ProxyConfig"], Awaitable[Any]]
+
+TO_UPSTREAM = "to_upstream"
+TO_CLIENT = "to_client"
+
+PROXY_SESSIONS = REGISTRY.gauge("conversation_proxy_sessions", "Active conversation proxy sessions")
+PROXY_SESSIONS_CLOSED = REGISTRY.counter(
+    "conversation_proxy_sessions_closed_total", "Conversation proxy sessions by close reason", ("reason",)
+)
+PROXY_BYTES = REGISTRY.counter(
+    "conversation_proxy_bytes_total", "Bytes relayed by the conversation proxy", ("direction",)
+)
+PROXY_MESSAGES = REGISTRY.counter(
+    "conversation_proxy_messages_total", "Messages relayed by the conversation proxy", ("direction",)
+)
+PROXY_BACKPRESSURE_SECONDS = REGISTRY.counter(
+    "conversation_proxy_backpressure_seconds_total", "Time readers waited on a full relay buffer", ("direction",)
+)
+PROXY_RELAY_SECONDS = REGISTRY.histogram(
+    "conversation_proxy_relay_seconds", "Time from receiving a message to finishing its send", ("direction",),
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+)
+PROXY_CONNECT_SECONDS = REGISTRY.histogram(
+    "conversation_proxy_upstream_connect_seconds", "Upstream WebSocket handshake time",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+# 종료 사유 → 클라이언트에 보낼 close code
+CLOSE_CODES = {
+    "client_closed": 1000,
+    "upstream_closed": 1000,
+    "idle_timeout": 1000,
+    "shutdown": 1001,
+    "slow_consumer": 1008,
+    "message_too_big": 1009,
+    "upstream_connect_failed": 1011,
+    "error": 1011,
+    "busy": 1013
+}
+
+class ProxyClosed(Exception):
+    """세션을 시작하지 못하고 close code와 사유로 종료할 때 (예: 음성 없음 → 4404)"""
+
+    def __init__(self, code: int, reason: str, kind: str = "rejected") -> None:
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+        self.kind = kind
+
+@dataclass
+class ProxyConfig:
+    """대화 프록시 설정"""
+    enabled: bool = False
+    # 워커당 동시 세션 수 (초과 시 1013 Try Again Later)
+    max_sessions: int = 1000
+    # 방향별 중계 버퍼 (메시지 수). 가득 차면 반대편 읽기를 멈춰 TCP 수준으로 역압 전달
+    buffer_messages: int = 32
+    max_message_bytes: int = 1024 * 1024
+    # 양방향 모두 메시지가 없으면 종료
+    idle_timeout: float = 60.0
+    # 한 메시지 전송이 이 시간 넘게 끝나지 않으면 느린 수신자로 보고 종료
+    send_timeout: float = 10.0
+    connect_timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "ProxyConfig":
+        """CONVERSATION_PROXY_* 환경변수 기반 설정"""
+        return cls(
+            enabled=os.getenv("CONVERSATION_PROXY_ENABLED", "false").lower() in ("1", "true", "yes"),
+            max_sessions=int(os.getenv("CONVERSATION_PROXY_MAX_SESSIONS", 1000)),
+            buffer_messages=int(os.getenv("CONVERSATION_PROXY_BUFFER_MESSAGES", 32)),
+            max_message_bytes=int(os.getenv("CONVERSATION_PROXY_MAX_MESSAGE_BYTES", 1024 * 1024)),
+            idle_timeout=float(os.getenv("CONVERSATION_PROXY_IDLE_TIMEOUT", 60)),
+            send_timeout=float(os.getenv("CONVERSATION_PROXY_SEND_TIMEOUT", 10)),
+            connect_timeout=float(os.getenv("CONVERSATION_PROXY_CONNECT_TIMEOUT", 10))
+        )
+
+def _size(data: Message) -> int:
+    if isinstance(data, bytes):
+        return len(data)
+    # ElevenLabs 이벤트(JSON, base64 오디오)는 ASCII라 인코딩 없이 길이 계산
+    return len(data) if data.isascii() else len(data.encode())
+
+class ProxySession:
+    """세션 하나의 바이트·메시지·지연 카운터"""
+
+    def __init__(self, session_id: int, public_id: str) -> None:
+        self.id = session_id
+        self.public_id = public_id
+        self.started = time.monotonic()
+        self.last_activity = self.started
+        self.connect_seconds: Optional[float] = None
+        self.first_upstream_message_seconds: Optional[float] = None
+        self.bytes = {TO_UPSTREAM: 0, TO_CLIENT: 0}
+        self.messages = {TO_UPSTREAM: 0, TO_CLIENT: 0}
+        self.backpressure_seconds = {TO_UPSTREAM: 0.0, TO_CLIENT: 0.0}
+        self.relay_seconds_max = {TO_UPSTREAM: 0.0, TO_CLIENT: 0.0}
+        self._relay_seconds_total = {TO_UPSTREAM: 0.0, TO_CLIENT: 0.0}
+        # 방향별 현재 전송 시작 시각 (전송 중이 아니면 None) → 느린 수신자 감지
+        self.sending_since: Dict[str, Optional[float]] = {TO_UPSTREAM: None, TO_CLIENT: None}
+        self.stopping = asyncio.Event()
+        self.close_reason: Optional[str] = None
+
+    def received(self, direction: str, now: float) -> None:
+        self.last_activity = now
+        if direction == TO_CLIENT and self.first_upstream_message_seconds is None:
+            self.first_upstream_message_seconds = now - self.started
+
+    def sent(self, direction: str, size: int, relay_seconds: float) -> None:
+        self.bytes[direction] += size
+        self.messages[direction] += 1
+        self._relay_seconds_total[direction] += relay_seconds
+        if relay_seconds > self.relay_seconds_max[direction]:
+            self.relay_seconds_max[direction] = relay_seconds
+        PROXY_BYTES.inc(direction, amount=size)
+        PROXY_MESSAGES.inc(direction)
+        PROXY_RELAY_SECONDS.observe(relay_seconds, direction)
+
+    def next_deadline(self, config: ProxyConfig) -> float:
+        deadline = self.last_activity + config.idle_timeout
+        for since in self.sending_since.values():
+            if since is not None:
+                deadline = min(deadline, since + config.send_timeout)
+        return deadline
+
+    def expired(self, config: ProxyConfig, now: float) -> Optional[str]:
+        if any(since is not None and now - since >= config.send_timeout for since in self.sending_since.values()):
+            return "slow_consumer"
+        if now - self.last_activity >= config.idle_timeout:
+            return "idle_timeout"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        def ms(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "id": self.id,
+            "public_id": self.public_id,
+            "duration_s": round(time.monotonic() - self.started, 3),
+            "connect_ms": ms(self.connect_seconds),
+            "first_upstream_message_ms": ms(self.first_upstream_message_seconds),
+            "bytes": dict(self.bytes),
+            "messages": dict(self.messages),
+            "relay_ms_mean": {
+                direction: ms(total / self.messages[direction]) if self.messages[direction] else None
+                for direction, total in self._relay_seconds_total.items()
+            },
+            "relay_ms_max": {direction: ms(value) for direction, value in self.relay_seconds_max.items()},
+            "backpressure_ms": {direction: ms(value) for direction, value in self.backpressure_seconds.items()},
+            "close_reason": self.close_reason
+        }
+
+async def connect_upstream(url: str, config: ProxyConfig) -> Any:
+    """ElevenLabs 대화 WebSocket 연결 (websockets는 uvicorn[standard]에 포함, 프록시를 쓸 때만 import)"""
+    from websockets.asyncio.client import connect
+
+    return await connect(
+        url,
+        open_timeout=config.connect_timeout,
+        close_timeout=2,
+        max_size=config.max_message_bytes,
+        # 수신 프레임 버퍼도 작게 잡아 중계 버퍼가 차면 upstream 소켓 읽기가 멈추도록
+        max_queue=config.buffer_messages,
+        write_limit=64 * 1024
+    )
+
+def _close_reason(reason: str) -> str:
+    # WebSocket close reason은 UTF-8 123바이트까지
+    return reason.encode()[:123].decode(errors="ignore")
+
+async def close_client(websocket: WebSocket, code: int, reason: str = "") -> None:
+    """클라이언트 WebSocket 종료 (이미 끊긴 경우 무시)"""
+    if websocket.application_state == WebSocketState.DISCONNECTED:
+        return
+    if websocket.client_state == WebSocketState.DISCONNECTED:
+        return
+    try:
+        await websocket.close(code=code, reason=_close_reason(reason))
+    except Exception:
+        pass
+
+class ConversationProxy:
+    """클라이언트 ↔ ElevenLabs 대화 WebSocket 중계
+
+    방향마다 [읽기 → 크기 제한 버퍼 → 쓰기] 태스크 쌍을 둡니다. 쓰기가 밀리면 버퍼가 차고,
+    읽기가 멈추면 소켓 수신 버퍼가 차서 보내는 쪽 TCP가 느려집니다 (메모리는 세션당 버퍼 크기로 제한).
+    upstream이 먼저 끝나면 버퍼에 남은 메시지를 클라이언트에 모두 전달한 뒤 종료합니다.
+    """
+
+    def __init__(self, config: Optional[ProxyConfig] = None, connect: Optional[Connect] = None) -> None:
+        self.config = config or ProxyConfig.from_env()
+        self._connect = connect or connect_upstream
+        self.sessions: Dict[int, ProxySession] = {}
+        self._next_id = 0
+        self.closed: Dict[str, int] = {}
+
+    async def serve(self, websocket: WebSocket, public_id: str, resolve: Callable[[], Awaitable[str]]) -> ProxySession:
+        """클라이언트 연결 수락 → resolve()로 Signed URL 발급 → upstream 연결 → 종료까지 중계"""
+        self._next_id += 1
+        session = ProxySession(self._next_id, public_id)
+        # 핸드셰이크 전에 등록해 max_sessions를 넘지 않도록
+        busy = len(self.sessions) >= self.config.max_sessions
+        if not busy:
+            self.sessions[session.id] = session
+            PROXY_SESSIONS.inc()
+
+        upstream = None
+        try:
+            await websocket.accept()
+            if busy:
+                raise ProxyClosed(CLOSE_CODES["busy"], "동시 대화 수가 많습니다. 잠시 후 다시 시도하세요.", "busy")
+
+            signed_url = await resolve()
+            connect_started = time.monotonic()
+            try:
+                upstream = await self._connect(signed_url, self.config)
+            except Exception as e:
+                logger.warning(f"대화 upstream 연결 실패: {type(e).__name__}: {e}")
+                raise ProxyClosed(CLOSE_CODES["upstream_connect_failed"], "upstream 연결 실패", "upstream_connect_failed")
+            session.connect_seconds = time.monotonic() - connect_started
+            PROXY_CONNECT_SECONDS.observe(session.connect_seconds)
+
+            session.close_reason = await self._relay(session, websocket, upstream)
+            await close_client(websocket, _client_close_code(session.close_reason, upstream), session.close_reason)
+        except ProxyClosed as e:
+            session.close_reason = e.kind
+            await close_client(websocket, e.code, e.reason)
+        except Exception as e:
+            session.close_reason = "error"
+            logger.error(f"대화 프록시 오류: {type(e).__name__}: {e}")
+            await close_client(websocket, CLOSE_CODES["error"], "프록시 오류")
+        finally:
+            if upstream is not None:
+                try:
+                    await upstream.close()
+                except Exception:
+                    pass
+            if self.sessions.pop(session.id, None) is not None:
+                PROXY_SESSIONS.dec()
+            reason = session.close_reason or "error"
+            self.closed[reason] = self.closed.get(reason, 0) + 1
+            PROXY_SESSIONS_CLOSED.inc(reason)
+            logger.info(f"대화 프록시 세션 종료: {session.stats()}")
+        return session
+
+    async def _relay(self, session: ProxySession, websocket: WebSocket, upstream: Any) -> str:
+        from websockets.exceptions import ConnectionClosed
+
+        async def receive_client() -> Optional[Message]:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return None
+            text = message.get("text")
+            return text if text is not None else message.get("bytes", b"")
+
+        async def send_client(data: Message) -> None:
+            if isinstance(data, str):
+                await websocket.send_text(data)
+            else:
+                await websocket.send_bytes(data)
+
+        async def receive_upstream() -> Optional[Message]:
+            try:
+                return await upstream.recv()
+            except ConnectionClosed:
+                return None
+
+        to_upstream: "asyncio.Queue[Optional[Tuple[Message, int, float]]]" = asyncio.Queue(self.config.buffer_messages)
+        to_client: "asyncio.Queue[Optional[Tuple[Message, int, float]]]" = asyncio.Queue(self.config.buffer_messages)
+        tasks = [
+            asyncio.create_task(self._pump(session, TO_UPSTREAM, receive_client, to_upstream, "client_closed")),
+            asyncio.create_task(self._drain(session, TO_UPSTREAM, to_upstream, upstream.send, None)),
+            # upstream 종료는 버퍼를 다 비운 to_client 쓰기 태스크가 보고
+            asyncio.create_task(self._pump(session, TO_CLIENT, receive_upstream, to_client, None)),
+            asyncio.create_task(self._drain(session, TO_CLIENT, to_client, send_client, "upstream_closed")),
+            asyncio.create_task(self._watchdog(session))
+        ]
+        pending = set(tasks)
+        reason: Optional[str] = None
+        try:
+            while reason is None and pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    reason = reason or self._task_result(task, tasks.index(task), ConnectionClosed)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        return reason or "error"
+
+    @staticmethod
+    def _task_result(task: "asyncio.Task[Optional[str]]", index: int, connection_closed: type) -> Optional[str]:
+        error = task.exception()
+        if error is None:
+            return task.result()
+        # 0, 3: 클라이언트 읽기/쓰기, 1, 2: upstream 쓰기/읽기
+        if isinstance(error, connection_closed):
+            return "upstream_closed"
+        if index in (0, 3):
+            return "client_closed"
+        logger.warning(f"대화 프록시 중계 오류: {type(error).__name__}: {error}")
+        return "error"
+
+    async def _pump(
+        self,
+        session: ProxySession,
+        direction: str,
+        receive: Callable[[], Awaitable[Optional[Message]]],
+        queue: "asyncio.Queue[Any]",
+        eof_reason: Optional[str]
+    ) -> Optional[str]:
+        """한쪽에서 읽어 버퍼에 넣기 (버퍼가 가득 차면 자리가 날 때까지 읽지 않음)"""
+        max_bytes = self.config.max_message_bytes
+        while True:
+            data = await receive()
+            if data is None:
+                if eof_reason is None:
+                    # 남은 메시지를 쓰기 태스크가 모두 보낸 뒤 종료하도록 표시
+                    await queue.put(None)
+                return eof_reason
+            now = time.monotonic()
+            session.received(direction, now)
+            size = _size(data)
+            if size > max_bytes:
+                return "message_too_big"
+            if queue.full():
+                await queue.put((data, size, now))
+                waited = time.monotonic() - now
+                session.backpressure_seconds[direction] += waited
+                PROXY_BACKPRESSURE_SECONDS.inc(direction, amount=waited)
+            else:
+                queue.put_nowait((data, size, now))
+
+    async def _drain(
+        self,
+        session: ProxySession,
+        direction: str,
+        queue: "asyncio.Queue[Any]",
+        send: Callable[[Message], Awaitable[None]],
+        eof_reason: Optional[str]
+    ) -> Optional[str]:
+        """버퍼에서 꺼내 반대쪽으로 전송"""
+        while True:
+            item = await queue.get()
+            if item is None:
+                return eof_reason
+            data, size, received_at = item
+            session.sending_since[direction] = time.monotonic()
+            await send(data)
+            now = time.monotonic()
+            session.sending_since[direction] = None
+            session.sent(direction, size, now - received_at)
+
+    async def _watchdog(self, session: ProxySession) -> str:
+        """유휴 시간·느린 수신자·종료 요청 감시 (다음 기한까지만 대기)"""
+        while True:
+            timeout = max(0.0, session.next_deadline(self.config) - time.monotonic())
+            try:
+                await asyncio.wait_for(session.stopping.wait(), timeout=timeout + 0.01)
+                return "shutdown"
+            except asyncio.TimeoutError:
+                reason = session.expired(self.config, time.monotonic())
+                if reason is not None:
+                    return reason
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.config.enabled,
+            "active_sessions": len(self.sessions),
+            "max_sessions": self.config.max_sessions,
+            "buffer_messages": self.config.buffer_messages,
+            "closed": dict(self.closed)
+        }
+
+    async def aclose(self, timeout: float = 5.0) -> None:
+        """진행 중인 세션에 종료 요청 후 정리될 때까지 대기"""
+        for session in list(self.sessions.values()):
+            session.stopping.set()
+        deadline = time.monotonic() + timeout
+        while self.sessions and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+def _client_close_code(reason: str, upstream: Any) -> int:
+    """upstream이 정상 범위 close code로 끝냈으면 그대로 전달"""
+    if reason == "upstream_closed":
+        code = getattr(upstream, "close_code", None)
+        if code is not None and (code in (1000, 1001, 1008, 1011) or 3000 <= code < 5000):
+            return code
+    return CLOSE_CODES.get(reason, 1011)
+
+# 전역 대화 프록시 인스턴스
+_conversation_proxy: Optional[ConversationProxy] = None
+
+def get_conversation_proxy() -> ConversationProxy:
+    """대화 프록시 인스턴스 반환"""
+    global _conversation_proxy
+    if _conversation_proxy is None:
+        _conversation_proxy = ConversationProxy()
+    return _conversation_proxy
+
+def set_conversation_proxy(proxy: Optional[ConversationProxy]) -> None:
+    """전역 대화 프록시 교체 (벤치마크용)"""
+    global _conversation_proxy
+    _conversation_proxy = proxy
+
+async def close_conversation_proxy() -> None:
+    """앱 종료 시 진행 중인 대화 세션 정리"""
+    if _conversation_proxy is not None:
+        await _conversation_proxy.aclose()
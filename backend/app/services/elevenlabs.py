@@ -1,40 +1,146 @@
 import os
 import logging
-from typing import Optional
-from elevenlabs.client import ElevenLabs
+import httpx
+from typing import TYPE_CHECKING, Optional, Dict, Any
 from app.database.models import SignedUrlResponse
+from app.core.singleflight import SingleFlight
+from app.core.errors import ServiceUnavailableError
+from app.core.limiter import ConcurrencyLimiter
+from app.core.http import pooled_transport, pool_stats
+from app.core.resilience import ResilientTransport, Upstream
+from app.services.signed_url_pool import SignedUrlPool
+from app.services.signed_url_cache import SignedUrlCache
+from app.core.metrics import span
+
+# ElevenLabs SDK는 import만 수백 ms라 클라이언트를 만들 때 불러옴
+if TYPE_CHECKING:
+    from elevenlabs.client import AsyncElevenLabs
 
 logger = logging.getLogger(__name__)
 
 class ElevenLabsService:
     """ElevenLabs API 서비스"""
     
-    def __init__(self) -> None:
+    def __init__(self, client: Optional["AsyncElevenLabs"] = None) -> None:
         self.api_key: Optional[str] = os.getenv("ELEVENLABS_API_KEY")
-        self._client: Optional[ElevenLabs] = None
+        # client를 주입하면 (테스트용 로컬 스텁 등) 그대로 사용
+        self._client: Optional["AsyncElevenLabs"] = client
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+        # 로컬 mock 서버 등 다른 API 주소 사용 시 (기본: ElevenLabs 운영 API)
+        self.base_url: Optional[str] = os.getenv("ELEVENLABS_BASE_URL") or None
+        # 멱등 요청 재시도 + 서킷 브레이커 (ELEVENLABS_RETRY_* / ELEVENLABS_BREAKER_*)
+        self.upstream: Upstream = Upstream.from_env("elevenlabs")
+        # Signed URL 발급 동시 호출 수 제한 (초과분은 deadline까지 대기 후 실패)
+        self.mint_limiter = ConcurrencyLimiter(
+            'elevenlabs_mint',
+            limit=int(os.getenv("ELEVENLABS_MAX_CONCURRENT_MINTS", 16)),
+            queue_timeout=float(os.getenv("ELEVENLABS_MINT_QUEUE_TIMEOUT", 2)),
+            max_queue=int(os.getenv("ELEVENLABS_MINT_MAX_QUEUE", 256))
+        )
+        # Signed URL은 대화 세션 토큰을 담고 있어 요청 간 공유가 안전하지 않으므로 기본 비활성화
+        # (같은 URL을 여러 클라이언트가 써도 되는 환경에서만 켜세요)
+        self.signed_url_flight: Optional[SingleFlight] = (
+            SingleFlight('signed_url')
+            if os.getenv("ELEVENLABS_COALESCE_SIGNED_URL", "false").lower() in ("1", "true", "yes")
+            else None
+        )
+        # 인기 agent용 Signed URL 예열 풀 (선택)
+        self.signed_url_pool: Optional[SignedUrlPool] = (
+            SignedUrlPool.from_env(mint=self._mint_signed_url, fallback=self._mint_on_demand)
+            if os.getenv("SIGNED_URL_POOL_ENABLED", "false").lower() in ("1", "true", "yes")
+            else None
+        )
+        # 같은 클라이언트의 새로고침·재연결 요청에 발급한 URL을 잠시 재사용 (선택, 클라이언트 간 공유 없음)
+        self.signed_url_cache: Optional[SignedUrlCache] = (
+            SignedUrlCache.from_env()
+            if os.getenv("SIGNED_URL_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+            else None
+        )
         
         if not self.api_key:
             logger.warning("ELEVENLABS_API_KEY가 환경변수에 설정되지 않았습니다.")
     
     @property
-    def client(self) -> ElevenLabs:
-        """ElevenLabs 클라이언트 (지연 초기화)"""
+    def client(self) -> "AsyncElevenLabs":
+        """비동기 ElevenLabs 클라이언트 (지연 초기화, 공유 httpx 커넥션 풀 사용)
+
+        풀 크기·keep-alive·connect/read timeout은 ELEVENLABS_* 환경변수로 설정합니다.
+        """
         if self._client is None:
             if not self.api_key:
                 raise ValueError("ELEVENLABS_API_KEY가 환경변수에 설정되지 않았습니다.")
-            self._client = ElevenLabs(api_key=self.api_key)
+            from elevenlabs.client import AsyncElevenLabs
+            transport = pooled_transport(
+                "ELEVENLABS",
+                max_connections=20,
+                max_keepalive=20,
+                connect_timeout=5.0,
+                read_timeout=30.0
+            )
+            self._transport = ResilientTransport(transport, self.upstream)
+            self._http_client = httpx.AsyncClient(transport=self._transport, timeout=transport.timeout)
+            self._client = AsyncElevenLabs(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                httpx_client=self._http_client
+            )
         return self._client
     
-    def get_signed_url(self, agent_id: str) -> SignedUrlResponse:
-        """Agent ID로 대화용 Signed URL 생성"""
+    async def aclose(self) -> None:
+        """Signed URL 풀 및 커넥션 풀 정리"""
+        if self.signed_url_pool is not None:
+            await self.signed_url_pool.stop()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+            self._transport = None
+            self._client = None
+    
+    def client_identity(self, session: Optional[str], client_ip: Optional[str]) -> Optional[str]:
+        """Signed URL 재사용 캐시 식별자 (캐시가 꺼져 있거나 세션 값이 없으면 None)"""
+        if self.signed_url_cache is None:
+            return None
+        return self.signed_url_cache.identity(session, client_ip)
+    
+    async def get_signed_url(self, agent_id: str, client: Optional[str] = None) -> SignedUrlResponse:
+        """Agent ID로 대화용 Signed URL 생성 (클라이언트별 재사용 캐시 → 예열 풀 → 즉시 발급)
+
+        client는 client_identity()의 값이며, 있으면 같은 클라이언트에 한해 재사용 기간 안의 URL을 돌려줍니다.
+        """
+        with span("elevenlabs.get_signed_url"):
+            if self.signed_url_cache is not None:
+                return await self.signed_url_cache.get_or_mint(client, agent_id, lambda: self._get_fresh(agent_id))
+            return await self._get_fresh(agent_id)
+    
+    async def _get_fresh(self, agent_id: str) -> SignedUrlResponse:
+        """새 URL (예열 풀 → 즉시 발급)"""
+        if self.signed_url_pool is not None:
+            return await self.signed_url_pool.acquire(agent_id)
+        return await self._mint_on_demand(agent_id)
+    
+    async def _mint_on_demand(self, agent_id: str) -> SignedUrlResponse:
+        """요청 경로에서 즉시 발급 (설정 시 동일 agent 동시 요청 병합)"""
+        if self.signed_url_flight is not None:
+            return await self.signed_url_flight.do(agent_id, lambda: self._mint_signed_url(agent_id))
+        return await self._mint_signed_url(agent_id)
+    
+    async def _mint_signed_url(self, agent_id: str) -> SignedUrlResponse:
+        """ElevenLabs API로 Signed URL 발급"""
         try:
-            if not self.api_key:
+            if not self.api_key and self._client is None:
                 raise ValueError("ELEVENLABS_API_KEY가 설정되지 않았습니다.")
             
             logger.info(f"실제 ElevenLabs API 호출: Agent {agent_id[:15]}...")
             
-            # 올바른 ElevenLabs API 경로로 호출
-            response = self.client.conversational_ai.conversations.get_signed_url(agent_id=agent_id)
+            # 올바른 ElevenLabs API 경로로 호출 (동시 발급 수 제한)
+            async with self.mint_limiter:
+                with span("elevenlabs.mint_signed_url", upstream="elevenlabs"):
+                    # 재시도는 트랜스포트(ResilientTransport)에서 하므로 SDK 자체 재시도는 끔
+                    response = await self.client.conversational_ai.conversations.get_signed_url(
+                        agent_id=agent_id,
+                        request_options={"max_retries": 0}
+                    )
             
             logger.info(f"Signed URL 생성 완료: Agent {agent_id[:15]}...")
             
@@ -44,19 +150,34 @@ class ElevenLabsService:
                 message="실제 대화용 URL이 생성되었습니다."
             )
             
+        except ServiceUnavailableError as e:
+            # 대기열 포화·서킷 open은 호출부에서 503으로 구분할 수 있도록 그대로 전달
+            logger.warning(f"Signed URL 발급 불가: {e}")
+            raise
         except Exception as e:
-            logger.error(f"Signed URL 생성 실패: {e}")
-            raise Exception(f"Signed URL 생성 실패: {str(e)}")
+            # ReadTimeout 등 메시지가 비어 있는 예외는 타입 이름으로 표시
+            reason = str(e) or type(e).__name__
+            logger.error(f"Signed URL 생성 실패: {reason}")
+            raise Exception(f"Signed URL 생성 실패: {reason}")
     
-    def test_connection(self) -> bool:
+    def stats(self) -> Dict[str, Any]:
+        """커넥션 풀·발급 대기열·서킷 브레이커 통계"""
+        return {
+            "http_pool": pool_stats(self._transport),
+            "mint_queue": self.mint_limiter.stats(),
+            "signed_url_cache": self.signed_url_cache.stats() if self.signed_url_cache else None,
+            "upstream": self.upstream.stats()
+        }
+    
+    async def test_connection(self) -> bool:
         """ElevenLabs API 연결 테스트"""
         try:
             if not self.api_key:
                 return False
             
-            # 실제 API 호출로 테스트
-            voices = self.client.voices.get_all()
-            return True  # voices 응답이 있으면 성공
+            # 전체 목록 대신 1개짜리 페이지만 조회 (헬스체크 부하 최소화)
+            await self.client.voices.search(page_size=1, request_options={"max_retries": 0})
+            return True  # 응답이 있으면 성공
             
         except Exception as e:
             logger.error(f"ElevenLabs 연결 테스트 실패: {e}")
@@ -72,5 +193,12 @@ def get_elevenlabs_service() -> ElevenLabsService:
         _elevenlabs_service = ElevenLabsService()
     return _elevenlabs_service
 
-# 하위 호환성을 위한 전역 변수
-elevenlabs_service = get_elevenlabs_service() 
\ No newline at end of file
+def set_elevenlabs_service(service: Optional[ElevenLabsService]) -> None:
+    """전역 ElevenLabs 서비스 교체 (벤치마크/로컬 스텁 주입용)"""
+    global _elevenlabs_service
+    _elevenlabs_service = service
+
+async def close_elevenlabs_service() -> None:
+    """앱 종료 시 ElevenLabs 연결 정리"""
+    if _elevenlabs_service is not None:
+        await _elevenlabs_service.aclose() 
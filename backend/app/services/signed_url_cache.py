@@ -0,0 +1,149 @@
+import os
+import re
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.database.models import SignedUrlResponse
+from app.core.singleflight import SingleFlight
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SIGNED_URL_CACHE_REQUESTS = REGISTRY.counter(
+    "signed_url_cache_requests_total", "Signed URL requests by per-client reuse cache result", ("result",)
+)
+SIGNED_URL_CACHE_EVICTIONS = REGISTRY.counter(
+    "signed_url_cache_evictions_total", "Signed URL cache entries removed", ("reason",)
+)
+
+# 클라이언트가 보내는 세션 식별자 (탭마다 무작위 UUID 등). 추측할 수 없는 길이만 허용
+_SESSION_PATTERN = re.compile(r"[A-Za-z0-9._:-]{16,128}")
+
+CacheKey = Tuple[str, str]
+
+class SignedUrlCache:
+    """같은 클라이언트의 반복 요청(새로고침·재연결)에 Signed URL을 짧게 재사용하는 캐시
+
+    - 키는 (클라이언트 식별자, agent_id)입니다. 식별자는 세션 헤더 값이며 bind_ip면 IP도 포함합니다.
+      식별자가 없으면 캐시하지 않으므로 한 URL이 다른 클라이언트에 전달되지 않습니다.
+    - 재사용 기간(window)은 발급 시점부터이며 조회해도 늘어나지 않습니다.
+      항목은 발급 순서 = 만료 순서로 저장하므로, 만료·크기 초과 항목을 앞에서부터 제거합니다.
+    - 같은 클라이언트의 동시 요청(새로고침 직후 중복 호출)은 발급 한 번으로 병합합니다.
+    """
+
+    def __init__(self, window: float = 30.0, max_size: int = 10_000, bind_ip: bool = True) -> None:
+        self.window = window
+        self.max_size = max_size
+        self.bind_ip = bind_ip
+        self._entries: "OrderedDict[CacheKey, Tuple[float, SignedUrlResponse]]" = OrderedDict()
+        # 키에 세션 식별자·IP가 들어가므로 키별 통계는 남기지 않음 (/health 노출 방지)
+        self._flight = SingleFlight("signed_url_session", max_tracked_keys=0)
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.expired = 0
+        self.evicted = 0
+
+    @classmethod
+    def from_env(cls) -> "SignedUrlCache":
+        """SIGNED_URL_CACHE_WINDOW / _MAX_SIZE / _BIND_IP
+
+        예열 풀의 URL은 만료 SIGNED_URL_POOL_REFRESH_MARGIN초 전까지 전달되므로 재사용 기간은 그보다 짧게 제한합니다.
+        """
+        window = float(os.getenv("SIGNED_URL_CACHE_WINDOW", 30))
+        limit = float(os.getenv("SIGNED_URL_POOL_REFRESH_MARGIN", 120))
+        if window > limit:
+            logger.warning(f"SIGNED_URL_CACHE_WINDOW({window}s)가 URL 남은 유효 시간 하한({limit}s)보다 길어 {limit}s로 줄입니다.")
+            window = limit
+        return cls(
+            window=window,
+            max_size=int(os.getenv("SIGNED_URL_CACHE_MAX_SIZE", 10_000)),
+            bind_ip=os.getenv("SIGNED_URL_CACHE_BIND_IP", "true").lower() in ("1", "true", "yes")
+        )
+
+    def identity(self, session: Optional[str], client_ip: Optional[str]) -> Optional[str]:
+        """세션 헤더(+IP) → 캐시 식별자. 형식에 맞지 않으면 None (캐시하지 않음)"""
+        if not session or not _SESSION_PATTERN.fullmatch(session):
+            return None
+        if self.bind_ip:
+            return f"{client_ip or 'unknown'}|{session}"
+        return session
+
+    def _prune(self, now: float) -> None:
+        entries = self._entries
+        while entries:
+            key, (expires_at, _) = next(iter(entries.items()))
+            if expires_at > now:
+                break
+            entries.popitem(last=False)
+            self.expired += 1
+            SIGNED_URL_CACHE_EVICTIONS.inc("expired")
+
+    def get(self, identity: str, agent_id: str) -> Optional[SignedUrlResponse]:
+        now = time.monotonic()
+        entry = self._entries.get((identity, agent_id))
+        if entry is None:
+            return None
+        if entry[0] <= now:
+            self._prune(now)
+            return None
+        return entry[1]
+
+    def put(self, identity: str, agent_id: str, response: SignedUrlResponse) -> None:
+        now = time.monotonic()
+        self._prune(now)
+        key = (identity, agent_id)
+        # 새 URL로 바꾸면 만료 시각도 새로 정해지므로 맨 뒤로 (발급 순서 = 만료 순서 유지)
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.window, response)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+            SIGNED_URL_CACHE_EVICTIONS.inc("size")
+
+    async def get_or_mint(
+        self,
+        identity: Optional[str],
+        agent_id: str,
+        mint: Callable[[], Awaitable[SignedUrlResponse]]
+    ) -> SignedUrlResponse:
+        """재사용 기간 안의 URL 반환, 없으면 mint() 결과를 저장 (identity가 None이면 항상 새로 발급)"""
+        if identity is None:
+            self.bypassed += 1
+            SIGNED_URL_CACHE_REQUESTS.inc("bypass")
+            return await mint()
+
+        cached = self.get(identity, agent_id)
+        if cached is not None:
+            self.hits += 1
+            SIGNED_URL_CACHE_REQUESTS.inc("hit")
+            return cached
+
+        self.misses += 1
+        SIGNED_URL_CACHE_REQUESTS.inc("miss")
+
+        async def mint_and_store() -> SignedUrlResponse:
+            response = await mint()
+            self.put(identity, agent_id, response)
+            return response
+
+        return await self._flight.do((identity, agent_id), mint_and_store)
+
+    def stats(self) -> Dict[str, Any]:
+        """재사용·병합으로 아낀 ElevenLabs 호출 수 포함 통계"""
+        flight = self._flight.stats(top=0)
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "window_s": self.window,
+            "bind_ip": self.bind_ip,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "coalesced": flight["coalesced"],
+            "mints_avoided": self.hits + flight["coalesced"],
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
@@ -0,0 +1,210 @@
+import os
+import time
+import asyncio
+import logging
+from collections import Counter, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Any
+
+from app.database.models import SignedUrlResponse
+from app.core import deadline
+
+logger = logging.getLogger(__name__)
+
+MintFn = Callable[[str], Awaitable[SignedUrlResponse]]
+
+def _parse_pool_sizes(raw: str) -> Dict[str, int]:
+    """"agent_a:5,agent_b:3" 형식의 agent별 풀 크기 파싱"""
+    sizes: Dict[str, int] = {}
+    for item in raw.split(","):
+        if ":" not in item:
+            continue
+        agent_id, size = item.rsplit(":", 1)
+        if agent_id.strip() and size.strip().isdigit():
+            sizes[agent_id.strip()] = int(size)
+    return sizes
+
+class SignedUrlPool:
+    """요청이 많은 agent용 Signed URL 예열 풀
+
+    - 요청 빈도 상위 agent마다 미사용 Signed URL을 pool_size개씩 미리 발급해 둡니다.
+    - 각 URL은 정확히 한 번만 전달되며, 만료 refresh_margin초 전에 폐기됩니다.
+    - 풀이 비어 있으면 fallback(즉시 발급)으로 처리합니다.
+    """
+
+    def __init__(
+        self,
+        mint: MintFn,
+        fallback: Optional[MintFn] = None,
+        pool_size: int = 2,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        max_agents: int = 10,
+        url_ttl: float = 900.0,
+        refresh_margin: float = 120.0,
+        refill_interval: float = 5.0,
+        demand_half_life: float = 300.0
+    ) -> None:
+        self.mint = mint
+        self.fallback = fallback or mint
+        self.pool_size = pool_size
+        self.pool_sizes = pool_sizes or {}
+        self.max_agents = max_agents
+        self.url_ttl = url_ttl
+        self.refresh_margin = refresh_margin
+        self.refill_interval = refill_interval
+        self.demand_half_life = demand_half_life
+        self._last_decay = time.monotonic()
+        self._pools: Dict[str, Deque[Tuple[float, SignedUrlResponse]]] = {}
+        self._demand: Counter = Counter()
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.hits = 0
+        self.misses = 0
+        self.minted = 0
+        self.expired = 0
+        self.mint_errors = 0
+        self._hit_latency = 0.0
+        self._miss_latency = 0.0
+
+    @classmethod
+    def from_env(cls, mint: MintFn, fallback: Optional[MintFn] = None) -> "SignedUrlPool":
+        """환경변수 기반 풀 생성"""
+        return cls(
+            mint=mint,
+            fallback=fallback,
+            pool_size=int(os.getenv("SIGNED_URL_POOL_SIZE", 2)),
+            pool_sizes=_parse_pool_sizes(os.getenv("SIGNED_URL_POOL_SIZES", "")),
+            max_agents=int(os.getenv("SIGNED_URL_POOL_MAX_AGENTS", 10)),
+            url_ttl=float(os.getenv("SIGNED_URL_TTL", 900)),
+            refresh_margin=float(os.getenv("SIGNED_URL_POOL_REFRESH_MARGIN", 120)),
+            refill_interval=float(os.getenv("SIGNED_URL_POOL_INTERVAL", 5)),
+            demand_half_life=float(os.getenv("SIGNED_URL_POOL_DEMAND_HALF_LIFE", 300))
+        )
+
+    def size_for(self, agent_id: str) -> int:
+        """agent별 목표 풀 크기"""
+        return self.pool_sizes.get(agent_id, self.pool_size)
+
+    def _usable_until(self, minted_at: float) -> float:
+        return minted_at + self.url_ttl - self.refresh_margin
+
+    def _take(self, agent_id: str) -> Optional[SignedUrlResponse]:
+        """풀에서 유효한 URL 하나를 꺼냄 (만료 임박 항목은 폐기)"""
+        pool = self._pools.get(agent_id)
+        now = time.monotonic()
+        while pool:
+            minted_at, response = pool.popleft()
+            if self._usable_until(minted_at) > now:
+                return response
+            self.expired += 1
+        return None
+
+    async def acquire(self, agent_id: str) -> SignedUrlResponse:
+        """Signed URL 반환 (풀 우선, 비어 있으면 즉시 발급)"""
+        self._ensure_started()
+        started = time.perf_counter()
+        self._demand[agent_id] += 1
+
+        response = self._take(agent_id)
+        if response is not None:
+            self.hits += 1
+            self._hit_latency += time.perf_counter() - started
+            if len(self._pools.get(agent_id, ())) < self.size_for(agent_id):
+                self._wakeup.set()
+            return response
+
+        self.misses += 1
+        self._wakeup.set()
+        try:
+            return await self.fallback(agent_id)
+        finally:
+            self._miss_latency += time.perf_counter() - started
+
+    def hot_agents(self) -> List[str]:
+        """풀을 유지할 요청 빈도 상위 agent 목록"""
+        return [
+            agent_id
+            for agent_id, demand in self._demand.most_common(self.max_agents)
+            if demand > 0
+        ]
+
+    def _decay_demand(self) -> None:
+        """half-life마다 요청 수를 절반으로 줄여 최근 인기 agent 위주로 유지"""
+        now = time.monotonic()
+        if now - self._last_decay < self.demand_half_life:
+            return
+        self._last_decay = now
+        for agent_id in list(self._demand):
+            self._demand[agent_id] //= 2
+            if self._demand[agent_id] == 0:
+                del self._demand[agent_id]
+
+    async def refill(self) -> None:
+        """상위 agent 풀을 목표 크기까지 채우고 나머지 풀은 정리"""
+        self._decay_demand()
+        hot = self.hot_agents()
+
+        for agent_id in list(self._pools):
+            if agent_id not in hot:
+                self._pools.pop(agent_id)
+
+        now = time.monotonic()
+        for agent_id in hot:
+            pool = self._pools.setdefault(agent_id, deque())
+            while pool and self._usable_until(pool[0][0]) <= now:
+                pool.popleft()
+                self.expired += 1
+
+            missing = self.size_for(agent_id) - len(pool)
+            for _ in range(missing):
+                try:
+                    response = await self.mint(agent_id)
+                except Exception as e:
+                    self.mint_errors += 1
+                    logger.warning(f"Signed URL 풀 보충 실패: Agent {agent_id[:15]}... ({e})")
+                    break
+                self.minted += 1
+                pool.append((time.monotonic(), response))
+
+    async def _run(self) -> None:
+        """백그라운드 보충 루프"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.refill()
+            except Exception as e:
+                logger.error(f"Signed URL 풀 보충 루프 오류: {e}")
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            # 첫 요청 안에서 시작되므로 그 요청의 deadline을 물려받지 않도록
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=deadline.detached())
+
+    async def stop(self) -> None:
+        """백그라운드 보충 중지 및 풀 비우기"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._pools.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """풀 hit rate 및 추가 지연 통계"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "minted": self.minted,
+            "expired": self.expired,
+            "mint_errors": self.mint_errors,
+            "avg_hit_latency_ms": round(self._hit_latency / self.hits * 1000, 3) if self.hits else 0.0,
+            "avg_miss_latency_ms": round(self._miss_latency / self.misses * 1000, 3) if self.misses else 0.0,
+            "pools": {agent_id: len(pool) for agent_id, pool in self._pools.items()}
+        }
@@ -0,0 +1,354 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.database.models import TranscriptEvent
+from app.core import deadline
+from app.core.errors import ServiceUnavailableError
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+Row = Dict[str, Any]
+# (행, 사용자 액세스 토큰) → 저장한 행 수. 토큰으로 호출해 messages RLS(sender_id 본인)를 DB가 검사
+InsertFn = Callable[[List[Row], str], Awaitable[int]]
+
+TRANSCRIPT_EVENTS = REGISTRY.counter(
+    "transcript_events_total", "Transcript events by outcome", ("result",)
+)
+TRANSCRIPT_QUEUE_DEPTH = REGISTRY.gauge(
+    "transcript_queue_depth", "Transcript events waiting to be written"
+)
+TRANSCRIPT_BATCH_ROWS = REGISTRY.histogram(
+    "transcript_batch_rows", "Rows per messages insert",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+TRANSCRIPT_FLUSH_SECONDS = REGISTRY.histogram(
+    "transcript_flush_seconds", "Duration of one messages insert (including retries)"
+)
+TRANSCRIPT_DELAY_SECONDS = REGISTRY.histogram(
+    "transcript_write_delay_seconds", "Time from accepting an event to its row being written",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest")
+
+Entry = Tuple[Row, float, str]
+
+# 일시적 오류로 보는 SQLSTATE 클래스 (연결, 트랜잭션 롤백·교착, 자원 부족, 관리자 중단, 시스템 오류)
+TRANSIENT_SQLSTATE_CLASSES = ("08", "40", "53", "57", "58")
+# PostgREST가 DB에 연결하지 못함 (503)
+TRANSIENT_POSTGREST_CODES = ("PGRST000", "PGRST001", "PGRST002", "PGRST003")
+
+class TranscriptQueueFullError(ServiceUnavailableError):
+    """대기열이 가득 차 이번 요청의 이벤트를 받지 않음 (reject 정책)"""
+
+def event_rows(events: Sequence[TranscriptEvent], sender_id: str) -> List[Row]:
+    """TranscriptEvent → messages 행 (sender_id는 인증된 사용자, id는 재전송 시 중복 방지를 위해 여기서 생성)"""
+    received_at = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "content": event.content,
+            "sender_id": sender_id,
+            "chatroom_id": event.chatroom_id,
+            "message_type": event.message_type,
+            # 배치 저장 시각이 아니라 이벤트 시각으로 정렬되도록 명시
+            "created_at": (event.created_at or received_at).isoformat()
+        }
+        for event in events
+    ]
+
+def is_transient_error(error: BaseException) -> bool:
+    """다시 보내면 성공할 수 있는 저장 오류인지 (네트워크·타임아웃·5xx·DB 연결 오류)
+
+    postgrest APIError에는 HTTP 상태가 없으므로 code로 구분합니다. JSON이 아닌 오류 응답(게이트웨이 5xx 등)은
+    code가 HTTP 상태 코드입니다.
+    """
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ServiceUnavailableError)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or "")
+        if code.isdigit() and len(code) == 3:
+            return int(code) >= 500
+        return code in TRANSIENT_POSTGREST_CODES or code[:2] in TRANSIENT_SQLSTATE_CLASSES
+    return False
+
+def _rejects_whole_request(error: BaseException) -> bool:
+    """행과 무관하게 요청 전체가 거절됨 (JWT 만료·무효, 인증 실패) → 나눠 보내도 결과가 같음"""
+    from postgrest.exceptions import APIError
+
+    if not isinstance(error, APIError):
+        return False
+    code = str(error.code or "")
+    return code.startswith("PGRST3") or code in ("401", "403")
+
+class TranscriptWriter:
+    """대화 기록을 메모리 대기열에 받고 백그라운드에서 다건 INSERT로 저장
+
+    - batch_size개가 모이거나 flush_interval초가 지나면 저장 (요청 경로는 대기열에 넣기만 함)
+    - 행마다 보낸 사용자의 액세스 토큰을 함께 보관하고, 배치 안에서 토큰별로 나눠 그 토큰으로 INSERT합니다
+      (service role 키를 쓰지 않으므로 RLS가 그대로 적용됨). 토큰별 INSERT는 최대 write_concurrency개씩 동시에 보냅니다.
+    - 대기열은 max_queue개로 제한. 넘치면 overflow 정책에 따라
+      reject: 요청 전체를 503으로 거절 (클라이언트 재시도), drop_oldest: 가장 오래된 이벤트를 버림
+    - 일시적 오류(네트워크·5xx·DB 연결)만 같은 배치를 지수 백오프로 max_retries번 재시도 후 버림
+      (id 고정이라 중복 없음)
+    - 행 때문에 거절되면(4xx, 제약 조건 위반 등) 배치를 반씩 나눠 다시 보내 잘못된 행만 버리고 failed로 셈
+    - 종료 시 shutdown_timeout초 안에 남은 이벤트를 모두 저장. 시간 안에 끝나지 않아 취소된 INSERT의 행과
+      대기열에 남은 행은 failed로 셈
+    """
+
+    def __init__(
+        self,
+        insert: InsertFn,
+        batch_size: int = 500,
+        flush_interval: float = 0.5,
+        max_queue: int = 20_000,
+        overflow: str = "reject",
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        shutdown_timeout: float = 10.0,
+        write_concurrency: int = 8
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow는 {OVERFLOW_POLICIES} 중 하나여야 합니다: {overflow}")
+        self.insert = insert
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.shutdown_timeout = shutdown_timeout
+        self._write_slots = asyncio.Semaphore(max(1, write_concurrency))
+        # (행, 수락 시각, 사용자 액세스 토큰)
+        self._queue: Deque[Entry] = deque()
+        # 대기열에서 꺼냈지만 아직 저장·실패가 정해지지 않은 행 수
+        self._in_flight = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._stopping = False
+        self.accepted = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.batches = 0
+        self.retries = 0
+        self.splits = 0
+
+    @classmethod
+    def from_env(cls, insert: InsertFn) -> "TranscriptWriter":
+        """TRANSCRIPT_* 환경변수 기반 생성"""
+        return cls(
+            insert=insert,
+            batch_size=int(os.getenv("TRANSCRIPT_BATCH_SIZE", 500)),
+            flush_interval=float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", 0.5)),
+            max_queue=int(os.getenv("TRANSCRIPT_MAX_QUEUE", 20_000)),
+            overflow=os.getenv("TRANSCRIPT_OVERFLOW", "reject").lower(),
+            max_retries=int(os.getenv("TRANSCRIPT_MAX_RETRIES", 3)),
+            retry_backoff=float(os.getenv("TRANSCRIPT_RETRY_BACKOFF", 0.5)),
+            shutdown_timeout=float(os.getenv("TRANSCRIPT_SHUTDOWN_TIMEOUT", 10)),
+            write_concurrency=int(os.getenv("TRANSCRIPT_WRITE_CONCURRENCY", 8))
+        )
+
+    def submit(self, rows: Sequence[Row], token: str) -> int:
+        """행을 대기열에 추가 (I/O 없음). 반환값은 drop_oldest로 버려진 이전 이벤트 수
+
+        reject 정책에서 자리가 부족하면 하나도 넣지 않고 TranscriptQueueFullError를 던집니다.
+        """
+        if self._stopping:
+            raise TranscriptQueueFullError("대화 기록 저장이 종료 중입니다.", retry_after=1.0)
+        overflow = len(self._queue) + len(rows) - self.max_queue
+        dropped = 0
+        if overflow > 0:
+            if self.overflow == "reject" or len(rows) > self.max_queue:
+                self.rejected += len(rows)
+                TRANSCRIPT_EVENTS.inc("rejected", amount=len(rows))
+                raise TranscriptQueueFullError(
+                    "대화 기록 대기열이 가득 찼습니다. 잠시 후 다시 시도하세요.",
+                    retry_after=max(1.0, self.flush_interval)
+                )
+            for _ in range(overflow):
+                self._queue.popleft()
+            dropped = overflow
+            self.dropped += dropped
+            TRANSCRIPT_EVENTS.inc("dropped", amount=dropped)
+
+        now = time.monotonic()
+        self._queue.extend((row, now, token) for row in rows)
+        self.accepted += len(rows)
+        TRANSCRIPT_EVENTS.inc("accepted", amount=len(rows))
+        TRANSCRIPT_QUEUE_DEPTH.set(len(self._queue))
+        self._ensure_started()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+        return dropped
+
+    def _ensure_started(self) -> None:
+        if self._task is None or self._task.done():
+            # 첫 요청 안에서 시작되므로 그 요청의 deadline을 물려받지 않도록
+            self._task = asyncio.get_running_loop().create_task(self._run(), context=deadline.detached())
+
+    async def _run(self) -> None:
+        """크기(batch_size) 또는 시간(flush_interval) 조건으로 저장"""
+        while not self._stopping:
+            if len(self._queue) < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+            if self._stopping:
+                break
+            await self.flush()
+
+    async def flush(self) -> None:
+        """대기열의 이벤트를 batch_size개씩 모두 저장"""
+        while self._queue:
+            count = min(self.batch_size, len(self._queue))
+            batch = [self._queue.popleft() for _ in range(count)]
+            self._in_flight += count
+            TRANSCRIPT_QUEUE_DEPTH.set(len(self._queue))
+            # 사용자(토큰)별로 나눠 저장
+            by_token: Dict[str, List[Entry]] = {}
+            for entry in batch:
+                by_token.setdefault(entry[2], []).append(entry)
+            await asyncio.gather(*(self._write_limited(entries, token) for token, entries in by_token.items()))
+
+    async def _write_limited(self, batch: List[Entry], token: str) -> None:
+        async with self._write_slots:
+            await self._write(batch, token)
+
+    async def _write(self, batch: List[Entry], token: str) -> None:
+        """한 토큰의 행 묶음 저장 (행 때문에 거절되면 반씩 나눠 다시 시도)"""
+        rows = [row for row, _, _ in batch]
+        started = time.monotonic()
+        try:
+            await self._insert_with_retry(rows, token)
+        except Exception as e:
+            if is_transient_error(e):
+                self._discard(batch, f"재시도 {self.max_retries}회 후 버림: {e}")
+            elif _rejects_whole_request(e):
+                self._discard(batch, f"요청 거절: {e}")
+            elif len(batch) == 1:
+                self._discard(batch, f"저장할 수 없는 행: {e}")
+            else:
+                self.splits += 1
+                middle = len(batch) // 2
+                await self._write(batch[:middle], token)
+                await self._write(batch[middle:], token)
+            return
+
+        now = time.monotonic()
+        self._in_flight -= len(batch)
+        self.batches += 1
+        self.written += len(rows)
+        TRANSCRIPT_EVENTS.inc("written", amount=len(rows))
+        TRANSCRIPT_BATCH_ROWS.observe(len(rows))
+        TRANSCRIPT_FLUSH_SECONDS.observe(now - started)
+        for _, accepted_at, _ in batch:
+            TRANSCRIPT_DELAY_SECONDS.observe(now - accepted_at)
+
+    async def _insert_with_retry(self, rows: List[Row], token: str) -> None:
+        """일시적 오류만 지수 백오프로 max_retries번 재시도 (그 밖의 오류와 마지막 실패는 그대로 던짐)"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.insert(rows, token)
+                return
+            except Exception as e:
+                if attempt >= self.max_retries or not is_transient_error(e):
+                    raise
+                self.retries += 1
+                # 종료 중에는 백오프를 줄여 shutdown_timeout 안에 끝나도록
+                delay = self.retry_backoff * (2 ** attempt) * random.uniform(0.5, 1.0)
+                logger.warning(f"대화 기록 {len(rows)}건 저장 실패, {delay:.2f}초 후 재시도: {e}")
+                await asyncio.sleep(delay / 10 if self._stopping else delay)
+
+    def _discard(self, batch: List[Entry], reason: str) -> None:
+        self._in_flight -= len(batch)
+        self.failed += len(batch)
+        TRANSCRIPT_EVENTS.inc("failed", amount=len(batch))
+        logger.error(f"대화 기록 {len(batch)}건 저장 실패 ({reason})")
+
+    async def stop(self) -> None:
+        """새 이벤트를 받지 않고 남은 이벤트 저장 후 종료"""
+        self._stopping = True
+        self._wakeup.set()
+        if self._task is not None:
+            try:
+                # 진행 중인 배치가 끝나길 기다린 뒤 나머지를 저장
+                await asyncio.wait_for(self._task, timeout=self.shutdown_timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._task = None
+        pending = len(self._queue)
+        try:
+            await asyncio.wait_for(self.flush(), timeout=self.shutdown_timeout)
+        except asyncio.TimeoutError:
+            pass
+        if self._queue or self._in_flight:
+            # 취소된 INSERT의 행은 DB 반영 여부를 알 수 없으므로 저장하지 못한 것으로 셈
+            lost = len(self._queue) + self._in_flight
+            self.failed += lost
+            TRANSCRIPT_EVENTS.inc("failed", amount=lost)
+            logger.error(f"종료 시간 초과로 대화 기록 {lost}건을 저장하지 못했습니다 (진행 중 취소 {self._in_flight}건 포함).")
+            self._queue.clear()
+            self._in_flight = 0
+        elif pending:
+            logger.info(f"종료 전 대화 기록 {pending}건 저장 완료")
+        TRANSCRIPT_QUEUE_DEPTH.set(0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._queue),
+            "in_flight": self._in_flight,
+            "max_queue": self.max_queue,
+            "overflow": self.overflow,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "batches": self.batches,
+            "retries": self.retries,
+            "splits": self.splits
+        }
+
+async def _insert_messages(rows: List[Row], token: str) -> int:
+    from app.database.supabase import get_supabase_manager
+
+    messages_repo = await get_supabase_manager().get_message_repository(token)
+    return await messages_repo.insert_many(rows)
+
+# 전역 대화 기록 저장기 인스턴스
+_transcript_writer: Optional[TranscriptWriter] = None
+
+def get_transcript_writer() -> TranscriptWriter:
+    """대화 기록 저장기 인스턴스 반환 (백그라운드 태스크는 첫 이벤트 수신 시 시작)"""
+    global _transcript_writer
+    if _transcript_writer is None:
+        _transcript_writer = TranscriptWriter.from_env(_insert_messages)
+    return _transcript_writer
+
+def set_transcript_writer(writer: Optional[TranscriptWriter]) -> None:
+    """전역 대화 기록 저장기 교체 (벤치마크용)"""
+    global _transcript_writer
+    _transcript_writer = writer
+
+async def close_transcript_writer() -> None:
+    """앱 종료 시 남은 대화 기록 저장 (Supabase 연결 정리 전에 호출)"""
+    if _transcript_writer is not None:
+        await _transcript_writer.stop()
@@ -0,0 +1 @@
+"""가짜 upstream 기반 부하 테스트 / 마이크로벤치마크"""
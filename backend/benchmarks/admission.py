@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+admission control / 요청 deadline 확인 (로컬 mock ElevenLabs HTTP 서버 + 가짜 Supabase)
+
+    cd backend
+    python -m benchmarks.admission
+
+1. overload: ElevenLabs가 느려진 상태(--slow-ms)에서 /signed-url 요청을 한꺼번에 보내는 동안
+   /api/voices/public 조회를 계속 보냄 → admission 끔/켬 비교
+   (signed-url 응답 상태·실패까지 걸린 시간, 워커가 요청을 붙잡고 있던 총 시간, voices 지연)
+   이어서 같은 burst를 한 번 더 보내, 기록된 점유 시간으로 대기열에 넣지 않고 바로 거절하는지 확인
+2. deadline: upstream 하나가 응답하지 않을 때 요청이 deadline에 503으로 끝나는지
+   (Supabase 조회와 ElevenLabs 발급 각각, deadline 없음과 비교)
+3. coalesced: deadline이 짧은 /api/voices/public 조회에 deadline이 긴 /signed-url-by-public이 같은 public_id로
+   합류할 때 먼저 온 요청만 503이고 합류한 요청은 자기 deadline 안에 200인지. 확인 실패 시 종료 코드 1
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import UpstreamConfig, running_app, run_load, summarize
+from benchmarks.mock_elevenlabs import MockElevenLabsServer
+
+def _use_mock_elevenlabs() -> None:
+    """running_app()의 가짜 SDK 클라이언트 대신 mock HTTP 서버로 가는 실제 ElevenLabsService 사용
+    (deadline은 httpx 트랜스포트에서 적용되므로)"""
+    from app.services.elevenlabs import ElevenLabsService, set_elevenlabs_service
+    set_elevenlabs_service(ElevenLabsService())
+
+async def _burst(bench: Any, agent_ids: List[str]) -> Dict[str, Any]:
+    by_status: Dict[str, List[float]] = {}
+
+    async def call(agent_id: str) -> None:
+        started = time.perf_counter()
+        try:
+            status = str((await bench.client.get("/api/conversations/signed-url", params={"agent_id": agent_id})).status_code)
+        except Exception as e:
+            status = type(e).__name__
+        by_status.setdefault(status, []).append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(agent_id) for agent_id in agent_ids))
+    return {
+        "duration_s": round(time.perf_counter() - started, 3),
+        "statuses": {status: len(latencies) for status, latencies in sorted(by_status.items())},
+        "latency_ms_by_status": {status: summarize(latencies) for status, latencies in sorted(by_status.items())},
+        # 요청마다 응답까지 걸린 시간의 합 = 워커가 요청(메모리·소켓)을 붙잡고 있던 총 시간
+        "request_seconds_held": round(sum(sum(latencies) for latencies in by_status.values()), 1)
+    }
+
+async def overload(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"burst": args.burst, "elevenlabs_latency_ms": args.slow_ms}
+    async with MockElevenLabsServer(latency_ms=args.slow_ms) as server:
+        modes = {
+            "admission_off": {"ADMISSION_ENABLED": "false"},
+            "admission_on": {
+                "ADMISSION_ENABLED": "true",
+                "ADMISSION_SIGNED_URL_DEADLINE": str(args.signed_url_deadline)
+            }
+        }
+        for name, env in modes.items():
+            env = {
+                **env,
+                "ELEVENLABS_API_KEY": "mock-key",
+                "ELEVENLABS_BASE_URL": server.url,
+                "ELEVENLABS_MAX_CONNECTIONS": "1000",
+                "ELEVENLABS_MAX_KEEPALIVE": "1000",
+                "VOICE_CACHE_ENABLED": "false"
+            }
+            async with running_app(supabase=UpstreamConfig(latency_ms=args.db_latency_ms), rows=args.rows, env=env) as bench:
+                _use_mock_elevenlabs()
+                agent_ids = [bench.rows[i % len(bench.rows)]["agent_id"] for i in range(args.burst)]
+
+                async def read_voice(i: int) -> int:
+                    public_id = bench.rows[i % len(bench.rows)]["public_id"]
+                    return (await bench.client.get(f"/api/voices/public/{public_id}")).status_code
+
+                baseline = await run_load(read_voice, args.reads, args.read_concurrency)
+                burst, during = await asyncio.gather(
+                    _burst(bench, agent_ids),
+                    run_load(read_voice, args.reads, args.read_concurrency)
+                )
+                # 두 번째 burst: 앞선 점유 시간 기록으로 대기해도 늦을 요청을 바로 거절하는지
+                second_burst = await _burst(bench, agent_ids)
+                health = (await bench.client.get("/health")).json()
+            results[name] = {
+                "signed_url": burst,
+                "signed_url_second_burst": second_burst,
+                "voices_alone": {key: baseline[key] for key in ("throughput_rps", "latency_ms", "status_codes")},
+                "voices_during_burst": {key: during[key] for key in ("throughput_rps", "latency_ms", "status_codes")},
+                "admission": health.get("admission"),
+                "mint_queue": health["elevenlabs"]["mint_queue"]
+            }
+    return results
+
+async def _timed_get(bench: Any, path: str, params: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    started = time.perf_counter()
+    response = await bench.client.get(path, params=params)
+    return {
+        "status": response.status_code,
+        "seconds": round(time.perf_counter() - started, 2),
+        "retry_after": response.headers.get("retry-after")
+    }
+
+async def deadline(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"hang_ms": args.hang_ms}
+    for name, enabled in (("no_deadline", "false"), ("deadline", "true")):
+        env = {
+            "ADMISSION_ENABLED": enabled,
+            "ADMISSION_VOICES_DEADLINE": str(args.voices_deadline),
+            "ADMISSION_SIGNED_URL_DEADLINE": str(args.signed_url_deadline),
+            "VOICE_CACHE_ENABLED": "false"
+        }
+        entry: Dict[str, Any] = {}
+        async with running_app(supabase=UpstreamConfig(latency_ms=args.hang_ms), rows=10, env=env) as bench:
+            entry["supabase_voice_lookup"] = await _timed_get(bench, f"/api/voices/public/{bench.rows[0]['public_id']}")
+            from app.database.supabase import get_supabase_manager
+            entry["supabase_upstream"] = {
+                key: get_supabase_manager().upstream.stats()[key] for key in ("deadline_exceeded", "retries", "failures")
+            }
+            # 공유 조회는 요청 deadline과 무관하게 계속되고, 요청은 자기 deadline에 기다림을 멈춤
+            entry["voices_singleflight_deadline_exceeded"] = get_supabase_manager().voice_flight.stats(top=0)["deadline_exceeded"]
+        async with MockElevenLabsServer(hang_rate=1.0, hang_ms=args.hang_ms) as server:
+            env.update({"ELEVENLABS_API_KEY": "mock-key", "ELEVENLABS_BASE_URL": server.url})
+            async with running_app(rows=10, env=env) as bench:
+                _use_mock_elevenlabs()
+                entry["elevenlabs_mint"] = await _timed_get(
+                    bench, "/api/conversations/signed-url", {"agent_id": bench.rows[0]["agent_id"]}
+                )
+                from app.services.elevenlabs import get_elevenlabs_service
+                entry["elevenlabs_upstream"] = {
+                    key: get_elevenlabs_service().upstream.stats()[key] for key in ("deadline_exceeded", "failures")
+                }
+        results[name] = entry
+    results["deadlines_s"] = {"voices": args.voices_deadline, "signed_url": args.signed_url_deadline}
+    return results
+
+async def coalesced(args: argparse.Namespace) -> Dict[str, Any]:
+    """deadline이 짧은 voices 조회가 시작한 DB 조회에 deadline이 긴 signed URL 요청이 합류할 때
+    합류한 요청이 자기 deadline까지 기다려 성공하는지 (공유 조회가 먼저 온 요청의 deadline을 물려받지 않음)"""
+    latency_ms = (args.voices_deadline + args.signed_url_deadline) / 2 * 1000
+    env = {
+        "ADMISSION_ENABLED": "true",
+        "ADMISSION_VOICES_DEADLINE": str(args.voices_deadline),
+        "ADMISSION_SIGNED_URL_DEADLINE": str(args.signed_url_deadline),
+        "VOICE_CACHE_ENABLED": "false",
+        "SINGLEFLIGHT_ENABLED": "true"
+    }
+    async with running_app(supabase=UpstreamConfig(latency_ms=latency_ms), rows=10, env=env) as bench:
+        public_id = bench.rows[0]["public_id"]
+        leader = asyncio.ensure_future(_timed_get(bench, f"/api/voices/public/{public_id}"))
+        await asyncio.sleep(0.05)
+        follower = await _timed_get(bench, "/api/conversations/signed-url-by-public", {"public_id": public_id})
+        leader_result = await leader
+        from app.database.supabase import get_supabase_manager
+        flight = get_supabase_manager().voice_flight.stats(top=None)
+    checks = {
+        "shared_one_lookup": flight["upstream_calls"] == 1 and flight["coalesced"] == 1,
+        "leader_hits_own_deadline": leader_result["status"] == 503,
+        "follower_uses_own_deadline": follower["status"] == 200
+    }
+    return {
+        "supabase_latency_ms": latency_ms,
+        "deadlines_s": {"voices": args.voices_deadline, "signed_url": args.signed_url_deadline},
+        "voices_leader": leader_result,
+        "signed_url_follower": follower,
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+
+SCENARIOS = {"overload": overload, "deadline": deadline, "coalesced": coalesced}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="admission control / 요청 deadline 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--burst", type=int, default=400, help="overload: 동시에 보낼 signed-url 요청 수")
+    parser.add_argument("--slow-ms", type=float, default=3000.0, help="overload: 느려진 ElevenLabs 응답 지연")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=2000, help="overload: voices 조회 수")
+    parser.add_argument("--read-concurrency", type=int, default=20)
+    parser.add_argument("--signed-url-deadline", type=float, default=2.0)
+    parser.add_argument("--voices-deadline", type=float, default=1.0)
+    parser.add_argument("--hang-ms", type=float, default=5000.0, help="deadline: 응답하지 않는 upstream 지연")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+응답 압축 비용/효과 측정 (코덱·레벨별 CPU 시간과 절약 바이트)
+
+    cd backend
+    python -m benchmarks.compression
+
+1. codecs: 실제 응답 본문(signed URL, 목록 100개, 목록 1000개, /metrics)을
+   코덱·레벨별로 압축해 요청당 CPU 시간과 압축률 비교
+2. app: create_app()에 Accept-Encoding별로 목록 요청을 보내 지연 시간과 전송 바이트 비교
+   (br / zstd는 brotli / zstandard가 설치된 경우에만)
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from app.core.compression import available_codecs
+from app.core.serialization import model_json
+from app.database.models import SignedUrlResponse, VoiceListResponse, VoiceRecord
+from benchmarks.fakes import make_voice_rows
+from benchmarks.harness import UpstreamConfig, run_load, running_app
+
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 6, 11), "zstd": (1, 3, 9)}
+
+def _voice_list(count: int) -> bytes:
+    records = [VoiceRecord(**row) for row in make_voice_rows(count)]
+    return model_json(VoiceListResponse(
+        voices=records, total=count, next_cursor=None, message=f"총 {count}개의 음성 에이전트를 찾았습니다."
+    ))
+
+def payloads() -> Dict[str, bytes]:
+    return {
+        "signed_url": model_json(SignedUrlResponse(
+            signed_url="wss://api.elevenlabs.io/v1/convai/conversation?agent_id=agent_0000001&conversation_signature=" + "x" * 96,
+            agent_id="agent_0000001",
+            message="대화 준비 완료! 음성: sample_1.mp3 (음성 1)"
+        )),
+        "list_100": _voice_list(100),
+        "list_1000": _voice_list(1000)
+    }
+
+def _cpu_per_call(func: Any, data: bytes, min_seconds: float) -> float:
+    runs = 0
+    started = time.thread_time()
+    while True:
+        func(data)
+        runs += 1
+        elapsed = time.thread_time() - started
+        if elapsed >= min_seconds:
+            return elapsed / runs
+
+def bench_codecs(bodies: Dict[str, bytes], min_seconds: float) -> List[Dict[str, Any]]:
+    codecs = available_codecs()
+    results = []
+    for payload, data in bodies.items():
+        for name, levels in LEVELS.items():
+            codec = codecs.get(name)
+            if codec is None:
+                continue
+            for level in levels:
+                compressed = codec.compress(data, level)
+                cpu = _cpu_per_call(lambda body: codec.compress(body, level), data, min_seconds)
+                results.append({
+                    "payload": payload,
+                    "encoding": name,
+                    "level": level,
+                    "bytes_in": len(data),
+                    "bytes_out": len(compressed),
+                    "saved_pct": round((1 - len(compressed) / len(data)) * 100, 1),
+                    "cpu_us": round(cpu * 1e6, 1)
+                })
+    return results
+
+async def bench_app(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    encodings = ["identity"] + [name for name in ("gzip", "br", "zstd") if name in available_codecs()]
+    results = []
+    async with running_app(supabase=UpstreamConfig(), rows=args.rows, seed=args.seed) as bench:
+        for encoding in encodings:
+            wire_bytes = 0
+
+            async def call(_: int) -> int:
+                nonlocal wire_bytes
+                response = await bench.client.get(
+                    "/api/voices/list?limit=100", headers={"accept-encoding": encoding}
+                )
+                wire_bytes += int(response.headers.get("content-length", 0))
+                return response.status_code
+
+            cpu_started = time.process_time()
+            result = await run_load(call, args.requests, args.concurrency)
+            cpu = time.process_time() - cpu_started
+            results.append({
+                "encoding": encoding,
+                "bytes_per_request": round(wire_bytes / args.requests),
+                "process_cpu_ms_per_request": round(cpu / args.requests * 1000, 3),
+                "throughput_rps": result["throughput_rps"],
+                "latency_ms": result["latency_ms"]
+            })
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="응답 압축 CPU 시간 / 절약 바이트 측정")
+    parser.add_argument("--min-seconds", type=float, default=0.2, help="코덱·레벨별 최소 측정 CPU 시간")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    codec_results = bench_codecs(payloads(), args.min_seconds)
+    print(f"{'payload':<11} {'encoding':<6} {'level':>5} {'bytes_in':>9} {'bytes_out':>9} {'saved%':>7} {'cpu_us':>9}")
+    for row in codec_results:
+        print(
+            f"{row['payload']:<11} {row['encoding']:<6} {row['level']:>5} {row['bytes_in']:>9} "
+            f"{row['bytes_out']:>9} {row['saved_pct']:>7} {row['cpu_us']:>9}"
+        )
+
+    app_results = asyncio.run(bench_app(args))
+    print()
+    for row in app_results:
+        print(
+            f"{row['encoding']:<8} bytes/req={row['bytes_per_request']:>6} "
+            f"cpu/req={row['process_cpu_ms_per_request']:.3f}ms rps={row['throughput_rps']} "
+            f"p99={row['latency_ms']['p99']}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"codecs": codec_results, "app": app_results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+ETag / If-None-Match 폴링 비용 비교 (가짜 upstream, 인프로세스)
+
+    cd backend
+    python -m benchmarks.conditional_get --requests 500
+
+같은 경로를 반복 조회하면서 If-None-Match 없이(매번 전체 본문 + gzip)와
+이전 ETag를 보내는 경우(304)의 요청당 지연과 전송 바이트를 비교합니다.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import UpstreamConfig, running_app, summarize
+
+PATHS = {
+    "list": "/api/voices/list?limit=100",
+    "agent": "/api/voices/agent/agent_0000001",
+    "public": "/api/voices/public/p0000001"
+}
+
+async def poll(bench: Any, path: str, requests: int, revalidate: bool) -> Dict[str, Any]:
+    headers = {"accept-encoding": "gzip"}
+    first = await bench.client.get(path, headers=headers)
+    etag = first.headers.get("etag")
+    if revalidate and etag:
+        headers["if-none-match"] = etag
+
+    latencies: List[float] = []
+    wire_bytes = 0
+    statuses: Dict[str, int] = {}
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = await bench.client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        # httpx가 gzip을 풀기 전 바이트 수 (실제 전송량)
+        wire_bytes += int(response.headers.get("content-length", len(response.content)))
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    return {
+        "revalidate": revalidate,
+        "status_codes": statuses,
+        "bytes_per_poll": round(wire_bytes / requests, 1),
+        "latency_ms": summarize(latencies)
+    }
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    async with running_app(
+        supabase=UpstreamConfig(latency_ms=args.supabase_latency_ms),
+        rows=args.rows,
+        seed=args.seed
+    ) as bench:
+        for name in args.paths:
+            for revalidate in (False, True):
+                result = {"path": name, **await poll(bench, PATHS[name], args.requests, revalidate)}
+                results.append(result)
+                print(
+                    f"{name:<7} if-none-match={'yes' if revalidate else 'no ':<3} "
+                    f"status={result['status_codes']} bytes/poll={result['bytes_per_poll']:>8} "
+                    f"mean={result['latency_ms']['mean']:.3f}ms p99={result['latency_ms']['p99']:.3f}ms"
+                )
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ETag / 304 폴링 비용 비교")
+    parser.add_argument("--paths", nargs="*", default=list(PATHS), choices=list(PATHS))
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--supabase-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+대화 WebSocket 프록시 확인 (로컬 mock ElevenLabs 에코 WebSocket 서버 + 실제 uvicorn)
+
+    cd backend
+    python -m benchmarks.conversation_proxy
+
+1. echo: 동시 세션 N개가 메시지 M개씩 왕복. 에코 서버 직접 연결 vs 프록시 경유 왕복 지연 비교
+2. backpressure: 클라이언트가 읽지 않는 동안 upstream이 큰 메시지를 쏟아낼 때
+   프록시 메모리가 버퍼 크기로 제한되는지 (최대 RSS 증가량) + 이후 메시지 유실 없는지
+3. idle: 양방향 메시지가 없으면 CONVERSATION_PROXY_IDLE_TIMEOUT 후 종료되는지
+4. errors: 없는 public_id → 4404, 프록시 비활성화 → 핸드셰이크 거부
+5. guards: 수락 전 Origin 허용 목록(403)·Signed URL 레이트 리밋(429 + Retry-After),
+   발급 중 signed_url admission 묶음이 가득 차면 1013으로 종료되는지
+"""
+
+import os
+import sys
+import json
+import base64
+import time
+import asyncio
+import argparse
+import resource
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed, InvalidStatus
+
+from app.services.conversation_proxy import set_conversation_proxy
+from benchmarks.harness import BenchApp, UpstreamConfig, running_app, serving, summarize
+from benchmarks.mock_elevenlabs import MockElevenLabsServer
+
+@asynccontextmanager
+async def ws_serving(bench: BenchApp) -> AsyncIterator[str]:
+    """실제 uvicorn으로 서비스 → 프록시 WebSocket base URL"""
+    async with serving(bench) as base_url:
+        yield base_url.replace("http://", "ws://", 1) + "/api/conversations/ws"
+
+@asynccontextmanager
+async def proxied(env: Dict[str, str], rows: int = 100) -> AsyncIterator[Any]:
+    """mock 에코 서버 + 프록시를 켠 앱 (Signed URL이 에코 서버를 가리키도록)"""
+    set_conversation_proxy(None)
+    async with MockElevenLabsServer() as upstream:
+        async with running_app(rows=rows, env={"CONVERSATION_PROXY_ENABLED": "true", **env}) as bench:
+            bench.elevenlabs.signed_url_base = upstream.ws_url
+            async with ws_serving(bench) as base_url:
+                yield bench, upstream, base_url
+    set_conversation_proxy(None)
+
+def _rss_mb() -> float:
+    # Linux ru_maxrss는 KB 단위 (프로세스 최대 RSS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+async def _round_trips(url: str, messages: int, payload: str, latencies: List[float]) -> None:
+    async with connect(url, max_size=None) as ws:
+        await ws.recv()  # conversation_initiation_metadata
+        for _ in range(messages):
+            started = time.perf_counter()
+            await ws.send(payload)
+            await ws.recv()
+            latencies.append(time.perf_counter() - started)
+
+async def echo(args: argparse.Namespace) -> Dict[str, Any]:
+    audio = base64.b64encode(os.urandom(args.message_bytes))[:args.message_bytes].decode()
+    payload = json.dumps({"user_audio_chunk": audio})
+    results: Dict[str, Any] = {}
+    # 세션이 한꺼번에 연결하므로 발급 admission 대기열이 넘치지 않도록 (guards 시나리오에서 따로 확인)
+    async with proxied({"ADMISSION_SIGNED_URL_MAX_QUEUE": str(args.sessions)}) as (bench, upstream, base_url):
+        public_id = bench.rows[0]["public_id"]
+        targets = {
+            "direct": f"{upstream.ws_url}/v1/convai/conversation?agent_id=direct",
+            "proxy": f"{base_url}/{public_id}"
+        }
+        for name, url in targets.items():
+            latencies: List[float] = []
+            started = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(_round_trips(url, args.messages, payload, latencies) for _ in range(args.sessions)),
+                return_exceptions=True
+            )
+            elapsed = time.perf_counter() - started
+            errors = [type(outcome).__name__ for outcome in outcomes if isinstance(outcome, BaseException)]
+            results[name] = {
+                "sessions": args.sessions,
+                "round_trips": len(latencies),
+                "errors": len(errors),
+                "round_trip_per_s": round(len(latencies) / elapsed, 1),
+                "latency_ms": summarize(latencies)
+            }
+        health = (await bench.client.get("/health")).json()
+        results["proxy_stats"] = health.get("conversation_proxy")
+        results["upstream"] = upstream.stats()
+    return results
+
+async def backpressure(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {"CONVERSATION_PROXY_BUFFER_MESSAGES": str(args.buffer_messages), "CONVERSATION_PROXY_SEND_TIMEOUT": "30"}
+    async with proxied(env) as (bench, upstream, base_url):
+        url = f"{base_url}/{bench.rows[0]['public_id']}"
+        rss_before = _rss_mb()
+        async with connect(url, max_size=None, max_queue=4) as ws:
+            await ws.recv()
+            await ws.send(json.dumps({"type": "flood", "count": args.flood_count, "size": args.flood_bytes}))
+            # 읽지 않고 대기 → 클라이언트·프록시·upstream 버퍼가 차고 upstream 전송이 멈춰야 함
+            await asyncio.sleep(args.stall_seconds)
+            stalled_rss = _rss_mb()
+            received = 0
+            while received < args.flood_count:
+                await ws.recv()
+                received += 1
+        await asyncio.sleep(0.2)
+        total_mb = args.flood_count * args.flood_bytes / 1024 / 1024
+        return {
+            "flood_total_mb": round(total_mb, 1),
+            "buffer_messages": args.buffer_messages,
+            "max_rss_growth_while_stalled_mb": round(stalled_rss - rss_before, 1),
+            "received": received,
+            "lost": args.flood_count - received,
+            "upstream_flood_seconds": [round(value, 2) for value in upstream.flood_seconds],
+            "stall_seconds": args.stall_seconds,
+            "proxy_stats": (await bench.client.get("/health")).json().get("conversation_proxy")
+        }
+
+async def idle(args: argparse.Namespace) -> Dict[str, Any]:
+    async with proxied({"CONVERSATION_PROXY_IDLE_TIMEOUT": str(args.idle_timeout)}) as (bench, upstream, base_url):
+        started = time.perf_counter()
+        async with connect(f"{base_url}/{bench.rows[0]['public_id']}") as ws:
+            await ws.recv()
+            try:
+                await ws.recv()
+            except ConnectionClosed as e:
+                return {
+                    "idle_timeout_s": args.idle_timeout,
+                    "closed_after_s": round(time.perf_counter() - started, 3),
+                    "close_code": e.rcvd.code if e.rcvd else None,
+                    "close_reason": e.rcvd.reason if e.rcvd else None
+                }
+    return {"error": "세션이 종료되지 않았습니다."}
+
+async def errors(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    async with proxied({}) as (bench, upstream, base_url):
+        async with connect(f"{base_url}/unknown_public_id") as ws:
+            try:
+                await ws.recv()
+            except ConnectionClosed as e:
+                results["unknown_public_id"] = {"code": e.rcvd.code, "reason": e.rcvd.reason}
+    set_conversation_proxy(None)
+    async with running_app(rows=10, env={"CONVERSATION_PROXY_ENABLED": "false"}) as bench:
+        async with ws_serving(bench) as base_url:
+            try:
+                async with connect(f"{base_url}/{bench.rows[0]['public_id']}"):
+                    results["disabled"] = "connected"
+            except InvalidStatus as e:
+                results["disabled"] = {"handshake_status": e.response.status_code}
+    set_conversation_proxy(None)
+    return results
+
+async def _handshake(url: str, origin: Optional[str] = None) -> Any:
+    """연결 결과: ("open", 첫 메시지 수신 여부) / ("closed", 종료 코드) / ("rejected", HTTP 상태, Retry-After)"""
+    try:
+        async with connect(url, origin=origin) as ws:
+            try:
+                await ws.recv()
+                return ("open", True)
+            except ConnectionClosed as e:
+                return ("closed", e.rcvd.code if e.rcvd else None)
+    except InvalidStatus as e:
+        return ("rejected", e.response.status_code, e.response.headers.get("Retry-After"))
+
+async def guards(args: argparse.Namespace) -> Dict[str, Any]:
+    checks: Dict[str, bool] = {}
+    results: Dict[str, Any] = {}
+    env = {"RATE_LIMIT_ENABLED": "true", "RATE_LIMIT_SIGNED_URL_IP": "1000/1:1000", "RATE_LIMIT_SIGNED_URL_PUBLIC_ID": "2/60:2"}
+    async with proxied(env) as (bench, upstream, base_url):
+        url = f"{base_url}/{bench.rows[0]['public_id']}"
+        results["allowed_origin"] = await _handshake(url, origin="http://localhost:3000")
+        results["disallowed_origin"] = await _handshake(url, origin="https://evil.example")
+        results["no_origin"] = await _handshake(url)
+        results["public_id_limited"] = await _handshake(url)
+        results["other_public_id"] = await _handshake(f"{base_url}/{bench.rows[1]['public_id']}")
+        checks["allowed_origin_connects"] = results["allowed_origin"] == ("open", True)
+        checks["disallowed_origin_403"] = results["disallowed_origin"][:2] == ("rejected", 403)
+        checks["no_origin_connects"] = results["no_origin"] == ("open", True)
+        # 허용 출처·Origin 없음 연결이 버킷 2개를 씀 (거절된 출처는 레이트 리밋 전에 거절)
+        checks["public_id_rate_limited_429"] = (
+            results["public_id_limited"][:2] == ("rejected", 429) and results["public_id_limited"][2] is not None
+        )
+        checks["other_public_id_not_limited"] = results["other_public_id"] == ("open", True)
+
+    set_conversation_proxy(None)
+    env = {"ADMISSION_SIGNED_URL_LIMIT": "1", "ADMISSION_SIGNED_URL_MAX_QUEUE": "0"}
+    async with MockElevenLabsServer() as upstream:
+        async with running_app(
+            rows=10, env={"CONVERSATION_PROXY_ENABLED": "true", **env}, elevenlabs=UpstreamConfig(latency_ms=300)
+        ) as bench:
+            bench.elevenlabs.signed_url_base = upstream.ws_url
+            async with ws_serving(bench) as base_url:
+                outcomes = await asyncio.gather(
+                    *(_handshake(f"{base_url}/{row['public_id']}") for row in bench.rows[:4])
+                )
+                admission = (await bench.client.get("/health")).json()["admission"]["signed_url"]
+    set_conversation_proxy(None)
+    results["admission_outcomes"] = outcomes
+    results["admission_shed"] = admission["shed"]
+    checks["admission_one_connects"] = outcomes.count(("open", True)) == 1
+    checks["admission_rest_closed_1013"] = outcomes.count(("closed", 1013)) == 3
+    return {"checks": checks, "ok": all(checks.values()), **results}
+
+SCENARIOS = {"echo": echo, "backpressure": backpressure, "idle": idle, "errors": errors, "guards": guards}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="대화 WebSocket 프록시 지연 / 역압 / 유휴 종료 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--sessions", type=int, default=200, help="echo: 동시 세션 수")
+    parser.add_argument("--messages", type=int, default=20, help="echo: 세션당 왕복 메시지 수")
+    parser.add_argument("--message-bytes", type=int, default=3200, help="echo: 메시지 크기 (기본 100ms 16kHz PCM base64 근사)")
+    parser.add_argument("--flood-count", type=int, default=2000)
+    parser.add_argument("--flood-bytes", type=int, default=64 * 1024)
+    parser.add_argument("--buffer-messages", type=int, default=32)
+    parser.add_argument("--stall-seconds", type=float, default=2.0)
+    parser.add_argument("--idle-timeout", type=float, default=0.5)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+ElevenLabs 커넥션 풀 / 발급 대기열 동작 확인 (로컬 mock HTTP 서버)
+
+    cd backend
+    python -m benchmarks.elevenlabs_pool --burst 200 --latency-ms 50
+
+같은 burst를 설정별로 보내 열린 TCP 연결 수, upstream 최대 동시 요청 수,
+대기열 timeout 수, 전체 소요 시간을 비교합니다.
+--hang-rate를 주면 응답하지 않는 요청이 read timeout으로 끊기는지도 확인할 수 있습니다.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import summarize
+from benchmarks.mock_elevenlabs import MockElevenLabsServer
+
+# (이름, 환경변수) — 기본값 대비 제한을 사실상 없앤 설정과 비교
+PROFILES: Dict[str, Dict[str, str]] = {
+    "unbounded": {
+        "ELEVENLABS_MAX_CONNECTIONS": "1000",
+        "ELEVENLABS_MAX_KEEPALIVE": "1000",
+        "ELEVENLABS_MAX_CONCURRENT_MINTS": "1000"
+    },
+    "default": {},
+    "tight": {
+        "ELEVENLABS_MAX_CONNECTIONS": "8",
+        "ELEVENLABS_MAX_KEEPALIVE": "8",
+        "ELEVENLABS_MAX_CONCURRENT_MINTS": "8",
+        "ELEVENLABS_MINT_QUEUE_TIMEOUT": "0.5"
+    }
+}
+
+async def run_profile(name: str, env: Dict[str, str], args: argparse.Namespace) -> Dict[str, Any]:
+    from app.core.limiter import QueueTimeoutError
+    from app.services.elevenlabs import ElevenLabsService
+
+    async with MockElevenLabsServer(latency_ms=args.latency_ms, hang_rate=args.hang_rate) as server:
+        overrides = {
+            "ELEVENLABS_API_KEY": "mock-key",
+            "ELEVENLABS_BASE_URL": server.url,
+            "ELEVENLABS_READ_TIMEOUT": str(args.read_timeout),
+            **env
+        }
+        previous = {key: os.environ.get(key) for key in overrides}
+        os.environ.update(overrides)
+        try:
+            service = ElevenLabsService()
+            # 풀/timeout 설정은 클라이언트 생성 시점에 읽으므로 환경변수 복원 전에 생성
+            service.client
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        latencies: List[float] = []
+        outcomes: Dict[str, int] = {}
+
+        async def mint(i: int) -> None:
+            started = time.perf_counter()
+            try:
+                await service.get_signed_url(f"agent_{i % args.agents:04d}")
+                outcome = "ok"
+            except QueueTimeoutError as e:
+                outcome = f"queue_{e.reason}"
+            except Exception as e:
+                outcome = "timeout" if "timeout" in str(e).lower() else "error"
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(mint(i) for i in range(args.burst)))
+        duration = time.perf_counter() - started
+        pool = service.stats()
+        await service.aclose()
+
+        return {
+            "profile": name,
+            "env": env,
+            "burst": args.burst,
+            "duration_s": round(duration, 3),
+            "outcomes": outcomes,
+            "latency_ms": summarize(latencies),
+            "upstream": server.stats(),
+            "service": pool
+        }
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    results = []
+    for name in args.profiles:
+        result = await run_profile(name, PROFILES[name], args)
+        results.append(result)
+        print(
+            f"{name:<10} duration={result['duration_s']:.2f}s outcomes={result['outcomes']} "
+            f"p99={result['latency_ms']['p99']:.1f}ms connections={result['upstream']['connections_opened']} "
+            f"upstream_max_in_flight={result['upstream']['max_in_flight']} "
+            f"avg_queue_wait={result['service']['mint_queue']['avg_queue_wait_ms']}ms"
+        )
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="ElevenLabs 커넥션 풀 / 발급 대기열 비교")
+    parser.add_argument("--profiles", nargs="*", default=list(PROFILES), choices=list(PROFILES))
+    parser.add_argument("--burst", type=int, default=200, help="동시에 보낼 발급 요청 수")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="응답하지 않는 요청 비율")
+    parser.add_argument("--read-timeout", type=float, default=2.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
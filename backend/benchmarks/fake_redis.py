@@ -0,0 +1,408 @@
+"""
+로컬 fake Redis 서버 (실제 TCP 소켓, RESP2)
+
+RedisClient / RedisBackend를 실제 네트워크 경로로 확인할 때 사용합니다.
+문자열·해시·만료·TIME 등 앱이 쓰는 명령만 구현하며, Lua는 실행하지 않고
+앱의 스크립트(sha1)를 같은 동작의 파이썬 함수로 대신 실행합니다.
+
+    async with FakeRedisServer() as server:
+        client = RedisClient(port=server.port)
+
+TLS(rediss://)는 self_signed_tls()로 만든 인증서를 ssl_context로 넘깁니다.
+"""
+
+import os
+import ssl
+import math
+import time
+import asyncio
+import datetime
+import ipaddress
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.redis import RedisError, Script, read_reply
+
+ScriptFunc = Callable[["FakeRedisServer", List[bytes], List[bytes]], Any]
+
+def _reply(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RedisError):
+        return b"-" + str(value).encode() + b"\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % int(value)
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str) and value in ("OK", "PONG", "QUEUED"):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, (str, float)):
+        value = str(value).encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, (list, tuple)):
+        return b"*%d\r\n" % len(value) + b"".join(_reply(item) for item in value)
+    raise TypeError(f"지원하지 않는 응답 타입: {type(value)}")
+
+def _token_bucket(server: "FakeRedisServer", keys: List[bytes], args: List[bytes]) -> List[Any]:
+    """app.core.ratelimit.TOKEN_BUCKET_SCRIPT와 같은 계산 (모두 허용일 때만 전부 차감)"""
+    cost = float(args[0])
+    now = time.time()
+    available: List[float] = []
+    for index, key in enumerate(keys):
+        rate, burst = float(args[1 + index * 2]), float(args[2 + index * 2])
+        state = server.get(key) or {}
+        if b"t" in state:
+            tokens = min(burst, float(state[b"t"]) + max(0.0, now - float(state[b"u"])) * rate)
+        else:
+            tokens = burst
+        if tokens < cost:
+            return [index + 1, repr((cost - tokens) / rate)]
+        available.append(tokens)
+    for index, (key, tokens) in enumerate(zip(keys, available)):
+        rate, burst = float(args[1 + index * 2]), float(args[2 + index * 2])
+        state = server.hash(key)
+        state[b"t"], state[b"u"] = repr(tokens - cost).encode(), repr(now).encode()
+        server.expire(key, (math.ceil(burst / rate * 1000) + 1000) / 1000)
+    return [0, "0"]
+
+def _track_hot(server: "FakeRedisServer", hot: bytes, member: bytes, max_size: int) -> None:
+    """app.database.shared_cache의 track_hot(Lua)과 같은 동작"""
+    score = server._cmd_zincrby(hot, b"1", member)
+    if server._cmd_zcard(hot) > max_size:
+        server._cmd_zrem(hot, member)
+        server._cmd_zremrangebyrank(hot, b"0", str(-max_size).encode())
+        server._cmd_zadd(hot, score, member)
+
+def _shared_cache_track_hot(server: "FakeRedisServer", keys: List[bytes], args: List[bytes]) -> int:
+    _track_hot(server, keys[0], args[0], int(args[1]))
+    return 1
+
+def _shared_cache_get_track_hot(server: "FakeRedisServer", keys: List[bytes], args: List[bytes]) -> Any:
+    value = server._cmd_get(keys[0])
+    if value and value[0] == 1:
+        _track_hot(server, keys[1], args[0], int(args[1]))
+    return [value, server._cmd_pttl(keys[0])]
+
+class FakeRedisServer:
+    """RESP2 fake 서버 (PING, GET, SET, MGET, DEL, EXISTS, INCR, PEXPIRE, PTTL, HGET/HSET/HMGET,
+    ZADD/ZINCRBY/ZREM/ZCARD/ZSCORE/ZREVRANGE/ZREMRANGEBYRANK, TIME, FLUSHALL, SCRIPT LOAD, EVAL, EVALSHA)
+
+    - latency_ms: 명령마다 응답 지연
+    - fail: True면 모든 명령에 에러 응답 (장애 시 동작 확인용)
+    """
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, ssl_context: Optional[ssl.SSLContext] = None) -> None:
+        self.host = "127.0.0.1"
+        self.port = port
+        self.ssl_context = ssl_context
+        self.latency_ms = latency_ms
+        self.fail = False
+        self._data: Dict[bytes, Any] = {}
+        self._expires: Dict[bytes, float] = {}
+        self._scripts: Dict[str, ScriptFunc] = {}
+        self._loaded: Set[str] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.commands = 0
+        self.connections = 0
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self.register_script(_ratelimit_script(), _token_bucket)
+        track_hot_script, get_track_hot_script = _shared_cache_scripts()
+        self.register_script(track_hot_script, _shared_cache_track_hot)
+        self.register_script(get_track_hot_script, _shared_cache_get_track_hot)
+
+    def register_script(self, script: Script, func: ScriptFunc) -> None:
+        """앱의 Lua 스크립트 sha → 파이썬 구현"""
+        self._scripts[script.sha] = func
+
+    # === 저장소 ===
+
+    def _alive(self, key: bytes) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return key in self._data
+
+    def get(self, key: bytes) -> Any:
+        return self._data[key] if self._alive(key) else None
+
+    def hash(self, key: bytes) -> Dict[bytes, bytes]:
+        if not self._alive(key) or not isinstance(self._data[key], dict):
+            self._data[key] = {}
+        return self._data[key]
+
+    def expire(self, key: bytes, seconds: float) -> None:
+        self._expires[key] = time.monotonic() + seconds
+
+    # === 명령 ===
+
+    def execute(self, command: List[bytes]) -> Any:
+        self.commands += 1
+        if self.fail:
+            return RedisError("ERR fake failure")
+        name = command[0].upper().decode()
+        args = command[1:]
+        handler = getattr(self, f"_cmd_{name.lower()}", None)
+        if handler is None:
+            return RedisError(f"ERR unknown command '{name}'")
+        try:
+            return handler(*args)
+        except (TypeError, ValueError, IndexError) as e:
+            return RedisError(f"ERR {name}: {e}")
+
+    def _cmd_ping(self, *_: bytes) -> str:
+        return "PONG"
+
+    def _cmd_select(self, _: bytes) -> str:
+        return "OK"
+
+    def _cmd_auth(self, *_: bytes) -> str:
+        return "OK"
+
+    def _cmd_flushall(self, *_: bytes) -> str:
+        self._data.clear()
+        self._expires.clear()
+        return "OK"
+
+    def _cmd_time(self) -> List[bytes]:
+        now = time.time()
+        return [str(int(now)).encode(), str(int((now % 1) * 1_000_000)).encode()]
+
+    def _cmd_get(self, key: bytes) -> Any:
+        value = self.get(key)
+        return value if value is None or isinstance(value, bytes) else RedisError("WRONGTYPE")
+
+    def _cmd_mget(self, *keys: bytes) -> List[Any]:
+        return [self._cmd_get(key) for key in keys]
+
+    def _cmd_set(self, key: bytes, value: bytes, *options: bytes) -> Any:
+        opts = [option.upper() for option in options]
+        if b"NX" in opts and self._alive(key):
+            return None
+        self._data[key] = value
+        self._expires.pop(key, None)
+        for flag, scale in ((b"PX", 1000), (b"EX", 1)):
+            if flag in opts:
+                self.expire(key, int(options[opts.index(flag) + 1]) / scale)
+        return "OK"
+
+    def _cmd_del(self, *keys: bytes) -> int:
+        removed = 0
+        for key in keys:
+            if self._alive(key):
+                del self._data[key]
+                self._expires.pop(key, None)
+                removed += 1
+        return removed
+
+    def _cmd_exists(self, *keys: bytes) -> int:
+        return sum(1 for key in keys if self._alive(key))
+
+    def _cmd_incr(self, key: bytes) -> int:
+        value = int(self.get(key) or 0) + 1
+        self._data[key] = str(value).encode()
+        return value
+
+    def _cmd_pexpire(self, key: bytes, milliseconds: bytes) -> int:
+        if not self._alive(key):
+            return 0
+        self.expire(key, int(milliseconds) / 1000)
+        return 1
+
+    def _cmd_pttl(self, key: bytes) -> int:
+        if not self._alive(key):
+            return -2
+        expires_at = self._expires.get(key)
+        return -1 if expires_at is None else int((expires_at - time.monotonic()) * 1000)
+
+    def _cmd_hset(self, key: bytes, *pairs: bytes) -> int:
+        state = self.hash(key)
+        added = 0
+        for field, value in zip(pairs[::2], pairs[1::2]):
+            added += field not in state
+            state[field] = value
+        return added
+
+    def _cmd_hget(self, key: bytes, field: bytes) -> Any:
+        return self.hash(key).get(field) if self._alive(key) else None
+
+    def _cmd_hmget(self, key: bytes, *fields: bytes) -> List[Any]:
+        state = self._data.get(key) if self._alive(key) else None
+        return [state.get(field) if isinstance(state, dict) else None for field in fields]
+
+    def _cmd_zincrby(self, key: bytes, increment: bytes, member: bytes) -> bytes:
+        scores = self._data.get(key) if self._alive(key) else None
+        if not isinstance(scores, dict):
+            scores = self._data[key] = {}
+        scores[member] = scores.get(member, 0.0) + float(increment)
+        return repr(scores[member]).encode()
+
+    def _zset(self, key: bytes) -> Optional[Dict[bytes, float]]:
+        scores = self._data.get(key) if self._alive(key) else None
+        return scores if isinstance(scores, dict) else None
+
+    def _cmd_zadd(self, key: bytes, *pairs: bytes) -> int:
+        scores = self._zset(key)
+        if scores is None:
+            scores = self._data[key] = {}
+        added = 0
+        for score, member in zip(pairs[::2], pairs[1::2]):
+            added += member not in scores
+            scores[member] = float(score)
+        return added
+
+    def _cmd_zcard(self, key: bytes) -> int:
+        scores = self._zset(key)
+        return len(scores) if scores is not None else 0
+
+    def _cmd_zscore(self, key: bytes, member: bytes) -> Any:
+        scores = self._zset(key)
+        return repr(scores[member]).encode() if scores is not None and member in scores else None
+
+    def _cmd_zrem(self, key: bytes, *members: bytes) -> int:
+        scores = self._zset(key)
+        if scores is None:
+            return 0
+        return sum(scores.pop(member, None) is not None for member in members)
+
+    def _cmd_zremrangebyrank(self, key: bytes, start: bytes, stop: bytes) -> int:
+        scores = self._zset(key)
+        if scores is None:
+            return 0
+        # 점수 오름차순, 같은 점수는 멤버 순 (Redis와 동일)
+        members = sorted(scores.items(), key=lambda item: (item[1], item[0]))
+        begin, end = int(start), int(stop)
+        begin = max(0, len(members) + begin if begin < 0 else begin)
+        end = len(members) + end if end < 0 else end
+        removed = members[begin:end + 1]
+        for member, _ in removed:
+            del scores[member]
+        return len(removed)
+
+    def _cmd_zrevrange(self, key: bytes, start: bytes, stop: bytes, *options: bytes) -> List[bytes]:
+        scores = self._data.get(key) if self._alive(key) else None
+        if not isinstance(scores, dict):
+            return []
+        # 점수 내림차순, 같은 점수는 멤버 역순 (Redis와 동일)
+        members = sorted(scores.items(), key=lambda item: (item[1], item[0]), reverse=True)
+        begin, end = int(start), int(stop)
+        end = len(members) + end if end < 0 else end
+        selected = members[begin:end + 1]
+        if any(option.upper() == b"WITHSCORES" for option in options):
+            return [value for member, score in selected for value in (member, repr(score).encode())]
+        return [member for member, _ in selected]
+
+    def _cmd_script(self, subcommand: bytes, *args: bytes) -> Any:
+        if subcommand.upper() == b"LOAD":
+            sha = Script(args[0].decode()).sha
+            if sha not in self._scripts:
+                return RedisError("ERR fake server cannot run this script")
+            self._loaded.add(sha)
+            return sha.encode()
+        if subcommand.upper() == b"FLUSH":
+            self._loaded.clear()
+            return "OK"
+        return RedisError("ERR unknown SCRIPT subcommand")
+
+    def _run_script(self, sha: str, numkeys: bytes, args: Tuple[bytes, ...]) -> Any:
+        count = int(numkeys)
+        return self._scripts[sha](self, list(args[:count]), list(args[count:]))
+
+    def _cmd_evalsha(self, sha: bytes, numkeys: bytes, *args: bytes) -> Any:
+        sha_text = sha.decode()
+        if sha_text not in self._loaded:
+            return RedisError("NOSCRIPT No matching script. Please use EVAL.")
+        return self._run_script(sha_text, numkeys, args)
+
+    def _cmd_eval(self, source: bytes, numkeys: bytes, *args: bytes) -> Any:
+        sha = Script(source.decode()).sha
+        if sha not in self._scripts:
+            return RedisError("ERR fake server cannot run this script")
+        self._loaded.add(sha)
+        return self._run_script(sha, numkeys, args)
+
+    # === 서버 ===
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                command = await read_reply(reader)
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000)
+                writer.write(_reply(self.execute(command)))
+                await writer.drain()
+        except (RedisError, asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    @property
+    def url(self) -> str:
+        scheme = "rediss" if self.ssl_context is not None else "redis"
+        return f"{scheme}://{self.host}:{self.port}/0"
+
+    async def start(self) -> "FakeRedisServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, ssl=self.ssl_context)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeRedisServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"commands": self.commands, "connections": self.connections, "keys": len(self._data)}
+
+def self_signed_tls(directory: str, host: str = "127.0.0.1") -> Tuple[ssl.SSLContext, str]:
+    """host용 자체 서명 인증서 → (서버 SSLContext, 클라이언트가 신뢰할 CA 파일 경로)"""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.IPAddress(ipaddress.ip_address(host))]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = os.path.join(directory, "redis.crt")
+    key_path = os.path.join(directory, "redis.key")
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ))
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert_path, key_path)
+    return context, cert_path
+
+def _ratelimit_script() -> Script:
+    from app.core.ratelimit import TOKEN_BUCKET_SCRIPT
+    return TOKEN_BUCKET_SCRIPT
+
+def _shared_cache_scripts() -> Tuple[Script, Script]:
+    from app.database.shared_cache import GET_TRACK_HOT_SCRIPT, TRACK_HOT_SCRIPT
+    return TRACK_HOT_SCRIPT, GET_TRACK_HOT_SCRIPT
@@ -0,0 +1,403 @@
+"""
+벤치마크용 인프로세스 가짜 upstream (Supabase PostgREST, ElevenLabs)
+
+- FakePostgrest: httpx 트랜스포트로 동작하는 최소 PostgREST 구현.
+  실제 supabase/postgrest 클라이언트와 VoiceRepository 쿼리 코드를 그대로 거칩니다.
+  issue_token()으로 만든 사용자 토큰은 /auth/v1/user로 확인되고, messages에 RLS(조회: 로그인 사용자만,
+  INSERT: auth.uid() = sender_id), message_type CHECK 제약, 만료 토큰 거절(PGRST301)을 적용합니다.
+- FakeElevenLabs: AsyncElevenLabs 중 앱이 사용하는 메서드만 흉내 낸 스텁.
+- 둘 다 지연 시간(latency/jitter)과 에러율을 주입할 수 있습니다.
+"""
+
+import json
+import time
+import uuid
+import base64
+import random
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+Row = Dict[str, Any]
+Predicate = Callable[[Row], bool]
+
+# messages.message_type CHECK 제약
+MESSAGE_TYPES = ("user_text", "ai_text", "ai_voice", "system")
+
+class FakeUpstreamError(Exception):
+    """주입된 upstream 실패"""
+
+class FaultInjector:
+    """호출마다 지연(latency ± jitter)을 주고 error_rate 확률로 실패 여부 결정"""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.calls = 0
+        self.errors = 0
+
+    async def __call__(self) -> bool:
+        """지연 후 실패해야 하면 True"""
+        self.calls += 1
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        else:
+            await asyncio.sleep(0)
+        if self.error_rate and self._random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms,
+            "error_rate": self.error_rate
+        }
+
+def make_voice_rows(count: int, users: int = 10, seed: int = 0) -> List[Row]:
+    """voices 테이블 가짜 행 생성 (created_at 최신순으로 정렬된 상태)"""
+    rng = random.Random(seed)
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    rows: List[Row] = []
+    for i in range(count):
+        rows.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "user_id": f"user-{i % users:04d}",
+            "voice_id": f"voice_{i:07d}",
+            "agent_id": f"agent_{i:07d}",
+            "file_name": f"sample_{i}.mp3",
+            "nickname": f"음성 {i}" if i % 3 else None,
+            "public_id": f"p{i:07d}",
+            "created_at": (started + timedelta(seconds=i)).isoformat(timespec="microseconds")
+        })
+    rows.reverse()
+    return rows
+
+# === PostgREST 필터 파싱 ===
+
+def _split_top_level(raw: str) -> List[str]:
+    """괄호/따옴표 밖의 쉼표로 분리"""
+    parts: List[str] = []
+    depth = 0
+    quoted = False
+    escaped = False
+    current: List[str] = []
+    for char in raw:
+        if quoted:
+            current.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                quoted = False
+            continue
+        if char == '"':
+            quoted = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return json.loads(value)
+    return value
+
+def _parse_operator(column: str, expression: str) -> Predicate:
+    """column + "op.value" → 행 조건 함수"""
+    op, _, value = expression.partition(".")
+
+    if op == "not":
+        inner = _parse_operator(column, value)
+        return lambda row: not inner(row)
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}[value]
+        return lambda row: row.get(column) is expected
+    if op == "in":
+        values = {_unquote(item) for item in _split_top_level(value[1:-1])}
+        return lambda row: row.get(column) is not None and str(row.get(column)) in values
+
+    value = _unquote(value)
+    compare = {
+        "eq": lambda a, b: a == b,
+        "neq": lambda a, b: a != b,
+        "lt": lambda a, b: a < b,
+        "lte": lambda a, b: a <= b,
+        "gt": lambda a, b: a > b,
+        "gte": lambda a, b: a >= b
+    }[op]
+    return lambda row: row.get(column) is not None and compare(str(row.get(column)), value)
+
+def _parse_logic(expression: str, conjunction: bool) -> Predicate:
+    """or=(a.eq.1,and(b.lt.2,c.eq.3)) 형식 파싱"""
+    predicates: List[Predicate] = []
+    for item in _split_top_level(expression[1:-1]):
+        if item.startswith("and("):
+            predicates.append(_parse_logic(item[3:], True))
+        elif item.startswith("or("):
+            predicates.append(_parse_logic(item[2:], False))
+        else:
+            column, _, rest = item.partition(".")
+            predicates.append(_parse_operator(column, rest))
+    if conjunction:
+        return lambda row: all(predicate(row) for predicate in predicates)
+    return lambda row: any(predicate(row) for predicate in predicates)
+
+class FakePostgrest(httpx.AsyncBaseTransport):
+    """supabase-py가 보내는 PostgREST 요청을 메모리 테이블로 처리하는 httpx 트랜스포트
+
+    지원 범위는 이 앱이 쓰는 기능(select/eq/in/or/and/not.is/order/limit/offset,
+    count=exact, HEAD, 다건 INSERT/ignore-duplicates)에 한정됩니다. voice_stats / voice_user_stats는
+    voices 행에서 매번 계산합니다.
+    """
+
+    def __init__(self, tables: Dict[str, List[Row]], faults: Optional[FaultInjector] = None) -> None:
+        self.tables = tables
+        self.faults = faults or FaultInjector()
+        self.requests_by_table: Dict[str, int] = {}
+        self.inserted_rows = 0
+        # 사용자 액세스 토큰 → auth.users id / 만료 시각(exp)
+        self.users: Dict[str, str] = {}
+        self.expires: Dict[str, float] = {}
+
+    def issue_token(self, user_id: Optional[str] = None, ttl: float = 3600.0) -> str:
+        """가짜 Supabase 액세스 토큰 (HS256 형식이라 앱은 /auth/v1/user로 확인)"""
+        def segment(value: Dict[str, Any]) -> str:
+            return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+        user_id = user_id or str(uuid.uuid4())
+        payload = {"sub": user_id, "role": "authenticated", "aud": "authenticated", "exp": int(time.time() + ttl)}
+        token = ".".join((segment({"alg": "HS256", "typ": "JWT"}), segment(payload), uuid.uuid4().hex))
+        self.users[token] = user_id
+        self.expires[token] = payload["exp"]
+        return token
+
+    def _bearer(self, request: httpx.Request) -> Optional[str]:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        return token if scheme.lower() == "bearer" else None
+
+    def _expired(self, request: httpx.Request) -> bool:
+        token = self._bearer(request)
+        return token in self.expires and self.expires[token] <= time.time()
+
+    def _auth_uid(self, request: httpx.Request) -> Optional[str]:
+        token = self._bearer(request)
+        return self.users.get(token) if token is not None and not self._expired(request) else None
+
+    def _jwt_error(self, request: httpx.Request) -> Optional[httpx.Response]:
+        """만료된 사용자 토큰이면 PostgREST처럼 401 PGRST301"""
+        if not self._expired(request):
+            return None
+        return httpx.Response(401, json={
+            "message": "JWT expired", "code": "PGRST301", "hint": None, "details": None
+        }, request=request)
+
+    def _auth_user(self, request: httpx.Request) -> httpx.Response:
+        """GET /auth/v1/user (토큰의 사용자, 모르는 토큰이면 401)"""
+        user_id = self._auth_uid(request)
+        if user_id is None:
+            return httpx.Response(401, json={"code": "bad_jwt", "message": "invalid JWT"}, request=request)
+        return httpx.Response(200, json={
+            "id": user_id, "aud": "authenticated", "role": "authenticated",
+            "app_metadata": {}, "user_metadata": {}, "created_at": "2025-01-01T00:00:00Z"
+        }, request=request)
+
+    def _rows(self, table: str) -> Optional[List[Row]]:
+        if table in self.tables:
+            return self.tables[table]
+
+        voices = self.tables.get("voices", [])
+        if table == "voice_stats":
+            return [{
+                "id": True,
+                "total_voices": len(voices),
+                "voices_with_agent": sum(1 for row in voices if row.get("agent_id"))
+            }]
+        if table == "voice_user_stats":
+            per_user: Dict[str, Row] = {}
+            for row in voices:
+                stats = per_user.setdefault(row["user_id"], {
+                    "user_id": row["user_id"], "total_voices": 0, "voices_with_agent": 0
+                })
+                stats["total_voices"] += 1
+                stats["voices_with_agent"] += 1 if row.get("agent_id") else 0
+            return list(per_user.values())
+        return None
+
+    def _query(self, rows: List[Row], params: httpx.QueryParams) -> Tuple[List[Row], int]:
+        select = "*"
+        order: List[Tuple[str, bool]] = []
+        limit: Optional[int] = None
+        offset = 0
+        predicates: List[Predicate] = []
+
+        for key, value in params.multi_items():
+            if key == "select":
+                select = value
+            elif key == "order":
+                for item in value.split(","):
+                    column, _, direction = item.partition(".")
+                    order.append((column, direction.startswith("desc")))
+            elif key == "limit":
+                limit = int(value)
+            elif key == "offset":
+                offset = int(value)
+            elif key == "or":
+                predicates.append(_parse_logic(value, False))
+            elif key == "and":
+                predicates.append(_parse_logic(value, True))
+            else:
+                predicates.append(_parse_operator(key, value))
+
+        matched = [row for row in rows if all(predicate(row) for predicate in predicates)]
+        total = len(matched)
+
+        for column, descending in reversed(order):
+            matched.sort(key=lambda row: (row.get(column) is None, str(row.get(column))), reverse=descending)
+
+        end = offset + limit if limit is not None else None
+        matched = matched[offset:end]
+
+        if select != "*":
+            columns = [column.strip() for column in select.split(",") if column.strip()]
+            matched = [{column: row.get(column) for column in columns} for row in matched]
+
+        return matched, total
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if request.url.path.startswith("/auth/v1/"):
+            table = f"auth.{table}"
+        self.requests_by_table[table] = self.requests_by_table.get(table, 0) + 1
+
+        if await self.faults():
+            return httpx.Response(
+                503,
+                json={"message": "injected failure", "code": "PGRST001", "hint": None, "details": None},
+                request=request
+            )
+
+        if table == "auth.user":
+            return self._auth_user(request)
+        if table == "messages":
+            denied = self._jwt_error(request)
+            if denied is not None:
+                return denied
+
+        rows = self._rows(table)
+        if rows is None:
+            return httpx.Response(
+                404,
+                json={"message": f"relation \"{table}\" does not exist", "code": "42P01", "hint": None, "details": None},
+                request=request
+            )
+
+        if request.method == "POST":
+            return self._insert(request, rows)
+
+        if request.method not in ("GET", "HEAD"):
+            return httpx.Response(
+                405,
+                json={"message": f"{request.method} not supported by fake", "code": "FAKE405", "hint": None, "details": None},
+                request=request
+            )
+
+        if table == "messages" and self._auth_uid(request) is None:
+            # RLS SELECT (auth.uid() IS NOT NULL): anon 키로는 행이 보이지 않음
+            rows = []
+        data, total = self._query(rows, request.url.params)
+        headers = {"content-type": "application/json"}
+        if "count=" in request.headers.get("prefer", ""):
+            headers["content-range"] = f"0-{max(len(data) - 1, 0)}/{total}" if data else f"*/{total}"
+
+        body = b"" if request.method == "HEAD" else json.dumps(data).encode()
+        return httpx.Response(200, headers=headers, content=body, request=request)
+
+    def _insert(self, request: httpx.Request, rows: List[Row]) -> httpx.Response:
+        """POST (단건/다건 INSERT). Prefer: resolution=ignore-duplicates면 같은 id는 건너뜀"""
+        payload = json.loads(request.content or b"[]")
+        new_rows = payload if isinstance(payload, list) else [payload]
+        if request.url.path.endswith("/messages"):
+            invalid = [row for row in new_rows if row.get("message_type", "ai_text") not in MESSAGE_TYPES]
+            if invalid:
+                return httpx.Response(400, json={
+                    "message": 'new row for relation "messages" violates check constraint "messages_message_type_check"',
+                    "code": "23514", "hint": None, "details": f"Failing row contains ({invalid[0].get('id')})."
+                }, request=request)
+            user_id = self._auth_uid(request)
+            if any(row.get("sender_id") != user_id or user_id is None for row in new_rows):
+                return httpx.Response(403, json={
+                    "message": 'new row violates row-level security policy for table "messages"',
+                    "code": "42501", "hint": None, "details": None
+                }, request=request)
+        prefer = request.headers.get("prefer", "")
+        if "resolution=ignore-duplicates" in prefer:
+            existing = {row.get("id") for row in rows}
+            new_rows = [row for row in new_rows if row.get("id") not in existing]
+        rows.extend(new_rows)
+        self.inserted_rows += len(new_rows)
+        if "return=minimal" in prefer:
+            return httpx.Response(201, request=request)
+        return httpx.Response(201, json=new_rows, request=request)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.faults.stats(),
+            "requests_by_table": dict(self.requests_by_table),
+            "inserted_rows": self.inserted_rows
+        }
+
+class FakeElevenLabs:
+    """AsyncElevenLabs 스텁 (conversational_ai.conversations.get_signed_url, voices.search)"""
+
+    def __init__(self, faults: Optional[FaultInjector] = None, signed_url_base: str = "wss://api.elevenlabs.fake") -> None:
+        self.faults = faults or FaultInjector()
+        self.minted = 0
+        # 대화 프록시 확인 시 로컬 에코 WebSocket 서버 주소로 변경
+        self.signed_url_base = signed_url_base
+        self.conversational_ai = SimpleNamespace(
+            conversations=SimpleNamespace(get_signed_url=self._get_signed_url)
+        )
+        self.voices = SimpleNamespace(search=self._search)
+
+    async def _get_signed_url(self, agent_id: str, **_: Any) -> SimpleNamespace:
+        if await self.faults():
+            raise FakeUpstreamError("injected ElevenLabs failure")
+        self.minted += 1
+        return SimpleNamespace(
+            signed_url=f"{self.signed_url_base}/v1/convai/conversation?agent_id={agent_id}&token={self.minted}"
+        )
+
+    async def _search(self, page_size: int = 10, **_: Any) -> SimpleNamespace:
+        if await self.faults():
+            raise FakeUpstreamError("injected ElevenLabs failure")
+        return SimpleNamespace(voices=[], has_more=False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.faults.stats(), "minted": self.minted}
@@ -0,0 +1,196 @@
+"""
+벤치마크 공통 하네스: 가짜 upstream을 주입한 create_app()을 인프로세스로 실행
+"""
+
+import os
+import math
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.fakes import FakeElevenLabs, FakePostgrest, FaultInjector, Row, make_voice_rows
+
+# 실제 .env가 없어도 SupabaseManager가 생성되도록 기본값 지정 (요청은 모두 FakePostgrest가 처리)
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://supabase.fake")
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "fake-anon-key")
+os.environ.setdefault("ELEVENLABS_API_KEY", "fake-elevenlabs-key")
+# 부하 테스트는 한 클라이언트에서 보내므로 레이트 리밋은 기본 해제 (--env RATE_LIMIT_ENABLED=true로 측정 가능)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+@dataclass
+class UpstreamConfig:
+    """가짜 upstream 지연/에러 설정"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    def injector(self, seed: Optional[int]) -> FaultInjector:
+        return FaultInjector(self.latency_ms, self.jitter_ms, self.error_rate, seed=seed)
+
+@dataclass
+class BenchApp:
+    """실행 중인 벤치마크 대상 앱과 가짜 upstream"""
+    app: Any
+    client: httpx.AsyncClient
+    rows: List[Row]
+    supabase: FakePostgrest
+    elevenlabs: FakeElevenLabs
+    env: Dict[str, str] = field(default_factory=dict)
+
+    def upstream_stats(self) -> Dict[str, Any]:
+        return {"supabase": self.supabase.stats(), "elevenlabs": self.elevenlabs.stats()}
+
+@asynccontextmanager
+async def _env(overrides: Dict[str, str]) -> AsyncIterator[None]:
+    previous = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+@asynccontextmanager
+async def running_app(
+    supabase: Optional[UpstreamConfig] = None,
+    elevenlabs: Optional[UpstreamConfig] = None,
+    rows: int = 1000,
+    env: Optional[Dict[str, str]] = None,
+    seed: Optional[int] = 0,
+    postgrest: Optional[FakePostgrest] = None
+) -> AsyncIterator[BenchApp]:
+    """가짜 upstream을 주입하고 lifespan까지 실행한 create_app() 앱 제공
+
+    env는 SupabaseManager / ElevenLabsService 생성 전에 적용되므로
+    VOICE_CACHE_ENABLED, SINGLEFLIGHT_ENABLED 같은 설정을 실행마다 바꿀 수 있습니다.
+    postgrest를 주면 supabase/rows 대신 그 가짜 PostgREST를 사용합니다.
+    """
+    env = dict(env or {})
+    async with _env(env):
+        from app.main import create_app
+        from app.database.supabase import SupabaseManager, set_supabase_manager
+        from app.services.elevenlabs import ElevenLabsService, set_elevenlabs_service
+        from app.services.conversation_proxy import set_conversation_proxy
+        from app.services.transcript_writer import set_transcript_writer
+
+        if postgrest is None:
+            postgrest = FakePostgrest(
+                {"voices": make_voice_rows(rows), "messages": []}, (supabase or UpstreamConfig()).injector(seed)
+            )
+        fake_supabase = postgrest
+        voice_rows = fake_supabase.tables.setdefault("voices", [])
+        fake_elevenlabs = FakeElevenLabs((elevenlabs or UpstreamConfig()).injector(seed))
+
+        set_supabase_manager(SupabaseManager(transport=fake_supabase, realtime=False))
+        set_elevenlabs_service(ElevenLabsService(client=fake_elevenlabs))
+        # 실행마다 env에 맞게 새로 생성되도록
+        set_conversation_proxy(None)
+        set_transcript_writer(None)
+
+        app = create_app()
+        try:
+            async with app.router.lifespan_context(app):
+                async with httpx.AsyncClient(
+                    transport=httpx.ASGITransport(app=app),
+                    base_url="http://bench.local",
+                    timeout=60
+                ) as client:
+                    yield BenchApp(app, client, voice_rows, fake_supabase, fake_elevenlabs, env)
+        finally:
+            set_supabase_manager(None)
+            set_elevenlabs_service(None)
+            set_conversation_proxy(None)
+            set_transcript_writer(None)
+
+@asynccontextmanager
+async def serving(bench: BenchApp) -> AsyncIterator[str]:
+    """running_app()의 앱을 실제 uvicorn으로 서비스 → base URL
+
+    ASGITransport는 응답 본문을 끝까지 모은 뒤 돌려주고 WebSocket도 지원하지 않으므로
+    스트리밍·WebSocket 확인은 실제 소켓으로 합니다.
+    """
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(
+        bench.app, host="127.0.0.1", port=0, log_level="warning", access_log=False, lifespan="off"
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        await task
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """정렬된 값의 nearest-rank 백분위수"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(pct / 100 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """초 단위 지연 목록 → ms 단위 통계"""
+    values = sorted(latencies)
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "mean": round(sum(values) / len(values) * 1000, 3),
+        "p50": round(percentile(values, 50) * 1000, 3),
+        "p95": round(percentile(values, 95) * 1000, 3),
+        "p99": round(percentile(values, 99) * 1000, 3),
+        "max": round(values[-1] * 1000, 3)
+    }
+
+async def run_load(
+    call: Callable[[int], Awaitable[int]],
+    requests: int,
+    concurrency: int
+) -> Dict[str, Any]:
+    """call(i)를 concurrency개 워커로 총 requests번 실행 → 처리량/지연 백분위수
+
+    call은 HTTP 상태 코드를 반환합니다. 예외 또는 5xx는 에러로 집계합니다.
+    """
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal errors, next_index
+        while next_index < requests:
+            index = next_index
+            next_index += 1
+            started = time.perf_counter()
+            try:
+                status = await call(index)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            status_codes[str(status)] = status_codes.get(str(status), 0) + 1
+            if not isinstance(status, int) or status >= 500:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "duration_s": round(duration, 4),
+        "throughput_rps": round(requests / duration, 2) if duration else 0.0,
+        "latency_ms": summarize(latencies),
+        "status_codes": status_codes
+    }
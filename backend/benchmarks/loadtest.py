@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+voices / conversations 라우트 부하 테스트 (가짜 upstream, 인프로세스)
+
+    cd backend
+    python -m benchmarks.loadtest --concurrency 1,10,50 --requests 500 \\
+        --supabase-latency-ms 5 --elevenlabs-latency-ms 50 \\
+        --output benchmarks/results/latest.json --baseline benchmarks/results/baseline.json
+
+결과는 JSON으로 저장되며 --baseline을 주면 시나리오·동시성별로
+처리량과 p99를 비교해 허용치(--max-regression)를 넘는 회귀를 표시합니다.
+"""
+
+import sys
+import json
+import random
+import asyncio
+import argparse
+import platform
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.harness import BenchApp, UpstreamConfig, run_load, running_app
+
+# (메서드, 경로, JSON 본문) 생성 함수
+RequestFactory = Callable[[BenchApp, random.Random], Tuple[str, str, Optional[Dict[str, Any]]]]
+
+def _row(bench: BenchApp, rng: random.Random, hot_keys: int) -> Dict[str, Any]:
+    return bench.rows[rng.randrange(min(hot_keys, len(bench.rows)))]
+
+def build_scenarios(hot_keys: int, resolve_batch: int) -> Dict[str, Tuple[str, RequestFactory]]:
+    """시나리오 이름 → (라우트 템플릿, 요청 생성 함수). voices.py / conversations.py 전 라우트 포함"""
+    row = lambda bench, rng: _row(bench, rng, hot_keys)
+
+    return {
+        "voices.list": (
+            "GET /api/voices/list",
+            lambda bench, rng: ("GET", "/api/voices/list?limit=20", None)
+        ),
+        "voices.list_fields": (
+            "GET /api/voices/list",
+            lambda bench, rng: ("GET", "/api/voices/list?limit=20&fields=public_id,nickname", None)
+        ),
+        "voices.agent": (
+            "GET /api/voices/agent/{agent_id}",
+            lambda bench, rng: ("GET", f"/api/voices/agent/{row(bench, rng)['agent_id']}", None)
+        ),
+        "voices.stats": (
+            "GET /api/voices/stats",
+            lambda bench, rng: ("GET", "/api/voices/stats", None)
+        ),
+        "voices.public": (
+            "GET /api/voices/public/{public_id}",
+            lambda bench, rng: ("GET", f"/api/voices/public/{row(bench, rng)['public_id']}", None)
+        ),
+        "voices.resolve": (
+            "POST /api/voices/resolve",
+            lambda bench, rng: ("POST", "/api/voices/resolve", {
+                "ids": [
+                    {"kind": "public_id", "id": row(bench, rng)["public_id"]}
+                    for _ in range(resolve_batch)
+                ]
+            })
+        ),
+        "conversations.signed_url_get": (
+            "GET /api/conversations/signed-url",
+            lambda bench, rng: ("GET", f"/api/conversations/signed-url?agent_id={row(bench, rng)['agent_id']}", None)
+        ),
+        "conversations.signed_url_post": (
+            "POST /api/conversations/signed-url",
+            lambda bench, rng: ("POST", "/api/conversations/signed-url", {"agent_id": row(bench, rng)["agent_id"]})
+        ),
+        "conversations.validate_agent": (
+            "GET /api/conversations/validate-agent/{agent_id}",
+            lambda bench, rng: ("GET", f"/api/conversations/validate-agent/{row(bench, rng)['agent_id']}", None)
+        ),
+        "conversations.signed_url_by_public_get": (
+            "GET /api/conversations/signed-url-by-public",
+            lambda bench, rng: (
+                "GET", f"/api/conversations/signed-url-by-public?public_id={row(bench, rng)['public_id']}", None
+            )
+        ),
+        "conversations.signed_url_by_public_post": (
+            "POST /api/conversations/signed-url-by-public",
+            lambda bench, rng: ("POST", "/api/conversations/signed-url-by-public", {"public_id": row(bench, rng)["public_id"]})
+        )
+    }
+
+async def run_scenario(
+    bench: BenchApp,
+    factory: RequestFactory,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+
+    async def call(_: int) -> int:
+        method, path, body = factory(bench, rng)
+        response = await bench.client.request(method, path, json=body)
+        return response.status_code
+
+    if warmup:
+        await run_load(call, warmup, min(concurrency, warmup))
+    return await run_load(call, requests, concurrency)
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    scenarios = build_scenarios(args.hot_keys, args.resolve_batch)
+    selected = [name for name in scenarios if not args.scenarios or name in args.scenarios]
+    unknown = set(args.scenarios or []) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+
+    env = dict(item.split("=", 1) for item in args.env)
+    supabase = UpstreamConfig(args.supabase_latency_ms, args.supabase_jitter_ms, args.supabase_error_rate)
+    elevenlabs = UpstreamConfig(args.elevenlabs_latency_ms, args.elevenlabs_jitter_ms, args.elevenlabs_error_rate)
+
+    results: List[Dict[str, Any]] = []
+    for name in selected:
+        route, factory = scenarios[name]
+        for concurrency in args.concurrency:
+            # 시나리오마다 새 앱을 띄워 캐시/풀 상태가 이전 실행에 영향을 주지 않도록 함
+            async with running_app(supabase, elevenlabs, rows=args.rows, env=env, seed=args.seed) as bench:
+                result = await run_scenario(bench, factory, args.requests, concurrency, args.warmup, args.seed)
+                result.update({"scenario": name, "route": route, "upstream": bench.upstream_stats()})
+            results.append(result)
+            _print_row(result)
+
+    return {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": {
+                "requests": args.requests,
+                "warmup": args.warmup,
+                "rows": args.rows,
+                "hot_keys": args.hot_keys,
+                "resolve_batch": args.resolve_batch,
+                "seed": args.seed,
+                "env": env,
+                "supabase": vars(supabase),
+                "elevenlabs": vars(elevenlabs)
+            }
+        },
+        "results": results
+    }
+
+def _print_header() -> None:
+    print(f"{'scenario':<42} {'conc':>5} {'rps':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>7}")
+    print("-" * 96)
+
+def _print_row(result: Dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"{result['scenario']:<42} {result['concurrency']:>5} {result['throughput_rps']:>10.1f} "
+        f"{latency['p50']:>9.2f} {latency['p95']:>9.2f} {latency['p99']:>9.2f} {result['error_rate'] * 100:>6.2f}%"
+    )
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[Dict[str, Any]]:
+    """(시나리오, 동시성)별 처리량/p99 비교. max_regression은 허용 비율 (0.1 = 10%)"""
+    previous = {(item["scenario"], item["concurrency"]): item for item in baseline.get("results", [])}
+    rows: List[Dict[str, Any]] = []
+
+    for item in current["results"]:
+        base = previous.get((item["scenario"], item["concurrency"]))
+        if base is None:
+            continue
+        throughput_change = (
+            (item["throughput_rps"] - base["throughput_rps"]) / base["throughput_rps"]
+            if base["throughput_rps"] else 0.0
+        )
+        p99_change = (
+            (item["latency_ms"]["p99"] - base["latency_ms"]["p99"]) / base["latency_ms"]["p99"]
+            if base["latency_ms"]["p99"] else 0.0
+        )
+        rows.append({
+            "scenario": item["scenario"],
+            "concurrency": item["concurrency"],
+            "throughput_change": round(throughput_change, 4),
+            "p99_change": round(p99_change, 4),
+            "regression": throughput_change < -max_regression or p99_change > max_regression
+        })
+
+    return rows
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print()
+    print(f"{'scenario':<42} {'conc':>5} {'rps Δ':>9} {'p99 Δ':>9}")
+    print("-" * 70)
+    for row in rows:
+        flag = "  ⚠️ 회귀" if row["regression"] else ""
+        print(
+            f"{row['scenario']:<42} {row['concurrency']:>5} "
+            f"{row['throughput_change'] * 100:>+8.1f}% {row['p99_change'] * 100:>+8.1f}%{flag}"
+        )
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AI Voice Chat API 부하 테스트 (가짜 upstream)")
+    parser.add_argument("--scenarios", nargs="*", help="실행할 시나리오 (기본: 전체)")
+    parser.add_argument("--list", action="store_true", help="시나리오 목록만 출력")
+    parser.add_argument("--concurrency", type=lambda raw: [int(v) for v in raw.split(",")], default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=500, help="시나리오·동시성별 측정 요청 수")
+    parser.add_argument("--warmup", type=int, default=20, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--rows", type=int, default=1000, help="가짜 voices 행 수")
+    parser.add_argument("--hot-keys", type=int, default=1000, help="조회 대상 ID 범위 (작을수록 캐시 hit 증가)")
+    parser.add_argument("--resolve-batch", type=int, default=20, help="/resolve 요청당 ID 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--supabase-latency-ms", type=float, default=5.0)
+    parser.add_argument("--supabase-jitter-ms", type=float, default=1.0)
+    parser.add_argument("--supabase-error-rate", type=float, default=0.0)
+    parser.add_argument("--elevenlabs-latency-ms", type=float, default=50.0)
+    parser.add_argument("--elevenlabs-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--elevenlabs-error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--env", action="append", default=[], metavar="KEY=VALUE",
+        help="앱 설정 환경변수 (예: --env VOICE_CACHE_ENABLED=false)"
+    )
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--max-regression", type=float, default=0.1, help="허용 회귀 비율 (기본 10%%)")
+    parser.add_argument("--fail-on-regression", action="store_true", help="회귀가 있으면 종료 코드 1")
+    return parser.parse_args(argv)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.list:
+        for name, (route, _) in build_scenarios(args.hot_keys, args.resolve_batch).items():
+            print(f"{name:<42} {route}")
+        return 0
+
+    _print_header()
+    report = asyncio.run(run(args))
+
+    if args.output:
+        from pathlib import Path
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, ensure_ascii=False, indent=2))
+        print(f"\n결과 저장: {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            rows = compare(report, json.load(f), args.max_regression)
+        _print_comparison(rows)
+        if args.fail_on_regression and any(row["regression"] for row in rows):
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+채팅 기록 조회 확인 (/api/conversations/{chatroom_id}/messages)
+
+    cd backend
+    python -m benchmarks.messages
+
+1. pages: json 페이지를 next_cursor로 끝까지 넘긴 결과와 ndjson 스트림이 같은지
+   (최신순, 누락·중복 없음, 같은 created_at은 id로 구분), 토큰 없음·무효·anon 키 요청은 401인지
+   (가짜 PostgREST가 messages 조회 RLS 적용), ndjson 수신 중 연결을 끊으면 미리 요청한 다음 페이지 조회가
+   바로 취소되는지. 확인 실패 시 종료 코드 1
+2. memory: 기록 길이별 ndjson 스트리밍 최대 메모리(tracemalloc)와 처리량 (실제 uvicorn 소켓)
+   vs 방 전체를 모아 한 번에 직렬화하는 방식 → 스트리밍은 기록 길이와 무관하게 일정해야 함
+
+가짜 messages 테이블은 행을 저장하지 않고 순번으로 계산하므로 (키셋 조건은 이진 탐색)
+100만 행 방도 가짜 DB 자체의 메모리·정렬 비용 없이 측정됩니다.
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.core.serialization import dumps
+from app.database.supabase import get_supabase_manager
+from benchmarks.fakes import FakePostgrest, Predicate, Row, _parse_logic, _parse_operator, _unquote
+from benchmarks.harness import running_app, serving
+
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CONTENT = "오늘 방송에서 들려준 노래 제목이 뭐였나요? 다음에도 꼭 불러 주세요!"
+
+class HistoryPostgrest(FakePostgrest):
+    """messages를 저장하지 않고 (방, 순번)으로 계산하는 가짜 PostgREST
+
+    순번 i(0 = 최신)의 행은 created_at DESC, id DESC 순서이며, 두 행씩 같은 created_at을 가집니다.
+    messages 외 테이블은 FakePostgrest가 처리합니다. page_delay초만큼 응답을 늦출 수 있고,
+    진행 중인 조회 수(in_flight)와 취소된 조회 수(pages_cancelled)를 기록합니다.
+    """
+
+    def __init__(self, rooms: Dict[str, int], page_delay: float = 0.0) -> None:
+        super().__init__({"voices": [], "messages": []})
+        self.rooms = rooms
+        self._room_index = {chatroom_id: index for index, chatroom_id in enumerate(rooms)}
+        self.page_delay = page_delay
+        self.pages_served = 0
+        self.pages_cancelled = 0
+        self.in_flight = 0
+
+    def row(self, chatroom_id: str, i: int) -> Row:
+        # 오래된 순 번호 k (id·created_at 모두 k가 클수록 최신)
+        k = self.rooms[chatroom_id] - 1 - i
+        return {
+            "id": str(uuid.UUID(int=(self._room_index[chatroom_id] << 64) + k + 1)),
+            "content": CONTENT,
+            "sender_id": str(uuid.UUID(int=k % 7 + 1)),
+            "chatroom_id": chatroom_id,
+            "message_type": "ai_text" if k % 2 else "user_text",
+            "created_at": (BASE_TIME + timedelta(milliseconds=k // 2)).isoformat(timespec="microseconds")
+        }
+
+    def _first_after(self, chatroom_id: str, predicates: List[Predicate]) -> int:
+        """키셋 조건을 만족하는 첫 순번 (조건은 순번에 대해 단조: 거짓…거짓 참…참)"""
+        low, high = 0, self.rooms[chatroom_id]
+        while low < high:
+            middle = (low + high) // 2
+            row = self.row(chatroom_id, middle)
+            if all(predicate(row) for predicate in predicates):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        if table != "messages" or request.method != "GET":
+            return await super().handle_async_request(request)
+
+        denied = self._jwt_error(request)
+        if denied is not None:
+            return denied
+        params = request.url.params
+        chatroom_id = _unquote(params.get("chatroom_id", "eq.").partition(".")[2])
+        columns = [column for column in params.get("select", "*").split(",") if column != "*"]
+        limit = int(params.get("limit", 1000))
+        keyset: List[Predicate] = []
+        for key, value in params.multi_items():
+            if key == "or":
+                keyset.append(_parse_logic(value, False))
+            elif key not in ("select", "order", "limit", "chatroom_id"):
+                keyset.append(_parse_operator(key, value))
+
+        if self.page_delay:
+            self.in_flight += 1
+            try:
+                await asyncio.sleep(self.page_delay)
+            except asyncio.CancelledError:
+                self.pages_cancelled += 1
+                raise
+            finally:
+                self.in_flight -= 1
+
+        data: List[Row] = []
+        # RLS SELECT (auth.uid() IS NOT NULL): anon 키로는 행이 보이지 않음
+        if chatroom_id in self.rooms and self._auth_uid(request) is not None:
+            start = self._first_after(chatroom_id, keyset) if keyset else 0
+            end = min(self.rooms[chatroom_id], start + limit)
+            data = [self.row(chatroom_id, i) for i in range(start, end)]
+            if columns:
+                data = [{column: row[column] for column in columns} for row in data]
+        self.pages_served += 1
+        return httpx.Response(200, headers={"content-type": "application/json"}, content=dumps(data), request=request)
+
+def _check_order(ids_and_times: List[Tuple[str, str]]) -> bool:
+    keys = [(datetime.fromisoformat(created_at), row_id) for row_id, created_at in ids_and_times]
+    return all(a > b for a, b in zip(keys, keys[1:]))
+
+async def pages(args: argparse.Namespace) -> Dict[str, Any]:
+    rows = args.check_rows
+    postgrest = HistoryPostgrest({"room-check": rows})
+    async with running_app(postgrest=postgrest) as bench:
+        path = "/api/conversations/room-check/messages"
+        headers = {"Authorization": f"Bearer {bench.supabase.issue_token()}"}
+        walked: List[Tuple[str, str]] = []
+        requests = 0
+        cursor: Optional[str] = None
+        while True:
+            params = {"limit": args.page_size, **({"cursor": cursor} if cursor else {})}
+            body = (await bench.client.get(path, params=params, headers=headers)).json()
+            requests += 1
+            walked += [(message["id"], message["created_at"]) for message in body["messages"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        response = await bench.client.get(path, params={"format": "ndjson", "limit": args.page_size}, headers=headers)
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        streamed = [(line["id"], line["created_at"]) for line in lines]
+        bad_cursor = await bench.client.get(path, params={"cursor": "not-a-cursor", "format": "ndjson"}, headers=headers)
+        unknown_room = (await bench.client.get("/api/conversations/no-such-room/messages", headers=headers)).json()
+        auth_statuses = {
+            "no_token": (await bench.client.get(path)).status_code,
+            "no_token_ndjson": (await bench.client.get(path, params={"format": "ndjson"})).status_code,
+            "invalid_token": (await bench.client.get(path, headers={"Authorization": "Bearer not.a.jwt"})).status_code,
+            "anon_key": (await bench.client.get(path, headers={"Authorization": "Bearer fake-anon-key"})).status_code
+        }
+    checks = {
+        "json_all_rows": len(walked) == rows,
+        "json_unique": len(set(walked)) == rows,
+        "json_ordered": _check_order(walked),
+        "ndjson_content_type": response.headers.get("content-type", "").startswith("application/x-ndjson"),
+        # json은 created_at을 datetime으로 검증 후 다시 직렬화하므로 id 순서로 비교
+        "ndjson_matches_json": [row_id for row_id, _ in streamed] == [row_id for row_id, _ in walked],
+        "bad_cursor_400": bad_cursor.status_code == 400,
+        "unknown_room_empty": unknown_room["total"] == 0,
+        "no_token_401": auth_statuses["no_token"] == 401 and auth_statuses["no_token_ndjson"] == 401,
+        "invalid_token_401": auth_statuses["invalid_token"] == 401,
+        "anon_key_401": auth_statuses["anon_key"] == 401
+    }
+    disconnect = await _disconnect_midstream(args.page_size)
+    # 연결을 끊으면 다음 페이지 조회가 응답 지연(page_delay)을 기다리지 않고 취소돼야 함
+    checks["disconnect_cancels_prefetch"] = (
+        disconnect["prefetching_before_disconnect"] == 1
+        and disconnect["in_flight_after_disconnect"] == 0
+        and disconnect["pages_cancelled"] >= 1
+        and disconnect["cancel_ms"] < disconnect["page_delay_ms"] / 2
+    )
+    return {
+        "rows": rows,
+        "page_size": args.page_size,
+        "json_pages": requests,
+        "json_rows": len(walked),
+        "ndjson_rows": len(streamed),
+        "auth_statuses": auth_statuses,
+        "disconnect": disconnect,
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+
+async def _disconnect_midstream(page_size: int) -> Dict[str, Any]:
+    """첫 NDJSON 청크를 보낸 뒤 연결이 끊겼을 때 미리 요청한 다음 페이지 조회가 바로 취소되는지
+
+    ASGI 앱을 직접 호출해 첫 청크 전송에서 OSError(연결 끊김)를 내고, 앱이 올린 예외를 붙잡아 둡니다
+    (로거·에러 리포터가 traceback을 잡고 있는 상황). 응답이 본문 제너레이터를 직접 닫지 않으면
+    traceback이 제너레이터를 붙잡고 있어 조회가 page_delay 동안 계속됩니다.
+    """
+    page_delay = 2.0
+    postgrest = HistoryPostgrest({"room-disconnect": page_size * 10}, page_delay=page_delay)
+    async with running_app(postgrest=postgrest) as bench:
+        token = bench.supabase.issue_token()
+        scope = {
+            "type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+            "method": "GET", "scheme": "http", "server": ("bench.local", 80), "client": ("127.0.0.1", 1234),
+            "root_path": "", "path": "/api/conversations/room-disconnect/messages", "raw_path": b"",
+            "query_string": f"limit={page_size}".encode(),
+            "headers": [(b"accept", b"application/x-ndjson"), (b"authorization", f"Bearer {token}".encode())]
+        }
+        prefetching = 0
+
+        async def receive() -> Dict[str, Any]:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message: Dict[str, Any]) -> None:
+            nonlocal prefetching
+            if message["type"] == "http.response.body" and message.get("body"):
+                # 첫 청크를 보내는 동안 다음 페이지 조회가 진행 중인지 확인한 뒤 연결 끊김
+                await asyncio.sleep(0.05)
+                prefetching = postgrest.in_flight
+                raise OSError("client disconnected")
+
+        held: Optional[BaseException] = None
+        try:
+            await bench.app(scope, receive, send)
+        except Exception as e:
+            held = e
+        disconnected = time.perf_counter()
+        while postgrest.in_flight and time.perf_counter() - disconnected < page_delay:
+            await asyncio.sleep(0.01)
+        result = {
+            "prefetching_before_disconnect": prefetching,
+            "in_flight_after_disconnect": postgrest.in_flight,
+            "cancel_ms": round((time.perf_counter() - disconnected) * 1000, 1),
+            "pages_served": postgrest.pages_served,
+            "pages_cancelled": postgrest.pages_cancelled,
+            "page_delay_ms": page_delay * 1000,
+            "app_raised": type(held).__name__ if held is not None else None
+        }
+        del held
+        return result
+
+async def _stream(base_url: str, chatroom_id: str, page_size: int, token: str) -> Tuple[int, int]:
+    """ndjson 스트림을 받으며 바로 버림 → (줄 수, 전송 바이트)"""
+    lines = 0
+    size = 0
+    async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+        async with client.stream(
+            "GET", f"/api/conversations/{chatroom_id}/messages",
+            params={"limit": page_size},
+            headers={"accept": "application/x-ndjson", "authorization": f"Bearer {token}"}
+        ) as response:
+            async for chunk in response.aiter_bytes():
+                lines += chunk.count(b"\n")
+            size = response.num_bytes_downloaded
+    return lines, size
+
+async def _buffered(chatroom_id: str, page_size: int, token: str) -> Tuple[int, int]:
+    """비교용: 방 전체 기록을 모아 JSON 하나로 직렬화"""
+    messages_repo = await get_supabase_manager().get_message_repository(token)
+    rows = [row async for page in messages_repo.iter_message_pages(chatroom_id, page_size=page_size) for row in page]
+    body = dumps({"messages": rows})
+    return len(rows), len(body)
+
+async def _measure(coro: Any) -> Dict[str, Any]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        rows, size = await coro
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "rows": rows,
+        "bytes_mb": round(size / 1024 / 1024, 2),
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed),
+        "peak_traced_mb": round(peak / 1024 / 1024, 2)
+    }
+
+async def memory(args: argparse.Namespace) -> Dict[str, Any]:
+    rooms = {f"room-{size}": size for size in args.sizes}
+    results: Dict[str, Any] = {
+        "page_size": args.stream_page_size,
+        "note": "처리량은 tracemalloc이 켜진 상태, ndjson bytes는 압축 후 전송량"
+    }
+    async with running_app(postgrest=HistoryPostgrest({"room-warmup": 2000, **rooms})) as bench:
+        token = bench.supabase.issue_token()
+        async with serving(bench) as base_url:
+            # 첫 요청의 일회성 할당(압축기·소켓 등)이 측정에 섞이지 않도록
+            await _stream(base_url, "room-warmup", args.stream_page_size, token)
+            for chatroom_id, size in rooms.items():
+                entry = {"ndjson_stream": await _measure(_stream(base_url, chatroom_id, args.stream_page_size, token))}
+                if size <= args.buffered_max:
+                    entry["buffered_json"] = await _measure(_buffered(chatroom_id, args.stream_page_size, token))
+                results[str(size)] = entry
+        results["pages_served"] = bench.supabase.pages_served
+    return results
+
+SCENARIOS = {"pages": pages, "memory": memory}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="채팅 기록 키셋 페이지네이션 / NDJSON 스트리밍 메모리 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--check-rows", type=int, default=2345, help="pages: 방 기록 길이")
+    parser.add_argument("--page-size", type=int, default=100, help="pages: limit")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10_000, 100_000, 300_000], help="memory: 기록 길이 (100만 행은 수 분 소요)")
+    parser.add_argument("--stream-page-size", type=int, default=500)
+    parser.add_argument("--buffered-max", type=int, default=100_000, help="memory: 전체 적재 비교를 실행할 최대 길이")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
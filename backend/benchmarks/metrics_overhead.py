@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+/metrics 계측(MetricsMiddleware + span) 오버헤드 측정
+
+    cd backend
+    python -m benchmarks.metrics_overhead --requests 2000 --rounds 5 --max-overhead-us 100
+
+upstream 지연 0, 캐시 hit 위주 경로(/api/voices/public/{id})에서 계측을 켜고 끈
+라운드를 번갈아 실행해 요청당 추가 시간을 비교합니다.
+요청당 추가 시간이 --max-overhead-us를 넘으면 종료 코드 1.
+"""
+
+import sys
+import json
+import random
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from app.core import metrics
+from benchmarks.harness import running_app, run_load
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rounds: Dict[str, List[Dict[str, Any]]] = {"enabled": [], "disabled": []}
+    original = metrics.METRICS_ENABLED
+
+    async with running_app(rows=args.rows) as bench:
+        rng = random.Random(0)
+        hot = bench.rows[:args.hot_keys]
+
+        async def call(_: int) -> int:
+            response = await bench.client.get(f"/api/voices/public/{rng.choice(hot)['public_id']}")
+            return response.status_code
+
+        # 캐시 채우기
+        await run_load(call, args.hot_keys * 2, args.concurrency)
+
+        try:
+            for _ in range(args.rounds):
+                for mode in ("enabled", "disabled"):
+                    metrics.METRICS_ENABLED = mode == "enabled"
+                    rounds[mode].append(await run_load(call, args.requests, args.concurrency))
+        finally:
+            metrics.METRICS_ENABLED = original
+
+    summary: Dict[str, Any] = {}
+    for mode, results in rounds.items():
+        summary[mode] = {
+            "throughput_rps": round(sum(r["throughput_rps"] for r in results) / len(results), 2),
+            "p50_ms": round(sorted(r["latency_ms"]["p50"] for r in results)[len(results) // 2], 3),
+            "p99_ms": round(sorted(r["latency_ms"]["p99"] for r in results)[len(results) // 2], 3)
+        }
+
+    per_request_enabled = 1 / summary["enabled"]["throughput_rps"]
+    per_request_disabled = 1 / summary["disabled"]["throughput_rps"]
+    summary["overhead_us_per_request"] = round((per_request_enabled - per_request_disabled) * 1e6, 2)
+    summary["overhead_ratio"] = round(per_request_enabled / per_request_disabled - 1, 4)
+    summary["max_overhead_us"] = args.max_overhead_us
+    summary["ok"] = summary["overhead_us_per_request"] <= args.max_overhead_us
+    return summary
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="지표 계측 오버헤드 측정")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--hot-keys", type=int, default=100)
+    parser.add_argument("--max-overhead-us", type=float, default=100.0, help="요청당 허용 계측 오버헤드(µs)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run(args))
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    if not summary["ok"]:
+        print(
+            f"계측 오버헤드 초과: {summary['overhead_us_per_request']}µs > {args.max_overhead_us}µs",
+            file=sys.stderr
+        )
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""
+로컬 mock ElevenLabs HTTP / WebSocket 서버 (실제 TCP 소켓, uvicorn)
+
+ElevenLabsService를 ELEVENLABS_BASE_URL=http://127.0.0.1:<port>로 띄워
+커넥션 풀·keep-alive·timeout·발급 대기열 동작을 실제 네트워크 경로로 확인할 때 사용합니다.
+발급한 Signed URL(ws://127.0.0.1:<port>/v1/convai/conversation)은 이 서버의 에코 WebSocket을 가리킵니다.
+
+    async with MockElevenLabsServer(latency_ms=50) as server:
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+"""
+
+import os
+import json
+import base64
+import random
+import asyncio
+from typing import Any, Dict, Optional, Set, Tuple
+
+import uvicorn
+
+class MockElevenLabsServer:
+    """GET /v1/convai/conversation/get-signed-url, GET /v2/voices 응답 + 대화 WebSocket 에코
+
+    - latency_ms: 응답 지연
+    - hang_rate: 이 비율의 요청은 hang_ms 동안 응답하지 않음 (read timeout 확인용)
+    - status_code_rate: 이 비율의 요청은 status_code로 실패
+    - 요청 수, 동시 처리 최대치, 클라이언트 TCP 연결 수를 기록합니다.
+    - WebSocket: 받은 메시지를 그대로 돌려보냄. {"type": "flood", "count": N, "size": S}를 받으면
+      S바이트 메시지 N개를 최대한 빨리 보내고 걸린 시간을 기록 (수신 측이 느리면 역압으로 길어짐)
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency_ms: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_ms: float = 60000.0,
+        status_code_rate: float = 0.0,
+        status_code: int = 503,
+        seed: Optional[int] = 0
+    ) -> None:
+        self.port = port
+        self.latency_ms = latency_ms
+        self.hang_rate = hang_rate
+        self.hang_ms = hang_ms
+        self.status_code_rate = status_code_rate
+        self.status_code = status_code
+        self._random = random.Random(seed)
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.connections: Set[Tuple[str, int]] = set()
+        self.minted = 0
+        self.ws_sessions = 0
+        self.ws_active = 0
+        self.ws_max_active = 0
+        self.ws_messages = 0
+        self.flood_seconds: list = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    async def _conversation(self, receive: Any, send: Any) -> None:
+        """대화 WebSocket 에코 (시작 시 ElevenLabs처럼 conversation_initiation_metadata 이벤트 전송)"""
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        await send({"type": "websocket.accept"})
+        self.ws_sessions += 1
+        self.ws_active += 1
+        self.ws_max_active = max(self.ws_max_active, self.ws_active)
+        try:
+            await send({"type": "websocket.send", "text": json.dumps({
+                "type": "conversation_initiation_metadata",
+                "conversation_initiation_metadata_event": {"conversation_id": f"conv_{self.ws_sessions}"}
+            })})
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                self.ws_messages += 1
+                text = message.get("text")
+                if text is not None and text.startswith('{"type": "flood"'):
+                    command = json.loads(text)
+                    # 오디오 base64처럼 압축되지 않는 내용 (permessage-deflate로 줄어들지 않도록)
+                    size = int(command.get("size", 1024))
+                    chunk = base64.b64encode(os.urandom(size))[:size].decode()
+                    started = asyncio.get_running_loop().time()
+                    for _ in range(int(command.get("count", 1))):
+                        await send({"type": "websocket.send", "text": chunk})
+                    self.flood_seconds.append(asyncio.get_running_loop().time() - started)
+                    continue
+                if text is not None:
+                    await send({"type": "websocket.send", "text": text})
+                else:
+                    await send({"type": "websocket.send", "bytes": message.get("bytes", b"")})
+        except Exception:
+            # 클라이언트(프록시)가 먼저 끊은 경우
+            return
+        finally:
+            self.ws_active -= 1
+
+    async def _send_json(self, send: Any, status: int, body: Dict[str, Any]) -> None:
+        payload = json.dumps(body).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode())]
+        })
+        await send({"type": "http.response.body", "body": payload})
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] == "websocket":
+            await self._conversation(receive, send)
+            return
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        if scope.get("client"):
+            self.connections.add(tuple(scope["client"]))
+
+        try:
+            roll = self._random.random()
+            if roll < self.hang_rate:
+                try:
+                    await asyncio.sleep(self.hang_ms / 1000)
+                except asyncio.CancelledError:
+                    # 서버 종료 시 응답하지 않고 있던 요청 정리
+                    return
+            elif self.latency_ms:
+                await asyncio.sleep(self.latency_ms / 1000)
+
+            if self._random.random() < self.status_code_rate:
+                await self._send_json(send, self.status_code, {"detail": "mock failure"})
+                return
+
+            path = scope["path"]
+            if path == "/v1/convai/conversation/get-signed-url":
+                self.minted += 1
+                query = scope.get("query_string", b"").decode()
+                await self._send_json(send, 200, {
+                    "signed_url": f"{self.ws_url}/v1/convai/conversation?{query}&token={self.minted}"
+                })
+            elif path == "/v2/voices":
+                await self._send_json(send, 200, {
+                    "voices": [], "has_more": False, "total_count": 0, "next_page_token": None
+                })
+            else:
+                await self._send_json(send, 404, {"detail": "not found"})
+        finally:
+            self.in_flight -= 1
+
+    async def start(self) -> "MockElevenLabsServer":
+        config = uvicorn.Config(
+            self, host="127.0.0.1", port=self.port, log_level="warning", access_log=False, lifespan="off"
+        )
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._server.force_exit = True
+        if self._task is not None:
+            await self._task
+        self._server = None
+        self._task = None
+
+    async def __aenter__(self) -> "MockElevenLabsServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "max_in_flight": self.max_in_flight,
+            "connections_opened": len(self.connections),
+            "minted": self.minted,
+            "ws_sessions": self.ws_sessions,
+            "ws_max_active": self.ws_max_active,
+            "ws_messages": self.ws_messages
+        }
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+레이트 리밋 오버헤드 / 동작 확인 (메모리 백엔드 + 로컬 fake Redis 서버)
+
+    cd backend
+    python -m benchmarks.ratelimit
+
+1. overhead: 미들웨어 없음 / 규칙 없는 경로 / 규칙 있는 경로의 요청당 추가 시간 (µs, ASGI 직접 호출)
+2. app: create_app()에서 signed URL 한도 초과 시 429 + Retry-After, 보충 후 다시 허용, 본문 키(IP + public_id),
+   거절된 요청이 다른 규칙의 토큰을 쓰지 않는지, /api/voices/list가 user_id 쿼리가 아니라 인증 사용자(없으면 IP)별인지
+3. redis: fake Redis에 둔 버킷을 두 워커(RateLimiter 2개)가 공유하는지, 검사당 지연, 장애 시 허용,
+   여러 규칙 중 하나에 걸리면 어느 버킷도 차감하지 않는지
+4. tls: rediss:// URL로 TLS fake Redis에 연결되는지, 신뢰하지 않는 인증서·평문 연결·알 수 없는 스킴은 거부하는지
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.ratelimit import MemoryBackend, RateLimiter, RateLimitMiddleware, RateLimitRule, RedisBackend
+from app.core.redis import RedisClient, RedisError
+from app.database.supabase import get_supabase_manager
+from benchmarks.fake_redis import FakeRedisServer, self_signed_tls
+from benchmarks.harness import run_load, running_app, summarize
+
+async def _noop_app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    pass
+
+async def _asgi_cost(app: Any, path: str, requests: int) -> float:
+    """ASGI 앱 호출 1회 평균(µs)"""
+    scope = {
+        "type": "http", "method": "GET", "path": path, "query_string": b"",
+        "headers": [], "client": ("10.0.0.1", 1234)
+    }
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, None, None)
+    return (time.perf_counter() - started) / requests * 1e6
+
+async def overhead(args: argparse.Namespace) -> Dict[str, Any]:
+    rule = RateLimitRule("bench", ("/limited",), rate=1e9, burst=10**9)
+    middleware = RateLimitMiddleware(_noop_app, RateLimiter([rule], MemoryBackend()))
+    baseline = await _asgi_cost(_noop_app, "/limited", args.requests)
+    return {
+        "baseline_us": round(baseline, 3),
+        "unlimited_path_us": round(await _asgi_cost(middleware, "/other", args.requests) - baseline, 3),
+        "limited_path_us": round(await _asgi_cost(middleware, "/limited", args.requests) - baseline, 3)
+    }
+
+async def app_behaviour(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {
+        "RATE_LIMIT_ENABLED": "true",
+        "RATE_LIMIT_SIGNED_URL_IP": "5/1:5",
+        "RATE_LIMIT_SIGNED_URL_PUBLIC_ID": "3/1:3",
+        "RATE_LIMIT_VOICES_LIST_USER": "3/1:3"
+    }
+    async with running_app(rows=100, env=env) as bench:
+        def client_at(ip: str) -> httpx.AsyncClient:
+            return httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=bench.app, client=(ip, 1234)), base_url="http://bench.local"
+            )
+
+        async def burst(
+            client: httpx.AsyncClient, count: int, method: str, path: str,
+            body: Optional[dict] = None, headers: Optional[dict] = None
+        ) -> List[Any]:
+            responses = [await client.request(method, path, json=body, headers=headers) for _ in range(count)]
+            return [(r.status_code, r.headers.get("retry-after")) for r in responses]
+
+        def statuses(results: List[Any]) -> List[int]:
+            return [status for status, _ in results]
+
+        signed_url = "/api/conversations/signed-url?agent_id=agent_0000001"
+        by_ip = await burst(bench.client, 8, "GET", signed_url)
+        await asyncio.sleep(1.0)
+        refilled = await burst(bench.client, 1, "GET", signed_url)
+        await asyncio.sleep(1.0)
+        # (IP, public_id) 버킷(3)이 IP 버킷(5)보다 먼저 소진되는지 (POST 본문에서 키 추출)
+        by_public = await burst(bench.client, 5, "POST", "/api/conversations/signed-url-by-public", {"public_id": "p0000002"})
+        # public_id 한도에 걸린 2건은 IP 버킷 토큰을 쓰지 않음 → 같은 IP로 2건 더 허용
+        ip_left_after_public = await burst(bench.client, 3, "GET", signed_url)
+
+        async with client_at("10.0.0.2") as other_viewer, client_at("10.0.0.3") as anonymous:
+            # 다른 시청자는 같은 public_id라도 자기 버킷 사용
+            other_viewer_same_public = await burst(
+                other_viewer, 1, "POST", "/api/conversations/signed-url-by-public", {"public_id": "p0000002"}
+            )
+
+            owner_token, intruder_token = bench.supabase.issue_token("user-a"), bench.supabase.issue_token("user-b")
+            # 인증이 필요한 라우트를 거친 것처럼 미리 검증해 둔 토큰만 사용자 버킷을 씀
+            for token in (owner_token, intruder_token):
+                await get_supabase_manager().verify_token(token)
+            owner = {"Authorization": f"Bearer {owner_token}"}
+            intruder = {"Authorization": f"Bearer {intruder_token}"}
+            # 남의 user_id를 넣어도 그 사용자의 버킷은 줄지 않음 (인증 사용자별 버킷)
+            spoofed = await burst(other_viewer, 4, "GET", "/api/voices/list?user_id=user-a", headers=intruder)
+            owner_list = await burst(other_viewer, 4, "GET", "/api/voices/list?user_id=user-a", headers=owner)
+            # user_id·토큰을 빼도 한도를 피하지 못함 (IP별 버킷)
+            without_user = await burst(anonymous, 4, "GET", "/api/voices/list")
+
+        async with client_at("10.0.0.4") as forger:
+            # 위조 토큰(Auth가 거부)은 한도 확인 전에 Auth를 부르지 않고 IP 버킷으로 제한
+            auth_before = bench.supabase.requests_by_table.get("auth.user", 0)
+            forged = []
+            for _ in range(50):
+                token = bench.supabase.issue_token()
+                bench.supabase.users.pop(token)
+                forged += await burst(forger, 1, "GET", "/api/voices/list", headers={"Authorization": f"Bearer {token}"})
+            forged_auth_calls = bench.supabase.requests_by_table.get("auth.user", 0) - auth_before
+
+        health = (await bench.client.get("/health")).json()
+        checks = {
+            "ip_limited_after_burst": statuses(by_ip) == [200] * 5 + [429] * 3,
+            "ip_refilled": statuses(refilled) == [200],
+            "public_id_limited_per_client": statuses(by_public) == [200] * 3 + [429] * 2,
+            "limited_requests_spend_no_tokens": statuses(ip_left_after_public) == [200, 200, 429],
+            "other_viewer_unaffected": statuses(other_viewer_same_public) == [200],
+            "user_bucket_not_drained_by_spoofed_user_id": (
+                statuses(spoofed) == [200] * 3 + [429] and statuses(owner_list) == [200] * 3 + [429]
+            ),
+            "missing_user_id_still_limited": statuses(without_user) == [200] * 3 + [429],
+            "forged_tokens_limited_by_ip": statuses(forged) == [200] * 3 + [429] * 47,
+            "auth_calls_within_admitted": forged_auth_calls <= statuses(forged).count(200)
+        }
+        return {
+            "signed_url_by_ip": by_ip,
+            "after_refill": refilled,
+            "by_public_id_body": by_public,
+            "ip_after_public_id_limit": ip_left_after_public,
+            "voices_list": {
+                "spoofed_user_id": spoofed, "owner": owner_list, "without_user": without_user,
+                "forged_token_statuses": {s: statuses(forged).count(s) for s in set(statuses(forged))},
+                "forged_token_auth_calls": forged_auth_calls
+            },
+            "rate_limit": health.get("rate_limit"),
+            "checks": checks,
+            "ok": all(checks.values())
+        }
+
+async def redis_shared(args: argparse.Namespace) -> Dict[str, Any]:
+    rule = RateLimitRule("shared", ("/x",), rate=1.0, burst=10)
+    async with FakeRedisServer(latency_ms=args.redis_latency_ms) as server:
+        workers = [RateLimiter([rule], RedisBackend(RedisClient(port=server.port))) for _ in range(2)]
+        outcomes: Dict[str, int] = {}
+        latencies: List[float] = []
+        for i in range(20):
+            started = time.perf_counter()
+            allowed, _ = await workers[i % 2].check(rule, "10.0.0.1")
+            latencies.append(time.perf_counter() - started)
+            key = "allowed" if allowed else "limited"
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+        async def call(i: int) -> int:
+            allowed, _ = await workers[i % 2].check(rule, f"ip-{i % 50}")
+            return 200 if allowed else 429
+
+        load = await run_load(call, args.redis_requests, args.concurrency)
+
+        # 두 규칙 중 작은 버킷(2)에 걸린 요청은 큰 버킷(5)의 토큰을 쓰지 않음
+        wide = RateLimitRule("wide", ("/y",), rate=0.001, burst=5)
+        narrow = RateLimitRule("narrow", ("/y",), rate=0.001, burst=2)
+        combined = [await workers[0].check_all([(wide, "10.0.0.9"), (narrow, "10.0.0.9")]) is None for _ in range(4)]
+        wide_left = [(await workers[1].check(wide, "10.0.0.9"))[0] for _ in range(4)]
+
+        server.fail = True
+        failing = await workers[0].check(rule, "10.0.0.1")
+        server.fail = False
+
+        for worker in workers:
+            await worker.aclose()
+        return {
+            "two_workers_20_requests_burst_10": outcomes,
+            "check_latency_ms": summarize(latencies),
+            "concurrent_checks": {
+                "concurrency": args.concurrency,
+                "throughput_checks_per_s": load["throughput_rps"],
+                "latency_ms": load["latency_ms"],
+                "errors": load["errors"]
+            },
+            "fail_open_when_backend_errors": failing[0],
+            "all_or_nothing": {"combined": combined, "wide_left": wide_left},
+            "server": server.stats(),
+            "ok": combined == [True, True, False, False] and wide_left == [True, True, True, False]
+        }
+
+async def _redis_ping(url: str) -> bool:
+    client = RedisClient.from_url(url)
+    try:
+        return await client.execute("PING") == b"PONG"
+    except RedisError:
+        return False
+    finally:
+        await client.aclose()
+
+async def tls(args: argparse.Namespace) -> Dict[str, Any]:
+    rule = RateLimitRule("tls", ("/x",), rate=1.0, burst=3)
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            server_context, ca_path = self_signed_tls(directory)
+        except ImportError:
+            # 인증서 생성에 cryptography 패키지가 필요 (앱 의존성 아님)
+            return {"skipped": "cryptography 미설치"}
+        async with FakeRedisServer(ssl_context=server_context) as server:
+            trusted_url = f"{server.url}?ssl_ca_certs={ca_path}"
+            limiter = RateLimiter([rule], RedisBackend(RedisClient.from_url(trusted_url)))
+            outcomes = [(await limiter.check(rule, "10.0.0.1"))[0] for _ in range(5)]
+            await limiter.aclose()
+            try:
+                RedisClient.from_url(f"http://{server.host}:{server.port}/0")
+                unknown_scheme_rejected = False
+            except ValueError:
+                unknown_scheme_rejected = True
+            checks = {
+                "url_scheme_rediss": server.url.startswith("rediss://"),
+                "client_uses_tls": RedisClient.from_url(trusted_url).stats()["tls"],
+                "tls_ping_with_trusted_ca": await _redis_ping(trusted_url),
+                "tls_bucket_limits": outcomes == [True, True, True, False, False],
+                "untrusted_certificate_rejected": not await _redis_ping(server.url),
+                "unverified_opt_in": await _redis_ping(f"{server.url}?ssl_cert_reqs=none"),
+                "plaintext_to_tls_server_fails": not await _redis_ping(server.url.replace("rediss://", "redis://", 1)),
+                "unknown_scheme_rejected": unknown_scheme_rejected
+            }
+            return {"checks": checks, "ok": all(checks.values()), "server": server.stats()}
+
+SCENARIOS = {"overhead": overhead, "app": app_behaviour, "redis": redis_shared, "tls": tls}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="레이트 리밋 오버헤드 / 동작 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--redis-requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20, help="redis 시나리오 동시 검사 수")
+    parser.add_argument("--redis-latency-ms", type=float, default=0.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+재시도 / 서킷 브레이커 장애 주입 확인 (가짜 Supabase + 로컬 mock ElevenLabs 서버)
+
+    cd backend
+    python -m benchmarks.resilience
+
+1. transient: Supabase 에러율 --error-rate에서 재시도 off/on 성공률 비교
+2. outage: Supabase 전면 장애 → 브레이커 open → 503 + Retry-After로 즉시 실패
+   → reset timeout 후 half-open 시험 호출로 복구되는지 확인
+3. elevenlabs: mock 서버가 항상 503이면 signed URL 발급도 브레이커로 빠르게 실패하는지 확인
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import UpstreamConfig, run_load, running_app, summarize
+from benchmarks.mock_elevenlabs import MockElevenLabsServer
+
+def _breaker_env(args: argparse.Namespace, prefix: str) -> Dict[str, str]:
+    return {
+        f"{prefix}_BREAKER_FAILURE_THRESHOLD": str(args.failure_threshold),
+        f"{prefix}_BREAKER_RESET_TIMEOUT": str(args.reset_timeout),
+        f"{prefix}_RETRY_BASE_DELAY": "0.01",
+        f"{prefix}_RETRY_MAX_DELAY": "0.05"
+    }
+
+async def transient(args: argparse.Namespace) -> Dict[str, Any]:
+    """일시적 에러: 재시도 횟수별 성공률/지연"""
+    results: Dict[str, Any] = {}
+    for attempts in (1, 3):
+        env = {
+            "VOICE_CACHE_ENABLED": "false",
+            "SUPABASE_RETRY_ATTEMPTS": str(attempts),
+            # 에러율만 보려고 브레이커는 끔
+            "SUPABASE_BREAKER_FAILURE_THRESHOLD": "0",
+            "SUPABASE_RETRY_BASE_DELAY": "0.01",
+            "SUPABASE_RETRY_MAX_DELAY": "0.05"
+        }
+        async with running_app(
+            supabase=UpstreamConfig(latency_ms=args.latency_ms, error_rate=args.error_rate),
+            rows=args.rows,
+            env=env,
+            seed=args.seed
+        ) as bench:
+            async def call(i: int) -> int:
+                response = await bench.client.get(f"/api/voices/agent/agent_{i % args.rows:07d}")
+                return response.status_code
+
+            result = await run_load(call, args.requests, args.concurrency)
+            results[f"attempts_{attempts}"] = {
+                "error_rate": result["error_rate"],
+                "latency_ms": result["latency_ms"],
+                "status_codes": result["status_codes"],
+                "upstream": bench.supabase.stats()
+            }
+    return results
+
+async def outage(args: argparse.Namespace) -> Dict[str, Any]:
+    """전면 장애 → open → fast fail → 복구"""
+    env = {"VOICE_CACHE_ENABLED": "false", **_breaker_env(args, "SUPABASE")}
+    async with running_app(
+        supabase=UpstreamConfig(latency_ms=args.latency_ms),
+        rows=args.rows,
+        env=env,
+        seed=args.seed
+    ) as bench:
+        from app.database.supabase import get_supabase_manager
+        breaker = get_supabase_manager().upstream.breaker
+        faults = bench.supabase.faults
+
+        async def request(path: str) -> Dict[str, Any]:
+            started = time.perf_counter()
+            response = await bench.client.get(path)
+            return {
+                "status": response.status_code,
+                "retry_after": response.headers.get("retry-after"),
+                "elapsed": time.perf_counter() - started
+            }
+
+        faults.error_rate = 1.0
+        failing: List[Dict[str, Any]] = []
+        for i in range(args.failure_threshold * 2):
+            failing.append(await request(f"/api/voices/agent/agent_{i:07d}"))
+        calls_before_open = faults.calls
+
+        rejected: List[Dict[str, Any]] = []
+        for i in range(args.requests):
+            rejected.append(await request(f"/api/voices/agent/agent_{i % args.rows:07d}"))
+        upstream_calls_while_open = faults.calls - calls_before_open
+        state_after_outage = breaker.state
+
+        faults.error_rate = 0.0
+        await asyncio.sleep(args.reset_timeout)
+        recovered = await request("/api/voices/agent/agent_0000000")
+        health = (await bench.client.get("/health")).json()
+
+        return {
+            "state_after_outage": state_after_outage,
+            "failing_status": sorted({item["status"] for item in failing}),
+            "open_status": sorted({item["status"] for item in rejected}),
+            "open_retry_after": sorted({item["retry_after"] for item in rejected if item["retry_after"]}),
+            "open_latency_ms": summarize([item["elapsed"] for item in rejected]),
+            "upstream_calls_while_open": upstream_calls_while_open,
+            "recovered_status": recovered["status"],
+            "breaker": health.get("upstreams", {}).get("supabase")
+        }
+
+async def elevenlabs(args: argparse.Namespace) -> Dict[str, Any]:
+    """ElevenLabs 503 지속 → 발급 요청이 브레이커로 즉시 503"""
+    from app.core.errors import ServiceUnavailableError
+    from app.services.elevenlabs import ElevenLabsService
+
+    async with MockElevenLabsServer(latency_ms=args.latency_ms, status_code_rate=1.0) as server:
+        overrides = {
+            "ELEVENLABS_API_KEY": "mock-key",
+            "ELEVENLABS_BASE_URL": server.url,
+            **_breaker_env(args, "ELEVENLABS")
+        }
+        previous = {key: os.environ.get(key) for key in overrides}
+        os.environ.update(overrides)
+        try:
+            service = ElevenLabsService()
+            service.client
+        finally:
+            for key, value in previous.items():
+                if value is None:
+                    os.environ.pop(key, None)
+                else:
+                    os.environ[key] = value
+
+        outcomes: Dict[str, int] = {}
+        latencies: List[float] = []
+        for i in range(args.requests):
+            started = time.perf_counter()
+            try:
+                await service.get_signed_url(f"agent_{i:04d}")
+                outcome = "ok"
+            except ServiceUnavailableError:
+                outcome = "circuit_open"
+            except Exception:
+                outcome = "error"
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+        stats = service.stats()["upstream"]
+        await service.aclose()
+        return {
+            "outcomes": outcomes,
+            "latency_ms": summarize(latencies),
+            "upstream_requests": server.stats()["requests"],
+            "breaker": stats
+        }
+
+SCENARIOS = {"transient": transient, "outage": outage, "elevenlabs": elevenlabs}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="재시도 / 서킷 브레이커 장애 주입 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.2, help="transient 시나리오 Supabase 에러율")
+    parser.add_argument("--failure-threshold", type=int, default=5)
+    parser.add_argument("--reset-timeout", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
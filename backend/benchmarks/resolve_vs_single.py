@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+POST /api/voices/resolve 한 번 vs GET /api/voices/public/{id} N번(동시) 비교
+
+    cd backend
+    python -m benchmarks.resolve_vs_single --batch 10,50,100 --iterations 30
+
+캐시를 끈 상태(VOICE_CACHE_ENABLED=false)에서 배치 전체 소요 시간과
+Supabase 요청 수를 비교합니다.
+"""
+
+import sys
+import json
+import random
+import asyncio
+import argparse
+import time
+from typing import Any, Dict, List, Optional
+
+from benchmarks.harness import UpstreamConfig, running_app, summarize
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    supabase = UpstreamConfig(args.supabase_latency_ms, args.supabase_jitter_ms)
+    env = {"VOICE_CACHE_ENABLED": "false", "SINGLEFLIGHT_ENABLED": "false"}
+    results: List[Dict[str, Any]] = []
+
+    async with running_app(supabase=supabase, rows=args.rows, env=env) as bench:
+        rng = random.Random(0)
+
+        for batch in args.batch:
+            timings: Dict[str, List[float]] = {"single": [], "resolve": []}
+            upstream: Dict[str, int] = {"single": 0, "resolve": 0}
+
+            for _ in range(args.iterations):
+                public_ids = [row["public_id"] for row in rng.sample(bench.rows, batch)]
+
+                before = bench.supabase.faults.calls
+                started = time.perf_counter()
+                responses = await asyncio.gather(*(
+                    bench.client.get(f"/api/voices/public/{public_id}") for public_id in public_ids
+                ))
+                timings["single"].append(time.perf_counter() - started)
+                upstream["single"] += bench.supabase.faults.calls - before
+                assert all(response.status_code == 200 for response in responses)
+
+                before = bench.supabase.faults.calls
+                started = time.perf_counter()
+                response = await bench.client.post("/api/voices/resolve", json={
+                    "ids": [{"kind": "public_id", "id": public_id} for public_id in public_ids]
+                })
+                timings["resolve"].append(time.perf_counter() - started)
+                upstream["resolve"] += bench.supabase.faults.calls - before
+                assert response.status_code == 200 and response.json()["found"] == batch
+
+            for mode in ("single", "resolve"):
+                result = {
+                    "batch": batch,
+                    "mode": mode,
+                    "iterations": args.iterations,
+                    "latency_ms": summarize(timings[mode]),
+                    "supabase_requests_per_batch": upstream[mode] / args.iterations
+                }
+                results.append(result)
+                print(
+                    f"batch={batch:<4} {mode:<8} p50={result['latency_ms']['p50']:>8.2f}ms "
+                    f"p99={result['latency_ms']['p99']:>8.2f}ms "
+                    f"supabase_requests={result['supabase_requests_per_batch']:.1f}"
+                )
+
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="resolve 일괄 조회 vs 단건 조회 N번")
+    parser.add_argument("--batch", type=lambda raw: [int(v) for v in raw.split(",")], default=[10, 50, 100])
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--supabase-latency-ms", type=float, default=5.0)
+    parser.add_argument("--supabase-jitter-ms", type=float, default=1.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+목록 응답 직렬화 마이크로벤치마크 + FAST_JSON 바이트 동일성 확인
+
+    cd backend
+    python -m benchmarks.serialization --items 100,1000,10000
+
+직렬화 방식별 VoiceListResponse 처리 시간 (모델 생성은 제외, 별도 표시):
+- fastapi_default: response_model 재검증 + pydantic-core JSON (기본 경로)
+- stdlib_json: model_dump(mode="json") + json.dumps (JSONResponse)
+- orjson_dict: model_dump(mode="json") + orjson (FastJSONResponse)
+- fast_path: 재검증 없이 pydantic-core JSON (FAST_JSON의 모델 응답)
+FastJSONResponse가 NaN·지수 표기 float 등에서도 JSONResponse와 같은 바이트(또는 같은 에러)인지 항상 확인하고,
+--check-routes를 주면 FAST_JSON on/off로 전 라우트(/health 포함) 응답 바이트가 같은지도 비교합니다.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from app.core import serialization
+from app.core.serialization import FastJSONResponse, model_json
+from app.database.models import VoiceListResponse, VoiceRecord
+from benchmarks.fakes import make_voice_rows
+from benchmarks.harness import running_app
+
+def _timeit(func: Callable[[], Any], min_seconds: float) -> float:
+    """min_seconds 이상 반복 실행한 1회 평균(ms)"""
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return elapsed / runs * 1000
+
+def bench_items(count: int, min_seconds: float) -> Dict[str, Any]:
+    rows = make_voice_rows(count)
+    build = lambda: [VoiceRecord(**row) for row in rows]
+    records = build()
+    model = VoiceListResponse(voices=records, total=count, next_cursor=None, message=f"총 {count}개의 음성 에이전트를 찾았습니다.")
+    field = create_model_field(name="response", type_=VoiceListResponse, mode="serialization")
+
+    def fastapi_default() -> bytes:
+        value, _ = field.validate(model, {}, loc=("response",))
+        return field.serialize_json(value)
+
+    methods: Dict[str, Callable[[], bytes]] = {
+        "fastapi_default": fastapi_default,
+        "stdlib_json": lambda: JSONResponse(content=model.model_dump(mode="json")).body,
+        "orjson_dict": lambda: FastJSONResponse(content=model.model_dump(mode="json")).body,
+        "fast_path": lambda: model_json(model)
+    }
+
+    reference = fastapi_default()
+    identical = {name: method() == reference for name, method in methods.items()}
+
+    return {
+        "items": count,
+        "bytes": len(reference),
+        "identical": identical,
+        "build_records_ms": round(_timeit(build, min_seconds), 3),
+        "serialize_ms": {name: round(_timeit(method, min_seconds), 3) for name, method in methods.items()}
+    }
+
+ROUTES = [
+    ("GET", "/api/voices/list?limit=100", None),
+    ("GET", "/api/voices/list?limit=5&fields=public_id,nickname", None),
+    ("GET", "/api/voices/agent/agent_0000001", None),
+    ("GET", "/api/voices/agent/missing", None),
+    ("GET", "/api/voices/public/p0000002", None),
+    ("GET", "/api/voices/stats", None),
+    ("POST", "/api/voices/resolve", {"ids": [{"kind": "public_id", "id": "p0000003"}, {"kind": "agent_id", "id": "nope"}]}),
+    ("GET", "/api/conversations/signed-url?agent_id=agent_0000004", None),
+    ("POST", "/api/conversations/signed-url", {"agent_id": "agent_0000004"}),
+    ("GET", "/api/conversations/validate-agent/agent_0000005", None),
+    ("GET", "/api/conversations/validate-agent/nope", None),
+    ("GET", "/api/conversations/signed-url-by-public?public_id=p0000006", None),
+    ("POST", "/api/conversations/signed-url-by-public", {"public_id": "p0000006"}),
+    ("GET", "/", None)
+]
+
+# JSONResponse와 표기·에러가 달라지기 쉬운 값 (orjson을 쓰면 표준 json으로 대신 직렬화돼야 함)
+EDGE_VALUES = [
+    {"ratio": 0.1, "small": 1e-05, "tiny": 5e-324, "large": 1e16, "huge": 1.5e300},
+    {"negative_zero": -0.0, "int": 2**63, "float_int": 1e15},
+    {"nan": float("nan")},
+    {"inf": [float("inf")]},
+    {"nested": [{"value": 2.5e-07}]}
+]
+
+def _render(render: Callable[[Any], bytes], content: Any) -> Any:
+    try:
+        return render(content)
+    except ValueError as e:
+        return f"ValueError: {e}"
+
+def check_values() -> List[Dict[str, Any]]:
+    """EDGE_VALUES를 FastJSONResponse / JSONResponse로 렌더링한 결과(바이트 또는 에러)가 같은지"""
+    return [
+        {
+            "value": repr(value),
+            "identical": _render(lambda c: FastJSONResponse(c).body, value) == _render(lambda c: JSONResponse(c).body, value)
+        }
+        for value in EDGE_VALUES
+    ]
+
+async def check_routes() -> List[Dict[str, Any]]:
+    """FAST_JSON off/on 응답 바이트 비교 (signed URL 토큰은 발급 순서만 같으면 동일)
+
+    /health처럼 매번 값이 바뀌는 dict 응답은 FAST_JSON 실행에서 FastJSONResponse가 렌더링한
+    내용을 기록해 JSONResponse 렌더링과 바이트를 비교합니다.
+    """
+    bodies: Dict[bool, List[bytes]] = {}
+    rendered: List[bool] = []
+    original = serialization.FAST_JSON
+    original_render = FastJSONResponse.render
+
+    def recording_render(self: FastJSONResponse, content: Any) -> bytes:
+        body = original_render(self, content)
+        rendered.append(body == _render(lambda c: JSONResponse.render(self, c), content))
+        return body
+
+    try:
+        for fast in (False, True):
+            serialization.FAST_JSON = fast
+            async with running_app(rows=100) as bench:
+                bodies[fast] = [
+                    (await bench.client.request(method, path, json=body)).content
+                    for method, path, body in ROUTES
+                ]
+                if fast:
+                    FastJSONResponse.render = recording_render
+                    try:
+                        health = await bench.client.get("/health")
+                    finally:
+                        FastJSONResponse.render = original_render
+    finally:
+        serialization.FAST_JSON = original
+
+    return [
+        {"route": f"{method} {path}", "identical": bodies[False][i] == bodies[True][i]}
+        for i, (method, path, _) in enumerate(ROUTES)
+    ] + [{
+        "route": "GET /health (FastJSONResponse vs JSONResponse)",
+        "identical": health.status_code == 200 and bool(rendered) and all(rendered)
+    }]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="목록 응답 직렬화 마이크로벤치마크")
+    parser.add_argument("--items", default="100,1000,10000", help="쉼표 구분 항목 수")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="방식별 최소 측정 시간")
+    parser.add_argument("--check-routes", action="store_true", help="FAST_JSON on/off 라우트 응답 바이트 비교")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Any] = {"orjson": serialization.orjson is not None, "items": []}
+    for count in (int(value) for value in args.items.split(",")):
+        result = bench_items(count, args.min_seconds)
+        results["items"].append(result)
+        timings = " ".join(f"{name}={ms:.3f}ms" for name, ms in result["serialize_ms"].items())
+        print(f"items={count:<6} bytes={result['bytes']:<8} build={result['build_records_ms']:.3f}ms {timings}")
+        if not all(result["identical"].values()):
+            print(f"  바이트 불일치: {result['identical']}")
+
+    results["values"] = check_values()
+    for value in results["values"]:
+        if not value["identical"]:
+            print(f"DIFF {value['value']}")
+
+    if args.check_routes:
+        results["routes"] = asyncio.run(check_routes())
+        for route in results["routes"]:
+            print(f"{'OK ' if route['identical'] else 'DIFF'} {route['route']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0 if all(all(item["identical"].values()) for item in results["items"]) and all(
+        check["identical"] for check in results["values"] + results.get("routes", [])
+    ) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""
+가짜 upstream을 주입한 앱 (실제 uvicorn 프로세스로 띄우는 벤치마크용)
+
+    uvicorn benchmarks.server_app:app
+
+워커 프로세스마다 import 시점에 가짜 Supabase/ElevenLabs가 설치됩니다.
+지연은 BENCH_SUPABASE_LATENCY_MS / BENCH_ELEVENLABS_LATENCY_MS, 행 수는 BENCH_ROWS로 조정합니다.
+"""
+
+import os
+
+from benchmarks.fakes import FakeElevenLabs, FakePostgrest, FaultInjector, make_voice_rows
+
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://supabase.fake")
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "fake-anon-key")
+os.environ.setdefault("ELEVENLABS_API_KEY", "fake-elevenlabs-key")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from app.main import create_app
+from app.database.supabase import SupabaseManager, set_supabase_manager
+from app.services.elevenlabs import ElevenLabsService, set_elevenlabs_service
+
+rows = make_voice_rows(int(os.getenv("BENCH_ROWS", 1000)))
+
+set_supabase_manager(SupabaseManager(
+    transport=FakePostgrest(
+        {"voices": rows},
+        FaultInjector(latency_ms=float(os.getenv("BENCH_SUPABASE_LATENCY_MS", 5)))
+    ),
+    realtime=False
+))
+set_elevenlabs_service(ElevenLabsService(client=FakeElevenLabs(
+    FaultInjector(latency_ms=float(os.getenv("BENCH_ELEVENLABS_LATENCY_MS", 50)))
+)))
+
+app = create_app()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+run.py 실행 모드(development / production) 기동 시간·처리량·종료 drain 비교
+
+    cd backend
+    python -m benchmarks.server_modes --duration 10 --concurrency 64 --client-processes 2
+
+각 모드의 uvicorn 옵션(run.server_options)으로 benchmarks.server_app:app을 실제 프로세스로 띄우고
+- 기동 시간: 프로세스 시작 → /livez 200, → /readyz 200 (예열 포함)
+- 처리량: 여러 클라이언트 프로세스에서 HTTP keep-alive로 부하
+- 종료: 느린 요청 진행 중 SIGTERM → 해당 요청이 끝까지 응답되는지와 종료 소요 시간
+을 측정합니다. 로드 생성기도 같은 머신의 CPU를 쓰므로 코어 수가 적으면 차이가 작게 나옵니다.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import random
+import asyncio
+import argparse
+import subprocess
+import multiprocessing
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.harness import summarize
+from benchmarks.fakes import make_voice_rows
+
+LAUNCHER = (
+    "import sys, run, uvicorn\n"
+    "options = run.server_options(sys.argv[1])\n"
+    "options.update(host='127.0.0.1', port=int(sys.argv[2]))\n"
+    "uvicorn.run('benchmarks.server_app:app', **options)\n"
+)
+
+def _start(mode: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", LAUNCHER, mode, str(port)],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+def _wait_for(url: str, timeout: float) -> Optional[float]:
+    """url이 200을 반환할 때까지 대기 → 걸린 시간(초)"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            if httpx.get(url, timeout=1).status_code == 200:
+                return time.perf_counter() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+    return None
+
+def _client_worker(args: tuple) -> Dict[str, Any]:
+    """클라이언트 프로세스 하나: duration초 동안 concurrency개 연결로 요청"""
+    base_url, duration, concurrency, rows, seed = args
+    public_ids = [row["public_id"] for row in make_voice_rows(rows)]
+    rng = random.Random(seed)
+
+    async def run() -> Dict[str, Any]:
+        latencies: List[float] = []
+        errors = 0
+        deadline = time.perf_counter() + duration
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            async def worker() -> None:
+                nonlocal errors
+                while time.perf_counter() < deadline:
+                    path = (
+                        f"/api/voices/public/{rng.choice(public_ids)}"
+                        if rng.random() < 0.8 else "/api/voices/list?limit=20"
+                    )
+                    started = time.perf_counter()
+                    try:
+                        response = await client.get(path)
+                        if response.status_code >= 500:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append(time.perf_counter() - started)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return {"latencies": latencies, "errors": errors}
+
+    return asyncio.run(run())
+
+def _measure_load(base_url: str, args: argparse.Namespace) -> Dict[str, Any]:
+    per_process = max(1, args.concurrency // args.client_processes)
+    jobs = [(base_url, args.duration, per_process, args.rows, seed) for seed in range(args.client_processes)]
+    with multiprocessing.Pool(args.client_processes) as pool:
+        parts = pool.map(_client_worker, jobs)
+
+    latencies = [value for part in parts for value in part["latencies"]]
+    return {
+        "requests": len(latencies),
+        "errors": sum(part["errors"] for part in parts),
+        "throughput_rps": round(len(latencies) / args.duration, 2),
+        "latency_ms": summarize(latencies)
+    }
+
+def _measure_drain(process: subprocess.Popen, base_url: str, in_flight: int) -> Dict[str, Any]:
+    """느린 요청(signed URL 발급) 진행 중 SIGTERM → 응답 완료 여부와 종료 시간"""
+
+    async def run() -> Dict[str, Any]:
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            requests = [
+                asyncio.ensure_future(client.get(f"/api/conversations/signed-url-by-public?public_id=p{i:07d}"))
+                for i in range(in_flight)
+            ]
+            await asyncio.sleep(0.2)
+            started = time.perf_counter()
+            process.send_signal(signal.SIGTERM)
+            responses = await asyncio.gather(*requests, return_exceptions=True)
+            completed = sum(1 for r in responses if isinstance(r, httpx.Response) and r.status_code == 200)
+            await asyncio.get_running_loop().run_in_executor(None, process.wait, 60)
+            return {
+                "in_flight": in_flight,
+                "completed": completed,
+                "shutdown_s": round(time.perf_counter() - started, 3)
+            }
+
+    return asyncio.run(run())
+
+def run_mode(mode: str, port: int, args: argparse.Namespace) -> Dict[str, Any]:
+    env = {
+        "BENCH_ROWS": str(args.rows),
+        "BENCH_SUPABASE_LATENCY_MS": str(args.supabase_latency_ms),
+        # drain 측정용으로 발급 지연을 길게 설정
+        "BENCH_ELEVENLABS_LATENCY_MS": str(args.drain_latency_ms),
+        "HEALTH_PROBE_INTERVAL": "60",
+        **({"WEB_CONCURRENCY": str(args.workers)} if args.workers else {})
+    }
+    base_url = f"http://127.0.0.1:{port}"
+
+    started = time.perf_counter()
+    process = _start(mode, port, env)
+    try:
+        livez = _wait_for(f"{base_url}/livez", args.startup_timeout)
+        readyz = _wait_for(f"{base_url}/readyz", args.startup_timeout)
+        startup = {
+            "livez_s": round(livez, 3) if livez is not None else None,
+            "readyz_s": round(time.perf_counter() - started, 3) if readyz is not None else None
+        }
+        if livez is None:
+            raise RuntimeError(f"{mode} 서버가 {args.startup_timeout}초 안에 시작되지 않았습니다.")
+
+        load = _measure_load(base_url, args)
+        drain = _measure_drain(process, base_url, args.drain_requests)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+    return {"mode": mode, "options": _describe(mode), "startup": startup, "load": load, "drain": drain}
+
+def _describe(mode: str) -> Dict[str, Any]:
+    import run
+    return {key: value for key, value in run.server_options(mode).items() if key not in ("host", "port")}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="run.py 실행 모드 비교")
+    parser.add_argument("--modes", nargs="*", default=["development", "production"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--client-processes", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=0, help="production 워커 수 (기본: CPU 수)")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--supabase-latency-ms", type=float, default=5.0)
+    parser.add_argument("--drain-latency-ms", type=float, default=2000.0)
+    parser.add_argument("--drain-requests", type=int, default=20)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = []
+    for offset, mode in enumerate(args.modes):
+        result = run_mode(mode, args.port + offset, args)
+        results.append(result)
+        load, startup, drain = result["load"], result["startup"], result["drain"]
+        print(
+            f"{mode:<12} livez={startup['livez_s']}s readyz={startup['readyz_s']}s "
+            f"rps={load['throughput_rps']:.1f} p50={load['latency_ms']['p50']:.2f}ms "
+            f"p99={load['latency_ms']['p99']:.2f}ms errors={load['errors']} "
+            f"drain={drain['completed']}/{drain['in_flight']} shutdown={drain['shutdown_s']}s"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
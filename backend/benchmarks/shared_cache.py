@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+공유(L2) voice 캐시 확인 (로컬 fake Redis 서버 + 가짜 Supabase)
+
+    cd backend
+    python -m benchmarks.shared_cache
+
+1. codec: L2 바이너리 형식 vs JSON 크기·인코딩/디코딩 시간 + 왕복 확인 (None 필드, 빈 문자열, 긴 UTF-8,
+   UTC가 아닌·naive datetime, negative 값, 손상된 값은 ValueError)
+2. cold_pod: 파드 A가 트래픽을 받은 뒤 새 파드 B(빈 L1)가 같은 트래픽을 받을 때 B의 Supabase 조회 수
+   (L2 없음 / L2 / L2 + 시작 시 warm-up)
+3. stampede: 파드 N개(각자 L1·single-flight)가 같은 콜드 키를 동시에 조회할 때 DB 조회 수 (L2 잠금 유무)
+4. invalidate: Realtime 변경 이벤트로 L2 키가 지워지는지
+5. redis_down: Redis에 연결할 수 없어도 요청이 성공하는지 (첫 에러 후 error_backoff 동안 L2를 건너뛰고 DB 조회)
+6. fingerprint: VoiceRecord 필드가 바뀌면(스키마 지문 변경) 이전 지문으로 저장된 키를 읽지 않는지
+7. fill_lock: 다른 파드가 잠금을 잡고 채우는 동안 기다렸다 L2 값을 쓰는지(DB 조회 없음),
+   잠금을 잡은 파드가 채우지 않으면 lock_wait 뒤 직접 조회하는지
+8. backoff: Redis 오류 후 error_backoff 동안 Redis에 명령을 보내지 않고 DB로 조회하다가 지나면 다시 L2를 쓰는지
+9. hot: 인기 점수가 찾은 레코드만 세는지(없는 public_id 제외), L2 hit·DB 채움 모두 세는지,
+   점수 집합이 --hot-max-size개로 제한되고 꽉 찬 뒤에도 새로 인기 있는 public_id가 순위에 오르는지
+10. no_realtime: Realtime 구독이 없을 때 L2 저장 TTL이 VOICE_CACHE_TTL로 줄고, Realtime이 있는 파드가
+    VOICE_L2_TTL로 저장한 값은 쓰지 않으며, L2에서 채운 L1 항목이 L2 값보다 오래 남지 않아
+    DB에서 지운 음성이 VOICE_CACHE_TTL 안에 404가 되는지
+
+확인(checks) 시나리오가 실패하면 종료 코드 1
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.redis import RedisClient
+from app.core.singleflight import SingleFlight
+from app.database.cache import VoiceCache
+from app.database.models import VoiceRecord
+from app.database.repository import VoiceRepository
+from app.database import shared_cache as shared_cache_module
+from app.database.shared_cache import (
+    SCHEMA_FINGERPRINT, SharedVoiceCache, decode_record, encode_record, schema_fingerprint
+)
+from app.database.supabase import SupabaseManager, get_supabase_manager
+from benchmarks.fake_redis import FakeRedisServer
+from benchmarks.fakes import FakePostgrest, make_voice_rows
+from benchmarks.harness import UpstreamConfig, running_app, summarize
+
+def _timed(fn: Any, items: List[Any], repeat: int) -> float:
+    """항목당 평균 µs"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - started) / (repeat * len(items)) * 1e6
+
+async def codec(args: argparse.Namespace) -> Dict[str, Any]:
+    records = [VoiceRecord(**row) for row in make_voice_rows(1000)]
+    binary = [encode_record(record) for record in records]
+    as_json = [record.model_dump_json().encode() for record in records]
+
+    def round_trip(**overrides: Any) -> VoiceRecord:
+        return decode_record(encode_record(records[0].model_copy(update=overrides)))
+
+    seoul = timezone(timedelta(hours=9))
+    local_time = datetime(2025, 3, 1, 9, 30, 15, 123456, tzinfo=seoul)
+    naive_time = datetime(2025, 3, 1, 0, 30, 15, 123456)
+    long_text = "가나다라마바사" * 40
+    try:
+        decode_record(encode_record(records[0])[:-3])
+        truncated_rejected = False
+    except ValueError:
+        truncated_rejected = True
+    checks = {
+        "round_trip_all": all(decode_record(data) == record for data, record in zip(binary, records)),
+        "none_field": round_trip(nickname=None).nickname is None
+        and any(record.nickname is None for record in records),
+        "empty_string_not_none": round_trip(nickname="").nickname == "",
+        "long_utf8": round_trip(nickname=long_text).nickname == long_text,
+        # 같은 시각(UTC)으로 복원
+        "non_utc_datetime": round_trip(created_at=local_time).created_at == local_time
+        and round_trip(created_at=local_time).created_at.utcoffset() == timedelta(0),
+        "naive_datetime_as_utc": round_trip(created_at=naive_time).created_at == naive_time.replace(tzinfo=timezone.utc),
+        "negative": decode_record(encode_record(None)) is None,
+        "truncated_rejected": truncated_rejected
+    }
+    return {
+        "checks": checks,
+        "ok": all(checks.values()),
+        "schema_fingerprint": SCHEMA_FINGERPRINT,
+        "example_key": SharedVoiceCache(RedisClient()).key("public_id", records[0].public_id),
+        "bytes_per_record": {
+            "binary": round(sum(map(len, binary)) / len(binary), 1),
+            "json": round(sum(map(len, as_json)) / len(as_json), 1)
+        },
+        "encode_us": {
+            "binary": round(_timed(encode_record, records, args.repeat), 2),
+            "json": round(_timed(lambda record: record.model_dump_json(), records, args.repeat), 2)
+        },
+        "decode_us": {
+            "binary": round(_timed(decode_record, binary, args.repeat), 2),
+            "json": round(_timed(VoiceRecord.model_validate_json, as_json, args.repeat), 2)
+        }
+    }
+
+def _traffic(args: argparse.Namespace, rows: List[Dict[str, Any]]) -> List[str]:
+    """Zipf 분포 public_id 요청 목록 (소수 음성에 요청이 몰림)"""
+    rng = random.Random(args.seed)
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(rows))]
+    return [row["public_id"] for row in rng.choices(rows, weights=weights, k=args.requests)]
+
+async def _serve(bench: Any, public_ids: List[str]) -> Dict[str, Any]:
+    before = bench.supabase.requests_by_table.get("voices", 0)
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    for public_id in public_ids:
+        started = time.perf_counter()
+        response = await bench.client.get(f"/api/voices/public/{public_id}")
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return {
+        "supabase_voice_queries": bench.supabase.requests_by_table.get("voices", 0) - before,
+        "statuses": statuses,
+        "latency_ms": summarize(latencies)
+    }
+
+async def cold_pod(args: argparse.Namespace) -> Dict[str, Any]:
+    supabase = UpstreamConfig(latency_ms=args.latency_ms)
+    rows = make_voice_rows(args.rows)
+    public_ids = _traffic(args, rows)
+    results: Dict[str, Any] = {
+        "requests": args.requests,
+        "distinct_public_ids": len(set(public_ids)),
+        "supabase_latency_ms": args.latency_ms
+    }
+    async with FakeRedisServer() as redis:
+        modes = {
+            "l1_only": {"VOICE_L2_ENABLED": "false"},
+            "l2": {"VOICE_L2_ENABLED": "true", "REDIS_URL": redis.url, "VOICE_CACHE_WARMUP_TOP": "0"},
+            "l2_warmup": {"VOICE_L2_ENABLED": "true", "REDIS_URL": redis.url, "VOICE_CACHE_WARMUP_TOP": str(args.warmup_top)}
+        }
+        for name, env in modes.items():
+            redis.execute([b"FLUSHALL"])
+            async with running_app(supabase=supabase, rows=args.rows, env=env) as pod_a:
+                first = await _serve(pod_a, public_ids)
+            # 새 파드: 빈 L1, 같은 L2 (pod A가 채운 값과 인기 점수)
+            async with running_app(supabase=supabase, rows=args.rows, env=env) as pod_b:
+                l1_after_startup = get_supabase_manager().voice_cache.stats()["size"]
+                second = await _serve(pod_b, public_ids)
+                l1 = get_supabase_manager().voice_cache.stats()
+                shared = get_supabase_manager().shared_voice_cache
+            results[name] = {
+                "pod_a": first,
+                "pod_b": {
+                    **second,
+                    "l1_entries_after_startup": l1_after_startup,
+                    "l1_hit_rate": l1["hit_rate"],
+                    "l2": shared.stats() if shared else None
+                }
+            }
+    return results
+
+async def stampede(args: argparse.Namespace) -> Dict[str, Any]:
+    fake = FakePostgrest({"voices": make_voice_rows(args.rows)}, UpstreamConfig(latency_ms=args.latency_ms).injector(args.seed))
+    manager = SupabaseManager(transport=fake, realtime=False)
+    client = await manager.get_async_client()
+    keys = [f"p{i:07d}" for i in range(args.stampede_keys)]
+    results: Dict[str, Any] = {"pods": args.pods, "keys": len(keys), "requests_per_pod_per_key": args.stampede_callers}
+
+    async with FakeRedisServer() as redis:
+        for name in ("l1_only", "l2_lock"):
+            pods = [
+                VoiceRepository(
+                    client,
+                    cache=VoiceCache(),
+                    flight=SingleFlight("voices"),
+                    shared=SharedVoiceCache(RedisClient(port=redis.port)) if name == "l2_lock" else None
+                )
+                for _ in range(args.pods)
+            ]
+            before = fake.requests_by_table.get("voices", 0)
+            started = time.perf_counter()
+            for public_id in keys:
+                # 파드마다 같은 키를 동시에 여러 번 (파드 안은 single-flight, 파드 사이는 L2 잠금)
+                await asyncio.gather(*(
+                    pod.get_by_public_id(public_id) for pod in pods for _ in range(args.stampede_callers)
+                ))
+            elapsed = time.perf_counter() - started
+            fills: Dict[str, int] = {}
+            for pod in pods:
+                if pod.shared is not None:
+                    for result, count in pod.shared.fills.items():
+                        fills[result] = fills.get(result, 0) + count
+                    await pod.shared.aclose()
+            results[name] = {
+                "db_queries": fake.requests_by_table.get("voices", 0) - before,
+                "per_key_ms": round(elapsed / len(keys) * 1000, 1),
+                "l2_fills": fills or None
+            }
+    await manager.aclose()
+    return results
+
+async def invalidate(args: argparse.Namespace) -> Dict[str, Any]:
+    async with FakeRedisServer() as redis:
+        env = {"VOICE_L2_ENABLED": "true", "REDIS_URL": redis.url}
+        async with running_app(rows=100, env=env) as bench:
+            row = bench.rows[0]
+            await bench.client.get(f"/api/voices/public/{row['public_id']}")
+            manager = get_supabase_manager()
+            shared = manager.shared_voice_cache
+            cached_before = {column: (await shared.get(column, row[column]))[0] for column in ("public_id", "agent_id")}
+            manager._handle_voice_change({"data": {"type": "UPDATE", "record": row, "old_record": row}})
+            await asyncio.gather(*manager._invalidations)
+            cached_after = {column: (await shared.get(column, row[column]))[0] for column in ("public_id", "agent_id")}
+    return {"l2_cached_before": cached_before, "l2_cached_after_change": cached_after}
+
+async def no_realtime(args: argparse.Namespace) -> Dict[str, Any]:
+    """Realtime 구독 없이 DB에서 지운 음성이 L2를 거쳐도 VOICE_CACHE_TTL보다 오래 라우팅되지 않는지"""
+    ttl, l2_ttl = 0.5, 5.0
+    async with FakeRedisServer() as redis:
+        env = {
+            "VOICE_L2_ENABLED": "true",
+            "REDIS_URL": redis.url,
+            "VOICE_CACHE_TTL": str(ttl),
+            "VOICE_L2_TTL": str(l2_ttl),
+            "RATE_LIMIT_ENABLED": "false"
+        }
+        async with running_app(rows=100, env=env) as bench:
+            shared = get_supabase_manager().shared_voice_cache
+
+            async def status(row: Dict[str, Any]) -> int:
+                return (await bench.client.get(f"/api/voices/public/{row['public_id']}")).status_code
+
+            async def l2_pttl(row: Dict[str, Any]) -> int:
+                return redis.execute([b"PTTL", shared.key("public_id", row["public_id"]).encode()])
+
+            # 1) 이 파드가 채운 값: L2 TTL도 VOICE_CACHE_TTL로 줄어, 삭제가 그 안에 반영
+            filled = bench.rows[0]
+            filled_status = await status(filled)
+            filled_pttl = await l2_pttl(filled)
+            bench.rows.remove(filled)
+            await asyncio.sleep(ttl + 0.1)
+            filled_after_ttl = await status(filled)
+
+            # 2) Realtime이 있는 파드가 VOICE_L2_TTL로 저장한 값은 쓰지 않고 DB에서 다시 채움
+            seeded = bench.rows[1]
+            realtime_pod = SharedVoiceCache(RedisClient(port=redis.port), ttl=l2_ttl)
+            realtime_pod.realtime = True
+            await realtime_pod.set_many([(("public_id", seeded["public_id"]), VoiceRecord(**seeded))])
+            await realtime_pod.aclose()
+            bench.rows.remove(seeded)
+            seeded_status = await status(seeded)
+
+            # 3) L2에서 읽은 값은 L2에 남은 수명까지만 L1에 보관
+            aged = bench.rows[2]
+            await status(aged)
+            get_supabase_manager().voice_cache.clear()
+            await asyncio.sleep(ttl * 0.6)
+            aged_status = await status(aged)
+            bench.rows.remove(aged)
+            await asyncio.sleep(ttl * 0.4 + 0.1)
+            aged_after_l2_expiry = await status(aged)
+
+            checks = {
+                "realtime_off": not shared.realtime,
+                "l2_write_ttl_clamped": 0 < filled_pttl <= ttl * 1000,
+                "deleted_404_after_ttl": filled_status == 200 and filled_after_ttl == 404,
+                "long_lived_l2_entry_ignored": seeded_status == 404,
+                "l1_expires_with_l2_entry": aged_status == 200 and aged_after_l2_expiry == 404
+            }
+            return {
+                "voice_cache_ttl_s": ttl,
+                "l2_ttl_s": l2_ttl,
+                "l2_pttl_ms": filled_pttl,
+                "statuses": {
+                    "filled": [filled_status, filled_after_ttl],
+                    "seeded_by_realtime_pod": seeded_status,
+                    "l1_from_l2": [aged_status, aged_after_l2_expiry]
+                },
+                "l2": shared.stats(),
+                "checks": checks,
+                "ok": all(checks.values())
+            }
+
+async def redis_down(args: argparse.Namespace) -> Dict[str, Any]:
+    # 아무도 듣지 않는 포트 (서버를 열었다 닫아 포트만 확보)
+    server = await FakeRedisServer().start()
+    await server.stop()
+    env = {"VOICE_L2_ENABLED": "true", "REDIS_URL": server.url}
+    async with running_app(rows=100, env=env) as bench:
+        served = await _serve(bench, [row["public_id"] for row in bench.rows[:20]])
+        shared = get_supabase_manager().shared_voice_cache
+        checks = {
+            "all_requests_served": served["statuses"] == {200: len(bench.rows[:20])},
+            "single_error_logged": shared.errors == 1
+        }
+        return {**served, "l2_errors": shared.errors, "l2_skipped": shared.skipped, "checks": checks, "ok": all(checks.values())}
+
+async def fingerprint(args: argparse.Namespace) -> Dict[str, Any]:
+    class NextVoiceRecord(VoiceRecord):
+        """다음 배포에서 필드가 추가된 VoiceRecord"""
+        language: Optional[str] = None
+
+    record = VoiceRecord(**make_voice_rows(1)[0])
+    next_fingerprint = schema_fingerprint(NextVoiceRecord)
+    async with FakeRedisServer() as redis:
+        current = SharedVoiceCache(RedisClient(port=redis.port))
+        await current.set_many([(("public_id", record.public_id), record)])
+        # 새 버전 파드: 모듈 import 시 계산되는 지문만 바꿔 같은 코드로 생성
+        shared_cache_module.SCHEMA_FINGERPRINT = next_fingerprint
+        try:
+            upgraded = SharedVoiceCache(RedisClient(port=redis.port))
+        finally:
+            shared_cache_module.SCHEMA_FINGERPRINT = SCHEMA_FINGERPRINT
+        upgraded_hit, *_ = await upgraded.get("public_id", record.public_id)
+        current_hit, current_record, _ = await current.get("public_id", record.public_id)
+        checks = {
+            "fingerprint_is_model_derived": schema_fingerprint(VoiceRecord) == SCHEMA_FINGERPRINT,
+            "field_change_changes_fingerprint": next_fingerprint != SCHEMA_FINGERPRINT,
+            "fingerprint_in_key": SCHEMA_FINGERPRINT in current.key("public_id", record.public_id)
+            and next_fingerprint in upgraded.key("public_id", record.public_id),
+            "new_schema_misses_old_key": not upgraded_hit,
+            "old_key_still_readable_by_old_schema": current_hit and current_record == record
+        }
+        await current.aclose()
+        await upgraded.aclose()
+    return {
+        "schemas": {"current": SCHEMA_FINGERPRINT, "next": next_fingerprint},
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+
+async def _hold_fill_lock(cache: SharedVoiceCache, public_id: str, ttl: float) -> None:
+    """다른 파드가 잡고 있는 채우기 잠금"""
+    await cache.client.execute("SET", f"{cache.key('public_id', public_id)}:lock", "other-pod", "PX", int(ttl * 1000))
+
+async def fill_lock(args: argparse.Namespace) -> Dict[str, Any]:
+    record = VoiceRecord(**make_voice_rows(1)[0])
+    lock_wait = args.lock_wait
+    async with FakeRedisServer() as redis:
+        pod_a = SharedVoiceCache(RedisClient(port=redis.port), lock_wait=lock_wait)
+        pod_b = SharedVoiceCache(RedisClient(port=redis.port), lock_wait=lock_wait)
+        fetched: Dict[str, int] = {"a": 0, "b": 0}
+
+        def fetcher(pod: str, delay: float, result: Optional[VoiceRecord]) -> Any:
+            async def fetch() -> Optional[VoiceRecord]:
+                fetched[pod] += 1
+                await asyncio.sleep(delay)
+                return result
+            return fetch
+
+        # 1) A가 잠금을 잡고 lock_wait보다 짧게 DB 조회 → B는 기다렸다 L2 값을 씀
+        task_a = asyncio.ensure_future(pod_a.load("public_id", record.public_id, fetcher("a", lock_wait / 4, record)))
+        await asyncio.sleep(0.01)
+        waited = await pod_b.load("public_id", record.public_id, fetcher("b", 0, None))
+        loaded = await task_a
+
+        # 2) 잠금을 잡은 파드가 채우지 않음 (중단 등) → B는 lock_wait 뒤 직접 조회
+        stuck_id = "p-stuck-lock"
+        await _hold_fill_lock(pod_a, stuck_id, ttl=lock_wait * 10)
+        started = time.perf_counter()
+        fallback = await pod_b.load("public_id", stuck_id, fetcher("b", 0, record))
+        waited_s = time.perf_counter() - started
+        checks = {
+            "loader_fetched_once": fetched["a"] == 1 and loaded == record,
+            "waiter_used_l2_value": waited == record and pod_b.fills["waited"] == 1,
+            "waiter_did_not_fetch_while_filled": pod_b.fills["loaded"] == 0,
+            "timeout_falls_back_to_fetch": fallback == record and fetched["b"] == 1,
+            "timeout_counted": pod_b.fills["wait_timeout"] == 1,
+            "timeout_waits_lock_wait": lock_wait * 0.9 <= waited_s < lock_wait * 3
+        }
+        await pod_a.aclose()
+        await pod_b.aclose()
+    return {
+        "lock_wait_s": lock_wait,
+        "timeout_wait_s": round(waited_s, 3),
+        "fills": {"pod_a": pod_a.fills, "pod_b": pod_b.fills},
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+
+async def backoff(args: argparse.Namespace) -> Dict[str, Any]:
+    record = VoiceRecord(**make_voice_rows(1)[0])
+    error_backoff = args.error_backoff
+    async with FakeRedisServer() as redis:
+        cache = SharedVoiceCache(RedisClient(port=redis.port), error_backoff=error_backoff)
+        await cache.set_many([(("public_id", record.public_id), record)])
+        fetches = 0
+
+        async def fetch() -> Optional[VoiceRecord]:
+            nonlocal fetches
+            fetches += 1
+            return record
+
+        redis.fail = True
+        commands_before = redis.commands
+        first = await cache.get("public_id", record.public_id)
+        commands_after_error = redis.commands
+        # 백오프 중: get/load/set/invalidate 모두 Redis를 건너뜀 (load는 바로 DB 조회)
+        during = [await cache.get("public_id", record.public_id) for _ in range(5)]
+        loaded = await cache.load("public_id", record.public_id, fetch)
+        await cache.set_many([(("public_id", record.public_id), record)])
+        await cache.invalidate_row(record)
+        commands_during_backoff = redis.commands - commands_after_error
+        errors_during_backoff = cache.errors
+
+        redis.fail = False
+        await asyncio.sleep(error_backoff + 0.05)
+        after = await cache.get("public_id", record.public_id)
+        checks = {
+            "error_is_miss": first == (False, None, 0.0) and commands_after_error - commands_before >= 1,
+            "single_error_counted": errors_during_backoff == 1,
+            "no_redis_commands_during_backoff": commands_during_backoff == 0,
+            "lookups_skipped_during_backoff": all(result == (False, None, 0.0) for result in during) and cache.skipped >= 5,
+            "load_fetches_from_db_during_backoff": loaded == record and fetches == 1,
+            "l2_used_again_after_backoff": after[:2] == (True, record)
+        }
+        stats = cache.stats()
+        await cache.aclose()
+    return {"error_backoff_s": error_backoff, "checks": checks, "ok": all(checks.values()), "l2": stats}
+
+async def hot(args: argparse.Namespace) -> Dict[str, Any]:
+    records = {record.public_id: record for record in (VoiceRecord(**row) for row in make_voice_rows(args.hot_ids))}
+    fetched: List[str] = []
+
+    async with FakeRedisServer() as redis:
+        cache = SharedVoiceCache(RedisClient(port=redis.port), hot_max_size=args.hot_max_size)
+        hot_key = cache.hot_key.encode()
+
+        async def lookup(public_id: str) -> Optional[VoiceRecord]:
+            # VoiceRepository와 같은 순서: L2 조회 → miss면 잠금 잡고 DB 조회 후 저장
+            hit, record, _ = await cache.get("public_id", public_id)
+            if hit:
+                return record
+
+            async def fetch() -> Optional[VoiceRecord]:
+                fetched.append(public_id)
+                return records.get(public_id)
+
+            return await cache.load("public_id", public_id, fetch)
+
+        # 없는 public_id: DB 조회(miss) + negative hit → 점수 없음
+        for i in range(50):
+            await lookup(f"missing-{i}")
+            await lookup(f"missing-{i}")
+        tracked_after_missing = redis.execute([b"ZCARD", hot_key])
+
+        # 같은 public_id 두 번: DB에서 채울 때 1 + L2 hit 1
+        first_id = next(iter(records))
+        await lookup(first_id)
+        await lookup(first_id)
+        first_score = float(redis.execute([b"ZSCORE", hot_key, first_id.encode()]) or 0)
+
+        # 상한보다 많은 public_id를 두 번씩 조회 → 점수 집합은 hot_max_size개
+        for public_id in records:
+            await lookup(public_id)
+            await lookup(public_id)
+        tracked_after_fill = redis.execute([b"ZCARD", hot_key])
+
+        # 꽉 찬 뒤 처음 보는 public_id가 계속 조회되면 순위에 올라야 함 (방금 올린 멤버는 잘리지 않음)
+        newcomer = VoiceRecord(**{**make_voice_rows(1)[0], "public_id": "zz-newcomer"})
+        records[newcomer.public_id] = newcomer
+        for _ in range(args.hot_newcomer_lookups):
+            await lookup(newcomer.public_id)
+        top = await cache.hot_public_ids(1)
+        tracked_after_newcomer = redis.execute([b"ZCARD", hot_key])
+        stats = cache.stats()
+        await cache.aclose()
+
+    checks = {
+        "missing_public_ids_not_tracked": tracked_after_missing == 0,
+        "l2_hit_and_db_fill_counted": first_score == 2.0,
+        "hot_set_capped": tracked_after_fill == args.hot_max_size,
+        "newcomer_reaches_top": top == [newcomer.public_id],
+        "hot_set_still_capped": tracked_after_newcomer == args.hot_max_size
+    }
+    return {
+        "public_ids": len(records),
+        "hot_max_size": args.hot_max_size,
+        "db_fetches": len(fetched),
+        "checks": checks,
+        "ok": all(checks.values()),
+        "l2": stats
+    }
+
+SCENARIOS = {
+    "codec": codec, "cold_pod": cold_pod, "stampede": stampede,
+    "invalidate": invalidate, "redis_down": redis_down, "fingerprint": fingerprint,
+    "fill_lock": fill_lock, "backoff": backoff, "hot": hot, "no_realtime": no_realtime
+}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="공유(L2) voice 캐시 형식 / 콜드 파드 / stampede 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000, help="cold_pod: 파드당 요청 수")
+    parser.add_argument("--zipf", type=float, default=1.1, help="cold_pod: 인기 분포 지수")
+    parser.add_argument("--warmup-top", type=int, default=200, help="cold_pod: VOICE_CACHE_WARMUP_TOP")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="가짜 Supabase 요청당 지연")
+    parser.add_argument("--pods", type=int, default=20, help="stampede: 파드 수")
+    parser.add_argument("--stampede-keys", type=int, default=10)
+    parser.add_argument("--stampede-callers", type=int, default=5, help="stampede: 파드당 동시 요청 수")
+    parser.add_argument("--repeat", type=int, default=20, help="codec: 반복 횟수")
+    parser.add_argument("--lock-wait", type=float, default=0.3, help="fill_lock: VOICE_L2_LOCK_WAIT")
+    parser.add_argument("--error-backoff", type=float, default=0.3, help="backoff: VOICE_L2_ERROR_BACKOFF")
+    parser.add_argument("--hot-ids", type=int, default=300, help="hot: 조회할 public_id 수")
+    parser.add_argument("--hot-max-size", type=int, default=50, help="hot: VOICE_L2_HOT_MAX_SIZE")
+    parser.add_argument("--hot-newcomer-lookups", type=int, default=5, help="hot: 꽉 찬 뒤 새 public_id 조회 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+클라이언트별 Signed URL 재사용 캐시 확인 (가짜 ElevenLabs, 발급 지연 --mint-ms)
+
+    cd backend
+    python -m benchmarks.signed_url_cache
+
+1. reconnect: --sessions개 탭이 각각 --refreshes번 새로고침(매번 같은 요청을 --double-fire번 동시에)
+   → 캐시 끔/켬에서 ElevenLabs 발급 수·응답 지연·아낀 호출 수
+2. safety: 서로 다른 세션은 절대 같은 URL을 받지 않는지, 세션 헤더가 없거나 형식이 틀리면 캐시하지 않는지,
+   같은 세션이라도 IP가 다르면 공유하지 않는지 (bind_ip)
+3. expiry: 재사용 기간(--window)이 지나면 새 URL을 발급하는지, max_size를 넘으면 오래된 항목부터 제거하는지
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from benchmarks.harness import UpstreamConfig, running_app, summarize
+
+SESSION_HEADER = "X-Client-Session"
+
+def _cache_env(enabled: bool, **overrides: Any) -> Dict[str, str]:
+    env = {
+        "SIGNED_URL_CACHE_ENABLED": "true" if enabled else "false",
+        "SIGNED_URL_POOL_ENABLED": "false",
+        "ELEVENLABS_COALESCE_SIGNED_URL": "false",
+        "ADMISSION_ENABLED": "false"
+    }
+    env.update({f"SIGNED_URL_CACHE_{key.upper()}": str(value) for key, value in overrides.items()})
+    return env
+
+async def _get(bench: Any, agent_id: str, session: Optional[str], ip: Optional[str] = None) -> Any:
+    headers = {SESSION_HEADER: session} if session else {}
+    if ip is not None:
+        # ASGITransport의 클라이언트 주소는 고정이므로 IP별 클라이언트를 따로 만듦
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=bench.app, client=(ip, 50000)), base_url="http://bench.local"
+        ) as client:
+            response = await client.get("/api/conversations/signed-url", params={"agent_id": agent_id}, headers=headers)
+    else:
+        response = await bench.client.get("/api/conversations/signed-url", params={"agent_id": agent_id}, headers=headers)
+    return response
+
+async def _signed_url(bench: Any, agent_id: str, session: Optional[str], ip: Optional[str] = None) -> str:
+    response = await _get(bench, agent_id, session, ip)
+    response.raise_for_status()
+    return response.json()["signed_url"]
+
+def _cache_stats(health: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    return health["elevenlabs"].get("signed_url_cache")
+
+async def reconnect(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "sessions": args.sessions,
+        "refreshes": args.refreshes,
+        "double_fire": args.double_fire,
+        "mint_ms": args.mint_ms
+    }
+    for name, enabled in (("cache_off", False), ("cache_on", True)):
+        async with running_app(
+            elevenlabs=UpstreamConfig(latency_ms=args.mint_ms), rows=args.rows, env=_cache_env(enabled)
+        ) as bench:
+            latencies: List[float] = []
+            statuses: Dict[int, int] = {}
+
+            async def tab(i: int) -> None:
+                session = uuid.uuid4().hex
+                agent_id = bench.rows[i % len(bench.rows)]["agent_id"]
+
+                async def call() -> None:
+                    started = time.perf_counter()
+                    status = (await _get(bench, agent_id, session)).status_code
+                    statuses[status] = statuses.get(status, 0) + 1
+                    latencies.append(time.perf_counter() - started)
+
+                for _ in range(args.refreshes):
+                    await asyncio.gather(*(call() for _ in range(args.double_fire)))
+                    await asyncio.sleep(args.refresh_interval_ms / 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(tab(i) for i in range(args.sessions)))
+            duration = time.perf_counter() - started
+            health = (await bench.client.get("/health")).json()
+            results[name] = {
+                "requests": len(latencies),
+                # 발급 대기열(ELEVENLABS_MINT_MAX_QUEUE)이 넘치면 503
+                "status_codes": dict(sorted(statuses.items())),
+                "elevenlabs_minted": bench.elevenlabs.minted,
+                "duration_s": round(duration, 3),
+                "latency_ms": summarize(latencies),
+                "cache": _cache_stats(health)
+            }
+    off, on = results["cache_off"]["elevenlabs_minted"], results["cache_on"]["elevenlabs_minted"]
+    results["mints_avoided_pct"] = round((off - on) / off * 100, 1) if off else 0.0
+    return results
+
+async def safety(args: argparse.Namespace) -> Dict[str, Any]:
+    async with running_app(rows=10, env=_cache_env(True)) as bench:
+        agent_id = bench.rows[0]["agent_id"]
+        sessions = [uuid.uuid4().hex for _ in range(args.safety_sessions)]
+        # 모든 세션이 같은 agent에 동시에 요청 (세션마다 두 번씩)
+        urls = await asyncio.gather(*(_signed_url(bench, agent_id, session) for session in sessions * 2))
+        by_session: Dict[str, set] = {}
+        for session, url in zip(sessions * 2, urls):
+            by_session.setdefault(session, set()).add(url)
+        reused_within_session = all(len(session_urls) == 1 for session_urls in by_session.values())
+        distinct_across_sessions = len(set().union(*by_session.values())) == len(sessions)
+
+        no_header = {await _signed_url(bench, agent_id, None) for _ in range(3)}
+        malformed = {await _signed_url(bench, agent_id, "short") for _ in range(3)}
+        session = uuid.uuid4().hex
+        other_ip = {await _signed_url(bench, agent_id, session, ip) for ip in ("10.0.0.1", "10.0.0.2")}
+        health = (await bench.client.get("/health")).json()
+        checks = {
+            "reused_within_session": reused_within_session,
+            "distinct_across_sessions": distinct_across_sessions,
+            "no_header_not_cached": len(no_header) == 3,
+            "malformed_session_not_cached": len(malformed) == 3,
+            "same_session_other_ip_not_shared": len(other_ip) == 2
+        }
+        return {"checks": checks, "ok": all(checks.values()), "cache": _cache_stats(health)}
+
+async def expiry(args: argparse.Namespace) -> Dict[str, Any]:
+    async with running_app(rows=10, env=_cache_env(True, window=args.window, max_size=args.max_size)) as bench:
+        agent_id = bench.rows[0]["agent_id"]
+        session = uuid.uuid4().hex
+        first = await _signed_url(bench, agent_id, session)
+        within = await _signed_url(bench, agent_id, session)
+        await asyncio.sleep(args.window + 0.1)
+        after = await _signed_url(bench, agent_id, session)
+
+        # max_size + 1개 세션을 채우면 가장 먼저 넣은 세션이 제거됨
+        sessions = [uuid.uuid4().hex for _ in range(args.max_size + 1)]
+        oldest = await _signed_url(bench, agent_id, sessions[0])
+        newest = ""
+        for other in sessions[1:]:
+            newest = await _signed_url(bench, agent_id, other)
+        oldest_again = await _signed_url(bench, agent_id, sessions[0])
+        newest_again = await _signed_url(bench, agent_id, sessions[-1])
+        health = (await bench.client.get("/health")).json()
+        cache = _cache_stats(health)
+        checks = {
+            "reused_within_window": first == within,
+            "new_url_after_window": after != first,
+            "oldest_evicted_by_size": oldest_again != oldest,
+            "size_bounded": cache["size"] <= args.max_size,
+            "newest_kept": newest_again == newest
+        }
+        return {
+            "window_s": args.window,
+            "max_size": args.max_size,
+            "checks": checks,
+            "ok": all(checks.values()),
+            "cache": cache
+        }
+
+SCENARIOS = {"reconnect": reconnect, "safety": safety, "expiry": expiry}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="클라이언트별 Signed URL 재사용 캐시 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--sessions", type=int, default=200, help="reconnect: 동시 탭 수")
+    parser.add_argument("--refreshes", type=int, default=5, help="reconnect: 탭마다 새로고침 횟수")
+    parser.add_argument("--double-fire", type=int, default=2, help="reconnect: 새로고침마다 동시에 보내는 같은 요청 수")
+    parser.add_argument("--refresh-interval-ms", type=float, default=200.0)
+    parser.add_argument("--mint-ms", type=float, default=150.0, help="가짜 ElevenLabs 발급 지연")
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--safety-sessions", type=int, default=100)
+    parser.add_argument("--window", type=float, default=1.0, help="expiry: 재사용 기간(초)")
+    parser.add_argument("--max-size", type=int, default=20, help="expiry: 최대 항목 수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+기동 비용 예산 확인 (import 시간·SDK 지연 import·첫 응답까지 시간)
+
+    cd backend
+    python -m benchmarks.startup --import-budget-ms 800 --first-response-budget-ms 3000
+    python -m benchmarks.startup --scenarios lazy_imports   # 시간과 무관한 확인만 (CI용)
+
+1. lazy_imports: 새 프로세스에서 `import app.main` 후 sys.modules에 supabase / postgrest / elevenlabs 등
+   SDK(DEFERRED_MODULES)가 있으면 실패. 머신 속도와 무관한 결정적 확인이며, 실패하면
+   `-X importtime` 출력으로 어떤 모듈이 불러왔는지(import 경로)를 함께 보여 줍니다
+2. imports: 새 프로세스에서 `python -X importtime -c "import app.main"`를 --runs번 실행한 app.main 누적
+   import 시간(중앙값)과 무거운 app 모듈 목록 (--import-budget-ms 예산)
+3. first_response: benchmarks.server_app(가짜 upstream)을 uvicorn 단일 프로세스로 띄워
+   프로세스 시작 → /livez 200, → 첫 /api/voices/public 200까지 시간 (PREWARM_CLIENTS 켬/끔)
+
+확인에 실패하거나 예산을 넘으면 종료 코드 1 (CI 회귀 확인용). 로드 생성·측정도 같은 머신에서 하므로 예산은 여유 있게 잡으세요.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.server_modes import _start, _wait_for
+
+# import app.main 시점에 올라오면 안 되는 SDK (클라이언트를 만들 때 import)
+DEFERRED_MODULES = ("supabase", "postgrest", "realtime", "storage3", "supabase_auth", "elevenlabs")
+
+def _deferred(name: str) -> bool:
+    return any(name == module or name.startswith(f"{module}.") for module in DEFERRED_MODULES)
+
+def _importtime_lines() -> List[Tuple[int, int, str]]:
+    """새 인터프리터에서 import app.main → (깊이, 누적 µs, 모듈) 목록 (-X importtime 순서: 자식이 부모보다 먼저)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True
+    )
+    lines: List[Tuple[int, int, str]] = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        try:
+            cumulative = int(total)
+        except ValueError:
+            continue
+        # 들여쓰기 2칸 = 한 단계 깊이
+        lines.append(((len(name) - len(name.lstrip())) // 2, cumulative, name.strip()))
+    return lines
+
+def _importtime() -> Dict[str, int]:
+    """모듈별 누적 import 시간(µs)"""
+    return {name: cumulative for _, cumulative, name in _importtime_lines()}
+
+def _import_chains(lines: List[Tuple[int, int, str]]) -> Dict[str, List[str]]:
+    """최상위 DEFERRED_MODULES import마다 app.main에서 그 모듈까지의 import 경로"""
+    chains: Dict[str, List[str]] = {}
+    for index, (depth, _, name) in enumerate(lines):
+        if not _deferred(name) or name in chains:
+            continue
+        # 부모는 뒤에 나오는 첫 번째 더 얕은 줄
+        chain = [name]
+        for parent_depth, _, parent in lines[index + 1:]:
+            if parent_depth < depth:
+                if _deferred(parent):
+                    break
+                chain.append(parent)
+                depth = parent_depth
+        else:
+            chains[name] = list(reversed(chain))
+    return chains
+
+def lazy_imports(args: argparse.Namespace) -> Dict[str, Any]:
+    loaded = subprocess.run(
+        [sys.executable, "-c", (
+            "import sys, app.main; "
+            f"print('\\n'.join(sorted(m for m in sys.modules if any(m == d or m.startswith(d + '.') for d in {DEFERRED_MODULES!r}))))"
+        )],
+        capture_output=True, text=True, check=True
+    ).stdout.split()
+    checks = {f"{module}_not_loaded": not any(name == module or name.startswith(f"{module}.") for name in loaded) for module in DEFERRED_MODULES}
+    result: Dict[str, Any] = {
+        "deferred_modules": list(DEFERRED_MODULES),
+        "loaded": loaded,
+        "checks": checks,
+        "ok": all(checks.values())
+    }
+    if loaded:
+        result["imported_by"] = _import_chains(_importtime_lines())
+    return result
+
+def imports(args: argparse.Namespace) -> Dict[str, Any]:
+    totals: List[int] = []
+    last: Dict[str, int] = {}
+    for _ in range(args.runs):
+        last = _importtime()
+        totals.append(last["app.main"])
+    app_modules = sorted(((name, us) for name, us in last.items() if name.startswith("app.")), key=lambda item: -item[1])
+    median_ms = statistics.median(totals) / 1000
+    return {
+        "app_main_ms": round(median_ms, 1),
+        "runs_ms": [round(total / 1000, 1) for total in totals],
+        "fastapi_ms": round(last.get("fastapi", 0) / 1000, 1),
+        "heaviest_app_modules_ms": {name: round(us / 1000, 1) for name, us in app_modules[:args.top]},
+        "budget_ms": args.import_budget_ms,
+        "ok": median_ms <= args.import_budget_ms
+    }
+
+def _first_response(port: int, prewarm: bool, args: argparse.Namespace) -> Dict[str, Any]:
+    env = {
+        "WEB_CONCURRENCY": "1",
+        "PREWARM_CLIENTS": "true" if prewarm else "false",
+        "LOG_LEVEL": "warning"
+    }
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = _start("production", port, env)
+    try:
+        livez = _wait_for(f"{base_url}/livez", args.startup_timeout)
+        first_api: Optional[float] = None
+        first_api_request_ms: Optional[float] = None
+        if livez is not None:
+            request_started = time.perf_counter()
+            status = httpx.get(f"{base_url}/api/voices/public/p0000000", timeout=args.startup_timeout).status_code
+            if status == 200:
+                first_api = time.perf_counter() - started
+                first_api_request_ms = (time.perf_counter() - request_started) * 1000
+        return {
+            "prewarm": prewarm,
+            "livez_s": None if livez is None else round(livez, 3),
+            "first_api_response_s": None if first_api is None else round(first_api, 3),
+            # 첫 API 요청 자체의 지연 (예열하지 않으면 클라이언트 생성·SDK import 비용을 여기서 냄)
+            "first_api_request_ms": None if first_api_request_ms is None else round(first_api_request_ms, 1)
+        }
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+def first_response(args: argparse.Namespace) -> Dict[str, Any]:
+    runs = [_first_response(args.port + offset, prewarm, args) for offset, prewarm in enumerate((True, False))]
+    worst = max((run["first_api_response_s"] or float("inf")) for run in runs)
+    return {
+        "runs": runs,
+        "budget_ms": args.first_response_budget_ms,
+        "ok": worst * 1000 <= args.first_response_budget_ms
+    }
+
+SCENARIOS = {"lazy_imports": lazy_imports, "imports": imports, "first_response": first_response}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="기동 비용 예산 확인 (SDK 지연 import·import 시간·첫 응답)")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=5, help="imports: 측정 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=8, help="imports: 표시할 app 모듈 수")
+    parser.add_argument("--import-budget-ms", type=float, default=800.0)
+    parser.add_argument("--first-response-budget-ms", type=float, default=3000.0)
+    parser.add_argument("--port", type=int, default=8785)
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    # 하위 프로세스가 app / benchmarks 패키지를 찾도록 backend 디렉토리를 기준으로 실행
+    os.environ["PYTHONPATH"] = os.pathsep.join(filter(None, (os.getcwd(), os.environ.get("PYTHONPATH"))))
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    failed = [name for name, result in results.items() if not result["ok"]]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
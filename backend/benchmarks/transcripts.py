@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+대화 기록 일괄 저장 확인 (가짜 Supabase PostgREST, 지연 주입)
+
+    cd backend
+    python -m benchmarks.transcripts
+
+1. inserts: messages 저장 처리량(rows/s) — 행마다 INSERT 1회 vs 다건 INSERT(batch_size별)
+2. ingest: POST /api/conversations/transcripts 응답 지연 + 마지막 행이 저장되기까지 걸린 시간
+3. overflow: 저장이 밀릴 때 reject(503 + Retry-After) / drop_oldest(오래된 이벤트 버림) 동작
+4. shutdown: lifespan 종료 시 대기열에 남은 이벤트가 모두 저장되는지
+5. auth: 토큰 없음·무효 토큰 401, 다른 사용자 sender_id 403, 저장된 행의 sender_id가 토큰 사용자인지,
+   같은 토큰 반복 요청은 Supabase Auth를 한 번만 호출하는지 (가짜 PostgREST가 messages RLS 적용)
+6. failures: 제약 위반 행이 섞인 배치는 반씩 나눠 그 행만 버리는지(재시도 없음), 일시적 오류(503·네트워크)만
+   재시도하는지, 만료 토큰은 나누지 않고 버리는지, 종료 시간 초과로 취소된 INSERT의 행이 failed로 세어지는지
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.database.models import TranscriptEvent
+from app.database.supabase import get_supabase_manager
+from app.services.transcript_writer import Row, TranscriptWriter, _insert_messages, event_rows, get_transcript_writer
+from benchmarks.harness import UpstreamConfig, run_load, running_app
+
+SENDER_ID = str(uuid.UUID(int=1))
+
+def _events(count: int, chatroom_id: str = "bench-room", sender_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    events: List[Dict[str, Any]] = [
+        {"content": f"transcript line {i}", "chatroom_id": chatroom_id} for i in range(count)
+    ]
+    if sender_id is not None:
+        for event in events:
+            event["sender_id"] = sender_id
+    return events
+
+def _auth(bench: Any, user_id: str = SENDER_ID) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {bench.supabase.issue_token(user_id)}"}
+
+def _upstream(args: argparse.Namespace) -> UpstreamConfig:
+    return UpstreamConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 5)
+
+async def inserts(args: argparse.Namespace) -> Dict[str, Any]:
+    rows = event_rows([TranscriptEvent(**event) for event in _events(args.rows)], SENDER_ID)
+    results: Dict[str, Any] = {"rows": args.rows, "supabase_latency_ms": args.latency_ms}
+    async with running_app(supabase=_upstream(args), rows=10) as bench:
+        messages_repo = await get_supabase_manager().get_message_repository(bench.supabase.issue_token(SENDER_ID))
+
+        async def measure(name: str, batch_size: int) -> None:
+            batches = [rows[i:i + batch_size] for i in range(0, len(rows), batch_size)]
+            before = bench.supabase.inserted_rows
+
+            async def call(i: int) -> int:
+                await messages_repo.insert_many(batches[i])
+                return 201
+
+            load = await run_load(call, len(batches), args.concurrency)
+            elapsed = load["duration_s"]
+            results[name] = {
+                "inserts": len(batches),
+                "rows_per_s": round(args.rows / elapsed, 1) if elapsed else None,
+                "errors": load["errors"],
+                "latency_ms_per_insert": load["latency_ms"],
+                "new_rows": bench.supabase.inserted_rows - before
+            }
+
+        bench.supabase.tables["messages"].clear()
+        await measure("single_row", 1)
+        for batch_size in args.batch_sizes:
+            bench.supabase.tables["messages"].clear()
+            await measure(f"batch_{batch_size}", batch_size)
+    return results
+
+async def ingest(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {"TRANSCRIPT_BATCH_SIZE": str(args.batch_size), "TRANSCRIPT_FLUSH_INTERVAL": str(args.flush_interval)}
+    async with running_app(supabase=_upstream(args), rows=10, env=env) as bench:
+        body = {"events": _events(args.events_per_request)}
+        # 여러 사용자가 동시에 보냄 → 배치 안에서 사용자(토큰)별로 나눠 저장
+        users = [_auth(bench, str(uuid.uuid4())) for _ in range(args.users)]
+
+        async def call(i: int) -> int:
+            response = await bench.client.post("/api/conversations/transcripts", json=body, headers=users[i % len(users)])
+            return response.status_code
+
+        started = time.perf_counter()
+        load = await run_load(call, args.requests, args.concurrency)
+        expected = args.requests * args.events_per_request
+        while bench.supabase.inserted_rows < expected and time.perf_counter() - started < 60:
+            await asyncio.sleep(0.01)
+        persisted_after = time.perf_counter() - started
+        return {
+            "requests": args.requests,
+            "events_per_request": args.events_per_request,
+            "users": args.users,
+            "supabase_latency_ms": args.latency_ms,
+            "ingest": load,
+            "persisted_rows": bench.supabase.inserted_rows,
+            "all_persisted_after_s": round(persisted_after, 3),
+            "persisted_rows_per_s": round(bench.supabase.inserted_rows / persisted_after, 1),
+            "writer": get_transcript_writer().stats()
+        }
+
+async def overflow(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    # 저장이 느린 상황 (INSERT 1회 200ms) + 작은 대기열
+    slow = UpstreamConfig(latency_ms=200)
+    body = {"events": _events(50)}
+    for policy in ("reject", "drop_oldest"):
+        env = {"TRANSCRIPT_OVERFLOW": policy, "TRANSCRIPT_MAX_QUEUE": "500", "TRANSCRIPT_BATCH_SIZE": "100"}
+        async with running_app(supabase=slow, rows=10, env=env) as bench:
+            statuses: Dict[str, int] = {}
+            retry_after = None
+            headers = _auth(bench)
+            for _ in range(40):
+                response = await bench.client.post("/api/conversations/transcripts", json=body, headers=headers)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+                retry_after = retry_after or response.headers.get("retry-after")
+            writer_stats = get_transcript_writer().stats()
+        results[policy] = {
+            "sent_events": 40 * 50,
+            "statuses": statuses,
+            "retry_after": retry_after,
+            "accepted": writer_stats["accepted"],
+            "rejected": writer_stats["rejected"],
+            "dropped": writer_stats["dropped"],
+            # lifespan 종료 시 남은 대기열까지 저장됨
+            "persisted_rows": bench.supabase.inserted_rows
+        }
+    return results
+
+async def shutdown(args: argparse.Namespace) -> Dict[str, Any]:
+    # 시간 조건으로는 저장되지 않도록 긴 주기 → 종료 시 저장만으로 전부 남아야 함
+    env = {"TRANSCRIPT_FLUSH_INTERVAL": "3600", "TRANSCRIPT_BATCH_SIZE": "100000"}
+    async with running_app(supabase=_upstream(args), rows=10, env=env) as bench:
+        headers = _auth(bench)
+        for _ in range(20):
+            await bench.client.post("/api/conversations/transcripts", json={"events": _events(100)}, headers=headers)
+        writer = get_transcript_writer()
+        queued_before_shutdown = writer.stats()["queued"]
+        persisted_before_shutdown = bench.supabase.inserted_rows
+    return {
+        "queued_before_shutdown": queued_before_shutdown,
+        "persisted_before_shutdown": persisted_before_shutdown,
+        "persisted_after_shutdown": bench.supabase.inserted_rows,
+        "writer": writer.stats()
+    }
+
+async def auth(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {"TRANSCRIPT_FLUSH_INTERVAL": "0.05"}
+    async with running_app(rows=10, env=env) as bench:
+        path = "/api/conversations/transcripts"
+        user_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+        headers = _auth(bench, user_id)
+        statuses = {
+            "no_token": (await bench.client.post(path, json={"events": _events(1)})).status_code,
+            "invalid_token": (await bench.client.post(
+                path, json={"events": _events(1)}, headers={"Authorization": "Bearer not.a.jwt"}
+            )).status_code,
+            "anon_key": (await bench.client.post(
+                path, json={"events": _events(1)}, headers={"Authorization": "Bearer fake-anon-key"}
+            )).status_code,
+            "other_sender": (await bench.client.post(
+                path, json={"events": _events(1, sender_id=other_id)}, headers=headers
+            )).status_code,
+            "own_sender": (await bench.client.post(
+                path, json={"events": _events(2, sender_id=user_id)}, headers=headers
+            )).status_code
+        }
+        for _ in range(5):
+            await bench.client.post(path, json={"events": _events(3)}, headers=headers)
+        await get_transcript_writer().flush()
+        await asyncio.sleep(0.1)
+        stored = [row for row in bench.supabase.tables["messages"] if row.get("chatroom_id") == "bench-room"]
+        auth_calls = bench.supabase.requests_by_table.get("auth.user", 0)
+        checks = {
+            "no_token_401": statuses["no_token"] == 401,
+            "invalid_token_401": statuses["invalid_token"] == 401,
+            "anon_key_401": statuses["anon_key"] == 401,
+            "other_sender_403": statuses["other_sender"] == 403,
+            "own_sender_202": statuses["own_sender"] == 202,
+            "all_rows_stored": len(stored) == 2 + 5 * 3,
+            "sender_is_token_user": all(row["sender_id"] == user_id for row in stored),
+            # JWT 형식이 아닌 토큰은 디코딩에서 거절, 같은 토큰 7번은 캐시 → /auth/v1/user 1번
+            "token_verification_cached": auth_calls == 1
+        }
+        writer = get_transcript_writer().stats()
+    return {"checks": checks, "ok": all(checks.values()), "statuses": statuses, "auth_user_calls": auth_calls, "writer": writer}
+
+async def failures(args: argparse.Namespace) -> Dict[str, Any]:
+    async with running_app(rows=10) as bench:
+        messages = bench.supabase.tables["messages"]
+        token = bench.supabase.issue_token(SENDER_ID)
+
+        # 1) 100행 중 3행이 message_type CHECK 위반 → 그 3행만 버림
+        rows = event_rows([TranscriptEvent(**event) for event in _events(100, "bench-bisect")], SENDER_ID)
+        bad_ids = {rows[i]["id"] for i in (7, 50, 93)}
+        for row in rows:
+            if row["id"] in bad_ids:
+                row["message_type"] = "not_a_type"
+        writer = TranscriptWriter(_insert_messages, retry_backoff=0.01)
+        writer.submit(rows, token)
+        await writer.flush()
+        stored = {row["id"] for row in messages if row.get("chatroom_id") == "bench-bisect"}
+        bisect = writer.stats()
+
+        # 2) 503(PGRST001) → 네트워크 오류 → 성공: 일시적 오류만 재시도
+        attempts: List[int] = []
+
+        async def flaky(batch: List[Row], batch_token: str) -> int:
+            attempts.append(len(batch))
+            if len(attempts) == 2:
+                raise httpx.ConnectError("injected network error")
+            bench.supabase.faults.error_rate = 1.0 if len(attempts) == 1 else 0.0
+            return await _insert_messages(batch, batch_token)
+
+        transient_rows = event_rows([TranscriptEvent(**event) for event in _events(20, "bench-transient")], SENDER_ID)
+        transient_writer = TranscriptWriter(flaky, retry_backoff=0.01)
+        transient_writer.submit(transient_rows, token)
+        await transient_writer.flush()
+        bench.supabase.faults.error_rate = 0.0
+        transient = transient_writer.stats()
+
+        # 3) 만료 토큰 → 행과 무관한 거절이므로 나누지 않고 한 번에 버림
+        expired_token = bench.supabase.issue_token(SENDER_ID, ttl=-1)
+        expired_writer = TranscriptWriter(_insert_messages, retry_backoff=0.01)
+        expired_writer.submit(event_rows([TranscriptEvent(**event) for event in _events(50, "bench-expired")], SENDER_ID), expired_token)
+        await expired_writer.flush()
+        expired = expired_writer.stats()
+
+        # 4) 응답하지 않는 INSERT 중 종료 → 진행 중이던 행과 남은 행 모두 failed
+        async def hang(batch: List[Row], batch_token: str) -> int:
+            await asyncio.sleep(3600)
+            return len(batch)
+
+        stuck_writer = TranscriptWriter(hang, flush_interval=0.01, shutdown_timeout=0.2)
+        stuck_rows = event_rows([TranscriptEvent(**event) for event in _events(50, "bench-stuck")], SENDER_ID)
+        stuck_writer.submit(stuck_rows[:30], token)
+        await asyncio.sleep(0.05)
+        stuck_writer.submit(stuck_rows[30:], token)
+        await stuck_writer.stop()
+        stuck = stuck_writer.stats()
+
+    checks = {
+        "bad_rows_discarded_only": stored == {row["id"] for row in rows} - bad_ids,
+        "bad_rows_counted_failed": bisect["failed"] == 3 and bisect["written"] == 97,
+        "constraint_error_not_retried": bisect["retries"] == 0 and bisect["splits"] > 0,
+        "transient_errors_retried": transient["retries"] == 2 and transient["written"] == 20 and transient["failed"] == 0,
+        "expired_token_not_split": expired["splits"] == 0 and expired["failed"] == 50 and expired["retries"] == 0,
+        "cancelled_in_flight_counted": stuck["failed"] == 50 and stuck["written"] == 0,
+        "nothing_left_in_flight": stuck["in_flight"] == 0 and stuck["queued"] == 0
+    }
+    return {
+        "checks": checks,
+        "ok": all(checks.values()),
+        "bisect": bisect,
+        "transient": {**transient, "attempts": attempts},
+        "expired_token": expired,
+        "stop_timeout": stuck
+    }
+
+SCENARIOS = {
+    "inserts": inserts, "ingest": ingest, "overflow": overflow, "shutdown": shutdown, "auth": auth, "failures": failures
+}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="대화 기록 일괄 저장 처리량 / 대기열 정책 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="가짜 Supabase 요청당 지연")
+    parser.add_argument("--rows", type=int, default=5000, help="inserts: 저장할 행 수")
+    parser.add_argument("--batch-sizes", type=int, nargs="*", default=[50, 500])
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=2000, help="ingest: 요청 수")
+    parser.add_argument("--events-per-request", type=int, default=5)
+    parser.add_argument("--users", type=int, default=50, help="ingest: 동시에 보내는 사용자(토큰) 수")
+    parser.add_argument("--batch-size", type=int, default=500, help="ingest: TRANSCRIPT_BATCH_SIZE")
+    parser.add_argument("--flush-interval", type=float, default=0.5, help="ingest: TRANSCRIPT_FLUSH_INTERVAL")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+public_id 메모리 라우팅 인덱스 확인 (가짜 Supabase)
+
+    cd backend
+    python -m benchmarks.voice_index --rows 1000000
+
+1. memory: 실제 형식과 비슷한 voices 행 --rows개(uuid id·user_id, agent_xxx, 8자 public_id)를 페이지 단위로
+   적재했을 때 남는 메모리 (tracemalloc). 비교: public_id → agent_id dict만 / 이 인덱스 / VoiceRecord dict
+2. lookup: 조회 1회 비용(µs) — index.lookup(agent_id만), index.get(VoiceRecord 생성), L1 VoiceCache hit
+3. routes: /api/voices/public/{public_id}와 /signed-url-by-public을 인덱스 끔/켬으로 호출
+   (L1 캐시 끔, Supabase 지연 --db-latency-ms) → 지연과 voices 테이블 요청 수
+4. refresh: 시작 후 추가된 행이 증분 갱신(고수위 이후 조회)으로 반영되는지, Realtime DELETE·UPDATE 반영,
+   인덱스에 없는 public_id는 DB 경로로 조회하는지
+5. no_realtime: Realtime 구독 없이 DB에서 지우거나 agent_id를 바꾼 음성이 VOICE_CACHE_TTL이 지나면 더는
+   인덱스로 라우팅되지 않고(DB 경로로 404·새 agent_id), 다음 동기화가 전체 적재로 반영하는지
+"""
+
+import gc
+import sys
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from app.database.cache import VoiceCache
+from app.database.models import VoiceRecord
+from app.database.voice_index import VoiceRoutingIndex
+from benchmarks.harness import UpstreamConfig, running_app, summarize
+
+_PUBLIC_ID_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789"
+
+def _realistic_rows(count: int, users: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """마이그레이션 형식과 비슷한 voices 행 (created_at 오름차순)"""
+    rng = random.Random(seed)
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(users)]
+    started = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "user_id": user_ids[rng.randrange(users)],
+            "voice_id": "".join(rng.choices(_PUBLIC_ID_CHARS, k=20)),
+            "agent_id": "agent_" + "".join(rng.choices(_PUBLIC_ID_CHARS, k=26)),
+            "file_name": f"recording_{i}.mp3",
+            "nickname": f"음성 {i % 500}" if i % 3 else None,
+            "public_id": f"{i:08x}",
+            "created_at": (started + timedelta(milliseconds=i)).isoformat(timespec="microseconds")
+        }
+
+class _RowSource:
+    """VoiceRepository.iter_index_pages 대역 (행을 페이지마다 새로 만들고 버림 → 인덱스가 가진 메모리만 남음)"""
+
+    def __init__(self, count: int, users: int) -> None:
+        self.count = count
+        self.users = users
+
+    async def iter_index_pages(self, page_size: int = 10_000, since: Optional[str] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        page: List[Dict[str, Any]] = []
+        for row in _realistic_rows(self.count, self.users):
+            page.append(row)
+            if len(page) == page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+def _measure(build: Any) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    structure = build()
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = len(structure)
+    del structure
+    gc.collect()
+    return {
+        "rows": size,
+        "mb": round(current / 2**20, 1),
+        "bytes_per_row": round(current / size, 1) if size else 0.0,
+        "peak_mb": round(peak / 2**20, 1)
+    }
+
+async def memory(args: argparse.Namespace) -> Dict[str, Any]:
+    def routing_dict() -> Dict[str, str]:
+        return {row["public_id"]: row["agent_id"] for row in _realistic_rows(args.rows, args.users)}
+
+    def routing_index() -> VoiceRoutingIndex:
+        index = VoiceRoutingIndex(page_size=args.page_size)
+        asyncio.run(index.load(_RowSource(args.rows, args.users)))
+        return index
+
+    def record_dict() -> Dict[str, VoiceRecord]:
+        return {row["public_id"]: VoiceRecord(**row) for row in _realistic_rows(args.rows, args.users)}
+
+    results: Dict[str, Any] = {"rows": args.rows, "users": args.users}
+    # asyncio.run은 이벤트 루프 안에서 부를 수 없으므로 별도 스레드에서 측정
+    results["public_id_to_agent_id_dict"] = await asyncio.to_thread(_measure, routing_dict)
+    results["voice_index"] = await asyncio.to_thread(_measure, routing_index)
+    if not args.skip_records:
+        results["voice_record_dict"] = await asyncio.to_thread(_measure, record_dict)
+
+    # tracemalloc 없이 적재 시간 (가짜 행 생성 포함이므로 상한)
+    index = VoiceRoutingIndex(page_size=args.page_size)
+    await index.load(_RowSource(args.rows, args.users))
+    results["voice_index_load_s"] = round(index.last_load_ms / 1000, 2)
+    return results
+
+def _timed(fn: Any, items: List[str], repeat: int) -> float:
+    """항목당 평균 µs"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - started) / (repeat * len(items)) * 1e6
+
+async def lookup(args: argparse.Namespace) -> Dict[str, Any]:
+    count = min(args.rows, 100_000)
+    index = VoiceRoutingIndex()
+    await index.load(_RowSource(count, args.users))
+    rng = random.Random(1)
+    public_ids = [f"{rng.randrange(count):08x}" for _ in range(10_000)]
+    missing = [f"x{i:07d}" for i in range(10_000)]
+
+    cache = VoiceCache(max_size=count * 2, ttl=3600)
+    for public_id in dict.fromkeys(public_ids):
+        cache.set("public_id", public_id, index.get(public_id))
+
+    return {
+        "index_rows": len(index),
+        "us_per_lookup": {
+            "index.lookup (agent_id)": round(_timed(index.lookup, public_ids, args.repeat), 3),
+            "index.get (VoiceRecord)": round(_timed(index.get, public_ids, args.repeat), 3),
+            "index.get miss": round(_timed(index.get, missing, args.repeat), 3),
+            "VoiceCache.get hit (L1)": round(_timed(lambda value: cache.get("public_id", value), public_ids, args.repeat), 3)
+        }
+    }
+
+async def routes(args: argparse.Namespace) -> Dict[str, Any]:
+    results: Dict[str, Any] = {"db_latency_ms": args.db_latency_ms, "requests": args.requests}
+    for name, enabled in (("index_off", "false"), ("index_on", "true")):
+        env = {
+            "VOICE_INDEX_ENABLED": enabled,
+            "VOICE_CACHE_ENABLED": "false",
+            "ADMISSION_ENABLED": "false",
+            "RATE_LIMIT_ENABLED": "false"
+        }
+        async with running_app(
+            supabase=UpstreamConfig(latency_ms=args.db_latency_ms), rows=args.route_rows, env=env
+        ) as bench:
+            rng = random.Random(2)
+            public_ids = [bench.rows[rng.randrange(len(bench.rows))]["public_id"] for _ in range(args.requests)]
+            before = bench.supabase.requests_by_table.get("voices", 0)
+            entry: Dict[str, Any] = {}
+            for route, path in (
+                ("voices_public", "/api/voices/public/{}"),
+                ("signed_url_by_public", "/api/conversations/signed-url-by-public?public_id={}")
+            ):
+                latencies: List[float] = []
+                statuses: Dict[int, int] = {}
+                start_count = bench.supabase.requests_by_table.get("voices", 0)
+                for public_id in public_ids:
+                    started = time.perf_counter()
+                    status = (await bench.client.get(path.format(public_id))).status_code
+                    latencies.append(time.perf_counter() - started)
+                    statuses[status] = statuses.get(status, 0) + 1
+                entry[route] = {
+                    "status_codes": statuses,
+                    "latency_ms": summarize(latencies),
+                    "voices_db_requests": bench.supabase.requests_by_table.get("voices", 0) - start_count
+                }
+            health = (await bench.client.get("/health")).json()
+            entry["startup_voices_db_requests"] = before
+            entry["voice_index"] = health.get("voice_index")
+            results[name] = entry
+    return results
+
+async def refresh(args: argparse.Namespace) -> Dict[str, Any]:
+    env = {"VOICE_INDEX_ENABLED": "true", "VOICE_INDEX_PAGE_SIZE": "400", "VOICE_CACHE_ENABLED": "false"}
+    async with running_app(rows=1000, env=env) as bench:
+        from app.database.supabase import get_supabase_manager
+        manager = get_supabase_manager()
+        index = manager.voice_index
+        voices_repo = await manager.get_voice_repository()
+        startup_requests = bench.supabase.requests_by_table.get("voices", 0)
+
+        # 시작 후 새 음성 추가 → 인덱스에는 아직 없지만 DB 경로로 200
+        newest = max(row["created_at"] for row in bench.rows)
+        created_at = (datetime.fromisoformat(newest) + timedelta(seconds=1)).isoformat(timespec="microseconds")
+        new_row = {
+            "id": str(uuid.uuid4()), "user_id": "user-0001", "voice_id": "voice_new", "agent_id": "agent_new",
+            "file_name": "new.mp3", "nickname": None, "public_id": "pnew0001", "created_at": created_at
+        }
+        bench.rows.insert(0, new_row)
+        before_refresh_status = (await bench.client.get("/api/voices/public/pnew0001")).status_code
+        before_refresh_indexed = index.lookup("pnew0001") is not None
+
+        refreshed = await index.refresh(voices_repo)
+        requests_before = bench.supabase.requests_by_table.get("voices", 0)
+        after_refresh_status = (await bench.client.get("/api/voices/public/pnew0001")).status_code
+        served_without_db = bench.supabase.requests_by_table.get("voices", 0) == requests_before
+
+        # Realtime: 닉네임 변경, public_id 변경, 삭제
+        target = bench.rows[10]
+        manager._handle_voice_change({"data": {
+            "type": "UPDATE", "record": {**target, "nickname": "바뀐 이름"}, "old_record": target
+        }})
+        renamed = index.get(target["public_id"])
+        moved = bench.rows[11]
+        manager._handle_voice_change({"data": {
+            "type": "UPDATE", "record": {**moved, "public_id": "pmoved01"}, "old_record": moved
+        }})
+        deleted = bench.rows[12]
+        manager._handle_voice_change({"data": {"type": "DELETE", "record": None, "old_record": deleted}})
+
+        checks = {
+            "startup_loaded_all_rows": index.stats()["full_loads"] == 1 and len(index) == 1000,
+            "new_row_not_404_before_refresh": before_refresh_status == 200 and not before_refresh_indexed,
+            "incremental_refresh_adds_row": index.lookup("pnew0001") == "agent_new",
+            "served_without_db_after_refresh": after_refresh_status == 200 and served_without_db,
+            "realtime_update_applied": renamed is not None and renamed.nickname == "바뀐 이름",
+            "realtime_public_id_change": index.lookup(moved["public_id"]) is None and index.lookup("pmoved01") == moved["agent_id"],
+            "realtime_delete_applied": index.lookup(deleted["public_id"]) is None
+        }
+        return {
+            "page_size": index.page_size,
+            "startup_voices_db_requests": startup_requests,
+            "refreshed_rows": refreshed,
+            "checks": checks,
+            "ok": all(checks.values()),
+            "voice_index": index.stats()
+        }
+
+async def no_realtime(args: argparse.Namespace) -> Dict[str, Any]:
+    """Realtime 구독 없이 DB에서 지우거나 agent_id를 바꾼 음성이 VOICE_CACHE_TTL보다 오래 라우팅되지 않는지"""
+    ttl = 1.0
+    env = {
+        "VOICE_INDEX_ENABLED": "true",
+        "VOICE_CACHE_ENABLED": "false",
+        "VOICE_CACHE_TTL": str(ttl),
+        # 백그라운드 동기화가 끼어들지 않도록 (sync_once를 직접 호출)
+        "VOICE_INDEX_REFRESH_INTERVAL": "3600",
+        "RATE_LIMIT_ENABLED": "false"
+    }
+    async with running_app(rows=100, env=env) as bench:
+        from app.database.supabase import get_supabase_manager
+        manager = get_supabase_manager()
+        index = manager.voice_index
+        voices_repo = await manager.get_voice_repository()
+
+        # Realtime 이벤트 없이 DB만 변경
+        deleted = bench.rows.pop(5)
+        changed = bench.rows[6]
+        changed["agent_id"] = "agent_changed"
+
+        async def status(public_id: str) -> int:
+            return (await bench.client.get(f"/api/voices/public/{public_id}")).status_code
+
+        within_ttl = {"deleted_routed": index.lookup(deleted["public_id"]) is not None, "fresh": index.fresh}
+        await asyncio.sleep(ttl + 0.1)
+        requests_before = bench.supabase.requests_by_table.get("voices", 0)
+        after_ttl = {
+            "fresh": index.fresh,
+            "deleted_status": await status(deleted["public_id"]),
+            "changed_agent_id": (await bench.client.get(f"/api/voices/public/{changed['public_id']}")).json().get("agent_id"),
+            "voices_db_requests": bench.supabase.requests_by_table.get("voices", 0) - requests_before
+        }
+        full_loads = index.stats()["full_loads"]
+        await index.sync_once(voices_repo)
+        after_sync = {
+            "full_reload": index.stats()["full_loads"] == full_loads + 1,
+            "fresh": index.fresh,
+            "deleted_routed": index.lookup(deleted["public_id"]) is not None,
+            "changed_agent_id": index.lookup(changed["public_id"])
+        }
+
+        # Realtime을 받고 있으면 TTL과 무관하게 full_reload_interval까지 인덱스 사용
+        index.realtime = True
+        await asyncio.sleep(ttl + 0.1)
+        fresh_with_realtime = index.fresh
+        index.realtime = False
+
+        checks = {
+            "realtime_off": not manager.voice_index.realtime and index.stats()["realtime"] is False,
+            "stale_after_ttl": within_ttl["fresh"] and not after_ttl["fresh"],
+            "deleted_404_after_ttl": after_ttl["deleted_status"] == 404,
+            "changed_agent_id_after_ttl": after_ttl["changed_agent_id"] == "agent_changed",
+            "full_reload_when_due": after_sync["full_reload"] and after_sync["fresh"],
+            "reload_applies_delete_and_change": (
+                not after_sync["deleted_routed"] and after_sync["changed_agent_id"] == "agent_changed"
+            ),
+            "realtime_not_capped_by_ttl": fresh_with_realtime
+        }
+        return {
+            "cache_ttl_s": ttl,
+            "within_ttl": within_ttl,
+            "after_ttl": after_ttl,
+            "after_sync": after_sync,
+            "checks": checks,
+            "ok": all(checks.values()),
+            "voice_index": index.stats()
+        }
+
+SCENARIOS = {"memory": memory, "lookup": lookup, "routes": routes, "refresh": refresh, "no_realtime": no_realtime}
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    results = {}
+    for name in args.scenarios:
+        results[name] = await SCENARIOS[name](args)
+        print(f"== {name}")
+        print(json.dumps(results[name], ensure_ascii=False, indent=2))
+    return results
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="public_id 메모리 라우팅 인덱스 확인")
+    parser.add_argument("--scenarios", nargs="*", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--rows", type=int, default=1_000_000, help="memory / lookup: 인덱스 행 수")
+    parser.add_argument("--users", type=int, default=20_000, help="memory: 서로 다른 user_id 수")
+    parser.add_argument("--page-size", type=int, default=10_000)
+    parser.add_argument("--skip-records", action="store_true", help="memory: VoiceRecord dict 비교 생략")
+    parser.add_argument("--repeat", type=int, default=20, help="lookup: 반복 횟수")
+    parser.add_argument("--route-rows", type=int, default=5000, help="routes: voices 행 수")
+    parser.add_argument("--requests", type=int, default=500, help="routes: 경로별 요청 수")
+    parser.add_argument("--db-latency-ms", type=float, default=5.0)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    failed = [name for name, result in results.items() if result.get("ok") is False]
+    if failed:
+        print(f"확인 실패: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
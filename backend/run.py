@@ -5,8 +5,15 @@ AI Voice Chat FastAPI 서버 실행 스크립트
 
 import uvicorn
 import os
+import sys
+import math
+import argparse
+import importlib.util
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
+APP = "app.main:app"
+
 def check_environment() -> None:
     """환경변수 확인 및 출력"""
     print("🚀 AI Voice Chat FastAPI 서버 시작...")
@@ -33,31 +40,110 @@ def check_environment() -> None:
     
     print("=" * 50)
 
-def main() -> None:
+def cpu_count() -> int:
+    """사용 가능한 CPU 수 (CPU affinity 및 cgroup CPU quota 반영)"""
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    # 컨테이너 CPU 제한 (cgroup v2: "quota period", v1: cfs_quota_us / cfs_period_us)
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            count = min(count, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota_us = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period_us = int(f.read())
+            if quota_us > 0 and period_us > 0:
+                count = min(count, math.ceil(quota_us / period_us))
+        except (OSError, ValueError):
+            pass
+
+    return max(1, count)
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+def server_options(mode: str) -> Dict[str, Any]:
+    """실행 모드별 uvicorn 옵션
+
+    - development: 단일 프로세스 + 자동 재시작 (파일 감시)
+    - production: CPU 수만큼 워커, uvloop/httptools, 종료 시 진행 중 요청 drain
+    """
+    options: Dict[str, Any] = {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", 8000)),
+        "log_level": os.getenv("LOG_LEVEL", "info")
+    }
+
+    if mode != "production":
+        options["reload"] = True
+        return options
+
+    workers = int(os.getenv("WEB_CONCURRENCY", 0)) or cpu_count()
+    options.update({
+        "reload": False,
+        "workers": workers,
+        "loop": "uvloop" if _installed("uvloop") else "auto",
+        "http": "httptools" if _installed("httptools") else "auto",
+        # SIGTERM 후 새 연결은 받지 않고 진행 중 요청을 최대 N초 기다린 뒤 lifespan 종료 훅 실행
+        "timeout_graceful_shutdown": int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", 30)),
+        "timeout_keep_alive": int(os.getenv("KEEPALIVE_TIMEOUT", 5)),
+        "backlog": int(os.getenv("BACKLOG", 2048)),
+        "access_log": os.getenv("ACCESS_LOG", "false").lower() in ("1", "true", "yes"),
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+    })
+
+    # 메모리 누수 대비 워커 주기적 재시작 (선택)
+    max_requests = int(os.getenv("WORKER_MAX_REQUESTS", 0))
+    if max_requests:
+        options["limit_max_requests"] = max_requests
+        options["limit_max_requests_jitter"] = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", max_requests // 10))
+
+    return options
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="AI Voice Chat FastAPI 서버 실행")
+    parser.add_argument(
+        "--mode",
+        choices=["development", "production"],
+        default=os.getenv("SERVER_MODE", "development"),
+        help="실행 모드 (기본: SERVER_MODE 환경변수 또는 development)"
+    )
+    return parser.parse_args(argv)
+
+def main(argv: Optional[list] = None) -> None:
     """메인 실행 함수"""
     # 환경변수 로드
     load_dotenv()
     
+    args = parse_args(argv)
+    
     # 환경변수 확인
     check_environment()
     
-    # 서버 정보 출력
-    host = os.getenv("HOST", "0.0.0.0")
-    port = int(os.getenv("PORT", 8000))
+    options = server_options(args.mode)
+    host, port = options["host"], options["port"]
     
+    # 서버 정보 출력
     print(f"🌟 서버 실행 중... (http://{host}:{port})")
+    print(f"⚙️  실행 모드: {args.mode}", end="")
+    if args.mode == "production":
+        print(f" (workers={options['workers']}, loop={options['loop']}, http={options['http']})")
+    else:
+        print(" (자동 재시작)")
     print(f"📚 API 문서: http://localhost:{port}/docs")
     print(f"🏥 헬스체크: http://localhost:{port}/health")
     print("=" * 50)
     
     # 서버 실행
-    uvicorn.run(
-        "app.main:app",
-        host=host,
-        port=port,
-        reload=True,
-        log_level="info"
-    )
+    uvicorn.run(APP, **options)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main(sys.argv[1:])
\ No newline at end of file
@@ -0,0 +1,12 @@
+-- Enable Realtime change events on voices table
+-- Used by the backend to invalidate its in-process VoiceRecord cache
+
+-- Include the full old row in UPDATE/DELETE events
+-- (needed to evict entries keyed by the previous agent_id/public_id)
+ALTER TABLE voices REPLICA IDENTITY FULL;
+
+-- Publish voices changes to Supabase Realtime
+ALTER PUBLICATION supabase_realtime ADD TABLE voices;
+
+-- Add helpful comments
+COMMENT ON TABLE voices IS 'Voice agents; changes are published to Realtime for backend cache invalidation';
@@ -0,0 +1,17 @@
+-- Add composite indexes for /api/voices/list keyset pagination
+-- The list endpoint filters agent_id IS NOT NULL (and optionally user_id)
+-- and pages with ORDER BY created_at DESC, id DESC
+
+-- Global listing: partial index on rows that have an agent
+CREATE INDEX IF NOT EXISTS idx_voices_agent_created_id
+  ON voices (created_at DESC, id DESC)
+  WHERE agent_id IS NOT NULL;
+
+-- Per-user listing
+CREATE INDEX IF NOT EXISTS idx_voices_user_created_id
+  ON voices (user_id, created_at DESC, id DESC)
+  WHERE agent_id IS NOT NULL;
+
+-- Add helpful comments
+COMMENT ON INDEX idx_voices_agent_created_id IS 'Keyset pagination for voice list (created_at, id) over agents';
+COMMENT ON INDEX idx_voices_user_created_id IS 'Keyset pagination for per-user voice list (user_id, created_at, id)';
@@ -0,0 +1,142 @@
+-- Create trigger-maintained counters for voices statistics
+-- Replaces COUNT(*) scans in /api/voices/stats and /health with single-row reads
+
+-- Global counter (single row, id is always TRUE)
+CREATE TABLE voice_stats (
+  id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+  total_voices BIGINT NOT NULL DEFAULT 0,
+  voices_with_agent BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Per-user counters
+CREATE TABLE voice_user_stats (
+  user_id TEXT PRIMARY KEY,
+  total_voices BIGINT NOT NULL DEFAULT 0,
+  voices_with_agent BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+-- Enable Row Level Security
+ALTER TABLE voice_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE voice_user_stats ENABLE ROW LEVEL SECURITY;
+
+-- RLS Policies
+-- Policy: Anyone can read counters (writes happen only through triggers)
+CREATE POLICY "Anyone can read voice stats" ON voice_stats
+  FOR SELECT USING (true);
+
+CREATE POLICY "Anyone can read voice user stats" ON voice_user_stats
+  FOR SELECT USING (true);
+
+-- Apply a batch of row changes to the counters
+-- p_sign is +1 for added rows and -1 for removed rows
+CREATE OR REPLACE FUNCTION voice_stats_apply(
+  p_user_ids TEXT[],
+  p_has_agent BOOLEAN[],
+  p_sign INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    IF p_has_agent IS NULL OR cardinality(p_has_agent) = 0 THEN
+        RETURN;
+    END IF;
+
+    UPDATE voice_stats SET
+        total_voices = total_voices + p_sign * cardinality(p_has_agent),
+        voices_with_agent = voices_with_agent
+            + p_sign * (SELECT count(*) FROM unnest(p_has_agent) AS h(has_agent) WHERE h.has_agent),
+        updated_at = NOW()
+    WHERE id;
+
+    INSERT INTO voice_user_stats (user_id, total_voices, voices_with_agent, updated_at)
+    SELECT
+        u.user_id,
+        p_sign * count(*),
+        p_sign * count(*) FILTER (WHERE u.has_agent),
+        NOW()
+    FROM unnest(p_user_ids, p_has_agent) AS u(user_id, has_agent)
+    WHERE u.user_id IS NOT NULL
+    GROUP BY u.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_voices = voice_user_stats.total_voices + EXCLUDED.total_voices,
+        voices_with_agent = voice_user_stats.voices_with_agent + EXCLUDED.voices_with_agent,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Statement-level trigger function (one counter update per statement, not per row)
+CREATE OR REPLACE FUNCTION voice_stats_on_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM voice_stats_apply(
+            array_agg(user_id::TEXT), array_agg(agent_id IS NOT NULL), 1
+        ) FROM new_rows;
+    END IF;
+
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM voice_stats_apply(
+            array_agg(user_id::TEXT), array_agg(agent_id IS NOT NULL), -1
+        ) FROM old_rows;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Reset counters on TRUNCATE
+CREATE OR REPLACE FUNCTION voice_stats_on_truncate()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE voice_stats SET total_voices = 0, voices_with_agent = 0, updated_at = NOW() WHERE id;
+    DELETE FROM voice_user_stats;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+-- Counter functions run only from triggers: revoke EXECUTE so the SECURITY DEFINER
+-- functions in public are not callable through PostgREST /rpc
+REVOKE EXECUTE ON FUNCTION voice_stats_apply(TEXT[], BOOLEAN[], INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION voice_stats_on_change() FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION voice_stats_on_truncate() FROM PUBLIC, anon, authenticated;
+
+-- Backfill from current data (block writes while counting so no change is missed)
+LOCK TABLE voices IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO voice_stats (id, total_voices, voices_with_agent)
+SELECT TRUE, count(*), count(agent_id) FROM voices;
+
+INSERT INTO voice_user_stats (user_id, total_voices, voices_with_agent)
+SELECT user_id::TEXT, count(*), count(agent_id)
+FROM voices
+WHERE user_id IS NOT NULL
+GROUP BY user_id;
+
+-- Create triggers (transition tables require one trigger per event)
+CREATE TRIGGER voice_stats_after_insert
+    AFTER INSERT ON voices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION voice_stats_on_change();
+
+CREATE TRIGGER voice_stats_after_update
+    AFTER UPDATE ON voices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION voice_stats_on_change();
+
+CREATE TRIGGER voice_stats_after_delete
+    AFTER DELETE ON voices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION voice_stats_on_change();
+
+CREATE TRIGGER voice_stats_after_truncate
+    AFTER TRUNCATE ON voices
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION voice_stats_on_truncate();
+
+-- Add helpful comments
+COMMENT ON TABLE voice_stats IS 'Trigger-maintained voices counters (single row) for stats and health endpoints';
+COMMENT ON TABLE voice_user_stats IS 'Trigger-maintained per-user voices counters';
@@ -0,0 +1,142 @@
+-- Trigger-maintained voices counters must match COUNT(*) after bulk writes
+-- Run against the local stack: supabase test db
+
+BEGIN;
+CREATE EXTENSION IF NOT EXISTS pgtap WITH SCHEMA extensions;
+SELECT plan(14);
+
+-- Counters vs. a real count over voices (global row and the test users)
+CREATE TEMP VIEW voice_stats_drift AS
+SELECT 'global' AS scope,
+       s.total_voices - (SELECT count(*) FROM voices) AS total_drift,
+       s.voices_with_agent - (SELECT count(agent_id) FROM voices) AS agent_drift
+FROM voice_stats s
+UNION ALL
+SELECT u.user_id,
+       coalesce(s.total_voices, 0) - (SELECT count(*) FROM voices v WHERE v.user_id::TEXT = u.user_id),
+       coalesce(s.voices_with_agent, 0) - (SELECT count(agent_id) FROM voices v WHERE v.user_id::TEXT = u.user_id)
+FROM (VALUES
+    ('00000000-0000-4000-8000-00000000a001'),
+    ('00000000-0000-4000-8000-00000000a002')
+) AS u(user_id)
+LEFT JOIN voice_user_stats s ON s.user_id = u.user_id;
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) before test writes'
+);
+
+-- Bulk insert: 500 rows for user a001 (every 3rd without agent), 200 rows for a002
+INSERT INTO voices (id, user_id, voice_id, file_name, agent_id, public_id)
+SELECT gen_random_uuid(), '00000000-0000-4000-8000-00000000a001', 'voice_' || i, 'file_' || i || '.wav',
+       CASE WHEN i % 3 = 0 THEN NULL ELSE 'agent_t1_' || i END,
+       'ta' || lpad(i::TEXT, 6, '0')
+FROM generate_series(1, 500) AS i;
+
+INSERT INTO voices (id, user_id, voice_id, file_name, agent_id, public_id)
+SELECT gen_random_uuid(), '00000000-0000-4000-8000-00000000a002', 'voice_' || i, 'file_' || i || '.wav',
+       'agent_t2_' || i, 'tb' || lpad(i::TEXT, 6, '0')
+FROM generate_series(1, 200) AS i;
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) after bulk insert'
+);
+SELECT is(
+    (SELECT total_voices FROM voice_user_stats WHERE user_id = '00000000-0000-4000-8000-00000000a001'),
+    500::BIGINT,
+    'per-user total after bulk insert'
+);
+SELECT is(
+    (SELECT voices_with_agent FROM voice_user_stats WHERE user_id = '00000000-0000-4000-8000-00000000a001'),
+    334::BIGINT,
+    'per-user voices_with_agent after bulk insert'
+);
+
+-- UPDATE that flips agent_id both ways (NULL -> set, set -> NULL) in one statement
+UPDATE voices
+SET agent_id = CASE WHEN agent_id IS NULL THEN 'agent_flip_' || voice_id ELSE NULL END
+WHERE user_id::TEXT = '00000000-0000-4000-8000-00000000a001'
+  AND public_id BETWEEN 'ta000001' AND 'ta000030';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) after UPDATE flipping agent_id'
+);
+SELECT is(
+    (SELECT voices_with_agent FROM voice_user_stats WHERE user_id = '00000000-0000-4000-8000-00000000a001'),
+    324::BIGINT,
+    'voices_with_agent follows flipped agent_id (10 set, 20 cleared)'
+);
+
+-- UPDATE that moves rows to another user
+UPDATE voices
+SET user_id = '00000000-0000-4000-8000-00000000a002'
+WHERE user_id::TEXT = '00000000-0000-4000-8000-00000000a001'
+  AND public_id BETWEEN 'ta000401' AND 'ta000500';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) after UPDATE moving rows between users'
+);
+
+-- UPDATE that touches rows without changing counted columns
+UPDATE voices SET nickname = 'renamed'
+WHERE user_id::TEXT = '00000000-0000-4000-8000-00000000a002';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters unchanged by UPDATE of uncounted columns'
+);
+
+-- Bulk delete (mixed users, with and without agent)
+DELETE FROM voices
+WHERE public_id LIKE 'ta%' AND public_id >= 'ta000250'
+   OR public_id LIKE 'tb%' AND public_id <= 'tb000100';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) after bulk delete'
+);
+
+-- Statement with no affected rows
+DELETE FROM voices WHERE public_id = 'does-not-exist';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters unchanged by statement affecting no rows'
+);
+
+-- Delete the rest of the test rows
+DELETE FROM voices WHERE public_id LIKE 'ta%' OR public_id LIKE 'tb%';
+
+SELECT is(
+    (SELECT count(*) FROM voice_stats_drift WHERE total_drift <> 0 OR agent_drift <> 0),
+    0::BIGINT,
+    'counters match count(*) after deleting all test rows'
+);
+
+-- Counter functions are not callable by API roles
+SELECT ok(
+    NOT has_function_privilege('anon', 'voice_stats_apply(text[], boolean[], integer)', 'EXECUTE'),
+    'anon cannot execute voice_stats_apply'
+);
+SELECT ok(
+    NOT has_function_privilege('authenticated', 'voice_stats_apply(text[], boolean[], integer)', 'EXECUTE'),
+    'authenticated cannot execute voice_stats_apply'
+);
+SELECT ok(
+    NOT has_function_privilege('anon', 'voice_stats_on_change()', 'EXECUTE')
+    AND NOT has_function_privilege('authenticated', 'voice_stats_on_truncate()', 'EXECUTE'),
+    'API roles cannot execute counter trigger functions'
+);
+
+SELECT * FROM finish();
+ROLLBACK;
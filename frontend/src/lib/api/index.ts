@@ -1,4 +1,4 @@
-import { VoiceListResponse, SignedUrlResponse, VoiceAgent, PublicIdToAgentResponse } from '../../types';
+import { VoiceListResponse, SignedUrlResponse, VoiceAgent, PublicIdToAgentResponse, VoiceLookupKey, VoiceResolveResponse } from '../../types';
 
 // API 설정
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
@@ -14,6 +14,23 @@ class ApiError extends Error {
   }
 }
 
+// 탭별 세션 식별자 (서버가 같은 탭의 새로고침·재연결에 Signed URL을 잠시 재사용할 때 사용)
+const CLIENT_SESSION_KEY = 'client-session-id';
+
+function getClientSessionId(): string | null {
+  if (typeof window === 'undefined' || !window.crypto?.randomUUID) return null;
+  try {
+    let sessionId = window.sessionStorage.getItem(CLIENT_SESSION_KEY);
+    if (!sessionId) {
+      sessionId = window.crypto.randomUUID();
+      window.sessionStorage.setItem(CLIENT_SESSION_KEY, sessionId);
+    }
+    return sessionId;
+  } catch {
+    return null;
+  }
+}
+
 class ApiService {
   private baseUrl: string;
 
@@ -28,11 +45,11 @@ class ApiService {
     const url = `${this.baseUrl}${endpoint}`;
     
     const response = await fetch(url, {
+      ...options,
       headers: {
         'Content-Type': 'application/json',
         ...options.headers,
       },
-      ...options,
     });
 
     if (!response.ok) {
@@ -49,10 +66,11 @@ class ApiService {
 
   // === Voice API ===
   
-  async getVoiceList(userId?: string, limit: number = 50): Promise<VoiceListResponse> {
+  async getVoiceList(userId?: string, limit: number = 50, cursor?: string): Promise<VoiceListResponse> {
     const params = new URLSearchParams();
     if (userId) params.append('user_id', userId);
     params.append('limit', limit.toString());
+    if (cursor) params.append('cursor', cursor);
     
     const queryString = params.toString();
     const endpoint = `/api/voices/list${queryString ? `?${queryString}` : ''}`;
@@ -68,16 +86,33 @@ class ApiService {
     return this.request<PublicIdToAgentResponse>(`/api/voices/public/${publicId}`);
   }
 
+  // 여러 agent_id / public_id를 한 번에 조회 (최대 100개, 요청 순서 유지)
+  async resolveVoices(ids: VoiceLookupKey[]): Promise<VoiceResolveResponse> {
+    return this.request<VoiceResolveResponse>('/api/voices/resolve', {
+      method: 'POST',
+      body: JSON.stringify({ ids }),
+    });
+  }
+
   // === Conversation API ===
   
+  private sessionHeaders(): Record<string, string> {
+    const sessionId = getClientSessionId();
+    return sessionId ? { 'X-Client-Session': sessionId } : {};
+  }
+
   async getSignedUrl(agentId: string): Promise<SignedUrlResponse> {
     const params = new URLSearchParams({ agent_id: agentId });
-    return this.request<SignedUrlResponse>(`/api/conversations/signed-url?${params}`);
+    return this.request<SignedUrlResponse>(`/api/conversations/signed-url?${params}`, {
+      headers: this.sessionHeaders(),
+    });
   }
 
   async getSignedUrlByPublicId(publicId: string): Promise<SignedUrlResponse> {
     const params = new URLSearchParams({ public_id: publicId });
-    return this.request<SignedUrlResponse>(`/api/conversations/signed-url-by-public?${params}`);
+    return this.request<SignedUrlResponse>(`/api/conversations/signed-url-by-public?${params}`, {
+      headers: this.sessionHeaders(),
+    });
   }
 
   async validateAgent(agentId: string): Promise<{ valid: boolean; message: string }> {
@@ -95,8 +130,8 @@ class ApiService {
 export const apiService = new ApiService();
 
 // 개별 함수들 (하위 호환성)
-export const getVoiceList = (userId?: string, limit?: number) => 
-  apiService.getVoiceList(userId, limit);
+export const getVoiceList = (userId?: string, limit?: number, cursor?: string) => 
+  apiService.getVoiceList(userId, limit, cursor);
 
 export const getSignedUrl = (agentId: string) => 
   apiService.getSignedUrl(agentId);
@@ -107,6 +142,9 @@ export const getSignedUrlByPublicId = (publicId: string) =>
 export const getAgentByPublicId = (publicId: string) => 
   apiService.getAgentByPublicId(publicId);
 
+export const resolveVoices = (ids: VoiceLookupKey[]) => 
+  apiService.resolveVoices(ids);
+
 export const validateAgent = (agentId: string) => 
   apiService.validateAgent(agentId);
 
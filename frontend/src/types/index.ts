@@ -23,6 +23,7 @@ export interface VoiceAgent {
 export interface VoiceListResponse extends BaseResponse {
   voices: VoiceAgent[];
   total: number;
+  next_cursor?: string | null;
 }
 
 export interface SignedUrlResponse extends BaseResponse {
@@ -40,6 +41,26 @@ export interface PublicIdToAgentResponse extends BaseResponse {
   created_at?: string | null;
 }
 
+export type VoiceLookupKind = 'agent_id' | 'public_id';
+
+export interface VoiceLookupKey {
+  kind: VoiceLookupKind;
+  id: string;
+}
+
+export interface VoiceResolveResult extends BaseResponse {
+  kind: VoiceLookupKind;
+  id: string;
+  found: boolean;
+  voice: VoiceAgent | null;
+}
+
+export interface VoiceResolveResponse extends BaseResponse {
+  results: VoiceResolveResult[];
+  found: number;
+  not_found: number;
+}
+
 // === Chat Types ===
 export interface ChatMessage {
   id: string;